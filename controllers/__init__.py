@@ -2,12 +2,17 @@
 
 from .database_manager import DatabaseManager, get_db
 from .excel_handler import ExcelHandler
-from .harmanlama_engine import HarmanlamaEngine, HarmanlamaConfig
+from .harmanlama_engine import HarmanlamaEngine, HarmanlamaConfig, IptalBelirteci
+from .toplu_harmanlama import TopluHarmanlamaEngine
+from .harmanlama_portfoy import PortfoyHarmanlama
 
 __all__ = [
     'DatabaseManager',
     'get_db',
     'ExcelHandler',
     'HarmanlamaEngine',
-    'HarmanlamaConfig'
+    'HarmanlamaConfig',
+    'IptalBelirteci',
+    'TopluHarmanlamaEngine',
+    'PortfoyHarmanlama'
 ]
\ No newline at end of file
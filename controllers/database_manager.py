@@ -12,6 +12,7 @@ import os
 
 from utils import MIN_SINIF, MAX_SINIF, get_user_data_path, ensure_user_data_dir
 from models import SinifSeviye
+from controllers.harmanlama_cache import duzen_onbellegini_gecersiz_kil
 
 
 class DatabaseManager:
@@ -186,6 +187,31 @@ class DatabaseManager:
                 )
             """)
             
+            # Harmanlama Çalışma Geçmişi (yerleşim kaydıyla aynı işlemde yazılır)
+            cursor.execute("""
+                CREATE TABLE IF NOT EXISTS harmanlama_gecmisi (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    tarih TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                    sinav_idleri TEXT NOT NULL,
+                    ogrenci_sayisi INTEGER NOT NULL,
+                    sabit_sayisi INTEGER DEFAULT 0,
+                    salon_sayisi INTEGER NOT NULL,
+                    koltuk_sayisi INTEGER,
+                    yerlestirilen INTEGER,
+                    cozum_yolu TEXT,
+                    portfoy_stratejisi TEXT,
+                    cozucu_durumu TEXT,
+                    ogretmen_masasi INTEGER DEFAULT 0,
+                    ihlal_sayisi INTEGER DEFAULT 0,
+                    uyumsuzluk_sayisi INTEGER DEFAULT 0,
+                    onbellekten INTEGER DEFAULT 0,
+                    toplam_sure REAL,
+                    asamalar TEXT,
+                    cozucu TEXT,
+                    config TEXT
+                )
+            """)
+            
             # Eski veritabanları için kolon kontrolü
             self._ensure_column(cursor, "sinavlar", "soru_dosyasi_id", "INTEGER")
             self._ensure_column(cursor, "ogrenciler", "sabit_salon_id", "INTEGER")
@@ -199,6 +225,7 @@ class DatabaseManager:
             cursor.execute("CREATE INDEX IF NOT EXISTS idx_salon_sira_salon ON salon_sira(salon_id)")
             cursor.execute("CREATE INDEX IF NOT EXISTS idx_ogrenci_sabit_salon ON ogrenciler(sabit_salon_id)")
             cursor.execute("CREATE INDEX IF NOT EXISTS idx_ogrenci_sabit_sira ON ogrenciler(sabit_salon_sira_id)")
+            cursor.execute("CREATE INDEX IF NOT EXISTS idx_harmanlama_gecmisi_tarih ON harmanlama_gecmisi(tarih)")
 
             self._ensure_salon_siralari(cursor)
             
@@ -490,36 +517,10 @@ class DatabaseManager:
             params.append(sinif)
         
         if siniflar is not None and len(siniflar) > 0:
-            # sinif-sube formatını kontrol et (örn: "5-A", "10-B")
-            sinif_sube_pairs = []
-            plain_siniflar = []
-            
-            for s in siniflar:
-                s_str = str(s)
-                if '-' in s_str:
-                    # sinif-sube formatı
-                    parts = s_str.rsplit('-', 1)
-                    if len(parts) == 2:
-                        sinif_sube_pairs.append((parts[0], parts[1]))
-                else:
-                    plain_siniflar.append(s_str)
-            
-            conditions = []
-            
-            # Sadece sınıf olanlar
-            if plain_siniflar:
-                placeholders = ','.join('?' * len(plain_siniflar))
-                conditions.append(f"sinif IN ({placeholders})")
-                params.extend(plain_siniflar)
-            
-            # sinif-sube çiftleri için
-            for sinif_val, sube_val in sinif_sube_pairs:
-                conditions.append("(sinif = ? AND sube = ?)")
-                params.append(sinif_val)
-                params.append(sube_val)
-            
-            if conditions:
-                query += " AND (" + " OR ".join(conditions) + ")"
+            kosul, kosul_params = self._sinif_filtresi(siniflar)
+            if kosul:
+                query += " AND " + kosul
+                params.extend(kosul_params)
         
         if sube is not None:
             query += " AND sube = ?"
@@ -542,6 +543,105 @@ class DatabaseManager:
             cursor.execute(query, params)
             return [dict(row) for row in cursor.fetchall()]
     
+    def _sinif_filtresi(self, siniflar: List) -> Tuple[str, List[str]]:
+        """
+        Sınıf listesini (örn: ["5", "6-A", "10-B"]) SQL koşuluna çevir.
+        Düz değerler sınıf seviyesi, "sinif-sube" değerleri tek şube eşleşmesidir.
+        """
+        sinif_sube_pairs = []
+        plain_siniflar = []
+        
+        for s in siniflar:
+            s_str = str(s)
+            if '-' in s_str:
+                # sinif-sube formatı
+                parts = s_str.rsplit('-', 1)
+                if len(parts) == 2:
+                    sinif_sube_pairs.append((parts[0], parts[1]))
+            else:
+                plain_siniflar.append(s_str)
+        
+        conditions = []
+        params: List[str] = []
+        
+        # Sadece sınıf olanlar
+        if plain_siniflar:
+            placeholders = ','.join('?' * len(plain_siniflar))
+            conditions.append(f"sinif IN ({placeholders})")
+            params.extend(plain_siniflar)
+        
+        # sinif-sube çiftleri için
+        for sinif_val, sube_val in sinif_sube_pairs:
+            conditions.append("(sinif = ? AND sube = ?)")
+            params.append(sinif_val)
+            params.append(sube_val)
+        
+        if not conditions:
+            return "", []
+        return "(" + " OR ".join(conditions) + ")", params
+    
+    def oturum_ogrenci_havuzu(self, sinavlar: List[Dict]) -> Dict[str, Any]:
+        """
+        Aynı oturumdaki sınavların öğrenci havuzunu tek sorguyla hazırla.
+        Bir öğrenci birden fazla sınava giriyorsa listedeki ilk sınava yazılır
+        ve 'cakisan' sayısına eklenir. Öğrenciler sinav_id/sinav_adi taşır.
+        """
+        parcalar = []
+        params: List[Any] = []
+        for sira, sinav in enumerate(sinavlar):
+            kosul, kosul_params = self._sinif_filtresi(sinav.get('secili_siniflar') or [])
+            if not kosul:
+                continue
+            parcalar.append(
+                f"SELECT *, ? AS _sinav_sirasi FROM ogrenciler WHERE aktif_mi = 1 AND {kosul}"
+            )
+            params.append(sira)
+            params.extend(kosul_params)
+        
+        satirlar: List[Dict] = []
+        if parcalar:
+            query = ("SELECT * FROM (" + " UNION ALL ".join(parcalar) + ") "
+                     "ORDER BY _sinav_sirasi, sinif, sube, soyad, ad")
+            with self.get_connection() as conn:
+                cursor = conn.cursor()
+                cursor.execute(query, params)
+                satirlar = [dict(row) for row in cursor.fetchall()]
+        
+        mobil, sabit = [], []
+        gorulen: Set[int] = set()
+        cakisan = 0
+        istatistikler = [
+            {'sinav_id': sinav['id'], 'sinav_adi': sinav['sinav_adi'],
+             'ders_adi': sinav.get('ders_adi'), 'siniflar': sinav.get('secili_siniflar', []),
+             'mobil': 0, 'sabit': 0, 'toplam': 0}
+            for sinav in sinavlar
+        ]
+        for satir in satirlar:
+            sira = satir.pop('_sinav_sirasi')
+            if satir['id'] in gorulen:
+                cakisan += 1
+                continue
+            gorulen.add(satir['id'])
+            sinav = sinavlar[sira]
+            satir['sinav_id'] = sinav['id']
+            satir['sinav_adi'] = sinav['sinav_adi']
+            ist = istatistikler[sira]
+            if satir.get('sabit_mi'):
+                sabit.append(satir)
+                ist['sabit'] += 1
+            else:
+                mobil.append(satir)
+                ist['mobil'] += 1
+            ist['toplam'] += 1
+        
+        return {
+            'mobil': mobil,
+            'sabit': sabit,
+            'tum': mobil + sabit,
+            'istatistikler': istatistikler,
+            'cakisan': cakisan
+        }
+    
     def ogrenci_sayisi(self, sinif: Optional[int] = None, sube: Optional[str] = None,
                        sabit_mi: Optional[bool] = None, siniflar: Optional[List[int]] = None) -> int:
         """Filtrelenmiş öğrenci sayısını döndür (pagination için toplam sayı)"""
@@ -553,32 +653,10 @@ class DatabaseManager:
             params.append(sinif)
         
         if siniflar is not None and len(siniflar) > 0:
-            sinif_sube_pairs = []
-            plain_siniflar = []
-            
-            for s in siniflar:
-                s_str = str(s)
-                if '-' in s_str:
-                    parts = s_str.rsplit('-', 1)
-                    if len(parts) == 2:
-                        sinif_sube_pairs.append((parts[0], parts[1]))
-                else:
-                    plain_siniflar.append(s_str)
-            
-            conditions = []
-            
-            if plain_siniflar:
-                placeholders = ','.join('?' * len(plain_siniflar))
-                conditions.append(f"sinif IN ({placeholders})")
-                params.extend(plain_siniflar)
-            
-            for sinif_val, sube_val in sinif_sube_pairs:
-                conditions.append("(sinif = ? AND sube = ?)")
-                params.append(sinif_val)
-                params.append(sube_val)
-            
-            if conditions:
-                query += " AND (" + " OR ".join(conditions) + ")"
+            kosul, kosul_params = self._sinif_filtresi(siniflar)
+            if kosul:
+                query += " AND " + kosul
+                params.extend(kosul_params)
         
         if sube is not None:
             query += " AND sube = ?"
@@ -751,8 +829,11 @@ class DatabaseManager:
     def sinav_ekle(self, sinav_adi: str, ders_id: int,
                    secili_siniflar: List[int],
                    secili_salonlar: Optional[List[int]] = None,
-                   soru_dosyasi_id: Optional[int] = None) -> int:
-        """Sınav ekleme - tarih/saat/ders_no kaldırıldı"""
+                   soru_dosyasi_id: Optional[int] = None,
+                   sinav_tarihi: Optional[str] = None,
+                   sinav_saati: Optional[str] = None,
+                   kacinci_ders: Optional[int] = None) -> int:
+        """Sınav ekleme - tarih/saat/ders_no isteğe bağlı (toplu oturum planlaması için)"""
         siniflar_json = json.dumps(secili_siniflar or [])
         salonlar_json = json.dumps(secili_salonlar or [])
         
@@ -761,8 +842,9 @@ class DatabaseManager:
             cursor.execute("""
                 INSERT INTO sinavlar (sinav_adi, ders_id, sinav_tarihi, sinav_saati, 
                                      kacinci_ders, secili_siniflar, secili_salonlar, soru_dosyasi_id)
-                VALUES (?, ?, NULL, NULL, NULL, ?, ?, ?)
-            """, (sinav_adi, ders_id, siniflar_json, salonlar_json, soru_dosyasi_id))
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+            """, (sinav_adi, ders_id, sinav_tarihi, sinav_saati, kacinci_ders,
+                  siniflar_json, salonlar_json, soru_dosyasi_id))
             return cursor.lastrowid
     
     def sinav_getir(self, sinav_id: int) -> Optional[Dict]:
@@ -1011,7 +1093,9 @@ class DatabaseManager:
             cursor.execute(f"UPDATE salonlar SET {', '.join(updates)} WHERE id = ?", params)
             if kapasite is not None:
                 self._sync_salon_sira_for(cursor, salon_id, kapasite)
-            return cursor.rowcount > 0
+            guncellendi = cursor.rowcount > 0
+        duzen_onbellegini_gecersiz_kil(salon_id)
+        return guncellendi
     
     def salonlari_listele(self) -> List[Dict]:
         with self.get_connection() as conn:
@@ -1049,7 +1133,12 @@ class DatabaseManager:
         with self.get_connection() as conn:
             cursor = conn.cursor()
             cursor.execute(f"UPDATE salon_sira SET {set_clause} WHERE id = ?", params)
-            return cursor.rowcount > 0
+            guncellendi = cursor.rowcount > 0
+            cursor.execute("SELECT salon_id FROM salon_sira WHERE id = ?", (sira_id,))
+            row = cursor.fetchone()
+        if row:
+            duzen_onbellegini_gecersiz_kil(row['salon_id'])
+        return guncellendi
 
     def salon_sira_haritasi(self, salon_ids: List[int]) -> Dict[int, List[Dict]]:
         """Seçili salonlar için sıra objelerini harita olarak döndür"""
@@ -1205,11 +1294,25 @@ class DatabaseManager:
     
     # ==================== SINAV YERLEŞİM İŞLEMLERİ ====================
     
-    def yerlesim_kaydet(self, sinav_id: int, yerlesim_data: List[Dict]) -> bool:
-        """Harmanlama sonucu yerleşimi kaydet"""
+    def yerlesim_kaydet(self, sinav_id: int, yerlesim_data: List[Dict],
+                        calisma: Optional[Dict] = None) -> bool:
+        """
+        Harmanlama sonucu yerleşimi kaydet. calisma (harmanla() sonucundaki
+        'calisma' bloğu) verilirse geçmiş kaydı aynı işlemde yazılır.
+        """
         if sinav_id is None:
             raise ValueError("sinav_id boş olamaz")
         
+        temiz_liste = self._yerlesim_temizle(sinav_id, yerlesim_data)
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            self._yerlesim_yaz(cursor, sinav_id, temiz_liste)
+            if calisma is not None:
+                self._gecmis_yaz(cursor, calisma, [sinav_id])
+            return True
+
+    def _yerlesim_temizle(self, sinav_id: int, yerlesim_data: List[Dict]) -> List[Dict]:
+        """Eksik, başka sınava ait veya aynı koltuk/öğrenciyi tekrar eden kayıtları at"""
         temiz_liste: List[Dict] = []
         seat_seen: Set[Tuple[int, int]] = set()
         ogrenci_seen: Set[int] = set()
@@ -1225,23 +1328,39 @@ class DatabaseManager:
             seat_seen.add(seat_key)
             ogrenci_seen.add(ogr_key)
             temiz_liste.append(yer)
+        return temiz_liste
+
+    def _yerlesim_yaz(self, cursor, sinav_id: int, temiz_liste: List[Dict]):
+        # Önce mevcut yerleşimi temizle
+        cursor.execute("DELETE FROM sinav_yerlesim WHERE sinav_id = ?", (sinav_id,))
         
+        # Yeni yerleşimi ekle
+        cursor.executemany("""
+            INSERT OR REPLACE INTO sinav_yerlesim (sinav_id, ogrenci_id, salon_id, sira_no)
+            VALUES (?, ?, ?, ?)
+        """, [(sinav_id, yer['ogrenci_id'], yer['salon_id'], yer['sira_no']) for yer in temiz_liste])
+
+    def yerlesimleri_kaydet(self, sinav_yerlesimleri: Dict[int, List[Dict]],
+                            calismalar: Optional[List[Dict]] = None) -> int:
+        """
+        Birden fazla sınavın yerleşimini tek işlemde kaydet; bir sınavda hata
+        olursa hiçbiri yazılmaz. calismalar (oturum başına 'calisma' blokları)
+        geçmişe aynı işlemde yazılır. Yazılan kayıt sayısını döndürür.
+        """
+        temiz = {
+            sinav_id: self._yerlesim_temizle(sinav_id, kayitlar)
+            for sinav_id, kayitlar in sinav_yerlesimleri.items()
+            if sinav_id is not None
+        }
         with self.get_connection() as conn:
             cursor = conn.cursor()
-            
-            # Önce mevcut yerleşimi temizle
-            cursor.execute("DELETE FROM sinav_yerlesim WHERE sinav_id = ?", (sinav_id,))
-            
-            # Yeni yerleşimi ekle
-            for yer in temiz_liste:
-                cursor.execute("""
-                    INSERT OR REPLACE INTO sinav_yerlesim (sinav_id, ogrenci_id, salon_id, sira_no)
-                    VALUES (?, ?, ?, ?)
-                """, (sinav_id, yer['ogrenci_id'], yer['salon_id'], yer['sira_no']))
-            
-            return True
+            for sinav_id, kayitlar in temiz.items():
+                self._yerlesim_yaz(cursor, sinav_id, kayitlar)
+            for calisma in calismalar or []:
+                self._gecmis_yaz(cursor, calisma, list(temiz))
+        return sum(len(kayitlar) for kayitlar in temiz.values())
 
-    def yerlesim_toplu_kaydet(self, yerlesim_data: List[Dict]) -> bool:
+    def yerlesim_toplu_kaydet(self, yerlesim_data: List[Dict], calisma: Optional[Dict] = None) -> bool:
         """Birden fazla sınava ait yerleşimleri aynı anda kaydet"""
         if not yerlesim_data:
             return False
@@ -1253,10 +1372,156 @@ class DatabaseManager:
             grouped.setdefault(sinav_id, []).append(yer)
         if not grouped:
             return False
-        for sinav_id, kayitlar in grouped.items():
-            self.yerlesim_kaydet(sinav_id, kayitlar)
+        self.yerlesimleri_kaydet(grouped, [calisma] if calisma is not None else None)
         return True
-    
+
+    # ==================== HARMANLAMA GEÇMİŞİ ====================
+
+    _GECMIS_JSON_ALANLARI = ('sinav_idleri', 'asamalar', 'cozucu', 'config')
+
+    def _gecmis_yaz(self, cursor, calisma: Dict, sinav_idleri: List[int]):
+        """Çalışma kaydını ekle; kayıtta sınav yoksa yazılan sınavlar kullanılır"""
+        def _json(deger) -> str:
+            return json.dumps(deger, ensure_ascii=False, default=str)
+
+        cursor.execute("""
+            INSERT INTO harmanlama_gecmisi (
+                sinav_idleri, ogrenci_sayisi, sabit_sayisi, salon_sayisi, koltuk_sayisi,
+                yerlestirilen, cozum_yolu, portfoy_stratejisi, cozucu_durumu, ogretmen_masasi,
+                ihlal_sayisi, uyumsuzluk_sayisi, onbellekten, toplam_sure, asamalar, cozucu, config
+            ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+        """, (
+            _json(calisma.get('sinav_idleri') or sorted(sinav_idleri)),
+            calisma['ogrenci_sayisi'],
+            calisma.get('sabit_sayisi', 0),
+            calisma['salon_sayisi'],
+            calisma.get('koltuk_sayisi'),
+            calisma.get('yerlestirilen'),
+            calisma.get('cozum_yolu'),
+            calisma.get('portfoy_stratejisi'),
+            calisma.get('cozucu_durumu'),
+            calisma.get('ogretmen_masasi', 0),
+            calisma.get('ihlal_sayisi', 0),
+            calisma.get('uyumsuzluk_sayisi', 0),
+            1 if calisma.get('onbellekten') else 0,
+            calisma.get('toplam_sure'),
+            _json(calisma.get('asamalar') or {}),
+            _json(calisma.get('cozucu') or []),
+            _json(calisma.get('config') or {})
+        ))
+
+    def harmanlama_gecmisi_listele(self, limit: Optional[int] = 100, sinav_id: Optional[int] = None,
+                                   baslangic: Optional[str] = None, bitis: Optional[str] = None,
+                                   cozum_yolu: Optional[str] = None) -> List[Dict]:
+        """
+        Harmanlama çalışmalarını yeniden eskiye listele. baslangic/bitis
+        'YYYY-MM-DD' biçimindedir (bitis günü dahil); JSON alanları çözülmüş gelir.
+        """
+        kosullar, parametreler = [], []
+        if baslangic:
+            kosullar.append("date(tarih) >= date(?)")
+            parametreler.append(baslangic)
+        if bitis:
+            kosullar.append("date(tarih) <= date(?)")
+            parametreler.append(bitis)
+        if cozum_yolu:
+            kosullar.append("cozum_yolu = ?")
+            parametreler.append(cozum_yolu)
+        if sinav_id is not None:
+            kosullar.append("EXISTS (SELECT 1 FROM json_each(sinav_idleri) WHERE value = ?)")
+            parametreler.append(sinav_id)
+        sorgu = "SELECT * FROM harmanlama_gecmisi"
+        if kosullar:
+            sorgu += " WHERE " + " AND ".join(kosullar)
+        sorgu += " ORDER BY id DESC"
+        if limit is not None:
+            sorgu += " LIMIT ?"
+            parametreler.append(limit)
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute(sorgu, parametreler)
+            kayitlar = [dict(row) for row in cursor.fetchall()]
+        for kayit in kayitlar:
+            kayit['onbellekten'] = bool(kayit['onbellekten'])
+            for alan in self._GECMIS_JSON_ALANLARI:
+                kayit[alan] = json.loads(kayit[alan]) if kayit[alan] else None
+        return kayitlar
+
+    def harmanlama_gecmisi_ozeti(self, baslangic: Optional[str] = None) -> List[Dict]:
+        """
+        Çözüm yolu başına çalışma sayısı, ortalama/en uzun süre, ortalama öğrenci
+        sayısı ve öğretmen masası/ihlal toplamları (önbellekten dönenler hariç);
+        süre bütçesi seçmek ve yavaşlamaları görmek için.
+        """
+        kosul, parametreler = "onbellekten = 0", []
+        if baslangic:
+            kosul += " AND date(tarih) >= date(?)"
+            parametreler.append(baslangic)
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute(f"""
+                SELECT
+                    cozum_yolu,
+                    COUNT(*) AS calisma_sayisi,
+                    ROUND(AVG(toplam_sure), 4) AS ortalama_sure,
+                    ROUND(MAX(toplam_sure), 4) AS en_uzun_sure,
+                    ROUND(AVG(ogrenci_sayisi), 1) AS ortalama_ogrenci,
+                    SUM(ogretmen_masasi) AS ogretmen_masasi,
+                    SUM(ihlal_sayisi) AS ihlal_sayisi,
+                    MAX(tarih) AS son_calisma
+                FROM harmanlama_gecmisi
+                WHERE {kosul}
+                GROUP BY cozum_yolu
+                ORDER BY calisma_sayisi DESC
+            """, parametreler)
+            return [dict(row) for row in cursor.fetchall()]
+
+    def yerlesim_degisikliklerini_kaydet(self, degisenler: List[Dict],
+                                         sinav_id: Optional[int] = None,
+                                         cikarilanlar: Optional[List[Dict]] = None) -> int:
+        """
+        Elle takas/taşıma ya da yerel onarım sonrası yalnızca değişen yerleşim
+        satırlarını yaz: kaydı olan öğrencinin konumu güncellenir, olmayan eklenir,
+        cikarilanlar silinir. Satırda sinav_id yoksa parametredeki kullanılır. Takasta
+        UNIQUE(sinav_id, salon_id, sira_no) çakışmasın diye satırlar önce geçici
+        (negatif) sıraya alınır; tümü tek işlemdedir. Yazılan satır sayısını döndürür.
+        """
+        def _sinav(yer: Dict) -> Optional[int]:
+            return yer.get('sinav_id') if yer.get('sinav_id') is not None else sinav_id
+
+        kayitlar = [
+            (yer['salon_id'], yer['sira_no'], _sinav(yer), yer['ogrenci_id'])
+            for yer in degisenler if _sinav(yer) is not None
+        ]
+        silinecekler = [
+            (_sinav(yer), yer['ogrenci_id']) for yer in cikarilanlar or [] if _sinav(yer) is not None
+        ]
+        if not kayitlar and not silinecekler:
+            return 0
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.executemany(
+                "DELETE FROM sinav_yerlesim WHERE sinav_id = ? AND ogrenci_id = ?", silinecekler
+            )
+            cursor.executemany("""
+                UPDATE sinav_yerlesim SET sira_no = -id
+                WHERE sinav_id = ? AND ogrenci_id = ?
+            """, [(sinav, ogrenci_id) for _, _, sinav, ogrenci_id in kayitlar])
+            yazilan = len(silinecekler)
+            for kayit in kayitlar:
+                cursor.execute("""
+                    UPDATE sinav_yerlesim SET salon_id = ?, sira_no = ?
+                    WHERE sinav_id = ? AND ogrenci_id = ?
+                """, kayit)
+                if cursor.rowcount == 0:
+                    salon_id, sira_no, sinav, ogrenci_id = kayit
+                    cursor.execute("""
+                        INSERT INTO sinav_yerlesim (sinav_id, ogrenci_id, salon_id, sira_no)
+                        VALUES (?, ?, ?, ?)
+                    """, (sinav, ogrenci_id, salon_id, sira_no))
+                yazilan += 1
+            return yazilan
+
     def yerlesim_getir(self, sinav_id: int) -> List[Dict]:
         """Sınav yerleşimini getir"""
         with self.get_connection() as conn:
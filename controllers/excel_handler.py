@@ -3,7 +3,7 @@ Kelebek Sınav Sistemi - Excel Handler
 Excel dosyalarından veri okuma ve yazma işlemleri
 """
 
-from typing import List, Dict, Tuple, Optional
+from typing import List, Dict, Tuple, Optional, Union
 from pathlib import Path
 from datetime import datetime
 
@@ -264,7 +264,27 @@ class ExcelHandler:
             return [], hatalar
     
     @staticmethod
-    def yerlesim_yazdir(dosya_yolu: str, sinav_bilgi: Dict, yerlesim_data: List[Dict],
+    def _salon_gruplari(tablo: pd.DataFrame) -> Tuple[Dict[str, List[Dict]], Dict[str, str]]:
+        """
+        Yerleşim DataFrame'ini salon adına göre sıralayıp grupla.
+        Döner: ({salon_adi: sira_no sıralı satırlar}, {salon_adi: gözetmen metni})
+        """
+        tablo = tablo.assign(salon_adi=tablo['salon_adi'].astype(str))
+        tablo = tablo.sort_values(['salon_adi', 'sira_no'], kind='stable')
+        salonlar = {
+            salon_adi: grup.to_dict('records')
+            for salon_adi, grup in tablo.groupby('salon_adi', sort=True)
+        }
+        salon_gozetmen_map = {}
+        if 'gozetmenler' in tablo.columns:
+            dolu = tablo[tablo['gozetmenler'].fillna('').astype(bool)]
+            dolu = dolu.drop_duplicates('salon_adi', keep='last')
+            salon_gozetmen_map = dict(zip(dolu['salon_adi'], dolu['gozetmenler']))
+        return salonlar, salon_gozetmen_map
+
+    @staticmethod
+    def yerlesim_yazdir(dosya_yolu: str, sinav_bilgi: Dict,
+                        yerlesim_data: Union[List[Dict], pd.DataFrame],
                         gozetmen_data: Dict = None) -> bool:
         """
         Sınav yerleşimini Excel'e yazdır (sadece öğrenci ve salon bilgileri)
@@ -272,21 +292,25 @@ class ExcelHandler:
         Args:
             dosya_yolu: Kaydedilecek dosya yolu
             sinav_bilgi: Sınav bilgileri (ders_adi, tarih, saat, sinav_adi vb.)
-            yerlesim_data: Yerleşim verileri (ogrenci, salon, sira bilgileri)
+            yerlesim_data: Yerleşim verileri (ogrenci, salon, sira bilgileri); sözlük
+                listesi ya da aynı sütunlara sahip DataFrame (salonlara vektörel ayrılır)
             gozetmen_data: Salon bazlı gözetmen bilgileri {salon_id: [gozetmen_listesi]}
         """
         try:
             # Salonlara göre grupla
-            salonlar = {}
-            salon_gozetmen_map = {}
-            for yer in yerlesim_data:
-                salon_adi = yer['salon_adi']
-                if salon_adi not in salonlar:
-                    salonlar[salon_adi] = []
-                salonlar[salon_adi].append(yer)
-                # Gözetmen bilgisini salon_id bazlı kaydet
-                if 'gozetmenler' in yer and yer['gozetmenler']:
-                    salon_gozetmen_map[salon_adi] = yer['gozetmenler']
+            if isinstance(yerlesim_data, pd.DataFrame):
+                salonlar, salon_gozetmen_map = ExcelHandler._salon_gruplari(yerlesim_data)
+            else:
+                salonlar = {}
+                salon_gozetmen_map = {}
+                for yer in yerlesim_data:
+                    salon_adi = yer['salon_adi']
+                    if salon_adi not in salonlar:
+                        salonlar[salon_adi] = []
+                    salonlar[salon_adi].append(yer)
+                    # Gözetmen bilgisini salon_id bazlı kaydet
+                    if 'gozetmenler' in yer and yer['gozetmenler']:
+                        salon_gozetmen_map[salon_adi] = yer['gozetmenler']
             
             # Harici gözetmen_data parametresi varsa birleştir
             if gozetmen_data:
@@ -515,6 +539,43 @@ class ExcelHandler:
             print(f"❌ Yoklama formu oluşturma hatası: {e}")
             return False
 
+    @staticmethod
+    def harmanlama_gecmisi_yazdir(dosya_yolu: str, kayitlar: List[Dict]) -> bool:
+        """
+        Harmanlama çalışma geçmişini (DatabaseManager.harmanlama_gecmisi_listele)
+        tek sayfalık Excel'e yaz; aşama süreleri 'sure_<aşama>' kolonlarına açılır.
+        """
+        try:
+            satirlar = []
+            for kayit in kayitlar:
+                satir = {
+                    alan: deger for alan, deger in kayit.items()
+                    if alan not in ('asamalar', 'cozucu', 'config')
+                }
+                satir['sinav_idleri'] = ", ".join(str(i) for i in kayit.get('sinav_idleri') or [])
+                satir['cozum_suresi'] = (kayit.get('config') or {}).get('cozum_suresi')
+                for asama, sure in (kayit.get('asamalar') or {}).items():
+                    satir[f"sure_{asama}"] = sure.get('duvar') if isinstance(sure, dict) else sure
+                satirlar.append(satir)
+            df = pd.DataFrame(satirlar)
+            
+            with pd.ExcelWriter(dosya_yolu, engine='openpyxl') as writer:
+                df.to_excel(writer, sheet_name='Harmanlama Geçmişi', index=False)
+                worksheet = writer.sheets['Harmanlama Geçmişi']
+                
+                header_fill = PatternFill(start_color="366092", end_color="366092", fill_type="solid")
+                header_font = Font(bold=True, color="FFFFFF")
+                for cell in worksheet[1]:
+                    cell.fill = header_fill
+                    cell.font = header_font
+                    cell.alignment = Alignment(horizontal='center', vertical='center')
+                    worksheet.column_dimensions[cell.column_letter].width = max(12, len(str(cell.value)) + 2)
+            
+            return True
+        except Exception as e:
+            print(f"❌ Harmanlama geçmişi dışa aktarma hatası: {e}")
+            return False
+
 if __name__ == "__main__":
     # Test
     handler = ExcelHandler()
@@ -0,0 +1,346 @@
+"""
+Kelebek Sınav Sistemi - Çözücü Ayar Profili
+Kayıtlı yerleşim örnekleri (sentetik okullar veya model_dokumu ile dökülmüş
+gerçek oturumlar) üzerinde CP-SAT parametrelerini ve motor stratejilerini
+arar; her öğrenci sayısı bandı için en iyi ayarları kurulumun kullanıcı veri
+dizinine profil olarak yazar. HarmanlamaConfig(ayar_profili=...) verilen
+motor, çalışırken problemin düştüğü bandın ayarlarını kullanır.
+
+Kullanım:
+    python -m controllers.harmanlama_ayar --boyutlar 300 1000 4000 \\
+        --dokum dokumler/ --deneme 12 --tekrar 2
+"""
+
+import argparse
+import dataclasses
+import glob
+import json
+import math
+import os
+import platform
+import random
+import statistics
+import sys
+import threading
+import time
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils import get_user_data_path
+from controllers.harmanlama_engine import HarmanlamaEngine, HarmanlamaConfig
+from controllers.harmanlama_benchmark import sentetik_okul
+from controllers.harmanlama_replay import DokumTekrari, dokum_oku
+
+
+# 2: cozum_suresi yalnızca yeterli örnekli bantlarda yazılır; eski profiller yok sayılır
+PROFIL_SURUMU = 2
+
+# (ad, alt sınır dahil, üst sınır hariç; None: sınırsız) — öğrenci sayısına göre
+VARSAYILAN_BANTLAR: List[Tuple[str, int, Optional[int]]] = [
+    ("kucuk", 0, 600),
+    ("orta", 600, 2000),
+    ("buyuk", 2000, None),
+]
+
+# Profilin değiştirebildiği HarmanlamaConfig alanları ve denenen değerleri
+ARAMA_UZAYI: Dict[str, List[Any]] = {
+    'sezgisel_once': [True, False],
+    'cp_sat_modeli': ["seviye", "ogrenci"],
+    'isci_sayisi': [None, 1, 2, 4, 8],
+    'ilk_cozumde_dur': [False, True],
+    'cp_sat_parametreleri': [None, {'randomize_search': True}, {'linearization_level': 0}],
+}
+AYARLANABILIR_ALANLAR = frozenset(ARAMA_UZAYI) | {'cozum_suresi'}
+
+# Kazanan ayarın gözlenen en uzun CP-SAT süresi bu katsayıyla büyütülüp süre bütçesi olur.
+# Bütçe ancak bant en az COZUM_SURESI_ORNEK_SAYISI örnekle ve başarısızlıksız ölçüldüyse
+# kısaltılır; tek ölçüm bandın zor örneklerini temsil etmez
+COZUM_SURESI_PAYI = 3.0
+COZUM_SURESI_TABANI = 2.0
+COZUM_SURESI_ORNEK_SAYISI = 3
+# Bir aday, en iyiden en az bu oran ve bu kadar saniye hızlıysa onun yerine geçer
+# (ölçüm gürültüsüyle ilgisiz ayarların profile girmesini önler)
+IYILESME_ORANI = 0.1
+IYILESME_ESIGI = 0.05
+
+_profil_onbellegi: Dict[str, Tuple[float, Optional[Dict[str, Any]]]] = {}
+_profil_kilidi = threading.Lock()
+
+
+def varsayilan_profil_dosyasi() -> str:
+    """Kurulumun ayar profilinin kullanıcı veri dizinindeki yolu"""
+    return get_user_data_path(os.path.join('cache', 'cozucu_profili.json'))
+
+
+def profil_oku(yol: str) -> Optional[Dict[str, Any]]:
+    """Profili oku (dosya değişmedikçe bellekten); yoksa ya da bozuksa None"""
+    try:
+        degisme = os.path.getmtime(yol)
+    except OSError:
+        return None
+    with _profil_kilidi:
+        kayit = _profil_onbellegi.get(yol)
+        if kayit is not None and kayit[0] == degisme:
+            return kayit[1]
+        try:
+            with open(yol, encoding='utf-8') as dosya:
+                profil = json.load(dosya)
+        except (OSError, ValueError):
+            profil = None
+        if not isinstance(profil, dict) or profil.get('surum') != PROFIL_SURUMU:
+            profil = None
+        _profil_onbellegi[yol] = (degisme, profil)
+        return profil
+
+
+def bant_bul(bantlar: List[Dict[str, Any]], ogrenci_sayisi: int) -> Optional[Dict[str, Any]]:
+    """Öğrenci sayısının düştüğü profil bandı"""
+    for bant in bantlar:
+        if bant['alt'] <= ogrenci_sayisi and (bant['ust'] is None or ogrenci_sayisi < bant['ust']):
+            return bant
+    return None
+
+
+def profil_uygula(config: HarmanlamaConfig,
+                  ogrenci_sayisi: int) -> Tuple[HarmanlamaConfig, Optional[str]]:
+    """
+    config.ayar_profili'ndeki bandın ayarlarını uygula. Yalnızca varsayılan
+    değerinde bırakılmış alanlar değişir; çağıranın açıkça seçtiği ayarlar
+    (ör. görünümün salon sayısına göre verdiği kararlar) korunur.
+    (yeni config, bant adı) döner; profil veya uygun bant yoksa (config, None).
+    """
+    profil = profil_oku(config.ayar_profili) if config.ayar_profili else None
+    bant = bant_bul(profil.get('bantlar', []), ogrenci_sayisi) if profil else None
+    if bant is None:
+        return config, None
+    varsayilanlar = {alan.name: alan.default for alan in dataclasses.fields(HarmanlamaConfig)}
+    degisiklik = {
+        ad: deger for ad, deger in bant.get('ayarlar', {}).items()
+        if ad in AYARLANABILIR_ALANLAR and getattr(config, ad) == varsayilanlar[ad]
+    }
+    return (dataclasses.replace(config, **degisiklik) if degisiklik else config), bant['ad']
+
+
+@dataclasses.dataclass
+class AyarOrnegi:
+    """Ayarlama derlemindeki tek problem: harmanla() girdisi ya da bir model dökümü"""
+    ad: str
+    ogrenci_sayisi: int
+    girdi: Optional[Dict[str, Any]] = None
+    dokum: Optional[Dict[str, Any]] = None
+
+    def coz(self, temel: HarmanlamaConfig, ayarlar: Dict[str, Any]) -> Dict[str, Any]:
+        """{'basarili', 'sure', 'cozucu'}: ayarlarla bir kez çöz"""
+        if self.dokum is not None:
+            # Dökümün kendi ayarları değil, temel + aday ayarlar değerlendirilir
+            tam = {ad: getattr(temel, ad) for ad in AYARLANABILIR_ALANLAR}
+            tam.update(ayarlar)
+            return DokumTekrari(self.dokum, tam).akis()
+        config = dataclasses.replace(
+            temel, **ayarlar, sonuc_onbellegi=False, model_dokumu=None, ayar_profili=None
+        )
+        baslangic = time.perf_counter()
+        try:
+            sonuc = HarmanlamaEngine(config).harmanla(**self.girdi)
+        except Exception:
+            return {'basarili': False, 'sure': round(time.perf_counter() - baslangic, 4), 'cozucu': []}
+        return {
+            'basarili': sonuc['basarili'],
+            'sure': round(time.perf_counter() - baslangic, 4),
+            'cozucu': sonuc.get('performans', {}).get('cp_sat', [])
+        }
+
+
+def sentetik_ornekler(boyutlar: List[int], tohumlar: Tuple[int, ...] = (0,)) -> List[AyarOrnegi]:
+    """harmanlama_benchmark.sentetik_okul ile her boyut × tohum için bir örnek"""
+    return [
+        AyarOrnegi(f"sentetik-{boyut}-{tohum}", boyut, girdi=sentetik_okul(boyut, seed=tohum))
+        for boyut in boyutlar for tohum in tohumlar
+    ]
+
+
+def dokum_ornekleri(yollar: List[str]) -> List[AyarOrnegi]:
+    """Döküm dosyalarından (dizin verilirse içindeki *.json.gz) örnekler"""
+    dosyalar: List[str] = []
+    for yol in yollar:
+        dosyalar.extend(sorted(glob.glob(os.path.join(yol, '*.json.gz'))) if os.path.isdir(yol) else [yol])
+    ornekler = []
+    for dosya in dosyalar:
+        dokum = dokum_oku(dosya)
+        ornekler.append(AyarOrnegi(os.path.basename(dosya), len(dokum['ogrenci_siniflari']), dokum=dokum))
+    return ornekler
+
+
+class CozucuAyarlayici:
+    """
+    Bant başına rastgele arama. Her bantta temel ayar ({}) ve arama uzayından
+    seçilen adaylar bandın tüm örnekleri üzerinde tekrar sayısı kadar çözülür.
+    Daha az başarısız örnek her zaman kazanır; eşitlikte örnek başına medyan
+    sürelerin toplamı IYILESME_ORANI/IYILESME_ESIGI'nden fazla düşmelidir, yoksa
+    temel ayar korunur. Bir aday en iyiyi artık geçemeyecekse kalan örnekleri
+    çözülmeden bırakılır.
+    """
+
+    def __init__(self, ornekler: List[AyarOrnegi], temel: Optional[HarmanlamaConfig] = None,
+                 bantlar: Optional[List[Tuple[str, int, Optional[int]]]] = None,
+                 deneme_sayisi: int = 12, tekrar: int = 1, tohum: int = 0,
+                 arama_uzayi: Optional[Dict[str, List[Any]]] = None,
+                 bildirim: Optional[Callable[[str], None]] = None):
+        self.ornekler = ornekler
+        self.temel = temel or HarmanlamaConfig()
+        self.bantlar = bantlar or VARSAYILAN_BANTLAR
+        self.deneme_sayisi = max(1, deneme_sayisi)
+        self.tekrar = max(1, tekrar)
+        self.rng = random.Random(tohum)
+        uzay = dict(arama_uzayi or ARAMA_UZAYI)
+        cekirdek = os.cpu_count() or 1
+        if 'isci_sayisi' in uzay:
+            uzay['isci_sayisi'] = [k for k in uzay['isci_sayisi'] if k is None or k <= cekirdek]
+        self.arama_uzayi = uzay
+        self.bildirim = bildirim
+
+    def adaylar(self) -> List[Dict[str, Any]]:
+        """Temel ayar ve arama uzayından tekrarsız rastgele adaylar"""
+        adaylar: List[Dict[str, Any]] = [{}]
+        gorulen = {json.dumps({}, sort_keys=True)}
+        toplam = math.prod(len(degerler) for degerler in self.arama_uzayi.values())
+        while len(adaylar) < min(self.deneme_sayisi, toplam):
+            aday = {ad: self.rng.choice(degerler) for ad, degerler in self.arama_uzayi.items()}
+            # Temelle aynı alanlar adayda tutulmaz; profil yalnızca farkları taşır
+            aday = {ad: deger for ad, deger in aday.items() if getattr(self.temel, ad) != deger}
+            anahtar = json.dumps(aday, sort_keys=True)
+            if anahtar not in gorulen:
+                gorulen.add(anahtar)
+                adaylar.append(aday)
+        return adaylar
+
+    def _degerlendir(self, ornekler: List[AyarOrnegi], ayarlar: Dict[str, Any],
+                     sinir: Optional[Tuple[int, float]]) -> Optional[Dict[str, Any]]:
+        basarisiz, toplam_sure, cozucu_sureleri = 0, 0.0, []
+        for ornek in ornekler:
+            sureler = []
+            for _ in range(self.tekrar):
+                sonuc = ornek.coz(self.temel, ayarlar)
+                if not sonuc['basarili']:
+                    basarisiz += 1
+                    break
+                sureler.append(sonuc['sure'])
+                cozucu_sureleri.extend(
+                    cozum['sure'] for cozum in sonuc['cozucu'] if cozum['durum'] in ("OPTIMAL", "FEASIBLE")
+                )
+            else:
+                toplam_sure += statistics.median(sureler)
+            if sinir is not None and (basarisiz, toplam_sure) > sinir:
+                return None
+        return {
+            'basarisiz': basarisiz,
+            'sure': round(toplam_sure, 4),
+            'en_uzun_cozucu': max(cozucu_sureleri) if cozucu_sureleri else None
+        }
+
+    @staticmethod
+    def _daha_iyi(aday: Dict[str, Any], en_iyi: Dict[str, Any]) -> bool:
+        if aday['basarisiz'] != en_iyi['basarisiz']:
+            return aday['basarisiz'] < en_iyi['basarisiz']
+        kazanc = en_iyi['sure'] - aday['sure']
+        return kazanc > IYILESME_ESIGI and kazanc > en_iyi['sure'] * IYILESME_ORANI
+
+    def _bant_ayarla(self, ad: str, ornekler: List[AyarOrnegi]) -> Dict[str, Any]:
+        adaylar = self.adaylar()
+        temel = self._degerlendir(ornekler, {}, None)
+        en_iyi, en_iyi_ayar = temel, {}
+        for ayarlar in adaylar[1:]:
+            sonuc = self._degerlendir(ornekler, ayarlar, (en_iyi['basarisiz'], en_iyi['sure']))
+            if sonuc is not None and self._daha_iyi(sonuc, en_iyi):
+                en_iyi, en_iyi_ayar = sonuc, ayarlar
+            if self.bildirim is not None:
+                durum = "budandı" if sonuc is None else f"{sonuc['basarisiz']} başarısız, {sonuc['sure']:.3f} sn"
+                self.bildirim(f"   {ad}: {json.dumps(ayarlar, ensure_ascii=False)} → {durum}")
+        ayarlar = dict(en_iyi_ayar)
+        if (en_iyi['en_uzun_cozucu'] is not None and en_iyi['basarisiz'] == 0
+                and len(ornekler) >= COZUM_SURESI_ORNEK_SAYISI):
+            ayarlar['cozum_suresi'] = min(self.temel.cozum_suresi, max(
+                COZUM_SURESI_TABANI, round(en_iyi['en_uzun_cozucu'] * COZUM_SURESI_PAYI, 1)
+            ))
+        return {
+            'ayarlar': ayarlar,
+            'ornekler': [ornek.ad for ornek in ornekler],
+            'denenen': len(adaylar),
+            'basarisiz': en_iyi['basarisiz'],
+            'sure': en_iyi['sure'],
+            'temel_basarisiz': temel['basarisiz'],
+            'temel_sure': temel['sure']
+        }
+
+    def ayarla(self) -> Dict[str, Any]:
+        """Tüm bantları ayarla ve profil sözlüğünü döndür (örneği olmayan bant yazılmaz)"""
+        bantlar = []
+        for ad, alt, ust in self.bantlar:
+            ornekler = [o for o in self.ornekler if alt <= o.ogrenci_sayisi and (ust is None or o.ogrenci_sayisi < ust)]
+            if not ornekler:
+                continue
+            if self.bildirim is not None:
+                self.bildirim(f"🔧 {ad} bandı: {len(ornekler)} örnek")
+            bantlar.append(dict(ad=ad, alt=alt, ust=ust, **self._bant_ayarla(ad, ornekler)))
+        return {
+            'surum': PROFIL_SURUMU,
+            'tarih': datetime.now().isoformat(timespec='seconds'),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'cekirdek': os.cpu_count(),
+            'bantlar': bantlar
+        }
+
+
+def profil_yaz(profil: Dict[str, Any], yol: Optional[str] = None) -> str:
+    """Profili (geçici dosya üzerinden) yaz ve yolunu döndür"""
+    yol = yol or varsayilan_profil_dosyasi()
+    os.makedirs(os.path.dirname(yol) or ".", exist_ok=True)
+    gecici = f"{yol}.tmp"
+    with open(gecici, 'w', encoding='utf-8') as dosya:
+        json.dump(profil, dosya, ensure_ascii=False, indent=2)
+    os.replace(gecici, yol)
+    return yol
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Harmanlama çözücü ayarlarını örnekler üzerinde ayarla")
+    parser.add_argument('--boyutlar', type=int, nargs='*', default=[300, 1000, 4000],
+                        help="Sentetik okul boyutları (öğrenci sayısı)")
+    parser.add_argument('--tohumlar', type=int, nargs='+', default=[0],
+                        help="Her boyut için sentetik okul tohumları")
+    parser.add_argument('--dokum', nargs='*', default=[],
+                        help="model_dokumu dosyaları veya dizinleri")
+    parser.add_argument('--deneme', type=int, default=12, help="Bant başına aday sayısı")
+    parser.add_argument('--tekrar', type=int, default=1, help="Her örneğin kaç kez çözüleceği")
+    parser.add_argument('--cozum-suresi', type=float, default=HarmanlamaConfig.cozum_suresi,
+                        help="Değerlendirmede CP-SAT süre bütçesi (sn)")
+    parser.add_argument('--tohum', type=int, default=0, help="Aday seçimi tohumu")
+    parser.add_argument('--cikti', help="Profil dosyası (varsayılan: kullanıcı veri dizini)")
+    args = parser.parse_args(argv)
+
+    ornekler = sentetik_ornekler(args.boyutlar, tuple(args.tohumlar)) + dokum_ornekleri(args.dokum)
+    if not ornekler:
+        print("❌ Ayarlanacak örnek yok")
+        return 1
+    ayarlayici = CozucuAyarlayici(
+        ornekler,
+        temel=HarmanlamaConfig(cozum_suresi=args.cozum_suresi),
+        deneme_sayisi=args.deneme,
+        tekrar=args.tekrar,
+        tohum=args.tohum,
+        bildirim=print
+    )
+    profil = ayarlayici.ayarla()
+    for bant in profil['bantlar']:
+        print(f"✅ {bant['ad']}: {json.dumps(bant['ayarlar'], ensure_ascii=False)} "
+              f"({bant['temel_sure']:.3f} → {bant['sure']:.3f} sn, "
+              f"başarısız {bant['temel_basarisiz']} → {bant['basarisiz']})")
+    print(f"📄 Profil yazıldı: {profil_yaz(profil, args.cikti)}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,245 @@
+"""
+Kelebek Sınav Sistemi - Harmanlama Performans Ölçümü
+Gerçekçi sentetik okullar üretip HarmanlamaEngine'i aşama aşama ölçer
+(harmanla() sonucundaki 'performans' bloğu),
+sonuçları JSON temel ölçümle karşılaştırır.
+
+Kullanım:
+    python -m controllers.harmanlama_benchmark --boyutlar 300 1000 5000 20000 \\
+        --cikti sonuc.json --temel benchmark_temel.json
+    python -m controllers.harmanlama_benchmark --temel-yaz benchmark_temel.json
+"""
+
+import argparse
+import json
+import math
+import platform
+import random
+import sys
+import os
+import time
+import tracemalloc
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils import SINIF_SEVIYELERI
+from controllers.harmanlama_engine import HarmanlamaEngine, HarmanlamaConfig
+
+
+VARSAYILAN_BOYUTLAR = [300, 1000, 2500, 5000, 10000, 20000]
+
+
+def _seviye_agirligi(sinif: str) -> float:
+    """Okullarda 9/10 ve ortaokul kalabalık, branş ve hazırlık sınıfları küçük"""
+    if sinif.isdigit():
+        return 4.0
+    if sinif.startswith(("11", "12")):
+        return 1.0
+    return 0.5
+
+
+def sentetik_okul(ogrenci_sayisi: int, seed: int = 0, sabit_orani: float = 0.02,
+                  salon_kapasitesi: int = 30, bos_orani: float = 0.1,
+                  seviyeler: Optional[List[str]] = None) -> Dict[str, Any]:
+    """
+    SINIF_SEVIYELERI karışımıyla, düzensiz şube büyüklükleri, 2 genişlikli
+    salonlar ve sabit_salon_sira_id'si dolu sabit öğrenciler içeren bir okul üret.
+    Dönen sözlük harmanla() argümanlarını içerir.
+    """
+    rng = random.Random(seed)
+    seviyeler = seviyeler or SINIF_SEVIYELERI
+    agirliklar = [_seviye_agirligi(s) for s in seviyeler]
+    ogrenciler: List[Dict] = []
+    while len(ogrenciler) < ogrenci_sayisi:
+        sinif = rng.choices(seviyeler, weights=agirliklar)[0]
+        sube = chr(ord('A') + rng.randrange(6))
+        sube_mevcudu = min(rng.randint(12, 38), ogrenci_sayisi - len(ogrenciler))
+        for _ in range(sube_mevcudu):
+            ogr_id = len(ogrenciler) + 1
+            ogrenciler.append({
+                'id': ogr_id,
+                'ad': f'Öğrenci{ogr_id}',
+                'soyad': 'SENTETIK',
+                'sinif': sinif,
+                'sube': sube
+            })
+
+    salon_sayisi = max(1, math.ceil(ogrenci_sayisi * (1 + bos_orani) / salon_kapasitesi))
+    salonlar = []
+    salon_sira_haritasi: Dict[int, List[Dict]] = {}
+    sira_id = 0
+    for salon_id in range(1, salon_sayisi + 1):
+        salon_adi = f"S-{salon_id:03d}"
+        salonlar.append({'id': salon_id, 'salon_adi': salon_adi, 'kapasite': salon_kapasitesi})
+        satirlar = []
+        for sira_no in range(1, salon_kapasitesi + 1):
+            sira_id += 1
+            satirlar.append({
+                'id': sira_id,
+                'salon_id': salon_id,
+                'salon_adi': salon_adi,
+                'sira_no': sira_no,
+                'etiket': None,
+                'aktif_mi': 1
+            })
+        salon_sira_haritasi[salon_id] = satirlar
+
+    # Sabit öğrenciler: farklı salonlarda, birbirine komşu olmayan köşe sıralarına
+    sabit_sayisi = min(int(ogrenci_sayisi * sabit_orani), salon_sayisi * 2)
+    sabit_ogrenciler = []
+    for sira, ogr in enumerate(rng.sample(ogrenciler, sabit_sayisi)):
+        salon_id = sira % salon_sayisi + 1
+        sira_kaydi = salon_sira_haritasi[salon_id][0 if sira < salon_sayisi else salon_kapasitesi - 1]
+        sabit = dict(ogr)
+        sabit['sabit_mi'] = 1
+        sabit['sabit_salon_id'] = salon_id
+        sabit['sabit_salon_sira_id'] = sira_kaydi['id']
+        sabit_ogrenciler.append(sabit)
+    sabit_idler = {o['id'] for o in sabit_ogrenciler}
+    return {
+        'ogrenciler': [o for o in ogrenciler if o['id'] not in sabit_idler] + sabit_ogrenciler,
+        'sabit_ogrenciler': sabit_ogrenciler,
+        'salonlar': salonlar,
+        'salon_sira_haritasi': salon_sira_haritasi,
+    }
+
+
+def olcum_yap(ogrenci_sayisi: int, seed: int = 0, bellek: bool = True,
+              config: Optional[HarmanlamaConfig] = None,
+              seviyeler: Optional[List[str]] = None) -> Dict[str, Any]:
+    """Tek boyut için süre, aşama dağılımı, tepe bellek ve çözüm durumunu ölç"""
+    okul = sentetik_okul(ogrenci_sayisi, seed=seed, seviyeler=seviyeler)
+    config = config or HarmanlamaConfig(seed=seed)
+
+    engine = HarmanlamaEngine(config)
+    baslangic = time.perf_counter()
+    sonuc = engine.harmanla(
+        okul['ogrenciler'],
+        okul['salonlar'],
+        sabit_ogrenciler=okul['sabit_ogrenciler'],
+        salon_sira_haritasi=okul['salon_sira_haritasi']
+    )
+    toplam = time.perf_counter() - baslangic
+
+    tepe_bellek = None
+    if bellek:
+        # tracemalloc süreyi şişirdiği için bellek ayrı bir çalıştırmada ölçülür
+        tracemalloc.start()
+        try:
+            HarmanlamaEngine(config).harmanla(
+                okul['ogrenciler'],
+                okul['salonlar'],
+                sabit_ogrenciler=okul['sabit_ogrenciler'],
+                salon_sira_haritasi=okul['salon_sira_haritasi']
+            )
+            tepe_bellek = tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+
+    return {
+        'ogrenci_sayisi': ogrenci_sayisi,
+        'salon_sayisi': len(okul['salonlar']),
+        'sabit_ogrenci': len(okul['sabit_ogrenciler']),
+        'basarili': sonuc['basarili'],
+        'hatalar': sonuc['hatalar'],
+        'cozum_yolu': engine.cozum_yolu,
+        'cozucu_durumlari': [cozum['durum'] for cozum in sonuc['performans']['cp_sat']],
+        'toplam_sure': round(toplam, 4),
+        'asamalar': {ad: sure['duvar'] for ad, sure in sonuc['performans']['asamalar'].items()},
+        'tepe_bellek_mb': round(tepe_bellek / (1024 * 1024), 2) if tepe_bellek is not None else None,
+    }
+
+
+def benchmark_calistir(boyutlar: Optional[List[int]] = None, seed: int = 0,
+                       bellek: bool = True, yazdir: bool = False,
+                       config: Optional[HarmanlamaConfig] = None) -> Dict[str, Any]:
+    """Tüm boyutları sırayla ölç"""
+    olcumler = []
+    for boyut in boyutlar or VARSAYILAN_BOYUTLAR:
+        olcum = olcum_yap(boyut, seed=seed, bellek=bellek, config=config)
+        olcumler.append(olcum)
+        if yazdir:
+            durum = "✅" if olcum['basarili'] else "❌"
+            print(f"{durum} {boyut:>6} öğrenci: {olcum['toplam_sure']:.3f} sn "
+                  f"({olcum['cozum_yolu']}), tepe bellek {olcum['tepe_bellek_mb']} MB")
+    return {
+        'tarih': datetime.now().isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'seed': seed,
+        'olcumler': olcumler,
+    }
+
+
+def karsilastir(sonuc: Dict[str, Any], temel: Dict[str, Any], tolerans: float = 0.25,
+                mutlak_esik: float = 0.05) -> List[str]:
+    """
+    Sonucu temel ölçümle karşılaştır; gerilemeleri metin olarak döndür.
+    Süre/bellek temelin (1 + tolerans) katını ve mutlak_esik saniyeyi aşarsa,
+    ya da temelde başarılı olan boyut artık başarısızsa gerileme sayılır.
+    """
+    temel_olcumler = {o['ogrenci_sayisi']: o for o in temel.get('olcumler', [])}
+    gerilemeler = []
+    for olcum in sonuc.get('olcumler', []):
+        boyut = olcum['ogrenci_sayisi']
+        eski = temel_olcumler.get(boyut)
+        if eski is None:
+            continue
+        if eski['basarili'] and not olcum['basarili']:
+            gerilemeler.append(f"{boyut} öğrenci: harmanlama artık başarısız")
+        if (olcum['toplam_sure'] > eski['toplam_sure'] * (1 + tolerans)
+                and olcum['toplam_sure'] - eski['toplam_sure'] > mutlak_esik):
+            gerilemeler.append(
+                f"{boyut} öğrenci: süre {eski['toplam_sure']:.3f} → {olcum['toplam_sure']:.3f} sn"
+            )
+        if (olcum.get('tepe_bellek_mb') is not None and eski.get('tepe_bellek_mb')
+                and olcum['tepe_bellek_mb'] > eski['tepe_bellek_mb'] * (1 + tolerans)):
+            gerilemeler.append(
+                f"{boyut} öğrenci: tepe bellek {eski['tepe_bellek_mb']} → {olcum['tepe_bellek_mb']} MB"
+            )
+    return gerilemeler
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Harmanlama motoru performans ölçümü")
+    parser.add_argument('--boyutlar', type=int, nargs='+', default=VARSAYILAN_BOYUTLAR)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--bellek-yok', action='store_true', help="tracemalloc ölçümünü atla")
+    parser.add_argument('--cp-sat', action='store_true', help="Sezgisel yolu atlayıp CP-SAT'i ölç")
+    parser.add_argument('--round-robin', action='store_true',
+                        help="Çözücüsüz round-robin dağıtım modunu ölç")
+    parser.add_argument('--cikti', help="Sonuç JSON dosyası")
+    parser.add_argument('--temel', help="Karşılaştırılacak temel ölçüm JSON dosyası")
+    parser.add_argument('--temel-yaz', help="Sonucu yeni temel ölçüm olarak bu dosyaya yaz")
+    parser.add_argument('--tolerans', type=float, default=0.25)
+    args = parser.parse_args(argv)
+
+    config = HarmanlamaConfig(
+        seed=args.seed,
+        sezgisel_once=not args.cp_sat,
+        dagitim_modu="round-robin" if args.round_robin else "ozel-kural"
+    )
+    sonuc = benchmark_calistir(args.boyutlar, seed=args.seed,
+                               bellek=not args.bellek_yok, yazdir=True, config=config)
+    for yol in (args.cikti, args.temel_yaz):
+        if yol:
+            with open(yol, 'w', encoding='utf-8') as dosya:
+                json.dump(sonuc, dosya, ensure_ascii=False, indent=2)
+
+    if args.temel:
+        with open(args.temel, encoding='utf-8') as dosya:
+            temel = json.load(dosya)
+        gerilemeler = karsilastir(sonuc, temel, tolerans=args.tolerans)
+        if gerilemeler:
+            print("❌ Performans gerilemesi:")
+            for satir in gerilemeler:
+                print(f"   {satir}")
+            return 1
+        print("✅ Temel ölçüme göre gerileme yok")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
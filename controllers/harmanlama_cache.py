@@ -0,0 +1,285 @@
+"""
+Kelebek Sınav Sistemi - Harmanlama Önbellekleri
+Salonların koltuk numaraları ve yan/arka komşulukları her harmanlamada
+yeniden hesaplanmasın diye hazır (sıkıştırılmış) halde saklanır; aynı
+girdilerle tekrarlanan harmanlamaların sonuçları diskte tutulur.
+"""
+
+import dataclasses
+import hashlib
+import json
+import os
+import pickle
+import sys
+import threading
+from array import array
+from collections import OrderedDict
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils import get_user_data_path
+
+
+class SalonDuzeni:
+    """
+    Tek salonun değişmeyen koltuk grafı.
+    sira_nolar sıralı aktif sıra numaralarıdır; komşuluk CSR biçimindedir:
+    i. koltuğun komşuları komsu_indeksleri[komsu_baslangic[i]:komsu_baslangic[i + 1]].
+    """
+
+    __slots__ = ('salon_id', 'satir_genisligi', 'sira_nolar', 'komsu_baslangic',
+                 'komsu_indeksleri', 'indeks')
+
+    def __init__(self, salon_id: int, sira_nolar: Iterable[int], satir_genisligi: int):
+        self.salon_id = salon_id
+        self.satir_genisligi = max(1, satir_genisligi)
+        self.sira_nolar = array('i', sorted(sira_nolar))
+        self.indeks: Dict[int, int] = {no: idx for idx, no in enumerate(self.sira_nolar)}
+        self.komsu_baslangic = array('i', [0])
+        self.komsu_indeksleri = array('i')
+        genislik = self.satir_genisligi
+        for sira_no in self.sira_nolar:
+            satir = (sira_no - 1) // genislik
+            # HarmanlamaEngine._seat_neighbors ile aynı sıra: sol, sağ, ön, arka
+            adaylar = []
+            if sira_no - 1 >= 1 and (sira_no - 2) // genislik == satir:
+                adaylar.append(sira_no - 1)
+            if sira_no // genislik == satir:
+                adaylar.append(sira_no + 1)
+            if sira_no - genislik >= 1:
+                adaylar.append(sira_no - genislik)
+            adaylar.append(sira_no + genislik)
+            for aday in adaylar:
+                komsu = self.indeks.get(aday)
+                if komsu is not None:
+                    self.komsu_indeksleri.append(komsu)
+            self.komsu_baslangic.append(len(self.komsu_indeksleri))
+
+    def __len__(self) -> int:
+        return len(self.sira_nolar)
+
+    def komsular(self, idx: int) -> array:
+        return self.komsu_indeksleri[self.komsu_baslangic[idx]:self.komsu_baslangic[idx + 1]]
+
+    def komsu_numaralari(self, idx: int):
+        return [self.sira_nolar[nb] for nb in self.komsular(idx)]
+
+    def __getstate__(self):
+        return (self.salon_id, self.satir_genisligi, self.sira_nolar,
+                self.komsu_baslangic, self.komsu_indeksleri)
+
+    def __setstate__(self, state):
+        (self.salon_id, self.satir_genisligi, self.sira_nolar,
+         self.komsu_baslangic, self.komsu_indeksleri) = state
+        self.indeks = {no: idx for idx, no in enumerate(self.sira_nolar)}
+
+
+DuzenAnahtari = Tuple[int, Tuple[int, ...], int]
+
+
+class SalonDuzeniOnbellegi:
+    """
+    (salon_id, aktif sıra kümesi, satir_genisligi) -> SalonDuzeni.
+    Anahtar düzenin kendisini içerdiği için eski bir kayıt yanlış sonuç
+    veremez; gecersiz_kil() salon değiştiğinde artık kullanılmayacak
+    kayıtları bellekten ve (varsa) diskteki dosyadan atar.
+    """
+
+    def __init__(self, dosya_yolu: Optional[str] = None, en_fazla: int = 512):
+        self.dosya_yolu = dosya_yolu
+        self.en_fazla = en_fazla
+        self._kayitlar: "OrderedDict[DuzenAnahtari, SalonDuzeni]" = OrderedDict()
+        self._kilit = threading.Lock()
+        self._yuklendi = False
+        self.isabet = 0
+        self.iska = 0
+
+    def getir(self, salon_id: int, sira_nolar: Iterable[int], satir_genisligi: int) -> SalonDuzeni:
+        anahtar: DuzenAnahtari = (salon_id, tuple(sorted(sira_nolar)), max(1, satir_genisligi))
+        with self._kilit:
+            self._diskten_yukle()
+            duzen = self._kayitlar.get(anahtar)
+            if duzen is not None:
+                self._kayitlar.move_to_end(anahtar)
+                self.isabet += 1
+                return duzen
+            self.iska += 1
+            duzen = SalonDuzeni(salon_id, anahtar[1], anahtar[2])
+            self._kayitlar[anahtar] = duzen
+            while len(self._kayitlar) > self.en_fazla:
+                self._kayitlar.popitem(last=False)
+            self._diske_yaz()
+            return duzen
+
+    def gecersiz_kil(self, salon_id: Optional[int] = None):
+        """Salonun (None ise tüm salonların) kayıtlarını at"""
+        with self._kilit:
+            self._diskten_yukle()
+            if salon_id is None:
+                self._kayitlar.clear()
+            else:
+                for anahtar in [k for k in self._kayitlar if k[0] == salon_id]:
+                    del self._kayitlar[anahtar]
+            self._diske_yaz()
+
+    def __len__(self) -> int:
+        return len(self._kayitlar)
+
+    def _diskten_yukle(self):
+        if self._yuklendi or not self.dosya_yolu:
+            self._yuklendi = True
+            return
+        self._yuklendi = True
+        if not os.path.exists(self.dosya_yolu):
+            return
+        try:
+            with open(self.dosya_yolu, 'rb') as dosya:
+                kayitlar = pickle.load(dosya)
+        except (OSError, pickle.UnpicklingError, EOFError, AttributeError):
+            return
+        if isinstance(kayitlar, dict):
+            self._kayitlar.update(kayitlar)
+
+    def _diske_yaz(self):
+        if not self.dosya_yolu:
+            return
+        gecici = f"{self.dosya_yolu}.tmp"
+        try:
+            os.makedirs(os.path.dirname(self.dosya_yolu) or ".", exist_ok=True)
+            with open(gecici, 'wb') as dosya:
+                pickle.dump(dict(self._kayitlar), dosya, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(gecici, self.dosya_yolu)
+        except OSError:
+            pass
+
+
+def varsayilan_dosya_yolu() -> str:
+    """Kalıcı düzen önbelleğinin kullanıcı veri dizinindeki yolu"""
+    return get_user_data_path(os.path.join('cache', 'salon_duzenleri.pkl'))
+
+
+_onbellekler: Dict[Optional[str], SalonDuzeniOnbellegi] = {}
+_onbellek_kilidi = threading.Lock()
+
+
+def get_duzen_onbellegi(dosya_yolu: Optional[str] = None) -> SalonDuzeniOnbellegi:
+    """Süreç genelinde paylaşılan salon düzeni önbelleği (dosya yolu başına tek)"""
+    with _onbellek_kilidi:
+        onbellek = _onbellekler.get(dosya_yolu)
+        if onbellek is None:
+            onbellek = SalonDuzeniOnbellegi(dosya_yolu)
+            _onbellekler[dosya_yolu] = onbellek
+        return onbellek
+
+
+def duzen_onbellegini_gecersiz_kil(salon_id: Optional[int] = None):
+    """
+    Salon veya sıraları değiştiğinde bu süreçteki önbellekleri ve diskteki
+    varsayılan önbelleği temizle (işçi süreci onu bir sonraki açılışta okur).
+    """
+    yol = varsayilan_dosya_yolu()
+    if os.path.exists(yol):
+        get_duzen_onbellegi(yol)
+    with _onbellek_kilidi:
+        onbellekler = list(_onbellekler.values())
+    for onbellek in onbellekler:
+        onbellek.gecersiz_kil(salon_id)
+
+
+class HarmanlamaSonucOnbellegi:
+    """
+    Aynı girdilerle tekrar çalıştırılan harmanla() için içerik adresli sonuç
+    önbelleği. Anahtar; öğrenciler, sabit öğrenciler, salonlar, sıra haritası,
+    önceki yerleşim ve HarmanlamaConfig (seed dahil) üzerinden kararlı bir
+    SHA-256 özetidir. Her sonuç dizinde ayrı bir dosyadır; dosya erişim zamanı
+    LRU sırası olarak kullanılır ve en_fazla aşılınca en eskiler silinir.
+    """
+
+    UZANTI = ".pkl"
+
+    def __init__(self, dizin: Optional[str] = None, en_fazla: int = 50):
+        self.dizin = dizin or get_user_data_path(os.path.join('cache', 'harmanlama'))
+        self.en_fazla = en_fazla
+        self._kilit = threading.Lock()
+
+    @staticmethod
+    def anahtar(*parcalar: Any) -> str:
+        """Girdilerin kararlı özeti (sözlük sırası ve liste sırasından bağımsız)"""
+        ozet = hashlib.sha256()
+        for parca in parcalar:
+            ozet.update(json.dumps(_kanonik(parca), sort_keys=True, ensure_ascii=False,
+                                   default=str).encode('utf-8'))
+            ozet.update(b'\x1e')
+        return ozet.hexdigest()
+
+    def _yol(self, anahtar: str) -> str:
+        return os.path.join(self.dizin, anahtar + self.UZANTI)
+
+    def getir(self, anahtar: str) -> Optional[Dict[str, Any]]:
+        yol = self._yol(anahtar)
+        with self._kilit:
+            try:
+                with open(yol, 'rb') as dosya:
+                    sonuc = pickle.load(dosya)
+                os.utime(yol)
+            except (OSError, pickle.UnpicklingError, EOFError, AttributeError):
+                return None
+        return sonuc if isinstance(sonuc, dict) else None
+
+    def kaydet(self, anahtar: str, sonuc: Dict[str, Any]):
+        yol = self._yol(anahtar)
+        with self._kilit:
+            try:
+                os.makedirs(self.dizin, exist_ok=True)
+                gecici = f"{yol}.{os.getpid()}.tmp"
+                with open(gecici, 'wb') as dosya:
+                    pickle.dump(sonuc, dosya, protocol=pickle.HIGHEST_PROTOCOL)
+                os.replace(gecici, yol)
+                self._budama()
+            except OSError:
+                pass
+
+    def temizle(self):
+        with self._kilit:
+            for yol in self._dosyalar():
+                try:
+                    os.remove(yol)
+                except OSError:
+                    pass
+
+    def _dosyalar(self) -> List[str]:
+        try:
+            return [
+                os.path.join(self.dizin, ad) for ad in os.listdir(self.dizin)
+                if ad.endswith(self.UZANTI)
+            ]
+        except OSError:
+            return []
+
+    def _budama(self):
+        dosyalar = self._dosyalar()
+        if len(dosyalar) <= self.en_fazla:
+            return
+        dosyalar.sort(key=lambda yol: os.path.getmtime(yol))
+        for yol in dosyalar[:len(dosyalar) - self.en_fazla]:
+            try:
+                os.remove(yol)
+            except OSError:
+                pass
+
+
+def _kanonik(deger: Any) -> Any:
+    """Özet için JSON'a uygun, sırası sabit bir kopya üret"""
+    if dataclasses.is_dataclass(deger) and not isinstance(deger, type):
+        return _kanonik(dataclasses.asdict(deger))
+    if isinstance(deger, dict):
+        return {str(k): _kanonik(v) for k, v in deger.items()}
+    if isinstance(deger, (list, tuple)):
+        elemanlar = [_kanonik(v) for v in deger]
+        if all(isinstance(e, dict) and 'id' in e for e in elemanlar):
+            elemanlar.sort(key=lambda e: str(e['id']))
+        return elemanlar
+    if isinstance(deger, (set, frozenset)):
+        return sorted(_kanonik(v) for v in deger)
+    return deger
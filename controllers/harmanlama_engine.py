@@ -3,18 +3,52 @@ Kelebek Sınav Sistemi - Harmanlama Engine
 Öğrencileri salonlara yerleştiren algoritma motoru
 """
 
+import atexit
+import heapq
+import itertools
 import math
+import multiprocessing
+from array import array
 import random
 import sys
 import os
-from typing import List, Dict, Optional, Tuple, Any, Set
+import threading
+import time
+import functools
+from contextlib import contextmanager
+from typing import List, Dict, Optional, Tuple, Any, Set, Callable, Iterable
 from collections import defaultdict, deque
-from dataclasses import dataclass
+from concurrent.futures import ProcessPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import dataclass, asdict
+from datetime import datetime
 
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from utils import SINIF_SEVIYELERI, CP_SAT_FORBID_SAME_GRADE_ADJACENT
+from utils import (SINIF_SEVIYELERI, CP_SAT_FORBID_SAME_GRADE_ADJACENT, TEACHER_DESK_BASE,
+                   sinif_seviyesinden_sayi)
 from models import SalonSira, SabitOgrenciKonum
+from controllers.harmanlama_cache import (get_duzen_onbellegi, varsayilan_dosya_yolu,
+                                          HarmanlamaSonucOnbellegi)
+from controllers.koltuk_izgarasi import yerlesim_ihlalleri, ihlal_mesaji, YerlesimDenetleyici
+from controllers.yerlesim_tablosu import YerlesimTablosu
+
+
+# Round-robin yerleşimde her koltuk için akışın önünde bakılan öğrenci sayısı
+ROUND_ROBIN_PENCERESI = 8
+
+# Model dökümü biçim sürümü (bkz. controllers/harmanlama_replay.py)
+MODEL_DOKUMU_SURUMU = 1
+_DOKUM_SAYACI = itertools.count(1)
+
+
+@functools.lru_cache(maxsize=None)
+def _ortools_yuklu() -> bool:
+    try:
+        from ortools.sat.python import cp_model  # noqa: F401
+    except ImportError:
+        return False
+    return True
 
 
 @dataclass
@@ -24,28 +58,352 @@ class HarmanlamaConfig:
     max_deneme: int = 100  # Maksimum deneme sayısı
     seed: Optional[int] = None  # Random seed (test için)
     satir_genisligi: int = 2  # Bir sıradaki varsayılan koltuk sayısı (yan/arka kontrolü)
+    # CP-SAT model tipi: "seviye" koltuk başına sınıf seviyesi seçer (koltuk×seviye),
+    # "ogrenci" eski yoğun öğrenci×koltuk matrisini kurar.
+    cp_sat_modeli: str = "seviye"
+    # İki aşamalı mod: önce seviyeler salonlara paylaştırılır, sonra her salon
+    # ayrı bir süreçte kendi koltuk modelini çözer.
+    salon_ayristirma: bool = False
+    # Önce DSATUR tabanlı sezgisel renklendirme denenir; CP-SAT yalnızca o başarısız olursa çalışır.
+    sezgisel_once: bool = True
+    # Önceki yerleşimle yeniden harmanlamada: "ipucu" eski koltukları CP-SAT'e ipucu ve
+    # hedef olarak verir, "sabit" eski koltuğu hâlâ geçerli öğrencileri yerinde kilitler.
+    artimli_mod: str = "ipucu"
+    # CP-SAT çözüm başına süre bütçesi (saniye)
+    cozum_suresi: float = 15.0
+    # CP-SAT arama işçisi; None ise makinedeki çekirdek sayısı kullanılır
+    isci_sayisi: Optional[int] = None
+    # İlk geçerli yerleşim bulununca aramayı bırak (en iyiyi aramadan)
+    ilk_cozumde_dur: bool = False
+    # Hazır salon düzenleri (koltuk dizisi + komşuluk) kullanıcı veri dizinine de yazılsın
+    duzen_onbellegi_kalici: bool = False
+    # Aynı girdilerle tekrar çalıştırmada diskteki önceki sonucu döndür
+    sonuc_onbellegi: bool = False
+    sonuc_onbellegi_dizini: Optional[str] = None  # None: kullanıcı veri dizini/cache/harmanlama
+    # "ozel-kural": sezgisel + CP-SAT; "round-robin": çözücüsüz doğrusal IWRR yerleşimi
+    # (çok büyük okullar için; OR-Tools kurulu değilse de buna düşülür)
+    dagitim_modu: str = "ozel-kural"
+    # CP-SAT arama tohumu ve ek çözücü parametreleri (ör. {"randomize_search": True});
+    # portföy çözümünde stratejileri çeşitlendirmek için
+    cp_sat_tohumu: Optional[int] = None
+    cp_sat_parametreleri: Optional[Dict[str, Any]] = None
+    # CP-SAT'i masasız denemeden doğrudan öğretmen masalı (gevşetilmiş) modelle çöz
+    ogretmen_masasi_once: bool = False
+    # Yerleşim bulunduktan sonra aynı şubeden öğrencileri birbirinden uzaklaştıran
+    # zamana yayılan yerel arama; aralik_yaricapi içindeki (Manhattan) aynı şube
+    # çiftleri cezalandırılır, optimizasyon_suresi saniye sonunda en iyisi döner.
+    aralik_optimizasyonu: bool = False
+    aralik_yaricapi: int = 2
+    optimizasyon_suresi: float = 5.0
+    # Sonuçtaki 'yerlesim' sözlük listesi yerine sütunlu YerlesimTablosu olsun
+    # (liste gibi dolaşılır; dataframe() ile pandas'a satır satır dolaşmadan geçer)
+    sutunlu_sonuc: bool = False
+    # Çözücü girdisi (anonim sınıf kodları, koltuk tablosu, komşuluk, ayarlar) bu dizine
+    # sıkıştırılmış JSON olarak dökülür; harmanlama_replay ile başka ayarlarla yeniden
+    # çözülür. model_dokumu_proto açıksa her CP-SAT modelinin protosu da eklenir.
+    model_dokumu: Optional[str] = None
+    model_dokumu_proto: bool = False
+    # yerel_onarim() hamle zincirinin en fazla halka sayısı (1: yalnızca boş koltuk,
+    # 2: bir öğrenci boş koltuğa kaydırılıp yeri açılır, ...)
+    onarim_zincir_uzunlugu: int = 3
+    # harmanlama_ayar ile üretilmiş çözücü ayar profili (JSON yolu). Verilirse her
+    # harmanla() çağrısında öğrenci sayısının düştüğü bandın ayarları, varsayılan
+    # değerinde bırakılmış alanların yerine geçer.
+    ayar_profili: Optional[str] = None
     
     def __post_init__(self):
         if self.seed is not None:
             random.seed(self.seed)
 
 
+class IptalBelirteci:
+    """
+    Arka plandaki harmanlamayı durdurmak için paylaşılan belirteç.
+    Arayüz iptal_et() çağırır; motor aşama aralarında kontrol eder ve
+    çalışan CP-SAT aramasını kaydettiği durdurucularla keser. kabul_et() ise
+    yalnızca aralık optimizasyonunu durdurur: o ana kadarki en iyi yerleşim döner.
+    """
+
+    def __init__(self):
+        self._olay = threading.Event()
+        self._kabul = threading.Event()
+        self._kilit = threading.Lock()
+        self._durdurucular: List[Callable[[], None]] = []
+
+    @property
+    def iptal_edildi(self) -> bool:
+        return self._olay.is_set()
+
+    @property
+    def kabul_edildi(self) -> bool:
+        return self._kabul.is_set()
+
+    def kabul_et(self):
+        self._kabul.set()
+
+    def iptal_et(self):
+        with self._kilit:
+            self._olay.set()
+            durdurucular = list(self._durdurucular)
+        for durdur in durdurucular:
+            durdur()
+
+    def kaydet(self, durdur: Callable[[], None]):
+        with self._kilit:
+            self._durdurucular.append(durdur)
+            zaten_iptal = self._olay.is_set()
+        if zaten_iptal:
+            durdur()
+
+    def kaldir(self, durdur: Callable[[], None]):
+        with self._kilit:
+            if durdur in self._durdurucular:
+                self._durdurucular.remove(durdur)
+
+
+class SinifSozlugu:
+    """
+    Harmanlama başına sınıf sözlüğü. Her farklı (sinif, sube) çifti ve her sınıf
+    seviyesi ailesi ilk görüldüğünde küçük bir tamsayıya çevrilir; sıcak döngüler ve
+    kısıt üretimi bu kodlarla çalışır. Seviye ailesi sinif_seviyesinden_sayi ile
+    bulunur ("11sayisal" ve "11sozel" aynı ailedir); tanınmayan sınıflar kendi
+    adlarıyla ayrı bir aile oluşturur.
+    """
+
+    __slots__ = ('_sinif_kodlari', 'siniflar', 'sinif_seviyeleri', '_seviye_kodlari',
+                 'seviye_adlari', '_sinif_seviye_onbellegi')
+
+    def __init__(self):
+        self._sinif_kodlari: Dict[Tuple[str, str], int] = {}
+        self.siniflar: List[Tuple[str, str]] = []  # kod -> (sinif, sube)
+        self.sinif_seviyeleri: List[int] = []  # sınıf kodu -> seviye kodu
+        self._seviye_kodlari: Dict[Any, int] = {}
+        self.seviye_adlari: List[str] = []  # seviye kodu -> "11", "ortaokulhazirlikarapca"...
+        self._sinif_seviye_onbellegi: Dict[str, int] = {}
+
+    def __len__(self) -> int:
+        return len(self.siniflar)
+
+    def seviye_kodu(self, sinif: Any) -> int:
+        sinif = str(sinif)
+        kod = self._sinif_seviye_onbellegi.get(sinif)
+        if kod is None:
+            aile = sinif_seviyesinden_sayi(sinif) or sinif.strip()
+            kod = self._seviye_kodlari.get(aile)
+            if kod is None:
+                kod = self._seviye_kodlari[aile] = len(self.seviye_adlari)
+                self.seviye_adlari.append(str(aile))
+            self._sinif_seviye_onbellegi[sinif] = kod
+        return kod
+
+    def sinif_kodu(self, sinif: Any, sube: Any) -> int:
+        anahtar = (str(sinif), str(sube))
+        kod = self._sinif_kodlari.get(anahtar)
+        if kod is None:
+            kod = self._sinif_kodlari[anahtar] = len(self.siniflar)
+            self.siniflar.append(anahtar)
+            self.sinif_seviyeleri.append(self.seviye_kodu(anahtar[0]))
+        return kod
+
+    def ogrenci_kodu(self, ogrenci: Dict) -> int:
+        return self.sinif_kodu(ogrenci['sinif'], ogrenci['sube'])
+
+    def yer_kodu(self, yer: Dict) -> int:
+        return self.sinif_kodu(yer['ogrenci_sinif'], yer['ogrenci_sube'])
+
+    def sinif_adi(self, kod: int, ayrac: str = "-") -> str:
+        sinif, sube = self.siniflar[kod]
+        return f"{sinif}{ayrac}{sube}"
+
+
+class KoltukTablosu:
+    """
+    Çözüme giren koltukların sütun tablosu (struct-of-arrays). i. koltuk
+    salon_idleri[i], sira_nolari[i] ve ogretmen[i] ile tanımlanır; salon adı
+    salon başına bir kez tutulur. Koltuk başına sözlük kurulmaz, tablo alt
+    problem süreçlerine olduğu gibi gönderilebilir.
+    yasak_maskeleri, komşusunda sabit öğrenci oturan koltuklar için o koltuğa
+    gelemeyecek seviye kodlarının bit maskesidir (seyrek; çoğu koltukta yoktur).
+    """
+
+    __slots__ = ('salon_idleri', 'sira_nolari', 'ogretmen', 'salon_adlari', 'yasak_maskeleri')
+
+    def __init__(self):
+        self.salon_idleri = array('i')
+        self.sira_nolari = array('i')
+        self.ogretmen = array('b')
+        self.salon_adlari: Dict[int, str] = {}
+        self.yasak_maskeleri: Dict[int, int] = {}
+
+    def __len__(self) -> int:
+        return len(self.sira_nolari)
+
+    def ekle(self, salon_id: int, salon_adi: str, sira_no: int, ogretmen: bool = False) -> int:
+        self.salon_idleri.append(salon_id)
+        self.sira_nolari.append(sira_no)
+        self.ogretmen.append(1 if ogretmen else 0)
+        self.salon_adlari.setdefault(salon_id, salon_adi)
+        return len(self.sira_nolari) - 1
+
+    def yasakla(self, idx: int, seviye: int):
+        self.yasak_maskeleri[idx] = self.yasak_maskeleri.get(idx, 0) | (1 << seviye)
+
+    def yasakli_mi(self, idx: int, seviye: int) -> bool:
+        return bool(self.yasak_maskeleri.get(idx, 0) >> seviye & 1)
+
+    def yasak_seviyeler(self, idx: int) -> Set[int]:
+        maske = self.yasak_maskeleri.get(idx, 0)
+        return {seviye for seviye in range(maske.bit_length()) if maske >> seviye & 1}
+
+    def normal_koltuklar(self) -> List[int]:
+        """Öğretmen masası olmayan koltuk indeksleri"""
+        return [idx for idx, masa in enumerate(self.ogretmen) if not masa]
+
+    def ogretmen_koltuklari(self) -> List[int]:
+        return [idx for idx, masa in enumerate(self.ogretmen) if masa]
+
+    def salon_koltuklari(self, ogretmen_dahil: bool = True) -> Dict[int, List[int]]:
+        """salon_id -> koltuk indeksleri (tablodaki sırayla)"""
+        sonuc: Dict[int, List[int]] = defaultdict(list)
+        for idx, (salon_id, masa) in enumerate(zip(self.salon_idleri, self.ogretmen)):
+            if ogretmen_dahil or not masa:
+                sonuc[salon_id].append(idx)
+        return sonuc
+
+    def kayit(self) -> Dict[str, Any]:
+        """JSON'a yazılabilir biçim (salon adları dökülmez)"""
+        return {
+            'salon_idleri': list(self.salon_idleri),
+            'sira_nolari': list(self.sira_nolari),
+            'ogretmen': list(self.ogretmen),
+            'yasak_maskeleri': {str(idx): maske for idx, maske in self.yasak_maskeleri.items()}
+        }
+
+    @classmethod
+    def kayittan(cls, kayit: Dict[str, Any]) -> "KoltukTablosu":
+        tablo = cls()
+        for salon_id, sira_no, masa in zip(kayit['salon_idleri'], kayit['sira_nolari'], kayit['ogretmen']):
+            tablo.ekle(salon_id, f"Salon {salon_id}", sira_no, bool(masa))
+        tablo.yasak_maskeleri = {int(idx): maske for idx, maske in kayit['yasak_maskeleri'].items()}
+        return tablo
+
+    def alt_tablo(self, indeksler: List[int]) -> "KoltukTablosu":
+        """Verilen koltuklardan (yeni sırayla) oluşan tablo"""
+        alt = KoltukTablosu()
+        for idx in indeksler:
+            salon_id = self.salon_idleri[idx]
+            yeni = alt.ekle(salon_id, self.salon_adlari[salon_id], self.sira_nolari[idx], self.ogretmen[idx])
+            maske = self.yasak_maskeleri.get(idx)
+            if maske:
+                alt.yasak_maskeleri[yeni] = maske
+        return alt
+
+
+class OgrenciTablosu:
+    """
+    Çözülecek öğrencilerin sütun tablosu: id, sınıf kodu ve seviye kodu dizileri
+    (kodlar SinifSozlugu'ndan). Kaynak sözlükler yalnızca sonuç satırları
+    üretilirken okunur.
+    """
+
+    __slots__ = ('ogrenciler', 'idler', 'sinif_kodlari', 'seviye_kodlari')
+
+    def __init__(self, ogrenciler: List[Dict], sozluk: SinifSozlugu):
+        self.ogrenciler = ogrenciler
+        self.idler = array('q', (ogr['id'] for ogr in ogrenciler))
+        self.sinif_kodlari = array('i', (sozluk.ogrenci_kodu(ogr) for ogr in ogrenciler))
+        self.seviye_kodlari = array('i', (sozluk.sinif_seviyeleri[kod] for kod in self.sinif_kodlari))
+
+    def __len__(self) -> int:
+        return len(self.idler)
+
+    def seviye_gruplari(self) -> Dict[int, List[int]]:
+        gruplar: Dict[int, List[int]] = defaultdict(list)
+        for idx, seviye in enumerate(self.seviye_kodlari):
+            gruplar[seviye].append(idx)
+        return gruplar
+
+
+def _asama(ad: str):
+    """Metodun süresini harmanla() performans raporuna 'ad' aşaması olarak yaz"""
+    def sarmal(metot):
+        @functools.wraps(metot)
+        def olculen(self, *args, **kwargs):
+            with self._olc(ad):
+                return metot(self, *args, **kwargs)
+        return olculen
+    return sarmal
+
+
 class HarmanlamaEngine:
     """Öğrenci harmanlama algoritması motoru"""
     
-    def __init__(self, config: Optional[HarmanlamaConfig] = None):
+    def __init__(self, config: Optional[HarmanlamaConfig] = None,
+                 iptal_belirteci: Optional[IptalBelirteci] = None,
+                 ilerleme_bildirimi: Optional[Callable[[Dict[str, Any]], None]] = None):
+        """
+        ilerleme_bildirimi her ara CP-SAT çözümünde {'gecen_sure', 'amac',
+        'cozum_sayisi'} sözlüğüyle çağrılır (çözücü iş parçacığından); aralık
+        optimizasyonunun her iyileşen turu da 'asama': 'aralik' ile bildirilir.
+        """
         self.config = config or HarmanlamaConfig()
+        self._temel_config = self.config
+        self.ayar_profili_bandi: Optional[str] = None
+        self.iptal_belirteci = iptal_belirteci
+        self.ilerleme_bildirimi = ilerleme_bildirimi
         self.hata_loglari = []
         self.uyumsuzluk_loglari: List[str] = []
+        self.cozum_yolu: Optional[str] = None
+        self.sozluk = SinifSozlugu()
+        self._asama_sureleri: Dict[str, Dict[str, float]] = {}
+        self._cozucu_istatistikleri: List[Dict[str, Any]] = []
+        self._olcum_yigini: List[List[Any]] = []
+        self._harmanla_baslangici: Optional[Tuple[float, float]] = None
+        self.model_dokumu_yolu: Optional[str] = None
+        self._model_dokumu: Optional[Dict[str, Any]] = None
+        self._dokum_tablosu: Optional[KoltukTablosu] = None
+        self._acik_dokum_cozumu: Optional[Dict[str, Any]] = None
     
     def harmanla(self, ogrenciler: List[Dict], salonlar: List[Dict],
                  sabit_ogrenciler: Optional[List[Dict]] = None,
-                 salon_sira_haritasi: Optional[Dict[int, List[Dict]]] = None) -> Dict[str, any]:
+                 salon_sira_haritasi: Optional[Dict[int, List[Dict]]] = None,
+                 onceki_yerlesim: Optional[List[Dict]] = None) -> Dict[str, any]:
         """
         Ana harmanlama fonksiyonu
+
+        onceki_yerlesim verilirse (DatabaseManager.yerlesim_getir satırları) artımlı
+        çalışır: öğrenciler mümkün olduğunca eski koltuklarında kalır ve sonuçta
+        'degisiklikler' farkı döner.
         """
         self.hata_loglari = []
         self.uyumsuzluk_loglari = []
+        self._asama_sureleri = {}
+        self._cozucu_istatistikleri = []
+        self._harmanla_baslangici = (time.perf_counter(), time.process_time())
+        self.cozum_yolu = None
+        self.sozluk = SinifSozlugu()
+        self.model_dokumu_yolu = None
+        self.config = self._profilli_config(len(ogrenciler))
+        
+        onbellek = None
+        onbellek_anahtari = None
+        if self.config.sonuc_onbellegi:
+            with self._olc('onbellek'):
+                onbellek = HarmanlamaSonucOnbellegi(self.config.sonuc_onbellegi_dizini)
+                onbellek_anahtari = onbellek.anahtar(
+                    ogrenciler, sabit_ogrenciler or [], salonlar,
+                    salon_sira_haritasi or {}, onceki_yerlesim, self.config
+                )
+                kayitli = onbellek.getir(onbellek_anahtari)
+            if kayitli is not None:
+                self.cozum_yolu = kayitli['istatistikler'].get('cozum_yolu')
+                self.uyumsuzluk_loglari = kayitli.get('uyumsuzluklar', [])
+                kayitli['onbellekten'] = True
+                kayitli['performans'] = self._performans_raporu()
+                kayitli['calisma'] = self._calisma_ozeti(
+                    kayitli, kayitli['yerlesim'], ogrenciler, sabit_ogrenciler, salonlar
+                )
+                return kayitli
         
         try:
             if not self._validate_input(ogrenciler, salonlar):
@@ -67,38 +425,70 @@ class HarmanlamaEngine:
                 self.hata_loglari.append(str(exc))
                 return self._hata_response()
 
-            dagitim_modu = "ozel-kural"
             yerlesim: List[Dict] = list(sabit_yerlesim)
             koltuk_listesi: List[str] = []
 
+            onceki_koltuklar = self._onceki_koltuklar(
+                onceki_yerlesim,
+                salon_sira_map,
+                occupied_map
+            )
+
             if mobil_ogr:
                 random.shuffle(mobil_ogr)
-                koltuk_sirasi = [dict(o) for o in mobil_ogr]
+                koltuk_sirasi = list(mobil_ogr)
                 try:
                     yerlesim_mobil, teacher_logs, teacher_ids = self._cp_sat_assign(
                         koltuk_sirasi,
                         salonlar,
                         salon_sira_map,
-                        occupied_map
+                        occupied_map,
+                        onceki_koltuklar=onceki_koltuklar,
+                        occupied_classes=occupied_classes
                     )
                 except RuntimeError as exc:
                     self.hata_loglari.append(str(exc))
                     return self._hata_response()
+                finally:
+                    self._model_dokumunu_yaz()
                 if teacher_logs:
                     self.uyumsuzluk_loglari.extend(teacher_logs)
                 yerlesim.extend(yerlesim_mobil)
                 koltuk_listesi = self._format_koltuk_listesi(koltuk_sirasi, teacher_ids)
 
-            yerlesim.sort(key=lambda x: (x['salon_adi'], x['sira_no']))
+            aralik = None
+            if self.config.aralik_optimizasyonu and yerlesim:
+                try:
+                    aralik = self._aralik_iyilestir(yerlesim, salon_sira_map, onceki_koltuklar)
+                except RuntimeError as exc:
+                    self.hata_loglari.append(str(exc))
+                    return self._hata_response()
+
+            with self._olc('siralama'):
+                yerlesim.sort(key=lambda x: (x['salon_adi'], x['sira_no']))
+
+            dagitim_modu = "ozel-kural"
+            if self.cozum_yolu == "round-robin":
+                # Çözücüsüz yolda kural garanti değil; kalan ihlaller uyumsuzluk olarak raporlanır
+                dagitim_modu = "round-robin"
+                self.uyumsuzluk_loglari.extend(
+                    ihlal_mesaji(kayit) for kayit in self._kural_ihlalleri(yerlesim, salon_sira_map)
+                )
             
             istatistikler = self._istatistik_hesapla(
                 yerlesim,
                 ogrenciler,
                 salonlar,
-                dagitim_modu=dagitim_modu
+                dagitim_modu=dagitim_modu,
+                cozum_yolu=self.cozum_yolu
             )
+            if aralik is not None:
+                istatistikler['aralik'] = aralik
+            satirlar = yerlesim
+            if self.config.sutunlu_sonuc:
+                yerlesim = YerlesimTablosu(yerlesim)
         
-            return {
+            sonuc = {
                 'basarili': True,
                 'yerlesim': yerlesim,
                 'istatistikler': istatistikler,
@@ -107,6 +497,16 @@ class HarmanlamaEngine:
                 'uyumsuzluk_var': bool(self.uyumsuzluk_loglari),
                 'koltuk_listesi': koltuk_listesi
             }
+            if onceki_yerlesim is not None:
+                sonuc['degisiklikler'] = self._yerlesim_farki(onceki_yerlesim, yerlesim)
+            if onbellek is not None:
+                with self._olc('onbellek'):
+                    onbellek.kaydet(onbellek_anahtari, sonuc)
+            sonuc['performans'] = self._performans_raporu()
+            sonuc['calisma'] = self._calisma_ozeti(
+                sonuc, satirlar, ogrenciler, sabit_liste, salonlar, salon_sira_map
+            )
+            return sonuc
         
         except Exception as e:
             self.hata_loglari.append(f"❌ Kritik hata: {str(e)}")
@@ -131,15 +531,15 @@ class HarmanlamaEngine:
         
         return True
     
-    def _sinif_gruplarina_ayir(self, ogrenciler: List[Dict]) -> Dict[str, List[Dict]]:
+    def _sinif_gruplarina_ayir(self, ogrenciler: List[Dict]) -> Dict[int, List[Dict]]:
         """
         Öğrencileri sınıf-şube gruplarına ayır
-        Returns: {'9-A': [...], '10-B': [...], ...}
+        Returns: {sınıf kodu: [...], ...} (kod adı: self.sozluk.sinif_adi(kod))
         """
         gruplar = defaultdict(list)
+        ogrenci_kodu = self.sozluk.ogrenci_kodu
         for ogr in ogrenciler:
-            anahtar = f"{ogr['sinif']}-{ogr['sube']}"
-            gruplar[anahtar].append(ogr)
+            gruplar[ogrenci_kodu(ogr)].append(ogr)
         
         # Her grubu karıştır
         for grup in gruplar.values():
@@ -199,70 +599,685 @@ class HarmanlamaEngine:
 
     def _cp_sat_assign(self, ogrenciler: List[Dict], salonlar: List[Dict],
                        salon_sira_map: Dict[int, Dict[str, Any]],
-                       occupied_map: Dict[int, set]) -> Tuple[List[Dict], List[str], Set[int]]:
-        """CP-SAT modeli ile öğrencileri koltuklara yerleştir"""
+                       occupied_map: Dict[int, set],
+                       onceki_koltuklar: Optional[Dict[int, Tuple[int, int]]] = None,
+                       occupied_classes: Optional[Dict[int, Dict[int, int]]] = None
+                       ) -> Tuple[List[Dict], List[str], Set[int]]:
+        """
+        Öğrencileri koltuklara yerleştir: önce sezgisel renklendirme, o başarısız
+        olursa CP-SAT (salon bazlı veya tek model, gerekirse öğretmen masasıyla).
+        onceki_koltuklar (ogrenci_id -> (salon_id, sira_no)) artımlı çözümde eski
+        koltukları tercih/kilit olarak taşır; bu durumda salon ayrıştırması kullanılmaz.
+        dagitim_modu "round-robin" ise veya OR-Tools yoksa çözücüsüz yerleşim kullanılır.
+        """
+        self._iptal_kontrol()
+        if self.config.dagitim_modu == "round-robin":
+            return self._round_robin_sonucu(
+                ogrenciler, salonlar, salon_sira_map, occupied_map, occupied_classes
+            )
+        ogrenciler = self._ogrenci_tablosu(ogrenciler)
         seat_data, adjacency_pairs = self._prepare_seat_data(
             salonlar,
             salon_sira_map,
             occupied_map,
-            include_teacher_desks=False
+            include_teacher_desks=False,
+            occupied_classes=occupied_classes
         )
-        assignment = self._solve_cp_sat(ogrenciler, seat_data, adjacency_pairs)
+        if self.config.model_dokumu:
+            self._dokum_baslat(ogrenciler, seat_data, adjacency_pairs, masa_sayisi=len(salonlar))
+        masa_ihtiyaci = self._fizibilite_on_kontrol(
+            ogrenciler, seat_data, adjacency_pairs, masa_sayisi=len(salonlar)
+        )
+        if masa_ihtiyaci and not _ortools_yuklu():
+            return self._round_robin_sonucu(
+                ogrenciler.ogrenciler, salonlar, salon_sira_map, occupied_map, occupied_classes,
+                yedek=True
+            )
+        if masa_ihtiyaci:
+            # Masasız model kesin olarak çözümsüz; doğrudan öğretmen masalı çözüme geç
+            self.cozum_yolu = "cp-sat-ogretmen-masasi"
+            seat_data, adjacency_pairs = self._prepare_seat_data(
+                salonlar,
+                salon_sira_map,
+                occupied_map,
+                include_teacher_desks=True,
+                occupied_classes=occupied_classes
+            )
+            assignment = self._solve_cp_sat(ogrenciler, seat_data, adjacency_pairs, onceki_koltuklar)
+            if assignment is None:
+                raise RuntimeError(
+                    f"CP-SAT çözüm üretemedi (en az {masa_ihtiyaci} öğretmen masası gerekiyordu). "
+                    "Salon kapasitesini artırın veya kısıtları gevşetin."
+                )
+            return self._atama_sonucu_olustur(ogrenciler, seat_data, assignment, True)
+        if self.config.sezgisel_once:
+            sonuc = self._sezgisel_assign(
+                ogrenciler, seat_data, adjacency_pairs, salon_sira_map, onceki_koltuklar
+            )
+            if sonuc is not None:
+                self.cozum_yolu = "sezgisel"
+                return sonuc
+            self._iptal_kontrol()
+        if not _ortools_yuklu():
+            return self._round_robin_sonucu(
+                ogrenciler.ogrenciler, salonlar, salon_sira_map, occupied_map, occupied_classes,
+                yedek=True
+            )
+        if self.config.salon_ayristirma and len(salonlar) > 1 and not onceki_koltuklar:
+            sonuc = self._cp_sat_assign_salon_bazli(
+                ogrenciler, salonlar, salon_sira_map, occupied_map, occupied_classes
+            )
+            if sonuc is not None:
+                self.cozum_yolu = "cp-sat-salon"
+                return sonuc
+            self.hata_loglari.append(
+                "⚠️ Salon bazlı çözüm üretilemedi; tüm salonlar tek modelde çözülüyor."
+            )
+        self.cozum_yolu = "cp-sat"
+        assignment = None
+        if not self.config.ogretmen_masasi_once:
+            assignment = self._solve_cp_sat(ogrenciler, seat_data, adjacency_pairs, onceki_koltuklar)
         teacher_mode = False
         if assignment is None:
+            self.cozum_yolu = "cp-sat-ogretmen-masasi"
             seat_data, adjacency_pairs = self._prepare_seat_data(
                 salonlar,
                 salon_sira_map,
                 occupied_map,
-                include_teacher_desks=True
+                include_teacher_desks=True,
+                occupied_classes=occupied_classes
             )
-            assignment = self._solve_cp_sat(ogrenciler, seat_data, adjacency_pairs)
+            assignment = self._solve_cp_sat(ogrenciler, seat_data, adjacency_pairs, onceki_koltuklar)
             teacher_mode = True
         if assignment is None:
             raise RuntimeError(
                 "CP-SAT çözüm üretemedi. Salon kapasitesini artırın veya kısıtları gevşetin."
             )
+        return self._atama_sonucu_olustur(ogrenciler, seat_data, assignment, teacher_mode)
+
+    def _round_robin_sonucu(self, ogrenciler: List[Dict], salonlar: List[Dict],
+                            salon_sira_map: Dict[int, Dict[str, Any]],
+                            occupied_map: Dict[int, set],
+                            occupied_classes: Optional[Dict[int, Dict[int, int]]],
+                            yedek: bool = False) -> Tuple[List[Dict], List[str], Set[int]]:
+        if yedek:
+            self.hata_loglari.append(
+                "⚠️ OR-Tools bulunamadı; çözücüsüz round-robin dağıtım kullanıldı."
+            )
+        self.cozum_yolu = "round-robin"
+        yerlesim = self._round_robin_yerlesim(
+            ogrenciler, salonlar, salon_sira_map, occupied_map, occupied_classes
+        )
+        return yerlesim, [], set()
+
+    @_asama('on_kontrol')
+    def _fizibilite_on_kontrol(self, ogrenciler, seat_data: KoltukTablosu,
+                               adjacency_pairs: Set[Tuple[int, int]], masa_sayisi: int) -> int:
+        """
+        Çözücüden önce milisaniyelik sınır kontrolü. Her seviye en fazla, salonların
+        boş koltuk grafındaki en büyük bağımsız küme toplamı kadar öğrenciyi yan/arka
+        kuralını bozmadan oturtabilir. Aşan öğrenciler ancak öğretmen masasına
+        (salon başına bir) gidebilir. Gereken en az masa sayısını döndürür;
+        masalar da yetmiyorsa gerekçeli RuntimeError fırlatır.
+        """
+        salon_koltuklari = seat_data.salon_koltuklari(ogretmen_dahil=False)
+        toplam_koltuk = sum(len(koltuklar) for koltuklar in salon_koltuklari.values())
+        if len(ogrenciler) > toplam_koltuk + masa_sayisi:
+            raise RuntimeError(
+                f"Yetersiz boş sıra: {len(ogrenciler)} öğrenci için {toplam_koltuk} boş sıra "
+                f"ve {masa_sayisi} öğretmen masası var."
+            )
+        if not CP_SAT_FORBID_SAME_GRADE_ADJACENT:
+            return max(0, len(ogrenciler) - toplam_koltuk)
+        komsular: Dict[int, List[int]] = defaultdict(list)
+        for a, b in adjacency_pairs:
+            komsular[a].append(b)
+            komsular[b].append(a)
+        seviye_kapasitesi = 0
+        for koltuklar in salon_koltuklari.values():
+            mis = self._bagimsiz_kume_boyutu(koltuklar, komsular)
+            if mis is None:
+                return 0
+            seviye_kapasitesi += mis
+        gereken = max(0, len(ogrenciler) - toplam_koltuk)
+        tasanlar = []
+        seviye_adlari = self.sozluk.seviye_adlari
+        for grade, stu_list in sorted(self._seviye_gruplari(ogrenciler).items(),
+                                      key=lambda item: seviye_adlari[item[0]]):
+            fazla = len(stu_list) - seviye_kapasitesi
+            if fazla > 0:
+                gereken += fazla
+                tasanlar.append(
+                    f"{seviye_adlari[grade]}. sınıf seviyesinden {len(stu_list)} öğrenci var; seçili salonlarda "
+                    f"yan yana/arka arkaya gelmeden en fazla {seviye_kapasitesi} öğrenci oturabilir"
+                )
+        if gereken > masa_sayisi:
+            raise RuntimeError(
+                "Yerleşim imkânsız: " + "; ".join(tasanlar or ["boş sıra sayısı yetersiz"]) +
+                f". Gereken en az {gereken} öğretmen masası, mevcut {masa_sayisi}. "
+                "Salon ekleyin veya sınavları ayırın."
+            )
+        return gereken
+
+    def _bagimsiz_kume_boyutu(self, koltuklar: List[int],
+                              komsular: Dict[int, List[int]]) -> Optional[int]:
+        """
+        Koltuk grafındaki en büyük bağımsız küme (aynı seviyeden komşusuz oturabilecek
+        en fazla öğrenci). Satır genişlikli ızgara grafı iki parçalıdır; König teoremiyle
+        n - en büyük eşleşme olarak hesaplanır. Graf iki parçalı değilse None döner.
+        """
+        kume = set(koltuklar)
+        renk: Dict[int, int] = {}
+        for baslangic in koltuklar:
+            if baslangic in renk:
+                continue
+            renk[baslangic] = 0
+            kuyruk = deque([baslangic])
+            while kuyruk:
+                idx = kuyruk.popleft()
+                for nb in komsular.get(idx, ()):
+                    if nb not in kume:
+                        continue
+                    if nb not in renk:
+                        renk[nb] = 1 - renk[idx]
+                        kuyruk.append(nb)
+                    elif renk[nb] == renk[idx]:
+                        return None
+        eslesme: Dict[int, int] = {}
+        sol_eslesme: Dict[int, int] = {}
+        eslesme_sayisi = 0
+        for sol in koltuklar:
+            if renk[sol] != 0:
+                continue
+            # BFS ile artıran yol ara
+            onceki: Dict[int, Optional[int]] = {}
+            kuyruk = deque([sol])
+            ziyaret = {sol}
+            bitis = None
+            while kuyruk and bitis is None:
+                u = kuyruk.popleft()
+                for sag in komsular.get(u, ()):
+                    if sag not in kume or sag in onceki:
+                        continue
+                    onceki[sag] = u
+                    es = eslesme.get(sag)
+                    if es is None:
+                        bitis = sag
+                        break
+                    if es not in ziyaret:
+                        ziyaret.add(es)
+                        kuyruk.append(es)
+            if bitis is None:
+                continue
+            sag = bitis
+            while sag is not None:
+                u = onceki[sag]
+                sonraki = sol_eslesme.get(u)
+                eslesme[sag] = u
+                sol_eslesme[u] = sag
+                sag = sonraki
+            eslesme_sayisi += 1
+        return len(koltuklar) - eslesme_sayisi
+
+    @_asama('sezgisel')
+    def _sezgisel_assign(self, ogrenciler, seat_data: KoltukTablosu,
+                         adjacency_pairs: Set[Tuple[int, int]],
+                         salon_sira_map: Dict[int, Dict[str, Any]],
+                         onceki_koltuklar: Optional[Dict[int, Tuple[int, int]]] = None
+                         ) -> Optional[Tuple[List[Dict], List[str], Set[int]]]:
+        """Sezgisel yerleşimi üret ve _validate_yerlesim ile doğrula; olmazsa None"""
+        if len(ogrenciler) > len(seat_data):
+            return None
+        students_by_grade = self._seviye_gruplari(ogrenciler)
+        onceki_idx = self._onceki_indeksler(ogrenciler, seat_data, onceki_koltuklar)
+        dokum = self._dokum_cozumu("sezgisel", seat_data, adjacency_pairs, onceki_idx)
+        baslangic = time.perf_counter()
+        secimler = self._sezgisel_seviye_koltuklari(
+            {grade: len(stu_list) for grade, stu_list in students_by_grade.items()},
+            seat_data,
+            adjacency_pairs,
+            tercihler=self._koltuk_tercihleri(ogrenciler, onceki_idx),
+            tercih_zorunlu=self.config.artimli_mod == "sabit"
+        )
+        if dokum is not None:
+            dokum['sure'] = round(time.perf_counter() - baslangic, 4)
+            dokum['durum'] = "BULUNAMADI" if secimler is None else "BULUNDU"
+        if secimler is None:
+            return None
+        assignment = self._seviye_secimlerini_ata(students_by_grade, secimler, onceki_idx)
+        sonuc = self._atama_sonucu_olustur(ogrenciler, seat_data, assignment, False)
+        if not self._validate_yerlesim(sonuc[0], 0, salon_sira_map, uyumsuzluklar=[], strict=False):
+            return None
+        return sonuc
+
+    def _sezgisel_seviye_koltuklari(self, grade_counts: Dict[int, int], seat_data: KoltukTablosu,
+                                    adjacency_pairs,
+                                    tercihler: Optional[Dict[int, int]] = None,
+                                    tercih_zorunlu: bool = False) -> Optional[Dict[int, List[int]]]:
+        """
+        DSATUR benzeri kotalı renklendirme: komşularında en çok farklı seviye
+        bulunan koltuk önce ele alınır ve komşularında olmayan, kalan öğrencisi
+        en fazla seviyeye verilir. Uygun seviye yoksa koltuk boş bırakılır;
+        boş koltuk hakkı biterse None döner.
+        tercihler (koltuk -> seviye) önce boyanır; çakışan tercih tercih_zorunlu
+        ise None döndürür, değilse atlanır.
+        """
+        num_seats = len(seat_data)
+        bos_hakki = num_seats - sum(grade_counts.values())
+        if bos_hakki < 0:
+            return None
+        kalan = dict(grade_counts)
+        komsular: List[List[int]] = [[] for _ in range(num_seats)]
+        if CP_SAT_FORBID_SAME_GRADE_ADJACENT:
+            for a, b in adjacency_pairs:
+                komsular[a].append(b)
+                komsular[b].append(a)
+        # Sabit öğrenci komşuluğundan gelen yasaklar baştan doygunluk sayılır
+        doygunluk: List[Set[int]] = [set() for _ in range(num_seats)]
+        for idx in seat_data.yasak_maskeleri:
+            doygunluk[idx] = seat_data.yasak_seviyeler(idx) & kalan.keys()
+        islendi = [False] * num_seats
+        secimler: Dict[int, List[int]] = {grade: [] for grade in grade_counts}
+        for idx, grade in (tercihler or {}).items():
+            if kalan.get(grade) and grade not in doygunluk[idx]:
+                islendi[idx] = True
+                kalan[grade] -= 1
+                secimler[grade].append(idx)
+                for nb in komsular[idx]:
+                    doygunluk[nb].add(grade)
+            elif tercih_zorunlu:
+                return None
+        heap = [
+            (-len(doygunluk[idx]), -len(komsular[idx]), idx)
+            for idx in range(num_seats) if not islendi[idx]
+        ]
+        heapq.heapify(heap)
+        while heap:
+            neg_doygunluk, _, idx = heapq.heappop(heap)
+            if islendi[idx] or -neg_doygunluk != len(doygunluk[idx]):
+                continue
+            islendi[idx] = True
+            aday = None
+            for grade, adet in kalan.items():
+                if adet and grade not in doygunluk[idx] and (aday is None or adet > kalan[aday]):
+                    aday = grade
+            if aday is None:
+                if bos_hakki == 0:
+                    return None
+                bos_hakki -= 1
+                continue
+            kalan[aday] -= 1
+            secimler[aday].append(idx)
+            for nb in komsular[idx]:
+                if not islendi[nb] and aday not in doygunluk[nb]:
+                    doygunluk[nb].add(aday)
+                    heapq.heappush(heap, (-len(doygunluk[nb]), -len(komsular[nb]), nb))
+        if any(kalan.values()):
+            return None
+        return secimler
+
+    def _seviye_secimlerini_ata(self, students_by_grade: Dict[int, List[int]],
+                                secimler: Dict[int, List[int]],
+                                onceki_idx: Optional[Dict[int, int]] = None) -> Dict[int, int]:
+        """
+        Seviyeye ayrılan koltukları o seviyedeki öğrencilere sırayla dağıt.
+        onceki_idx verilirse eski koltuğu seviyesine ayrılmış öğrenci önce oraya oturur.
+        """
+        assignment: Dict[int, int] = {}
+        onceki_idx = onceki_idx or {}
+        for grade, secilen in secimler.items():
+            bos_koltuklar = set(secilen)
+            bekleyenler = []
+            for s_idx in students_by_grade[grade]:
+                eski = onceki_idx.get(s_idx)
+                if eski in bos_koltuklar:
+                    assignment[s_idx] = eski
+                    bos_koltuklar.discard(eski)
+                else:
+                    bekleyenler.append(s_idx)
+            kalan_koltuklar = [seat_idx for seat_idx in secilen if seat_idx in bos_koltuklar]
+            for s_idx, seat_idx in zip(bekleyenler, kalan_koltuklar):
+                assignment[s_idx] = seat_idx
+        return assignment
+
+    def _onceki_koltuklar(self, onceki_yerlesim: Optional[List[Dict]],
+                          salon_sira_map: Dict[int, Dict[str, Any]],
+                          occupied_map: Dict[int, set]) -> Dict[int, Tuple[int, int]]:
+        """
+        Kayıtlı yerleşimden hâlâ kullanılabilir koltukları çıkar:
+        seçili salonda aktif olan, sabit öğrenciye ayrılmamış ve öğretmen masası olmayan.
+        """
+        sonuc: Dict[int, Tuple[int, int]] = {}
+        if not onceki_yerlesim:
+            return sonuc
+        alinan: Set[Tuple[int, int]] = set()
+        for satir in onceki_yerlesim:
+            salon_id = satir.get('salon_id')
+            sira_no = satir.get('sira_no')
+            salon_data = salon_sira_map.get(salon_id)
+            if not salon_data or sira_no not in salon_data['by_no']:
+                continue
+            if sira_no in occupied_map.get(salon_id, set()):
+                continue
+            konum = (salon_id, sira_no)
+            if konum in alinan or satir.get('ogrenci_id') in sonuc:
+                continue
+            alinan.add(konum)
+            sonuc[satir['ogrenci_id']] = konum
+        return sonuc
+
+    def _onceki_indeksler(self, ogrenciler, seat_data: KoltukTablosu,
+                          onceki_koltuklar: Optional[Dict[int, Tuple[int, int]]]) -> Dict[int, int]:
+        """ogrenci_id -> (salon, sıra) eşlemesini öğrenci indeksi -> koltuk indeksine çevir"""
+        if not onceki_koltuklar:
+            return {}
+        koltuk_idx = {
+            (seat_data.salon_idleri[idx], seat_data.sira_nolari[idx]): idx
+            for idx in seat_data.normal_koltuklar()
+        }
+        sonuc: Dict[int, int] = {}
+        for s_idx, ogrenci_id in enumerate(self._ogrenci_tablosu(ogrenciler).idler):
+            konum = onceki_koltuklar.get(ogrenci_id)
+            if konum in koltuk_idx:
+                sonuc[s_idx] = koltuk_idx[konum]
+        return sonuc
+
+    def _koltuk_tercihleri(self, ogrenciler, onceki_idx: Dict[int, int]) -> Dict[int, int]:
+        """Koltuk indeksi -> o koltukta daha önce oturan öğrencinin seviyesi"""
+        seviyeler = self._ogrenci_tablosu(ogrenciler).seviye_kodlari
+        return {seat_idx: seviyeler[s_idx] for s_idx, seat_idx in onceki_idx.items()}
+
+    @_asama('fark')
+    def _yerlesim_farki(self, onceki_yerlesim: List[Dict], yerlesim: List[Dict]) -> Dict[str, Any]:
+        """Önceki ve yeni yerleşim arasındaki en küçük değişiklik listesi"""
+        eski = {
+            satir['ogrenci_id']: (satir['salon_id'], satir['sira_no'])
+            for satir in onceki_yerlesim
+        }
+        yeni = {yer['ogrenci_id']: (yer['salon_id'], yer['sira_no']) for yer in yerlesim}
+        tasinan = []
+        for ogrenci_id, konum in yeni.items():
+            eski_konum = eski.get(ogrenci_id)
+            if eski_konum is not None and eski_konum != konum:
+                tasinan.append({
+                    'ogrenci_id': ogrenci_id,
+                    'eski_salon_id': eski_konum[0],
+                    'eski_sira_no': eski_konum[1],
+                    'salon_id': konum[0],
+                    'sira_no': konum[1]
+                })
+        return {
+            'eklenen': [ogrenci_id for ogrenci_id in yeni if ogrenci_id not in eski],
+            'cikarilan': [ogrenci_id for ogrenci_id in eski if ogrenci_id not in yeni],
+            'tasinan': tasinan,
+            'yerinde_kalan': sum(1 for ogrenci_id, konum in yeni.items() if eski.get(ogrenci_id) == konum)
+        }
+
+    @_asama('sonuc_olusturma')
+    def _atama_sonucu_olustur(self, ogrenciler, seat_data: KoltukTablosu,
+                              assignment: Dict[int, int],
+                              teacher_mode: bool) -> Tuple[List[Dict], List[str], Set[int]]:
+        """
+        Öğrenci -> koltuk indeks atamasını yerleşim satırlarına dönüştür.
+        Sonuç sözlükleri yalnızca burada, genel API sınırında kurulur.
+        """
+        kaynak = self._ogrenci_tablosu(ogrenciler).ogrenciler
+        salon_idleri, sira_nolari = seat_data.salon_idleri, seat_data.sira_nolari
+        ogretmen, salon_adlari = seat_data.ogretmen, seat_data.salon_adlari
         yerlesim: List[Dict] = []
         teacher_ids: Set[int] = set()
         usage_counter = defaultdict(int)
         for s_idx, seat_idx in assignment.items():
-            student = ogrenciler[s_idx]
-            seat = seat_data[seat_idx]
+            student = kaynak[s_idx]
+            salon_id = salon_idleri[seat_idx]
             entry = {
                 'ogrenci_id': student['id'],
-                'salon_id': seat['salon_id'],
-                'sira_no': seat['sira_no'],
+                'salon_id': salon_id,
+                'sira_no': sira_nolari[seat_idx],
                 'ogrenci_sinif': student['sinif'],
                 'ogrenci_sube': student['sube'],
-                'salon_adi': seat['salon_adi'],
+                'salon_adi': salon_adlari[salon_id],
                 'sabit_mi': False,
                 'sinav_id': student.get('sinav_id'),
                 'sinav_adi': student.get('sinav_adi')
             }
-            if seat.get('teacher'):
+            if ogretmen[seat_idx]:
                 entry['ogretmen_masasi'] = True
                 entry['sira_label'] = "Öğretmen Masası"
                 teacher_ids.add(student['id'])
-                usage_counter[seat['salon_id']] += 1
+                usage_counter[salon_id] += 1
             yerlesim.append(entry)
         teacher_logs: List[str] = []
         if teacher_mode and usage_counter:
             for salon_id, count in usage_counter.items():
-                salon_adi = next(
-                    (s['salon_adi'] for s in seat_data if s['salon_id'] == salon_id),
-                    str(salon_id)
-                )
+                salon_adi = salon_adlari.get(salon_id, str(salon_id))
                 teacher_logs.append(
                     f"{salon_adi} salonunda {count} öğrenci Öğretmen Masasına alındı."
                 )
         return yerlesim, teacher_logs, teacher_ids
 
+    @_asama('cp_sat_salon')
+    def _cp_sat_assign_salon_bazli(self, ogrenciler, salonlar: List[Dict],
+                                   salon_sira_map: Dict[int, Dict[str, Any]],
+                                   occupied_map: Dict[int, set],
+                                   occupied_classes: Optional[Dict[int, Dict[int, int]]] = None
+                                   ) -> Optional[Tuple[List[Dict], List[str], Set[int]]]:
+        """
+        İki aşamalı çözüm: seviye -> salon kotaları küçük bir taşıma problemi olarak
+        belirlenir, ardından her salonun koltuk modeli ayrı süreçte çözülür.
+        Herhangi bir aşama başarısız olursa None döner (tek model yedeği devreye girer).
+        """
+        seat_data, adjacency_pairs = self._prepare_seat_data(
+            salonlar,
+            salon_sira_map,
+            occupied_map,
+            include_teacher_desks=True,
+            occupied_classes=occupied_classes
+        )
+        salon_koltuklari = seat_data.salon_koltuklari()
+        students_by_grade = self._seviye_gruplari(ogrenciler)
+        kotalar = self._salon_kotalari(
+            {grade: len(stu_list) for grade, stu_list in students_by_grade.items()},
+            seat_data,
+            salon_koltuklari,
+            adjacency_pairs
+        )
+        if kotalar is None:
+            return None
+
+        salon_sirasi = [sid for sid in salon_koltuklari if kotalar.get(sid)]
+        paketler = []
+        for salon_id in salon_sirasi:
+            koltuklar = salon_koltuklari[salon_id]
+            yerel = {seat_idx: local for local, seat_idx in enumerate(koltuklar)}
+            paketler.append({
+                'config': self.config,
+                'koltuklar': seat_data.alt_tablo(koltuklar),
+                'komsuluklar': [
+                    (yerel[a], yerel[b]) for a, b in adjacency_pairs
+                    if a in yerel and b in yerel
+                ],
+                'seviye_sayilari': kotalar[salon_id]
+            })
+        cozumler = self._alt_problemleri_coz(paketler)
+        self._iptal_kontrol()
+        if any(cozum is None for cozum in cozumler):
+            return None
+
+        kalanlar = {grade: deque(stu_list) for grade, stu_list in students_by_grade.items()}
+        assignment: Dict[int, int] = {}
+        for salon_id, cozum in zip(salon_sirasi, cozumler):
+            koltuklar = salon_koltuklari[salon_id]
+            for grade, yerel_koltuklar in cozum.items():
+                for local in yerel_koltuklar:
+                    assignment[kalanlar[grade].popleft()] = koltuklar[local]
+        if len(assignment) != len(ogrenciler):
+            return None
+        return self._atama_sonucu_olustur(ogrenciler, seat_data, assignment, True)
+
+    def _salon_kotalari(self, grade_counts: Dict[int, int], seat_data: KoltukTablosu,
+                        salon_koltuklari: Dict[int, List[int]],
+                        adjacency_pairs: Set[Tuple[int, int]]) -> Optional[Dict[int, Dict[int, int]]]:
+        """
+        Her seviyeyi salonlara boş koltuk oranında paylaştır (taşıma problemi).
+        Bir salona tek seviyeden verilebilecek en fazla öğrenci, koltuk grafının
+        iki renklendirmesindeki büyük renk sınıfıyla sınırlanır; böylece her
+        seviye kendi payına komşusuz oturabilir. Dağıtılamazsa None döner.
+        """
+        komsular: Dict[int, List[int]] = defaultdict(list)
+        for a, b in adjacency_pairs:
+            komsular[a].append(b)
+            komsular[b].append(a)
+        bos: Dict[int, int] = {}
+        ust_sinir: Dict[int, int] = {}
+        normal_koltuklar: Dict[int, List[int]] = {}
+        for salon_id, koltuklar in salon_koltuklari.items():
+            normal = normal_koltuklar[salon_id] = [idx for idx in koltuklar if not seat_data.ogretmen[idx]]
+            bos[salon_id] = len(normal)
+            ust_sinir[salon_id] = self._iki_renk_siniri(normal, komsular)
+        maskeli = {
+            salon_id for salon_id, normal in normal_koltuklar.items()
+            if any(idx in seat_data.yasak_maskeleri for idx in normal)
+        }
+        seviye_sinirlari: Dict[Tuple[int, int], int] = {}
+
+        def sinir(salon_id: int, grade: int) -> int:
+            # Sabit komşulu salonlarda sınır, seviyeye yasak olmayan koltuklarla hesaplanır
+            if salon_id not in maskeli:
+                return ust_sinir[salon_id]
+            if (salon_id, grade) not in seviye_sinirlari:
+                seviye_sinirlari[(salon_id, grade)] = self._iki_renk_siniri(
+                    [idx for idx in normal_koltuklar[salon_id] if not seat_data.yasakli_mi(idx, grade)],
+                    komsular
+                )
+            return seviye_sinirlari[(salon_id, grade)]
+
+        toplam_bos = sum(bos.values())
+        if toplam_bos < sum(grade_counts.values()):
+            return None
+
+        kotalar: Dict[int, Dict[int, int]] = {salon_id: {} for salon_id in salon_koltuklari}
+        yuk = {salon_id: 0 for salon_id in salon_koltuklari}
+        for grade, adet in sorted(grade_counts.items(), key=lambda item: item[1], reverse=True):
+            kalan = adet
+            artiklar = []
+            for salon_id in salon_koltuklari:
+                pay = adet * bos[salon_id] / toplam_bos if toplam_bos else 0
+                taban = min(int(pay), sinir(salon_id, grade), bos[salon_id] - yuk[salon_id])
+                kotalar[salon_id][grade] = taban
+                yuk[salon_id] += taban
+                kalan -= taban
+                artiklar.append((pay - taban, salon_id))
+            artiklar.sort(key=lambda item: item[0], reverse=True)
+            while kalan > 0:
+                ilerleme = False
+                for _, salon_id in artiklar:
+                    if kalan == 0:
+                        break
+                    if (kotalar[salon_id][grade] < sinir(salon_id, grade)
+                            and yuk[salon_id] < bos[salon_id]):
+                        kotalar[salon_id][grade] += 1
+                        yuk[salon_id] += 1
+                        kalan -= 1
+                        ilerleme = True
+                if not ilerleme:
+                    return None
+        return {
+            salon_id: {grade: adet for grade, adet in kota.items() if adet}
+            for salon_id, kota in kotalar.items()
+        }
+
+    def _iki_renk_siniri(self, koltuklar: List[int], komsular: Dict[int, List[int]]) -> int:
+        """
+        Izgara koltuk grafı iki renklidir; her bileşenin büyük renk sınıfı
+        bağımsız bir kümedir. Toplamı, tek seviyenin komşusuz oturabileceği
+        koltuk sayısı için güvenli bir alt sınırdır.
+        """
+        kume = set(koltuklar)
+        renk: Dict[int, int] = {}
+        toplam = 0
+        for baslangic in koltuklar:
+            if baslangic in renk:
+                continue
+            renk[baslangic] = 0
+            sayac = [0, 0]
+            kuyruk = deque([baslangic])
+            while kuyruk:
+                idx = kuyruk.popleft()
+                sayac[renk[idx]] += 1
+                for nb in komsular.get(idx, ()):
+                    if nb in kume and nb not in renk:
+                        renk[nb] = 1 - renk[idx]
+                        kuyruk.append(nb)
+            toplam += max(sayac)
+        return toplam
+
+    def _alt_problemleri_coz(self, paketler: List[Dict[str, Any]]) -> List[Optional[Dict[int, List[int]]]]:
+        """
+        Salon alt problemlerini paylaşılan spawn süreç havuzunda paralel çöz. Havuz
+        isci_sayisi kadar süreçlidir (toplu/portföy çözümde çekirdek paylaşımı korunur).
+        İptal bekleyen işleri düşürür ve çalışan alt aramaları havuz olayıyla durdurur.
+        """
+        if min(len(paketler), self._isci_sayisi()) <= 1:
+            return self._alt_problemleri_sirayla_coz(paketler)
+        try:
+            havuz = _salon_havuzu_getir(self._isci_sayisi())
+            gelecekler = [havuz.executor.submit(_salon_alt_problemini_coz, paket) for paket in paketler]
+        except (OSError, RuntimeError, BrokenProcessPool) as exc:
+            _salon_havuzunu_birak()
+            self.hata_loglari.append(
+                f"⚠️ Paralel çözüm başlatılamadı ({exc}); salonlar sırayla çözülüyor."
+            )
+            return self._alt_problemleri_sirayla_coz(paketler)
+
+        def _durdur():
+            for gelecek in gelecekler:
+                gelecek.cancel()
+            _salon_havuzunu_birak(havuz)
+
+        if self.iptal_belirteci is not None:
+            self.iptal_belirteci.kaydet(_durdur)
+        try:
+            wait(gelecekler)
+            self._iptal_kontrol()
+            # Havuzu paylaşan başka bir çağrının iptali bu işleri düşürmüş olabilir;
+            # çözümsüz salon tek model çözüme düşülmesine yol açar
+            return [None if gelecek.cancelled() else gelecek.result() for gelecek in gelecekler]
+        except BrokenProcessPool as exc:
+            _salon_havuzunu_birak(havuz)
+            self.hata_loglari.append(
+                f"⚠️ Paralel çözüm yarıda kaldı ({exc}); salonlar sırayla çözülüyor."
+            )
+            return self._alt_problemleri_sirayla_coz(paketler)
+        finally:
+            if self.iptal_belirteci is not None:
+                self.iptal_belirteci.kaldir(_durdur)
+
+    def _alt_problemleri_sirayla_coz(self, paketler: List[Dict[str, Any]]) -> List[Optional[Dict[int, List[int]]]]:
+        sonuclar = []
+        for paket in paketler:
+            self._iptal_kontrol()
+            sonuclar.append(_salon_alt_problemini_coz(paket, self.iptal_belirteci))
+        self._iptal_kontrol()
+        return sonuclar
+
+    @_asama('koltuk_verisi')
     def _prepare_seat_data(self, salonlar: List[Dict],
                            salon_sira_map: Dict[int, Dict[str, Any]],
                            occupied_map: Dict[int, set],
-                           include_teacher_desks: bool = False) -> Tuple[List[Dict], Set[Tuple[int, int]]]:
-        seat_data: List[Dict[str, Any]] = []
-        seat_index_map: Dict[Tuple[int, int], int] = {}
+                           include_teacher_desks: bool = False,
+                           occupied_classes: Optional[Dict[int, Dict[int, int]]] = None
+                           ) -> Tuple[KoltukTablosu, Set[Tuple[int, int]]]:
+        """
+        Boş koltuk tablosu ve yan/arka komşu koltuk indeksi çiftleri.
+        occupied_classes (salon -> sıra no -> sınıf kodu) verilirse sabit öğrencilerin
+        komşusu olan boş koltuklara o seviyeler yasaklanır; modeller bu koltuklarda
+        yasak seviyenin değişkenini hiç kurmaz.
+        """
+        seat_data = KoltukTablosu()
+        seviyeler = self.sozluk.sinif_seviyeleri
+        adjacency_pairs: Set[Tuple[int, int]] = set()
+        onbellek = self._duzen_onbellegi()
         for salon in salonlar:
             salon_id = salon['id']
             bos_siralar = self._bos_siralar_for_salon(
@@ -275,88 +1290,406 @@ class HarmanlamaEngine:
             if not tum_sira_seti:
                 tum_sira_seti = {slot.sira_no for slot in bos_siralar}
             satir_gen = sira_data.get('satir_genisligi', self.config.satir_genisligi)
+            duzen = onbellek.getir(salon_id, tum_sira_seti, satir_gen)
+            # Düzen indeksi -> seat_data indeksi (yalnızca boş koltuklar)
+            global_idx: Dict[int, int] = {}
             for slot in bos_siralar:
-                idx = len(seat_data)
-                seat_data.append({
-                    'salon_id': salon_id,
-                    'salon_adi': salon['salon_adi'],
-                    'sira_no': slot.sira_no,
-                    'teacher': False,
-                    'neighbor_numbers': self._seat_neighbors(slot.sira_no, satir_gen, tum_sira_seti)
-                })
-                seat_index_map[(salon_id, slot.sira_no)] = idx
+                yerel = duzen.indeks[slot.sira_no]
+                global_idx[yerel] = seat_data.ekle(salon_id, salon['salon_adi'], slot.sira_no)
+            dolu = (occupied_classes or {}).get(salon_id) if CP_SAT_FORBID_SAME_GRADE_ADJACENT else None
+            for yerel, idx in global_idx.items():
+                for komsu in duzen.komsular(yerel):
+                    nb_idx = global_idx.get(komsu)
+                    if nb_idx is not None:
+                        if idx < nb_idx:
+                            adjacency_pairs.add((idx, nb_idx))
+                    elif dolu:
+                        kod = dolu.get(duzen.sira_nolar[komsu])
+                        if kod is not None:
+                            seat_data.yasakla(idx, seviyeler[kod])
             if include_teacher_desks:
-                idx = len(seat_data)
-                seat_data.append({
-                    'salon_id': salon_id,
-                    'salon_adi': salon['salon_adi'],
-                    'sira_no': self._teacher_desk_no(salon_id, 0),
-                    'teacher': True,
-                    'neighbor_numbers': set()
-                })
-                seat_index_map[(salon_id, seat_data[idx]['sira_no'])] = idx
-        adjacency_pairs: Set[Tuple[int, int]] = set()
-        for idx, seat in enumerate(seat_data):
-            if seat['teacher']:
-                continue
-            for neighbor_no in seat['neighbor_numbers']:
-                nb_idx = seat_index_map.get((seat['salon_id'], neighbor_no))
-                if nb_idx is None or nb_idx == idx:
-                    continue
-                pair = tuple(sorted((idx, nb_idx)))
-                adjacency_pairs.add(pair)
+                seat_data.ekle(salon_id, salon['salon_adi'],
+                               self._teacher_desk_no(salon_id, 0), ogretmen=True)
         return seat_data, adjacency_pairs
 
-    def _solve_cp_sat(self, ogrenciler: List[Dict], seat_data: List[Dict],
-                      adjacency_pairs: Set[Tuple[int, int]]) -> Optional[Dict[int, int]]:
+    def _duzen_onbellegi(self):
+        if self.config.duzen_onbellegi_kalici:
+            return get_duzen_onbellegi(varsayilan_dosya_yolu())
+        return get_duzen_onbellegi()
+
+    @_asama('cp_sat_kurulum')
+    def _solve_cp_sat(self, ogrenciler, seat_data: KoltukTablosu,
+                      adjacency_pairs: Set[Tuple[int, int]],
+                      onceki_koltuklar: Optional[Dict[int, Tuple[int, int]]] = None) -> Optional[Dict[int, int]]:
+        """Seçili CP-SAT modeliyle öğrenci -> koltuk ataması üret"""
+        onceki_idx = self._onceki_indeksler(ogrenciler, seat_data, onceki_koltuklar)
+        self._acik_dokum_cozumu = self._dokum_cozumu(
+            self.cozum_yolu or "cp-sat", seat_data, adjacency_pairs, onceki_idx
+        )
+        try:
+            if self.config.cp_sat_modeli == "ogrenci":
+                return self._solve_cp_sat_ogrenci(ogrenciler, seat_data, adjacency_pairs, onceki_idx)
+            return self._solve_cp_sat_seviye(ogrenciler, seat_data, adjacency_pairs, onceki_idx)
+        finally:
+            self._acik_dokum_cozumu = None
+
+    def _dokum_baslat(self, ogrenciler: OgrenciTablosu, seat_data: KoltukTablosu,
+                      adjacency_pairs: Set[Tuple[int, int]], masa_sayisi: int):
+        """
+        Model dökümünü başlat. Öğrenciler yalnızca sınıf kodlarıyla yazılır (ad/id
+        yok); sözlük tabloları kodların aynı sırayla yeniden üretilmesini sağlar.
+        """
+        self._dokum_tablosu = seat_data
+        self._model_dokumu = {
+            'surum': MODEL_DOKUMU_SURUMU,
+            'tarih': datetime.now().isoformat(timespec='seconds'),
+            'config': asdict(self.config),
+            'seviye_adlari': list(self.sozluk.seviye_adlari),
+            'siniflar': [list(sinif) for sinif in self.sozluk.siniflar],
+            'ogrenci_siniflari': list(ogrenciler.sinif_kodlari),
+            'masa_sayisi': masa_sayisi,
+            'koltuklar': seat_data.kayit(),
+            'komsuluk': sorted(adjacency_pairs),
+            'cozumler': []
+        }
+
+    def _dokum_cozumu(self, asama: str, seat_data: KoltukTablosu, adjacency_pairs: Set[Tuple[int, int]],
+                      onceki_idx: Dict[int, int]) -> Optional[Dict[str, Any]]:
+        """Dökümde bir çözüm denemesi kaydı aç; koltuk tablosu başlangıçtakiyle aynıysa tekrar yazılmaz"""
+        if self._model_dokumu is None:
+            return None
+        ayni = seat_data is self._dokum_tablosu
+        kayit = {
+            'asama': asama,
+            'model': self.config.cp_sat_modeli,
+            'koltuklar': None if ayni else seat_data.kayit(),
+            'komsuluk': None if ayni else sorted(adjacency_pairs),
+            'onceki': sorted(onceki_idx.items())
+        }
+        self._model_dokumu['cozumler'].append(kayit)
+        return kayit
+
+    def _model_dokumunu_yaz(self):
+        """Açık model dökümünü config.model_dokumu dizinine .json.gz olarak yaz"""
+        dokum, self._model_dokumu, self._dokum_tablosu = self._model_dokumu, None, None
+        if dokum is None:
+            return
+        import gzip
+        import json
+        dokum['cozum_yolu'] = self.cozum_yolu
+        dokum['hatalar'] = list(self.hata_loglari)
+        yol = os.path.join(
+            self.config.model_dokumu,
+            f"harmanlama_{time.strftime('%Y%m%d_%H%M%S')}_{os.getpid()}_{next(_DOKUM_SAYACI)}.json.gz"
+        )
+        try:
+            os.makedirs(self.config.model_dokumu, exist_ok=True)
+            with gzip.open(yol, 'wt', encoding='utf-8') as dosya:
+                json.dump(dokum, dosya, ensure_ascii=False, separators=(',', ':'), default=str)
+        except OSError as exc:
+            self.hata_loglari.append(f"⚠️ Model dökümü yazılamadı: {exc}")
+            return
+        self.model_dokumu_yolu = yol
+
+    def _cp_model_yukle(self):
         try:
             from ortools.sat.python import cp_model
         except ImportError as exc:
             raise RuntimeError(
                 "CP-SAT için OR-Tools gerekiyor. Lütfen 'pip install ortools' çalıştırın."
             ) from exc
+        return cp_model
+
+    def _profilli_config(self, ogrenci_sayisi: int) -> HarmanlamaConfig:
+        """Kurulumdaki ayar profilinden bu boyuta düşen bandı motorun ayarlarına uygula"""
+        self.ayar_profili_bandi = None
+        if not self._temel_config.ayar_profili:
+            return self._temel_config
+        from controllers.harmanlama_ayar import profil_uygula
+        config, self.ayar_profili_bandi = profil_uygula(self._temel_config, ogrenci_sayisi)
+        return config
+
+    def _cp_sat_solver(self, cp_model, isci_sayisi: Optional[int] = None):
+        solver = cp_model.CpSolver()
+        solver.parameters.max_time_in_seconds = self.config.cozum_suresi
+        solver.parameters.num_workers = isci_sayisi or self._isci_sayisi()
+        if self.config.cp_sat_tohumu is not None:
+            solver.parameters.random_seed = self.config.cp_sat_tohumu
+        for ad, deger in (self.config.cp_sat_parametreleri or {}).items():
+            setattr(solver.parameters, ad, deger)
+        return solver
+
+    def _isci_sayisi(self) -> int:
+        return self.config.isci_sayisi or os.cpu_count() or 1
+
+    @contextmanager
+    def _olc(self, asama: str):
+        """
+        Aşamanın duvar ve CPU süresini biriktir. Süreler dışlayıcıdır: iç içe
+        bir aşama çalışırken dıştaki aşamanın saati durur, toplamlar örtüşmez.
+        """
+        yigin = self._olcum_yigini
+        simdi = (time.perf_counter(), time.process_time())
+        if yigin:
+            self._sure_ekle(yigin[-1][0], yigin[-1][1], simdi)
+        yigin.append([asama, simdi])
+        try:
+            yield
+        finally:
+            bitis = (time.perf_counter(), time.process_time())
+            _, baslangic = yigin.pop()
+            self._sure_ekle(asama, baslangic, bitis)
+            if yigin:
+                yigin[-1][1] = bitis
+
+    def _sure_ekle(self, asama: str, baslangic: Tuple[float, float], bitis: Tuple[float, float]):
+        kayit = self._asama_sureleri.setdefault(asama, {'duvar': 0.0, 'cpu': 0.0})
+        kayit['duvar'] += bitis[0] - baslangic[0]
+        kayit['cpu'] += bitis[1] - baslangic[1]
+
+    def _performans_raporu(self) -> Dict[str, Any]:
+        """harmanla() sonucundaki 'performans' bloğu (süreler saniye cinsinden)"""
+        baslangic = self._harmanla_baslangici
+        toplam = None
+        if baslangic is not None:
+            toplam = {
+                'duvar': round(time.perf_counter() - baslangic[0], 4),
+                'cpu': round(time.process_time() - baslangic[1], 4)
+            }
+        rapor = {
+            'toplam': toplam,
+            'asamalar': {
+                asama: {'duvar': round(kayit['duvar'], 4), 'cpu': round(kayit['cpu'], 4)}
+                for asama, kayit in self._asama_sureleri.items()
+            },
+            'cp_sat': list(self._cozucu_istatistikleri)
+        }
+        if self.model_dokumu_yolu is not None:
+            rapor['model_dokumu'] = self.model_dokumu_yolu
+        if self.ayar_profili_bandi is not None:
+            rapor['ayar_profili'] = self.ayar_profili_bandi
+        return rapor
+
+    def _iptal_kontrol(self):
+        if self.iptal_belirteci is not None and self.iptal_belirteci.iptal_edildi:
+            raise RuntimeError("⏹️ Harmanlama kullanıcı tarafından iptal edildi.")
+
+    @_asama('cp_sat_cozum')
+    def _cp_sat_calistir(self, cp_model, model, isci_sayisi: Optional[int] = None):
+        """
+        Modeli bütçe/işçi ayarlarıyla çöz. Her ara çözüm ilerleme bildirimine gider;
+        ilk_cozumde_dur açıksa ilk çözümde, iptal belirteci tetiklenirse hemen durur.
+        """
+        solver = self._cp_sat_solver(cp_model, isci_sayisi)
+        engine = self
+        amac_var = model.HasObjective()
+
+        class _CozumIzleyici(cp_model.CpSolverSolutionCallback):
+            def __init__(self):
+                super().__init__()
+                self.cozum_sayisi = 0
+
+            def on_solution_callback(self):
+                self.cozum_sayisi += 1
+                if engine.ilerleme_bildirimi is not None:
+                    engine.ilerleme_bildirimi({
+                        'gecen_sure': self.WallTime(),
+                        'amac': self.ObjectiveValue() if amac_var else None,
+                        'cozum_sayisi': self.cozum_sayisi
+                    })
+                if engine.config.ilk_cozumde_dur:
+                    self.StopSearch()
+
+        izleyici = _CozumIzleyici()
+        dokum = self._acik_dokum_cozumu
+        if dokum is not None and self.config.model_dokumu_proto:
+            dokum['model_proto'] = _model_proto_metni(model)
+        if self.iptal_belirteci is not None:
+            self.iptal_belirteci.kaydet(solver.StopSearch)
+        try:
+            status = solver.Solve(model, izleyici)
+        finally:
+            if self.iptal_belirteci is not None:
+                self.iptal_belirteci.kaldir(solver.StopSearch)
+        proto = model.Proto()
+        if dokum is not None:
+            dokum['durum'] = solver.StatusName(status)
+            dokum['sure'] = round(solver.WallTime(), 4)
+        self._cozucu_istatistikleri.append({
+            'model': self.config.cp_sat_modeli,
+            'ogretmen_masasi': self.cozum_yolu == "cp-sat-ogretmen-masasi",
+            'durum': solver.StatusName(status),
+            'degisken': len(proto.variables),
+            'kisit': len(proto.constraints),
+            'catisma': solver.NumConflicts(),
+            'dal': solver.NumBranches(),
+            'sure': round(solver.WallTime(), 4),
+            'cozum_sayisi': izleyici.cozum_sayisi
+        })
+        self._iptal_kontrol()
+        return solver, status
+
+    def _seviye_anahtari(self, ogrenci: Dict) -> int:
+        """Öğrencinin seviye ailesi kodu (bkz. SinifSozlugu)"""
+        return self.sozluk.seviye_kodu(ogrenci['sinif'])
+
+    def _ogrenci_tablosu(self, ogrenciler) -> OgrenciTablosu:
+        """Öğrenci listesini (zaten tablo değilse) bu çalıştırmanın sözlüğüyle tabloya çevir"""
+        if isinstance(ogrenciler, OgrenciTablosu):
+            return ogrenciler
+        return OgrenciTablosu(ogrenciler, self.sozluk)
+
+    def _seviye_gruplari(self, ogrenciler) -> Dict[int, List[int]]:
+        """Öğrenci indekslerini sınıf seviyesi ailesi koduna göre grupla"""
+        return self._ogrenci_tablosu(ogrenciler).seviye_gruplari()
+
+    def _solve_cp_sat_seviye(self, ogrenciler, seat_data: KoltukTablosu,
+                             adjacency_pairs: Set[Tuple[int, int]],
+                             onceki_idx: Optional[Dict[int, int]] = None) -> Optional[Dict[int, int]]:
+        """
+        Aynı seviyedeki öğrenciler birbirinin yerine geçebildiği için model yalnızca
+        her koltuğa hangi seviyenin oturacağına karar verir (koltuk×seviye değişken).
+        Somut öğrenciler çözüm sonrası seçilen koltuklara sırayla dağıtılır.
+        """
+        if len(ogrenciler) > len(seat_data):
+            return None
+        students_by_grade = self._seviye_gruplari(ogrenciler)
+        secimler = self._seviye_koltuklari_coz(
+            {grade: len(stu_list) for grade, stu_list in students_by_grade.items()},
+            seat_data,
+            adjacency_pairs,
+            tercihler=self._koltuk_tercihleri(ogrenciler, onceki_idx or {}),
+            tercih_zorunlu=self.config.artimli_mod == "sabit"
+        )
+        if secimler is None:
+            return None
+        return self._seviye_secimlerini_ata(students_by_grade, secimler, onceki_idx)
+
+    def _seviye_koltuklari_coz(self, grade_counts: Dict[int, int], seat_data: KoltukTablosu,
+                               adjacency_pairs, isci_sayisi: Optional[int] = None,
+                               tercihler: Optional[Dict[int, int]] = None,
+                               tercih_zorunlu: bool = False) -> Optional[Dict[int, List[int]]]:
+        """
+        Seviye -> seçilen koltuk indeksleri (koltuk×seviye CP-SAT modeli).
+        tercihler (koltuk -> seviye) ipucu olarak verilir ve korunan tercih sayısı
+        en büyüklenir; tercih_zorunlu ise bu koltuklar kısıt olarak kilitlenir.
+        """
+        cp_model = self._cp_model_yukle()
+        num_seats = len(seat_data)
+        if sum(grade_counts.values()) > num_seats:
+            return None
+        grades = list(grade_counts.keys())
+        model = cp_model.CpModel()
+        # Yasak maskesindeki (koltuk, seviye) çiftleri için değişken kurulmaz
+        y = {}
+        seviye_degiskenleri: Dict[int, List[Any]] = {grade: [] for grade in grades}
+        for seat_idx in range(num_seats):
+            koltuk_degiskenleri = []
+            for grade in grades:
+                if seat_data.yasakli_mi(seat_idx, grade):
+                    continue
+                degisken = y[(seat_idx, grade)] = model.NewBoolVar(f"y_{seat_idx}_{grade}")
+                koltuk_degiskenleri.append(degisken)
+                seviye_degiskenleri[grade].append(degisken)
+            if len(koltuk_degiskenleri) > 1:
+                model.AddAtMostOne(koltuk_degiskenleri)
+        for grade in grades:
+            if len(seviye_degiskenleri[grade]) < grade_counts[grade]:
+                return None
+            model.Add(sum(seviye_degiskenleri[grade]) == grade_counts[grade])
+        if CP_SAT_FORBID_SAME_GRADE_ADJACENT:
+            for seat_a, seat_b in adjacency_pairs:
+                for grade in grades:
+                    if (seat_a, grade) in y and (seat_b, grade) in y:
+                        model.AddBoolOr([y[(seat_a, grade)].Not(), y[(seat_b, grade)].Not()])
+        korunan = []
+        for seat_idx, grade in (tercihler or {}).items():
+            if (seat_idx, grade) not in y:
+                continue
+            if tercih_zorunlu:
+                model.Add(y[(seat_idx, grade)] == 1)
+            else:
+                model.AddHint(y[(seat_idx, grade)], 1)
+                korunan.append(y[(seat_idx, grade)])
+        teacher_seats = seat_data.ogretmen_koltuklari()
+        teacher_usage = sum(
+            y[(seat_idx, grade)] for seat_idx in teacher_seats for grade in grades
+            if (seat_idx, grade) in y
+        )
+        if korunan:
+            # Öğretmen masası kullanımı her zaman eski koltuğu korumaktan önce gelir
+            model.Minimize((len(korunan) + 1) * teacher_usage - sum(korunan))
+        elif teacher_seats:
+            model.Minimize(teacher_usage)
+        solver, status = self._cp_sat_calistir(cp_model, model, isci_sayisi)
+        if status not in (cp_model.OPTIMAL, cp_model.FEASIBLE):
+            return None
+        return {
+            grade: [
+                seat_idx for seat_idx in range(num_seats)
+                if (seat_idx, grade) in y and solver.Value(y[(seat_idx, grade)])
+            ]
+            for grade in grades
+        }
+
+    def _solve_cp_sat_ogrenci(self, ogrenciler, seat_data: KoltukTablosu,
+                              adjacency_pairs: Set[Tuple[int, int]],
+                              onceki_idx: Optional[Dict[int, int]] = None) -> Optional[Dict[int, int]]:
+        """(Eski model) her öğrenci×koltuk çifti için ayrı değişken"""
+        cp_model = self._cp_model_yukle()
         num_students = len(ogrenciler)
         num_seats = len(seat_data)
         if num_students > num_seats:
             return None
         model = cp_model.CpModel()
+        seviyeler = self._ogrenci_tablosu(ogrenciler).seviye_kodlari
+        # Öğrencinin seviyesi koltukta yasaksa (sabit komşu) değişken kurulmaz
         x = {}
         for s_idx in range(num_students):
             for seat_idx in range(num_seats):
-                x[(s_idx, seat_idx)] = model.NewBoolVar(f"x_{s_idx}_{seat_idx}")
+                if not seat_data.yasakli_mi(seat_idx, seviyeler[s_idx]):
+                    x[(s_idx, seat_idx)] = model.NewBoolVar(f"x_{s_idx}_{seat_idx}")
         for s_idx in range(num_students):
-            model.Add(sum(x[(s_idx, seat_idx)] for seat_idx in range(num_seats)) == 1)
+            model.Add(sum(x[(s_idx, seat_idx)] for seat_idx in range(num_seats)
+                          if (s_idx, seat_idx) in x) == 1)
         for seat_idx in range(num_seats):
-            model.Add(sum(x[(s_idx, seat_idx)] for s_idx in range(num_students)) <= 1)
+            model.Add(sum(x[(s_idx, seat_idx)] for s_idx in range(num_students)
+                          if (s_idx, seat_idx) in x) <= 1)
         if CP_SAT_FORBID_SAME_GRADE_ADJACENT:
-            students_by_grade: Dict[int, List[int]] = defaultdict(list)
-            for idx, ogr in enumerate(ogrenciler):
-                students_by_grade[int(ogr['sinif'])].append(idx)
+            students_by_grade = self._seviye_gruplari(ogrenciler)
             for seat_a, seat_b in adjacency_pairs:
                 for grade, stu_list in students_by_grade.items():
-                    if not stu_list:
+                    if not stu_list or seat_data.yasakli_mi(seat_a, grade) or seat_data.yasakli_mi(seat_b, grade):
                         continue
                     model.Add(
                         sum(x[(s_idx, seat_a)] for s_idx in stu_list) +
                         sum(x[(s_idx, seat_b)] for s_idx in stu_list)
                     <= 1)
-        teacher_seats = [idx for idx, seat in enumerate(seat_data) if seat['teacher']]
-        if teacher_seats:
-            teacher_usage = [
-                sum(x[(s_idx, seat_idx)] for s_idx in range(num_students))
-                for seat_idx in teacher_seats
-            ]
-            model.Minimize(sum(teacher_usage))
-        solver = cp_model.CpSolver()
-        solver.parameters.max_time_in_seconds = 15
-        solver.parameters.num_search_workers = 8
-        status = solver.Solve(model)
+        korunan = []
+        for s_idx, seat_idx in (onceki_idx or {}).items():
+            if (s_idx, seat_idx) not in x:
+                continue
+            if self.config.artimli_mod == "sabit":
+                model.Add(x[(s_idx, seat_idx)] == 1)
+            else:
+                model.AddHint(x[(s_idx, seat_idx)], 1)
+                korunan.append(x[(s_idx, seat_idx)])
+        teacher_seats = seat_data.ogretmen_koltuklari()
+        teacher_usage = sum(
+            x[(s_idx, seat_idx)] for s_idx in range(num_students) for seat_idx in teacher_seats
+            if (s_idx, seat_idx) in x
+        )
+        if korunan:
+            model.Minimize((len(korunan) + 1) * teacher_usage - sum(korunan))
+        elif teacher_seats:
+            model.Minimize(teacher_usage)
+        solver, status = self._cp_sat_calistir(cp_model, model)
         if status not in (cp_model.OPTIMAL, cp_model.FEASIBLE):
             return None
         assignment: Dict[int, int] = {}
         for s_idx in range(num_students):
             for seat_idx in range(num_seats):
-                if solver.Value(x[(s_idx, seat_idx)]):
+                if (s_idx, seat_idx) in x and solver.Value(x[(s_idx, seat_idx)]):
                     assignment[s_idx] = seat_idx
                     break
         return assignment
@@ -364,53 +1697,53 @@ class HarmanlamaEngine:
     def _teacher_desk_no(self, salon_id: int, index: int) -> int:
         return 900000 + salon_id * 100 + index
     
-    def _round_robin_harmanlama(self, sinif_gruplari: Dict[str, List[Dict]]) -> List[Dict]:
+    def _round_robin_harmanlama(self, sinif_gruplari: Dict[int, List[Dict]]) -> List[Dict]:
         """
         Interleaved weighted round-robin ile öğrencileri harmanla.
         Büyük gruplar daha fazla slot alır, aynı sınıf tekrarını minimumda tutar.
+        Her grup sabit sayıda döngüye eşit paylarla (Bresenham) dağıtılır; böylece
+        tüm gruplar birlikte biter. Gruplar deque olarak tüketilir ve her sınıfın
+        son konumu tutulduğu için iş öğrenci sayısıyla doğrusaldır.
         """
         karma_liste: List[Dict] = []
-        if not sinif_gruplari:
+        kuyruklar = {key: deque(grup) for key, grup in sinif_gruplari.items() if grup}
+        if not kuyruklar:
             return karma_liste
         
-        weights = self._grup_agirliklari_hesapla(sinif_gruplari)
-        max_weight = max(weights.values()) if weights else 1
-        toplam_ogrenci = sum(len(grup) for grup in sinif_gruplari.values())
+        weights = self._grup_agirliklari_hesapla(kuyruklar)
+        # Her grup kendi ağırlığıyla en geç bu kadar döngüde biter; paylar bu sayıya yayılır
+        dongu_sayisi = max(math.ceil(len(grup) / weights[key]) for key, grup in kuyruklar.items())
+        boyutlar = {key: len(grup) for key, grup in kuyruklar.items()}
+        # Büyük gruplar turun başında: aynı paydaki gruplar arasında sıra sabit kalır
+        sirali = sorted(kuyruklar, key=lambda k: -boyutlar[k])
+        son_konum: Dict[int, int] = {}
+        aralik = self.config.min_aralik
         fallback_used = False
         
-        while toplam_ogrenci > 0:
-            turde_ilerleme = False
-            for round_index in range(1, max_weight + 1):
-                round_keys = [
-                    key for key, grup in sinif_gruplari.items()
-                    if grup and round_index <= weights.get(key, 1)
-                ]
-                if not round_keys:
-                    continue
-                
-                ogrenci_atandi = False
+        for dongu in range(dongu_sayisi):
+            paylar = {
+                key: (dongu + 1) * boyutlar[key] // dongu_sayisi - dongu * boyutlar[key] // dongu_sayisi
+                for key in sirali
+            }
+            round_keys = [key for key in sirali if paylar[key] > 0]
+            round_index = 1
+            while round_keys:
+                ertelenen = []
                 for key in round_keys:
-                    ogrenci = sinif_gruplari[key][0]
-                    if not self._son_n_ayni_siniftan(karma_liste, ogrenci, self.config.min_aralik):
-                        karma_liste.append(sinif_gruplari[key].pop(0))
-                        toplam_ogrenci -= 1
-                        turde_ilerleme = True
-                        ogrenci_atandi = True
-                        break
-                
-                if not ogrenci_atandi and round_keys:
-                    # Bu turda hiç kimse kuralı sağlayamadı, ağırlıklı fallback uyguluyoruz.
-                    fallback_used = True
-                    hedef_key = max(round_keys, key=lambda k: len(sinif_gruplari[k]))
-                    karma_liste.append(sinif_gruplari[hedef_key].pop(0))
-                    toplam_ogrenci -= 1
-                    turde_ilerleme = True
-                
-                if toplam_ogrenci == 0:
-                    break
-            
-            if not turde_ilerleme:
-                raise RuntimeError("Round-robin ilerleyemedi; sınıf dağılımını kontrol edin.")
+                    son = son_konum.get(key)
+                    if son is not None and len(karma_liste) - son <= aralik:
+                        # Aynı sınıf son min_aralik öğrenci içinde; turun sonuna ertele
+                        ertelenen.append(key)
+                        continue
+                    son_konum[key] = len(karma_liste)
+                    karma_liste.append(kuyruklar[key].popleft())
+                for key in ertelenen:
+                    if len(karma_liste) - son_konum[key] <= aralik:
+                        fallback_used = True
+                    son_konum[key] = len(karma_liste)
+                    karma_liste.append(kuyruklar[key].popleft())
+                round_index += 1
+                round_keys = [key for key in round_keys if paylar[key] >= round_index]
         
         if fallback_used:
             self.hata_loglari.append(
@@ -418,17 +1751,118 @@ class HarmanlamaEngine:
             )
         return karma_liste
     
-    def _grup_agirliklari_hesapla(self, sinif_gruplari: Dict[str, List[Dict]]) -> Dict[str, int]:
-        """Sınıf büyüklüklerine göre ağırlık hesapla (IWRR için)."""
+    def _grup_agirliklari_hesapla(self, sinif_gruplari: Dict[int, List[Dict]]) -> Dict[int, int]:
+        """
+        Sınıf büyüklüklerine göre ağırlık (döngü başına ortalama slot) hesapla (IWRR için).
+        Taban ortanca grup büyüklüğüdür; ortanca ve küçük gruplar döngü başına
+        en fazla bir slot alır.
+        """
         if not sinif_gruplari:
             return {}
         
-        taban = max(1, self.config.min_aralik - 1)
+        boyutlar = sorted(len(grup) for grup in sinif_gruplari.values())
+        taban = max(1, self.config.min_aralik - 1, boyutlar[(len(boyutlar) - 1) // 2])
         weights = {}
         for key, grup in sinif_gruplari.items():
             weights[key] = max(1, math.ceil(len(grup) / taban))
         return weights
 
+    @_asama('round_robin')
+    def _round_robin_yerlesim(self, ogrenciler: List[Dict], salonlar: List[Dict],
+                              salon_sira_map: Dict[int, Dict[str, Any]],
+                              occupied_map: Dict[int, set],
+                              occupied_classes: Optional[Dict[int, Dict[int, int]]] = None) -> List[Dict]:
+        """
+        Çözücüsüz doğrusal yerleşim. Öğrenciler sınıf-şube deque'larından IWRR ile
+        karıştırılır ve boş koltuklar salonlara orantılı paylaştırılıp sıra numarasına
+        göre akışla doldurulur. Her koltukta akışın önündeki birkaç öğrenciden yan/arka
+        komşusuyla çözücünün kuralına göre (_kural_anahtari, aynı seviye) çakışmayan ilki
+        oturur; uygun öğrenci yoksa salonun artan boş koltuğu varsa koltuk boş bırakılır,
+        yoksa kural gevşetilir.
+        """
+        self._iptal_kontrol()
+        karma = self._round_robin_harmanlama(self._sinif_gruplarina_ayir(ogrenciler))
+        akis = iter(karma)
+        salon_bos = [
+            (salon, self._bos_siralar_for_salon(salon['id'], salon_sira_map, occupied_map))
+            for salon in salonlar
+        ]
+        bos_sayilari = [len(bos) for _, bos in salon_bos]
+        if len(karma) > sum(bos_sayilari):
+            raise RuntimeError("Yeterli boş sıra bulunamadı.")
+        kotalar = self._orantili_kotalar(bos_sayilari, len(karma))
+        onbellek = self._duzen_onbellegi()
+        occupied_classes = occupied_classes or {}
+        anahtar, _ = self._kural_anahtari()
+        siniflar = self.sozluk.siniflar
+        bekleyen: deque = deque()
+        yerlesim: List[Dict] = []
+        for (salon, bos_siralar), kota in zip(salon_bos, kotalar):
+            if not kota:
+                continue
+            salon_id = salon['id']
+            sira_data = salon_sira_map.get(salon_id, {})
+            tum_sira_seti = {slot.sira_no for slot in sira_data.get('siralar', [])}
+            if not tum_sira_seti:
+                tum_sira_seti = {slot.sira_no for slot in bos_siralar}
+            duzen = onbellek.getir(
+                salon_id, tum_sira_seti, sira_data.get('satir_genisligi', self.config.satir_genisligi)
+            )
+            # Sabit öğrencilerin sınıf kodları da kuralın anahtarına çevrilir
+            dolu = {
+                sira_no: anahtar({'ogrenci_sinif': siniflar[kod][0], 'ogrenci_sube': siniflar[kod][1]})
+                for sira_no, kod in occupied_classes.get(salon_id, {}).items()
+            }
+            artan = len(bos_siralar) - kota
+            for slot in bos_siralar:
+                if not kota:
+                    break
+                while len(bekleyen) < ROUND_ROBIN_PENCERESI:
+                    ogrenci = next(akis, None)
+                    if ogrenci is None:
+                        break
+                    satir = {
+                        'ogrenci_id': ogrenci['id'],
+                        'ogrenci_sinif': ogrenci['sinif'],
+                        'ogrenci_sube': ogrenci['sube'],
+                        'sabit_mi': False,
+                        'sinav_id': ogrenci.get('sinav_id'),
+                        'sinav_adi': ogrenci.get('sinav_adi')
+                    }
+                    bekleyen.append((anahtar(satir), satir))
+                yasakli = {dolu.get(komsu) for komsu in duzen.komsu_numaralari(duzen.indeks[slot.sira_no])}
+                secilen = next((i for i, (key, _) in enumerate(bekleyen) if key not in yasakli), None)
+                if secilen is None:
+                    if artan:
+                        artan -= 1
+                        continue
+                    secilen = 0
+                kural_key, satir = bekleyen[secilen]
+                del bekleyen[secilen]
+                dolu[slot.sira_no] = kural_key
+                kota -= 1
+                satir['salon_id'] = salon_id
+                satir['sira_no'] = slot.sira_no
+                satir['salon_adi'] = salon['salon_adi']
+                yerlesim.append(satir)
+        return yerlesim
+
+    def _orantili_kotalar(self, kapasiteler: List[int], toplam: int) -> List[int]:
+        """toplam'ı kapasitelere orantılı, en büyük kalan yöntemiyle paylaştır"""
+        kapasite_toplami = sum(kapasiteler)
+        if not kapasite_toplami:
+            return [0] * len(kapasiteler)
+        kotalar = [toplam * kapasite // kapasite_toplami for kapasite in kapasiteler]
+        artan = toplam - sum(kotalar)
+        sirali = sorted(
+            range(len(kapasiteler)),
+            key=lambda i: -(toplam * kapasiteler[i] % kapasite_toplami)
+        )
+        for i in sirali[:artan]:
+            kotalar[i] += 1
+        return kotalar
+
+    @_asama('sira_haritasi')
     def _hazirla_salon_sira_map(self, salonlar: List[Dict],
                                 salon_sira_haritasi: Optional[Dict[int, List[Dict]]]) -> Dict[int, Dict[str, Any]]:
         """Salon -> sıra nesnesi haritası hazırla"""
@@ -479,11 +1913,11 @@ class HarmanlamaEngine:
         occupied = occupied_map.get(salon_id, set()) if occupied_map else set()
         return [slot for slot in salon_data['siralar'] if slot.sira_no not in occupied]
 
-    def _pop_sira(self, salon_state_entry: Dict, class_key: Optional[str] = None) -> Optional[SalonSira]:
+    def _pop_sira(self, salon_state_entry: Dict, class_key: Optional[int] = None) -> Optional[SalonSira]:
         bos = salon_state_entry.get('bos_siralar')
         if not bos:
             return None
-        if not class_key or 'satir_genisligi' not in salon_state_entry:
+        if class_key is None or 'satir_genisligi' not in salon_state_entry:
             return bos.popleft() if bos else None
         skipped = deque()
         slot = None
@@ -497,7 +1931,8 @@ class HarmanlamaEngine:
             if skipped:
                 slot = skipped.popleft()
                 self.hata_loglari.append(
-                    f"⚠️ {salon_state_entry['salon']['salon_adi']} salonunda {class_key} için yan/arka kuralı geçici olarak gevşetildi.")
+                    f"⚠️ {salon_state_entry['salon']['salon_adi']} salonunda "
+                    f"{self.sozluk.sinif_adi(class_key)} için yan/arka kuralı geçici olarak gevşetildi.")
             else:
                 return None
         if skipped:
@@ -512,7 +1947,7 @@ class HarmanlamaEngine:
             return None
         return salon_data['by_id'].get(sira_id)
 
-    def _violates_neighbor_rule(self, sira_no: int, class_key: str, salon_state_entry: Dict) -> bool:
+    def _violates_neighbor_rule(self, sira_no: int, class_key: int, salon_state_entry: Dict) -> bool:
         tum_sira_seti = salon_state_entry.get('tum_sira_seti') or set()
         satir_gen = salon_state_entry.get('satir_genisligi', self.config.satir_genisligi)
         neighbors = self._seat_neighbors(sira_no, satir_gen, tum_sira_seti)
@@ -545,27 +1980,11 @@ class HarmanlamaEngine:
             neighbors.append(down)
         return neighbors
 
-    def _son_n_ayni_siniftan(self, liste: List[Dict], ogrenci: Dict, n: int) -> bool:
-        """
-        Son N öğrenciden herhangi biri bu öğrenci ile aynı sınıf/şubeden mi?
-        """
-        if len(liste) < n:
-            return False
-        
-        son_n = liste[-n:]
-        ogrenci_sinif_sube = f"{ogrenci['sinif']}-{ogrenci['sube']}"
-        
-        for ogr in son_n:
-            if f"{ogr['sinif']}-{ogr['sube']}" == ogrenci_sinif_sube:
-                return True
-        
-        return False
-    
     def _salonlara_yerlestir(self, ogrenci_listesi: List[Dict], 
                             salonlar: List[Dict],
                             salon_sira_map: Dict[int, Dict],
                             occupied_map: Optional[Dict[int, set]] = None,
-                            occupied_classes: Optional[Dict[int, Dict[int, str]]] = None) -> List[Dict]:
+                            occupied_classes: Optional[Dict[int, Dict[int, int]]] = None) -> List[Dict]:
         """Salonları, mümkün oldukça aynı sınıf tekrarını engelleyecek şekilde doldur"""
         yerlesim: List[Dict] = []
         occupied_map = occupied_map or defaultdict(set)
@@ -601,7 +2020,7 @@ class HarmanlamaEngine:
             if salon_id is None:
                 raise RuntimeError("Yeterli boş sıra bulunamadı (mobil öğrenciler için)")
             state = salon_state[salon_id]
-            class_key = f"{ogrenci['sinif']}-{ogrenci['sube']}"
+            class_key = self.sozluk.ogrenci_kodu(ogrenci)
             slot = self._pop_sira(state, class_key)
             if slot is None:
                 raise RuntimeError(f"Salon {state['salon']['salon_adi']} için boş sıra kalmadı")
@@ -623,7 +2042,7 @@ class HarmanlamaEngine:
     
     def _find_salon_for_ogrenci(self, ogrenci: Dict, salon_state: Dict) -> Optional[int]:
         """Öğrenci için uygun salon seç (boş salon varsa önce onları kullan)"""
-        class_key = f"{ogrenci['sinif']}-{ogrenci['sube']}"
+        class_key = self.sozluk.ogrenci_kodu(ogrenci)
         adaylar = [
             (salon_id, state) for salon_id, state in salon_state.items()
             if state['kalan'] > 0
@@ -643,10 +2062,11 @@ class HarmanlamaEngine:
         hedefler.sort(key=lambda item: item[1]['kalan'], reverse=True)
         return hedefler[0][0]
     
-    def _group_key(self, ogrenci: Dict, mode: str) -> str:
+    def _group_key(self, ogrenci: Dict, mode: str) -> int:
+        """"sinif_sube" modunda sınıf kodu, "sinif" modunda seviye ailesi kodu"""
         if mode == "sinif_sube":
-            return f"{ogrenci['sinif']}-{ogrenci['sube']}"
-        return str(ogrenci['sinif'])
+            return self.sozluk.ogrenci_kodu(ogrenci)
+        return self.sozluk.seviye_kodu(ogrenci['sinif'])
     
     def _can_distribute_groups(self, ogrenciler: List[Dict], salonlar: List[Dict],
                                mode: str,
@@ -681,7 +2101,7 @@ class HarmanlamaEngine:
                                  mode: str,
                                  salon_sira_map: Dict[int, Dict],
                                  occupied_map: Optional[Dict[int, set]] = None,
-                                 occupied_classes: Optional[Dict[int, Dict[int, str]]] = None) -> List[Dict]:
+                                 occupied_classes: Optional[Dict[int, Dict[int, int]]] = None) -> List[Dict]:
         """Grupları salonlara dağıt (boş salon varken aynı grup farklı salonlara yayılır)"""
         occupied_map = occupied_map or defaultdict(set)
         occupied_classes = occupied_classes or defaultdict(dict)
@@ -702,7 +2122,7 @@ class HarmanlamaEngine:
             if occupied_classes.get(salon['id']):
                 for class_key in occupied_classes[salon['id']].values():
                     if mode == "sinif":
-                        initial_groups.add(class_key.split('-')[0])
+                        initial_groups.add(self.sozluk.sinif_seviyeleri[class_key])
                     else:
                         initial_groups.add(class_key)
             state[salon['id']] = {
@@ -748,7 +2168,7 @@ class HarmanlamaEngine:
             return {}
         return {salon_id: len(siralar) for salon_id, siralar in occupied_map.items()}
     
-    def _choose_salon_for_group(self, group_key: str, state: Dict[int, Dict]) -> Optional[int]:
+    def _choose_salon_for_group(self, group_key: int, state: Dict[int, Dict]) -> Optional[int]:
         uygun = [
             (salon_id, data) for salon_id, data in state.items()
             if data['kalan'] > 0
@@ -764,13 +2184,14 @@ class HarmanlamaEngine:
         hedefler.sort(key=lambda item: item[1]['kalan'], reverse=True)
         return hedefler[0][0]
     
+    @_asama('sabit_yerlestirme')
     def _sabit_ogrenci_yerlestir(self, sabit_ogrenciler: List[Dict],
                                  salonlar: List[Dict],
-                                 salon_sira_map: Dict[int, Dict[str, Any]]) -> Tuple[List[Dict], Dict[int, set], Dict[int, Dict[int, str]]]:
+                                 salon_sira_map: Dict[int, Dict[str, Any]]) -> Tuple[List[Dict], Dict[int, set], Dict[int, Dict[int, int]]]:
         """Sabit öğrencileri kayıtlı salon ve sıralarına yerleştir"""
         yerlesim: List[Dict] = []
         occupied = defaultdict(set)
-        occupied_classes: Dict[int, Dict[int, str]] = defaultdict(dict)
+        occupied_classes: Dict[int, Dict[int, int]] = defaultdict(dict)
         sorun_var = False
         if not sabit_ogrenciler:
             return yerlesim, occupied, occupied_classes
@@ -801,7 +2222,7 @@ class HarmanlamaEngine:
                 sorun_var = True
                 continue
             occupied[salon_id].add(slot.sira_no)
-            class_key = f"{sabit['sinif']}-{sabit['sube']}"
+            class_key = self.sozluk.sinif_kodu(sabit['sinif'], sabit['sube'])
             occupied_classes[salon_id][slot.sira_no] = class_key
             konum = SabitOgrenciKonum(
                 ogrenci_id=sabit['id'],
@@ -827,6 +2248,7 @@ class HarmanlamaEngine:
             raise RuntimeError("Sabit öğrencilerin sabit konum bilgileri eksik veya hatalı.")
         return yerlesim, occupied, occupied_classes
     
+    @_asama('dogrulama')
     def _validate_yerlesim(self, yerlesim: List[Dict], min_aralik: int,
                            salon_sira_map: Optional[Dict[int, Dict[str, Any]]] = None,
                            uyumsuzluklar: Optional[List[str]] = None,
@@ -838,63 +2260,372 @@ class HarmanlamaEngine:
         """
         if not yerlesim:
             return True
-        ihlal = False
-        salonlar_dict = defaultdict(list)
-        for yer in yerlesim:
-            salonlar_dict[yer['salon_id']].append(yer)
-        
-        for salon_id, salon_yerlesim in salonlar_dict.items():
-            salon_yerlesim.sort(key=lambda x: x['sira_no'])
-            class_map = {yer['sira_no']: f"{yer['ogrenci_sinif']}-{yer['ogrenci_sube']}" for yer in salon_yerlesim}
-            salon_map_entry = salon_sira_map.get(salon_id) if salon_sira_map else {}
-            tum_sira_seti = {slot.sira_no for slot in salon_map_entry.get('siralar', [])}
-            if not tum_sira_seti:
-                tum_sira_seti = set(class_map.keys())
-            satir_gen = salon_map_entry.get('satir_genisligi', self.config.satir_genisligi)
-            
-            # Yan/arka kontrolü
-            for yer in salon_yerlesim:
-                sinif_sube = f"{yer['ogrenci_sinif']}-{yer['ogrenci_sube']}"
-                neighbors = self._seat_neighbors(yer['sira_no'], satir_gen, tum_sira_seti)
-                for komsu in neighbors:
-                    if class_map.get(komsu) == sinif_sube:
-                        msg = (
-                            f"⚠️ {yer['salon_adi']} salonunda {yer['sira_no']}. sıranın "
-                            f"yanında/arkasında aynı sınıftan öğrenci bulundu ({sinif_sube})."
-                        )
-                        if uyumsuzluklar is not None:
-                            uyumsuzluklar.append(msg)
-                        if strict:
-                            self.hata_loglari.append(msg)
-                            return False
-                        ihlal = True
-            
-            # Ekstra lineer aralık kontrolü (isteğe bağlı)
-            if min_aralik and min_aralik > 1:
-                for i, ogrenci in enumerate(salon_yerlesim):
-                    sinif_sube = f"{ogrenci['ogrenci_sinif']}-{ogrenci['ogrenci_sube']}"
-                    kontrol_baslangic = max(0, i - min_aralik)
-                    kontrol_ogrenciler = salon_yerlesim[kontrol_baslangic:i]
-                    ayni_sinif_var = any(
-                        f"{o['ogrenci_sinif']}-{o['ogrenci_sube']}" == sinif_sube
-                        for o in kontrol_ogrenciler
+        kayitlar = self.yerlesim_ihlalleri(yerlesim, min_aralik, salon_sira_map)
+        if not kayitlar:
+            return True
+        if strict:
+            msg = ihlal_mesaji(kayitlar[0])
+            if uyumsuzluklar is not None:
+                uyumsuzluklar.append(msg)
+            self.hata_loglari.append(msg)
+            return False
+        if uyumsuzluklar is not None:
+            uyumsuzluklar.extend(ihlal_mesaji(kayit) for kayit in kayitlar)
+        return False
+
+    def yerlesim_ihlalleri(self, yerlesim: List[Dict], min_aralik: int = 0,
+                           salon_sira_map: Optional[Dict[int, Dict[str, Any]]] = None) -> List[Dict]:
+        """
+        Yan/arka ve (min_aralik > 1 ise) lineer aralık ihlallerini yapısal kayıtlar
+        olarak döndür; bkz. koltuk_izgarasi.yerlesim_ihlalleri.
+        """
+        return yerlesim_ihlalleri(
+            yerlesim,
+            self._satir_genislikleri(salon_sira_map),
+            varsayilan_genislik=self.config.satir_genisligi,
+            min_aralik=min_aralik,
+            anahtar=self.sozluk.yer_kodu,
+            adlandir=self.sozluk.sinif_adi
+        )
+
+    def _kural_anahtari(self) -> Tuple[Callable[[Dict], Any], Callable[[Any], str]]:
+        """Çözücünün garanti ettiği kuralın (aynı seviye ailesi yan/arka oturmaz) anahtarı ve adı"""
+        if CP_SAT_FORBID_SAME_GRADE_ADJACENT:
+            return (
+                lambda yer: self.sozluk.seviye_kodu(yer['ogrenci_sinif']),
+                self.sozluk.seviye_adlari.__getitem__
+            )
+        return self.sozluk.yer_kodu, self.sozluk.sinif_adi
+
+    @_asama('dogrulama')
+    def _kural_ihlalleri(self, yerlesim: List[Dict],
+                         salon_sira_map: Optional[Dict[int, Dict[str, Any]]] = None) -> List[Dict]:
+        """
+        Çözücünün kuralına göre (seviye anahtarı) yan/arka ihlalleri; kuralı garanti
+        etmeyen round-robin yolunda kalan ihlaller bununla raporlanır.
+        """
+        anahtar, adlandir = self._kural_anahtari()
+        return yerlesim_ihlalleri(
+            yerlesim,
+            self._satir_genislikleri(salon_sira_map),
+            varsayilan_genislik=self.config.satir_genisligi,
+            anahtar=anahtar,
+            adlandir=adlandir
+        )
+
+    def yerlesim_denetleyici(self, yerlesim: List[Dict],
+                             salon_sira_map: Optional[Dict[int, Dict[str, Any]]] = None) -> YerlesimDenetleyici:
+        """
+        Harmanlama sonrası elle takas/taşıma için artımlı denetleyici; çözücünün garanti
+        ettiği kuralın anahtarını (_kural_anahtari) ve satır genişliklerini kullanır.
+        Satırlar yerinde güncellenir.
+        """
+        anahtar, adlandir = self._kural_anahtari()
+        return YerlesimDenetleyici(
+            yerlesim,
+            self._satir_genislikleri(salon_sira_map),
+            varsayilan_genislik=self.config.satir_genisligi,
+            anahtar=anahtar,
+            adlandir=adlandir
+        )
+
+    def yerel_onarim(self, yerlesim: List[Dict], salonlar: List[Dict],
+                     yeni_ogrenciler: Optional[List[Dict]] = None,
+                     cikarilan_idler: Optional[Iterable[int]] = None,
+                     salon_sira_haritasi: Optional[Dict[int, List[Dict]]] = None) -> Dict[str, Any]:
+        """
+        Sınav sabahı eklenen/çıkarılan öğrenciler için mevcut yerleşimi yeniden
+        çözmeden onar. Çıkarılanların koltukları boşalır; yeni öğrenciler (harmanla
+        girdisiyle aynı biçim) önce kurala uyan bir boş koltuğa, olmazsa en fazla
+        onarim_zincir_uzunlugu halkalı bir kaydırma zinciriyle yerleşir (yeni öğrenci
+        bir koltuğa, oradaki öğrenci bir başkasına, ..., son halka boş koltuğa).
+        Zincir tek salonda kalır ve önce koltuğu boşalan salonlara bakılır; sabit
+        öğrenciler ile öğretmen masaları yerinden oynamaz. Girdi satırları
+        değiştirilmez; 'degisen' veritabanına yazılması gereken satırlardır.
+        """
+        self.hata_loglari = []
+        self._asama_sureleri = {}
+        self._cozucu_istatistikleri = []
+        self._harmanla_baslangici = (time.perf_counter(), time.process_time())
+        with self._olc('yerel_onarim'):
+            cikarilan = set(cikarilan_idler or ())
+            satirlar: List[Dict] = []
+            cikarilan_satirlar: List[Dict] = []
+            for yer in yerlesim:
+                if yer['ogrenci_id'] in cikarilan:
+                    cikarilan_satirlar.append(yer)
+                    continue
+                yer = dict(yer)
+                # Veritabanı satırları (yerlesim_getir) sinif/sube taşır
+                yer.setdefault('ogrenci_sinif', yer.get('sinif'))
+                yer.setdefault('ogrenci_sube', yer.get('sube'))
+                satirlar.append(yer)
+
+            anahtar, adlandir = self._kural_anahtari()
+            salon_sira_map = self._hazirla_salon_sira_map(salonlar, salon_sira_haritasi)
+            denetleyici = YerlesimDenetleyici(
+                satirlar,
+                self._satir_genislikleri(salon_sira_map),
+                varsayilan_genislik=self.config.satir_genisligi,
+                anahtar=anahtar,
+                adlandir=adlandir
+            )
+            bos: Dict[int, List[int]] = {
+                salon_id: [
+                    slot.sira_no for slot in entry['siralar']
+                    if denetleyici.yer((salon_id, slot.sira_no)) is None
+                ]
+                for salon_id, entry in salon_sira_map.items()
+            }
+            salon_sirasi = [
+                salon_id for salon_id in dict.fromkeys(
+                    [yer['salon_id'] for yer in cikarilan_satirlar] + [s['id'] for s in salonlar]
+                )
+                if salon_id in salon_sira_map
+            ]
+            salon_adlari = {s['id']: s['salon_adi'] for s in salonlar}
+
+            yerlesmis = {yer['ogrenci_id'] for yer in satirlar}
+            yerlestirilemeyen: List[int] = []
+            for ogrenci in yeni_ogrenciler or []:
+                if ogrenci['id'] in yerlesmis:
+                    continue
+                yer = {
+                    'ogrenci_id': ogrenci['id'],
+                    'salon_id': None,
+                    'sira_no': None,
+                    'ogrenci_sinif': ogrenci['sinif'],
+                    'ogrenci_sube': ogrenci['sube'],
+                    'salon_adi': '',
+                    'sabit_mi': False,
+                    'sinav_id': ogrenci.get('sinav_id'),
+                    'sinav_adi': ogrenci.get('sinav_adi')
+                }
+                zincir = None
+                for salon_id in salon_sirasi:
+                    if bos[salon_id]:
+                        zincir = self._onarim_zinciri(denetleyici, yer, salon_id, bos[salon_id])
+                        if zincir:
+                            break
+                if not zincir:
+                    yerlestirilemeyen.append(ogrenci['id'])
+                    self.hata_loglari.append(
+                        f"⚠️ {ogrenci['sinif']}-{ogrenci['sube']} sınıfından {ogrenci['id']} numaralı "
+                        f"öğrenci için kurala uygun koltuk bulunamadı."
                     )
-                    if ayni_sinif_var:
-                        msg = (
-                            f"⚠️ {ogrenci['salon_adi']} salonunda {ogrenci['sira_no']}. sıraya "
-                            f"çok yakın başka bir {sinif_sube} öğrencisi yerleşmiş."
-                        )
-                        if uyumsuzluklar is not None:
-                            uyumsuzluklar.append(msg)
-                        if strict:
-                            self.hata_loglari.append(msg)
-                            return False
-                        ihlal = True
-        
-        return not ihlal
+                    continue
+                # Sondan başa uygula: son halka boş koltuğa geçer, her öğrenci açılan yere kayar
+                for tasinan, konum in reversed(zincir):
+                    if tasinan is not yer:
+                        denetleyici.cikar((tasinan['salon_id'], tasinan['sira_no']))
+                    denetleyici.yerlestir(tasinan, konum, salon_adlari.get(konum[0]))
+                bos[salon_id].remove(zincir[-1][1][1])
+                satirlar.append(yer)
+                yerlesmis.add(ogrenci['id'])
+
+            satirlar.sort(key=lambda x: (x['salon_adi'], x['sira_no']))
+            degisiklikler = self._yerlesim_farki(yerlesim, satirlar)
+            degisen_idler = set(degisiklikler['eklenen']) | {t['ogrenci_id'] for t in degisiklikler['tasinan']}
+        return {
+            'basarili': not yerlestirilemeyen,
+            'yerlesim': satirlar,
+            'degisen': [yer for yer in satirlar if yer['ogrenci_id'] in degisen_idler],
+            'cikarilan': cikarilan_satirlar,
+            'degisiklikler': degisiklikler,
+            'yerlestirilemeyen': yerlestirilemeyen,
+            'hatalar': self.hata_loglari,
+            'performans': self._performans_raporu()
+        }
+
+    def _onarim_zinciri(self, denetleyici: YerlesimDenetleyici, yer: Dict, salon_id: int,
+                        bos_siralar: List[int]) -> Optional[List[Tuple[Dict, Tuple[int, int]]]]:
+        """
+        Salon içinde (satır, hedef koltuk) hamle zinciri ara; ilk halka yeni öğrenci,
+        son halkanın hedefi boş bir koltuktur. Her adımda o ana kadarki hamleler
+        birlikte denetlenir, son adımdaki denetim tüm zincir için kesindir.
+        """
+        bos_konumlar = [(salon_id, sira_no) for sira_no in bos_siralar]
+        hareketliler = [
+            (salon_id, sira_no) for sira_no in denetleyici.dolu_siralar(salon_id)
+            if not denetleyici.yer((salon_id, sira_no)).get('sabit_mi')
+        ]
+        uzunluk = max(1, self.config.onarim_zincir_uzunlugu)
+
+        def ara(tasinan: Dict, yeni: Dict[Tuple[int, int], Any], zincir: List):
+            kod = denetleyici.anahtar(tasinan)
+            for konum in bos_konumlar:
+                yeni[konum] = kod
+                if not denetleyici.atama_ihlalleri(yeni):
+                    return zincir + [(tasinan, konum)]
+                del yeni[konum]
+            if len(zincir) + 1 >= uzunluk:
+                return None
+            for konum in hareketliler:
+                if konum in yeni:
+                    continue
+                yeni[konum] = kod
+                if not denetleyici.atama_ihlalleri(yeni):
+                    bulunan = ara(denetleyici.yer(konum), yeni, zincir + [(tasinan, konum)])
+                    if bulunan:
+                        return bulunan
+                del yeni[konum]
+            return None
+
+        return ara(yer, {}, [])
+
+    def _satir_genislikleri(self, salon_sira_map: Optional[Dict[int, Dict[str, Any]]]) -> Dict[int, int]:
+        return {
+            salon_id: entry.get('satir_genisligi', self.config.satir_genisligi)
+            for salon_id, entry in (salon_sira_map or {}).items()
+        }
     
+    @_asama('aralik_optimizasyonu')
+    def _aralik_iyilestir(self, yerlesim: List[Dict],
+                          salon_sira_map: Dict[int, Dict[str, Any]],
+                          onceki_koltuklar: Optional[Dict[int, Tuple[int, int]]] = None) -> Dict[str, Any]:
+        """
+        Zamana yayılan (anytime) yerel arama. Aynı seviye ailesindeki iki hareketli
+        öğrencinin koltukları takas edilir; seviye deseni değişmediği için çözücünün
+        yan/arka kuralı korunur. Puan, aynı salonda aralik_yaricapi içinde oturan aynı
+        şube çiftlerinin yakınlığa göre ağırlıklı sayısıdır (yan/arka komşuluk hiçbir
+        takas kazancıyla telafi edilemeyecek kadar ağırdır). Sabit öğrenciler ve
+        öğretmen masaları puana girer ama yer değiştirmez; artımlı çalışmada
+        onceki_koltuklar'daki koltuğunda kalmış öğrenciler de kilitlidir, böylece
+        optimizasyon artımlı modun az değişiklik hedefini bozmaz. Süre bitince, yerel
+        optimuma varılınca ya da belirteç kabul_et() ile durdurulunca döner;
+        yerlesim yerinde güncellenir.
+        """
+        baslangic = time.perf_counter()
+        bitis = baslangic + max(0.0, self.config.optimizasyon_suresi)
+        yaricap = max(1, self.config.aralik_yaricapi)
+        ofsetler = [
+            (dr, dc, yaricap + 1 - abs(dr) - abs(dc))
+            for dr in range(-yaricap, yaricap + 1)
+            for dc in range(-yaricap, yaricap + 1)
+            if 0 < abs(dr) + abs(dc) <= yaricap
+        ]
+        yasak = 1 + 2 * sum(agirlik for _, _, agirlik in ofsetler)
+        ofsetler = [
+            (dr, dc, yasak if abs(dr) + abs(dc) == 1 else agirlik)
+            for dr, dc, agirlik in ofsetler
+        ]
+
+        # Koltuk başına paralel diziler; izgara (salon, satır, sütun) -> koltuk indeksi
+        konumlar: List[Tuple[int, int, int]] = []
+        kodlar: List[int] = []
+        yer_kodu = self.sozluk.yer_kodu
+        sinif_seviyeleri = self.sozluk.sinif_seviyeleri
+        izgara: Dict[Tuple[int, int, int], int] = {}
+        hareketli: Dict[int, List[int]] = defaultdict(list)
+        satirlar: List[Optional[Dict]] = []
+        onceki_koltuklar = onceki_koltuklar or {}
+        kilitli = 0
+        for yer in yerlesim:
+            if yer.get('ogretmen_masasi') or yer['sira_no'] >= TEACHER_DESK_BASE:
+                continue
+            genislik = salon_sira_map.get(yer['salon_id'], {}).get(
+                'satir_genisligi', max(1, self.config.satir_genisligi)
+            )
+            konum = (yer['salon_id'], (yer['sira_no'] - 1) // genislik,
+                     (yer['sira_no'] - 1) % genislik)
+            idx = len(konumlar)
+            konumlar.append(konum)
+            izgara[konum] = idx
+            kod = yer_kodu(yer)
+            kodlar.append(kod)
+            satirlar.append(yer)
+            if onceki_koltuklar.get(yer['ogrenci_id']) == (yer['salon_id'], yer['sira_no']):
+                kilitli += 1
+            elif not yer.get('sabit_mi'):
+                hareketli[sinif_seviyeleri[kod]].append(idx)
+
+        def maliyet(idx: int, kod: int) -> int:
+            salon_id, satir, sutun = konumlar[idx]
+            toplam = 0
+            for dr, dc, agirlik in ofsetler:
+                komsu = izgara.get((salon_id, satir + dr, sutun + dc))
+                if komsu is not None and kodlar[komsu] == kod:
+                    toplam += agirlik
+            return toplam
+
+        def yakin_cift_sayisi() -> int:
+            sayi = 0
+            for idx, (salon_id, satir, sutun) in enumerate(konumlar):
+                for dr, dc, _ in ofsetler:
+                    komsu = izgara.get((salon_id, satir + dr, sutun + dc))
+                    if komsu is not None and komsu > idx and kodlar[komsu] == kodlar[idx]:
+                        sayi += 1
+            return sayi
+
+        baslangic_puani = sum(maliyet(i, kodlar[i]) for i in range(len(konumlar))) // 2
+        puan = baslangic_puani
+        rng = random.Random(self.config.seed)
+        adaylar = [i for grup in hareketli.values() if len(grup) > 1 for i in grup]
+        takas_sayisi = 0
+        tur = 0
+        durma_nedeni = "yerel-optimum"
+        # Öğrenci ve sınav bilgisi koltukla değil öğrenciyle birlikte taşınır
+        tasinan = ('ogrenci_id', 'ogrenci_sinif', 'ogrenci_sube', 'sinav_id', 'sinav_adi')
+        yukler = [tuple(yer.get(alan) for alan in tasinan) for yer in satirlar]
+        devam = puan > 0
+        while devam:
+            tur += 1
+            cakisan = [i for i in adaylar if maliyet(i, kodlar[i]) > 0]
+            rng.shuffle(cakisan)
+            gelisti = False
+            for sayac, i in enumerate(cakisan):
+                if sayac % 64 == 0:
+                    self._iptal_kontrol()
+                    if time.perf_counter() >= bitis:
+                        durma_nedeni, devam = "sure", False
+                        break
+                    if self.iptal_belirteci is not None and self.iptal_belirteci.kabul_edildi:
+                        durma_nedeni, devam = "kabul", False
+                        break
+                grup = hareketli[sinif_seviyeleri[kodlar[i]]]
+                for _ in range(8):
+                    j = grup[rng.randrange(len(grup))]
+                    if kodlar[j] == kodlar[i]:
+                        continue
+                    once = maliyet(i, kodlar[i]) + maliyet(j, kodlar[j])
+                    kodlar[i], kodlar[j] = kodlar[j], kodlar[i]
+                    sonra = maliyet(i, kodlar[i]) + maliyet(j, kodlar[j])
+                    if sonra < once:
+                        yukler[i], yukler[j] = yukler[j], yukler[i]
+                        puan += sonra - once
+                        takas_sayisi += 1
+                        gelisti = True
+                        break
+                    kodlar[i], kodlar[j] = kodlar[j], kodlar[i]
+            if gelisti and self.ilerleme_bildirimi is not None:
+                self.ilerleme_bildirimi({
+                    'asama': 'aralik',
+                    'gecen_sure': time.perf_counter() - baslangic,
+                    'amac': puan,
+                    'cozum_sayisi': tur
+                })
+            if devam and (not gelisti or puan == 0):
+                devam = False
+
+        for yer, yuk in zip(satirlar, yukler):
+            if not yer.get('sabit_mi'):
+                yer.update(zip(tasinan, yuk))
+        return {
+            'yaricap': yaricap,
+            'baslangic_puani': baslangic_puani,
+            'puan': puan,
+            'yakin_cift': yakin_cift_sayisi(),
+            'takas': takas_sayisi,
+            'kilitli': kilitli,
+            'tur': tur,
+            'durma_nedeni': durma_nedeni,
+            'sure': round(time.perf_counter() - baslangic, 4)
+        }
+
+    @_asama('istatistik')
     def _istatistik_hesapla(self, yerlesim: List[Dict], ogrenciler: List[Dict],
-                           salonlar: List[Dict], dagitim_modu: str = "karma") -> Dict:
+                           salonlar: List[Dict], dagitim_modu: str = "karma",
+                           cozum_yolu: Optional[str] = None) -> Dict:
         """Harmanlama istatistiklerini hesapla"""
         salon_doluluk = defaultdict(int)
         for yer in yerlesim:
@@ -911,9 +2642,13 @@ class HarmanlamaEngine:
                 'oran': round(oran, 2)
             })
         
-        sinif_dagilim = defaultdict(int)
+        kod_sayilari = defaultdict(int)
+        ogrenci_kodu = self.sozluk.ogrenci_kodu
         for ogr in ogrenciler:
-            sinif_dagilim[f"{ogr['sinif']}/{ogr['sube']}"] += 1
+            kod_sayilari[ogrenci_kodu(ogr)] += 1
+        sinif_dagilim = {
+            self.sozluk.sinif_adi(kod, "/"): adet for kod, adet in kod_sayilari.items()
+        }
         
         return {
             'toplam_ogrenci': len(ogrenciler),
@@ -921,10 +2656,49 @@ class HarmanlamaEngine:
             'kullanilan_salon': len([d for d in salon_doluluk.values() if d > 0]),
             'toplam_salon': len(salonlar),
             'salon_istatistikleri': salon_istatistikleri,
-            'sinif_dagilim': dict(sinif_dagilim),
-            'dagitim_modu': dagitim_modu
+            'sinif_dagilim': sinif_dagilim,
+            'dagitim_modu': dagitim_modu,
+            'cozum_yolu': cozum_yolu
         }
     
+    def _calisma_ozeti(self, sonuc: Dict[str, Any], yerlesim: List[Dict], ogrenciler: List[Dict],
+                       sabit_ogrenciler: Optional[List[Dict]], salonlar: List[Dict],
+                       salon_sira_map: Optional[Dict[int, Dict[str, Any]]] = None) -> Dict[str, Any]:
+        """
+        Çalışma geçmişi kaydı (DatabaseManager.harmanlama_gecmisi tablosu): girdi
+        boyutları, ayarlar, çözüm yolu, aşama süreleri, çözücü durumu, öğretmen masası
+        ve ihlal sayıları. Sonuç bloğuyla birlikte yerleşim kaydına verilir.
+        """
+        sabit = sabit_ogrenciler or []
+        performans = sonuc['performans']
+        cozucu = performans['cp_sat']
+        if salon_sira_map:
+            koltuk_sayisi = sum(len(entry['siralar']) for entry in salon_sira_map.values())
+        else:
+            koltuk_sayisi = sum(salon.get('kapasite') or 0 for salon in salonlar)
+        return {
+            'sinav_idleri': sorted({
+                ogrenci['sinav_id'] for ogrenci in list(ogrenciler) + list(sabit)
+                if ogrenci.get('sinav_id') is not None
+            }),
+            'ogrenci_sayisi': len(ogrenciler),
+            'sabit_sayisi': len(sabit),
+            'salon_sayisi': len(salonlar),
+            'koltuk_sayisi': koltuk_sayisi,
+            'yerlestirilen': len(yerlesim),
+            'cozum_yolu': sonuc['istatistikler'].get('cozum_yolu'),
+            'portfoy_stratejisi': sonuc['istatistikler'].get('portfoy_kazanani'),
+            'cozucu_durumu': cozucu[-1]['durum'] if cozucu else None,
+            'ogretmen_masasi': sum(1 for yer in yerlesim if yer.get('ogretmen_masasi')),
+            'ihlal_sayisi': len(self.yerlesim_ihlalleri(yerlesim, 0, salon_sira_map)),
+            'uyumsuzluk_sayisi': len(sonuc['uyumsuzluklar']),
+            'onbellekten': bool(sonuc.get('onbellekten')),
+            'toplam_sure': (performans['toplam'] or {}).get('duvar'),
+            'asamalar': performans['asamalar'],
+            'cozucu': cozucu,
+            'config': asdict(self.config)
+        }
+
     def _hata_response(self) -> Dict:
         """Hata durumunda response"""
         return {
@@ -933,7 +2707,8 @@ class HarmanlamaEngine:
             'istatistikler': {},
             'hatalar': self.hata_loglari,
             'uyumsuzluklar': self.uyumsuzluk_loglari,
-            'uyumsuzluk_var': bool(self.uyumsuzluk_loglari)
+            'uyumsuzluk_var': bool(self.uyumsuzluk_loglari),
+            'performans': self._performans_raporu()
         }
     
     def yerlesim_gorsellesitir(self, yerlesim: List[Dict]) -> str:
@@ -970,6 +2745,113 @@ class HarmanlamaEngine:
         return "\n".join(output)
 
 
+def _model_proto_metni(model) -> str:
+    """CP-SAT modelinin metin protosu (OR-Tools sürümleri arasında taşınabilir yol)"""
+    import tempfile
+    with tempfile.TemporaryDirectory() as dizin:
+        yol = os.path.join(dizin, "model.txt")
+        model.ExportToFile(yol)
+        with open(yol, encoding='utf-8') as dosya:
+            return dosya.read()
+
+
+class _SalonHavuzu:
+    """Salon alt problemleri için spawn süreç havuzu ve işçilerin izlediği iptal olayı"""
+
+    def __init__(self, isci_sayisi: int):
+        baglam = multiprocessing.get_context("spawn")
+        self.isci_sayisi = isci_sayisi
+        self.iptal_olayi = baglam.Event()
+        self.executor = ProcessPoolExecutor(
+            max_workers=isci_sayisi,
+            mp_context=baglam,
+            initializer=_salon_iscisi_baslat,
+            initargs=(self.iptal_olayi,)
+        )
+
+    def kapat(self):
+        self.iptal_olayi.set()
+        self.executor.shutdown(wait=False, cancel_futures=True)
+
+
+_salon_havuzu: Optional[_SalonHavuzu] = None
+_salon_havuzu_kilidi = threading.Lock()
+# İşçi sürecinde initializer ile kalıtılan iptal olayı
+_salon_iptal_olayi = None
+
+
+def _salon_havuzu_getir(isci_sayisi: int) -> _SalonHavuzu:
+    """Paylaşılan havuzu getir; işçi sayısı değiştiyse yenisini kur"""
+    global _salon_havuzu
+    with _salon_havuzu_kilidi:
+        if _salon_havuzu is not None and _salon_havuzu.isci_sayisi != isci_sayisi:
+            _salon_havuzu.kapat()
+            _salon_havuzu = None
+        if _salon_havuzu is None:
+            _salon_havuzu = _SalonHavuzu(isci_sayisi)
+        return _salon_havuzu
+
+
+def _salon_havuzunu_birak(havuz: Optional[_SalonHavuzu] = None):
+    """
+    Havuzu durdur ve bırak (havuz verilmezse güncel olanı). Çalışan alt aramalar
+    iptal olayıyla kesilir; sonraki çağrı temiz bir havuz kurar.
+    """
+    global _salon_havuzu
+    with _salon_havuzu_kilidi:
+        havuz = havuz or _salon_havuzu
+        if havuz is None:
+            return
+        if _salon_havuzu is havuz:
+            _salon_havuzu = None
+    havuz.kapat()
+
+
+atexit.register(_salon_havuzunu_birak)
+
+
+def _salon_iscisi_baslat(iptal_olayi):
+    """ProcessPoolExecutor initializer: havuzun iptal olayını işçi sürecine aktar"""
+    global _salon_iptal_olayi
+    _salon_iptal_olayi = iptal_olayi
+
+
+def _salon_alt_problemini_coz(paket: Dict[str, Any],
+                              iptal_belirteci: Optional[IptalBelirteci] = None) -> Optional[Dict[int, List[int]]]:
+    """
+    ProcessPoolExecutor işçisi: tek salonun koltuklarına seviye kotalarını yerleştir.
+    Süreçler zaten paralel çalıştığı için her alt model tek arama işçisiyle çözülür.
+    İşçi süreçte havuzun iptal olayı, sıralı çözümde çağıranın belirteci aramayı keser.
+    """
+    bitti = threading.Event()
+    if iptal_belirteci is None:
+        iptal_belirteci = IptalBelirteci()
+        if _salon_iptal_olayi is not None:
+            def _iptali_izle():
+                # Paylaşılan olayda beklemek yerine yoklanır: süreç beklerken ölürse
+                # olayın koşul değişkeni kapanışta set() çağrısını kilitleyebilir
+                while not bitti.wait(0.1):
+                    if _salon_iptal_olayi.is_set():
+                        iptal_belirteci.iptal_et()
+                        return
+
+            threading.Thread(target=_iptali_izle, daemon=True).start()
+    engine = HarmanlamaEngine(paket['config'], iptal_belirteci=iptal_belirteci)
+    try:
+        return engine._seviye_koltuklari_coz(
+            paket['seviye_sayilari'],
+            paket['koltuklar'],
+            paket['komsuluklar'],
+            isci_sayisi=1
+        )
+    except RuntimeError:
+        if iptal_belirteci.iptal_edildi:
+            return None
+        raise
+    finally:
+        bitti.set()
+
+
 class GozetmenAtamaEngine:
     """Gözetmen atama motoru"""
     
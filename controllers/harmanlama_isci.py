@@ -0,0 +1,210 @@
+"""
+Kelebek Sınav Sistemi - Harmanlama İşçi Süreci
+Harmanlama motorunu ayrı bir süreçte çalıştırır; Tkinter arayüzü model
+kurulumu sırasında GIL yüzünden donmaz. Süreç tekrar kullanıldığı için
+OR-Tools her harmanlamada yeniden içe aktarılmaz.
+"""
+
+import atexit
+import multiprocessing
+import queue
+import sys
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Callable, Dict, List, Optional
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from controllers.harmanlama_engine import HarmanlamaEngine, HarmanlamaConfig, IptalBelirteci
+
+
+# İşçi sürecinde initializer ile kalıtılan paylaşılan nesneler
+_ilerleme_kuyrugu = None
+_iptal_olayi = None
+_kabul_olayi = None
+
+
+def _isci_baslat(ilerleme_kuyrugu, iptal_olayi, kabul_olayi):
+    """ProcessPoolExecutor initializer: kuyruk ve olayları işçi sürecine aktar"""
+    global _ilerleme_kuyrugu, _iptal_olayi, _kabul_olayi
+    _ilerleme_kuyrugu = ilerleme_kuyrugu
+    _iptal_olayi = iptal_olayi
+    _kabul_olayi = kabul_olayi
+
+
+def _isci_isit() -> bool:
+    """İlk görevde OR-Tools'u yükle; sonraki harmanlamalar hazır süreci kullanır"""
+    try:
+        from ortools.sat.python import cp_model  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def _isci_harmanla(calistirma_no: int, config: HarmanlamaConfig, ogrenciler: List[Dict],
+                   salonlar: List[Dict], sabit_ogrenciler: Optional[List[Dict]],
+                   salon_sira_haritasi: Optional[Dict[int, List[Dict]]],
+                   onceki_yerlesim: Optional[List[Dict]]) -> Dict[str, Any]:
+    """İşçi sürecinde çalışan harmanlama; ilerleme, iptal ve kabul paylaşılan nesnelerden geçer"""
+    iptal = IptalBelirteci()
+    if _iptal_olayi.is_set():
+        iptal.iptal_et()
+    bitti = threading.Event()
+
+    def _iptali_izle():
+        while not bitti.is_set():
+            if _kabul_olayi.is_set() and not iptal.kabul_edildi:
+                iptal.kabul_et()
+            if _iptal_olayi.wait(0.1):
+                iptal.iptal_et()
+                return
+
+    izleyici = threading.Thread(target=_iptali_izle, daemon=True)
+    izleyici.start()
+    try:
+        engine = HarmanlamaEngine(
+            config,
+            iptal_belirteci=iptal,
+            ilerleme_bildirimi=lambda bilgi: _ilerleme_kuyrugu.put((calistirma_no, bilgi))
+        )
+        return engine.harmanla(
+            ogrenciler,
+            salonlar,
+            sabit_ogrenciler=sabit_ogrenciler,
+            salon_sira_haritasi=salon_sira_haritasi,
+            onceki_yerlesim=onceki_yerlesim
+        )
+    finally:
+        bitti.set()
+        izleyici.join()
+
+
+class HarmanlamaIsciSureci:
+    """
+    Tek işçili, yeniden kullanılan harmanlama süreci.
+    harmanla() çağıran iş parçacığını sonuç gelene kadar bekletir ama GIL'i
+    tutmaz; ilerleme bildirimleri ve iptal süreç sınırından geçirilir.
+    """
+
+    def __init__(self):
+        self._baglam = multiprocessing.get_context("spawn")
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._ilerleme_kuyrugu = None
+        self._iptal_olayi = None
+        self._kabul_olayi = None
+        self._kilit = threading.Lock()
+        self._calistirma_no = 0
+
+    def _executor_getir(self) -> ProcessPoolExecutor:
+        if self._executor is None:
+            self._ilerleme_kuyrugu = self._baglam.Queue()
+            self._iptal_olayi = self._baglam.Event()
+            self._kabul_olayi = self._baglam.Event()
+            self._executor = ProcessPoolExecutor(
+                max_workers=1,
+                mp_context=self._baglam,
+                initializer=_isci_baslat,
+                initargs=(self._ilerleme_kuyrugu, self._iptal_olayi, self._kabul_olayi)
+            )
+        return self._executor
+
+    def isit(self):
+        """İşçi sürecini arka planda başlat (sonucu beklemez)"""
+        with self._kilit:
+            try:
+                self._executor_getir().submit(_isci_isit)
+            except (OSError, BrokenProcessPool):
+                self._sifirla()
+
+    def harmanla(self, ogrenciler: List[Dict], salonlar: List[Dict],
+                 sabit_ogrenciler: Optional[List[Dict]] = None,
+                 salon_sira_haritasi: Optional[Dict[int, List[Dict]]] = None,
+                 onceki_yerlesim: Optional[List[Dict]] = None,
+                 config: Optional[HarmanlamaConfig] = None,
+                 iptal_belirteci: Optional[IptalBelirteci] = None,
+                 ilerleme_bildirimi: Optional[Callable[[Dict[str, Any]], None]] = None
+                 ) -> Dict[str, Any]:
+        """HarmanlamaEngine.harmanla() ile aynı sonucu işçi sürecinde üret"""
+        config = config or HarmanlamaConfig()
+        with self._kilit:
+            try:
+                executor = self._executor_getir()
+            except OSError:
+                # Süreç açılamıyorsa (kısıtlı ortam) motoru bu iş parçacığında çalıştır
+                return HarmanlamaEngine(
+                    config,
+                    iptal_belirteci=iptal_belirteci,
+                    ilerleme_bildirimi=ilerleme_bildirimi
+                ).harmanla(
+                    ogrenciler,
+                    salonlar,
+                    sabit_ogrenciler=sabit_ogrenciler,
+                    salon_sira_haritasi=salon_sira_haritasi,
+                    onceki_yerlesim=onceki_yerlesim
+                )
+            self._calistirma_no += 1
+            calistirma_no = self._calistirma_no
+            self._iptal_olayi.clear()
+            self._kabul_olayi.clear()
+            iptal_olayi = self._iptal_olayi
+            kabul_olayi = self._kabul_olayi
+            kuyruk = self._ilerleme_kuyrugu
+            if iptal_belirteci is not None:
+                iptal_belirteci.kaydet(iptal_olayi.set)
+            try:
+                gelecek = executor.submit(
+                    _isci_harmanla,
+                    calistirma_no,
+                    config,
+                    ogrenciler,
+                    salonlar,
+                    sabit_ogrenciler,
+                    salon_sira_haritasi,
+                    onceki_yerlesim
+                )
+                while True:
+                    if iptal_belirteci is not None and iptal_belirteci.kabul_edildi:
+                        kabul_olayi.set()
+                    try:
+                        no, bilgi = kuyruk.get(timeout=0.1)
+                    except queue.Empty:
+                        if gelecek.done():
+                            break
+                        continue
+                    if no == calistirma_no and ilerleme_bildirimi is not None:
+                        ilerleme_bildirimi(bilgi)
+                try:
+                    return gelecek.result()
+                except BrokenProcessPool as exc:
+                    self._sifirla()
+                    raise RuntimeError("Harmanlama süreci beklenmedik şekilde sonlandı.") from exc
+            finally:
+                if iptal_belirteci is not None:
+                    iptal_belirteci.kaldir(iptal_olayi.set)
+
+    def _sifirla(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+        self._executor = None
+        self._ilerleme_kuyrugu = None
+        self._iptal_olayi = None
+        self._kabul_olayi = None
+
+    def kapat(self):
+        """İşçi sürecini sonlandır (uygulama kapanırken)"""
+        with self._kilit:
+            self._sifirla()
+
+
+_isci_instance: Optional[HarmanlamaIsciSureci] = None
+
+
+def get_harmanlama_isci() -> HarmanlamaIsciSureci:
+    """Global harmanlama işçi sürecini getir (Singleton)"""
+    global _isci_instance
+    if _isci_instance is None:
+        _isci_instance = HarmanlamaIsciSureci()
+        atexit.register(_isci_instance.kapat)
+    return _isci_instance
@@ -0,0 +1,185 @@
+"""
+Kelebek Sınav Sistemi - Portföy Harmanlama
+Aynı oturumu birkaç stratejiyle (sezgisel renklendirme, farklı tohumlu CP-SAT,
+öğretmen masalı gevşetilmiş model) aynı anda çözer; _validate_yerlesim'den
+geçen ilk yerleşimi döndürür ve diğerlerini iptal eder. Kazanan stratejiler
+kullanıcı veri dizininde sayılır.
+"""
+
+import dataclasses
+import json
+import os
+import queue
+import sys
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils import get_user_data_path
+from controllers.harmanlama_engine import HarmanlamaEngine, HarmanlamaConfig, IptalBelirteci
+
+
+Strateji = Tuple[str, Dict[str, Any]]
+
+# (ad, HarmanlamaConfig üzerine yazılacak alanlar)
+VARSAYILAN_STRATEJILER: List[Strateji] = [
+    ("sezgisel", {'sezgisel_once': True}),
+    ("cp-sat-tohum-1", {'sezgisel_once': False, 'cp_sat_tohumu': 1}),
+    ("cp-sat-tohum-2", {'sezgisel_once': False, 'cp_sat_tohumu': 2,
+                        'cp_sat_parametreleri': {'randomize_search': True}}),
+    ("gevsek-ogretmen-masasi", {'sezgisel_once': False, 'ogretmen_masasi_once': True}),
+]
+
+
+def varsayilan_kayit_dosyasi() -> str:
+    """Kazanan strateji sayaçlarının kullanıcı veri dizinindeki yolu"""
+    return get_user_data_path(os.path.join('cache', 'portfoy_kazananlar.json'))
+
+
+class PortfoyHarmanlama:
+    """
+    HarmanlamaEngine etrafında strateji yarışı. Her strateji kendi motoru ve
+    iptal belirteciyle ayrı bir iş parçacığında çalışır; CP-SAT aramaları GIL'i
+    bıraktığı için gerçekten paraleldir. Çekirdekler stratejiler arasında
+    paylaştırılır.
+    """
+
+    _kayit_kilidi = threading.Lock()
+
+    def __init__(self, config: Optional[HarmanlamaConfig] = None,
+                 stratejiler: Optional[List[Strateji]] = None,
+                 kayit_dosyasi: Optional[str] = None,
+                 iptal_belirteci: Optional[IptalBelirteci] = None,
+                 ilerleme_bildirimi: Optional[Callable[[Dict[str, Any]], None]] = None):
+        self.config = config or HarmanlamaConfig()
+        self.stratejiler = stratejiler or VARSAYILAN_STRATEJILER
+        self.kayit_dosyasi = kayit_dosyasi or varsayilan_kayit_dosyasi()
+        self.iptal_belirteci = iptal_belirteci
+        self.ilerleme_bildirimi = ilerleme_bildirimi
+
+    def _strateji_configi(self, degisiklikler: Dict[str, Any]) -> HarmanlamaConfig:
+        alanlar = dict(degisiklikler)
+        # Yarışan motorlar önbelleğe yazmaz; kazanan sonucu zaten döner. Stratejiler
+        # kendi ayarlarıyla yarışır, kurulum ayar profili onları değiştirmez.
+        alanlar['sonuc_onbellegi'] = False
+        alanlar['ayar_profili'] = None
+        if self.config.isci_sayisi is None:
+            alanlar['isci_sayisi'] = max(1, (os.cpu_count() or 1) // len(self.stratejiler))
+        return dataclasses.replace(self.config, **alanlar)
+
+    def harmanla(self, ogrenciler: List[Dict], salonlar: List[Dict],
+                 sabit_ogrenciler: Optional[List[Dict]] = None,
+                 salon_sira_haritasi: Optional[Dict[int, List[Dict]]] = None,
+                 onceki_yerlesim: Optional[List[Dict]] = None) -> Dict[str, Any]:
+        """HarmanlamaEngine.harmanla() ile aynı sonuç; ek olarak 'portfoy' bloğu taşır"""
+        baslangic = time.perf_counter()
+        sonuclar: "queue.Queue" = queue.Queue()
+
+        def _yaris(ad: str, config: HarmanlamaConfig, belirtec: IptalBelirteci):
+            def _bildir(bilgi):
+                if self.ilerleme_bildirimi is not None:
+                    self.ilerleme_bildirimi(dict(bilgi, strateji=ad))
+            engine = HarmanlamaEngine(config, iptal_belirteci=belirtec, ilerleme_bildirimi=_bildir)
+            try:
+                sonuc = engine.harmanla(
+                    ogrenciler,
+                    salonlar,
+                    sabit_ogrenciler=sabit_ogrenciler,
+                    salon_sira_haritasi=salon_sira_haritasi,
+                    onceki_yerlesim=onceki_yerlesim
+                )
+            except Exception as exc:
+                sonuc = {'basarili': False, 'hatalar': [f"❌ Kritik hata: {exc}"]}
+            sonuclar.put((ad, engine, sonuc, time.perf_counter() - baslangic))
+
+        belirtecler = [IptalBelirteci() for _ in self.stratejiler]
+
+        def _hepsini_iptal_et():
+            for belirtec in belirtecler:
+                belirtec.iptal_et()
+
+        # Dış iptal, yarış başlamadan önce bağlanır (önceden iptal edildiyse hemen yayılır)
+        if self.iptal_belirteci is not None:
+            self.iptal_belirteci.kaydet(_hepsini_iptal_et)
+        for (ad, degisiklik), belirtec in zip(self.stratejiler, belirtecler):
+            threading.Thread(
+                target=_yaris,
+                args=(ad, self._strateji_configi(degisiklik), belirtec),
+                daemon=True
+            ).start()
+
+        basarisizlar: Dict[str, List[str]] = {}
+        sureler: Dict[str, float] = {}
+        kazanan = None
+        try:
+            for _ in self.stratejiler:
+                ad, engine, sonuc, sure = sonuclar.get()
+                sureler[ad] = round(sure, 4)
+                if sonuc['basarili'] and self._gecerli_mi(engine, sonuc, salonlar, salon_sira_haritasi):
+                    kazanan = (ad, sonuc)
+                    break
+                basarisizlar[ad] = sonuc.get('hatalar') or ["⚠️ Yerleşim doğrulamadan geçmedi."]
+        finally:
+            _hepsini_iptal_et()
+            if self.iptal_belirteci is not None:
+                self.iptal_belirteci.kaldir(_hepsini_iptal_et)
+
+        portfoy = {
+            'kazanan': kazanan[0] if kazanan else None,
+            'sure': round(time.perf_counter() - baslangic, 4),
+            'stratejiler': [ad for ad, _ in self.stratejiler],
+            'sureler': sureler,
+            'basarisizlar': basarisizlar
+        }
+        if kazanan is None:
+            hatalar = [f"{ad}: {hata[0]}" for ad, hata in basarisizlar.items() if hata]
+            return {
+                'basarili': False,
+                'yerlesim': [],
+                'istatistikler': {},
+                'hatalar': hatalar,
+                'uyumsuzluklar': [],
+                'uyumsuzluk_var': False,
+                'portfoy': portfoy
+            }
+        ad, sonuc = kazanan
+        sonuc['istatistikler']['portfoy_kazanani'] = ad
+        if 'calisma' in sonuc:
+            sonuc['calisma']['portfoy_stratejisi'] = ad
+        sonuc['portfoy'] = portfoy
+        self._kazanani_kaydet(ad, portfoy['sure'])
+        return sonuc
+
+    def _gecerli_mi(self, engine: HarmanlamaEngine, sonuc: Dict[str, Any], salonlar: List[Dict],
+                    salon_sira_haritasi: Optional[Dict[int, List[Dict]]]) -> bool:
+        salon_sira_map = engine._hazirla_salon_sira_map(salonlar, salon_sira_haritasi)
+        return engine._validate_yerlesim(
+            sonuc['yerlesim'], 0, salon_sira_map, uyumsuzluklar=[], strict=False
+        )
+
+    def _kazanani_kaydet(self, ad: str, sure: float):
+        """Kazanan stratejiyi sayaç dosyasına işle (hata sessizce yutulur)"""
+        with self._kayit_kilidi:
+            kayitlar = self.kazanan_istatistikleri()
+            kayit = kayitlar.setdefault(ad, {'kazanma': 0, 'toplam_sure': 0.0})
+            kayit['kazanma'] += 1
+            kayit['toplam_sure'] = round(kayit['toplam_sure'] + sure, 4)
+            gecici = f"{self.kayit_dosyasi}.tmp"
+            try:
+                os.makedirs(os.path.dirname(self.kayit_dosyasi) or ".", exist_ok=True)
+                with open(gecici, 'w', encoding='utf-8') as dosya:
+                    json.dump(kayitlar, dosya, ensure_ascii=False, indent=2)
+                os.replace(gecici, self.kayit_dosyasi)
+            except OSError:
+                pass
+
+    def kazanan_istatistikleri(self) -> Dict[str, Dict[str, Any]]:
+        """{strateji: {'kazanma': n, 'toplam_sure': sn}} — hangi strateji ne sıklıkla kazanıyor"""
+        try:
+            with open(self.kayit_dosyasi, encoding='utf-8') as dosya:
+                kayitlar = json.load(dosya)
+        except (OSError, ValueError):
+            return {}
+        return kayitlar if isinstance(kayitlar, dict) else {}
@@ -0,0 +1,269 @@
+"""
+Kelebek Sınav Sistemi - Model Dökümü Tekrarı
+HarmanlamaConfig(model_dokumu=...) ile yazılan çözücü girdisini okulun
+veritabanı olmadan yeniden çözer: ön kontrol, sezgisel ve CP-SAT denemeleri
+aynı koltuk tablosu ve komşulukla, istenirse farklı ayarlarla tekrarlanır ve
+süreler dökümdeki özgün sürelerle yan yana yazdırılır.
+
+Kullanım:
+    python -m controllers.harmanlama_replay DOKUM.json.gz [--cozum-suresi 30]
+        [--isci 8] [--model ogrenci] [--tohum 3] [--param randomize_search=true]
+        [--tekrar 3] [--proto]
+"""
+
+import argparse
+import dataclasses
+import gzip
+import json
+import os
+import sys
+import time
+from typing import Any, Dict, List, Optional
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from controllers.harmanlama_engine import (HarmanlamaEngine, HarmanlamaConfig, KoltukTablosu,
+                                           OgrenciTablosu, MODEL_DOKUMU_SURUMU)
+
+
+def dokum_oku(yol: str) -> Dict[str, Any]:
+    """Model dökümünü oku (gzip'li veya düz JSON)"""
+    acici = gzip.open if yol.endswith('.gz') else open
+    with acici(yol, 'rt', encoding='utf-8') as dosya:
+        dokum = json.load(dosya)
+    if dokum.get('surum') != MODEL_DOKUMU_SURUMU:
+        raise ValueError(f"Desteklenmeyen döküm sürümü: {dokum.get('surum')}")
+    return dokum
+
+
+class DokumTekrari:
+    """
+    Tek bir dökümün tekrar oturumu. Sınıf sözlüğü dökümdeki sırayla yeniden
+    kurulur; böylece yasak maskelerindeki seviye kodları özgün koşuyla aynıdır.
+    Öğrenciler yalnızca sınıf kodlarından sentetik sözlüklerle üretilir.
+    """
+
+    def __init__(self, dokum: Dict[str, Any], degisiklikler: Optional[Dict[str, Any]] = None):
+        self.dokum = dokum
+        alanlar = {alan.name for alan in dataclasses.fields(HarmanlamaConfig)}
+        ayarlar = {ad: deger for ad, deger in dokum['config'].items() if ad in alanlar}
+        ayarlar.update(degisiklikler or {})
+        # Tekrar yeni döküm ya da sonuç önbelleği yazmaz; dökümdeki ayarlar zaten profilli haldedir
+        ayarlar.update(model_dokumu=None, sonuc_onbellegi=False, ayar_profili=None)
+        self.config = HarmanlamaConfig(**ayarlar)
+
+    def _engine(self) -> HarmanlamaEngine:
+        engine = HarmanlamaEngine(self.config)
+        for seviye in self.dokum['seviye_adlari']:
+            engine.sozluk.seviye_kodu(seviye)
+        for sinif, sube in self.dokum['siniflar']:
+            engine.sozluk.sinif_kodu(sinif, sube)
+        return engine
+
+    def _ogrenciler(self, engine: HarmanlamaEngine) -> OgrenciTablosu:
+        siniflar = self.dokum['siniflar']
+        return OgrenciTablosu([
+            {'id': idx + 1, 'sinif': siniflar[kod][0], 'sube': siniflar[kod][1]}
+            for idx, kod in enumerate(self.dokum['ogrenci_siniflari'])
+        ], engine.sozluk)
+
+    def _tablo(self, cozum: Optional[Dict[str, Any]] = None):
+        kaynak = cozum if cozum is not None and cozum.get('koltuklar') is not None else self.dokum
+        return (KoltukTablosu.kayittan(kaynak['koltuklar']),
+                {tuple(cift) for cift in kaynak['komsuluk']})
+
+    def on_kontrol(self) -> Dict[str, Any]:
+        """Fizibilite ön kontrolünü tekrarla (gereken öğretmen masası veya hata)"""
+        engine = self._engine()
+        tablo, komsuluk = self._tablo()
+        baslangic = time.perf_counter()
+        try:
+            gereken = engine._fizibilite_on_kontrol(
+                self._ogrenciler(engine), tablo, komsuluk, self.dokum['masa_sayisi']
+            )
+            durum = f"masa:{gereken}"
+        except RuntimeError as exc:
+            durum = f"HATA: {exc}"
+        return {'asama': 'on_kontrol', 'sure': round(time.perf_counter() - baslangic, 4), 'durum': durum}
+
+    def coz(self, cozum: Dict[str, Any]) -> Dict[str, Any]:
+        """Dökümdeki bir çözüm denemesini (sezgisel / cp-sat*) güncel ayarlarla tekrarla"""
+        engine = self._engine()
+        ogrenciler = self._ogrenciler(engine)
+        tablo, komsuluk = self._tablo(cozum)
+        onceki = {s_idx: seat_idx for s_idx, seat_idx in cozum.get('onceki') or []}
+        baslangic = time.perf_counter()
+        if cozum['asama'] == 'sezgisel':
+            secimler = engine._sezgisel_seviye_koltuklari(
+                {grade: len(liste) for grade, liste in engine._seviye_gruplari(ogrenciler).items()},
+                tablo,
+                komsuluk,
+                tercihler=engine._koltuk_tercihleri(ogrenciler, onceki),
+                tercih_zorunlu=self.config.artimli_mod == "sabit"
+            )
+            durum = "BULUNAMADI" if secimler is None else "BULUNDU"
+        else:
+            if self.config.cp_sat_modeli == "ogrenci":
+                engine._solve_cp_sat_ogrenci(ogrenciler, tablo, komsuluk, onceki)
+            else:
+                engine._solve_cp_sat_seviye(ogrenciler, tablo, komsuluk, onceki)
+            istatistik = engine._cozucu_istatistikleri
+            durum = istatistik[-1]['durum'] if istatistik else "MODEL_KURULMADI"
+        return {
+            'asama': cozum['asama'],
+            'sure': round(time.perf_counter() - baslangic, 4),
+            'durum': durum,
+            'cozucu': engine._cozucu_istatistikleri[-1] if engine._cozucu_istatistikleri else None
+        }
+
+    def proto_coz(self, cozum: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """Dökümdeki CP-SAT model protosunu olduğu gibi güncel çözücü ayarlarıyla çöz"""
+        metin = cozum.get('model_proto')
+        if not metin:
+            return None
+        engine = self._engine()
+        cp_model = engine._cp_model_yukle()
+        model = cp_model.CpModel()
+        proto = model.Proto()
+        if hasattr(proto, 'parse_text_format'):
+            proto.parse_text_format(metin)
+        else:
+            from google.protobuf import text_format
+            text_format.Parse(metin, proto)
+        baslangic = time.perf_counter()
+        engine._cp_sat_calistir(cp_model, model)
+        istatistik = engine._cozucu_istatistikleri[-1]
+        return {
+            'asama': f"{cozum['asama']} (proto)",
+            'sure': round(time.perf_counter() - baslangic, 4),
+            'durum': istatistik['durum'],
+            'cozucu': istatistik
+        }
+
+    def akis(self) -> Dict[str, Any]:
+        """
+        _cp_sat_assign akışını dökülen tablolar üzerinde güncel ayarlarla baştan
+        sona tekrarla: ön kontrol, (sezgisel_once ise) sezgisel, masasız CP-SAT
+        ve dökümde öğretmen masalı tablo varsa onunla CP-SAT. Salon ayrıştırması
+        dökülmediği için tekrarlanmaz.
+        """
+        engine = self._engine()
+        ogrenciler = self._ogrenciler(engine)
+        tablo, komsuluk = self._tablo()
+        cozumler = self.dokum['cozumler']
+        ilk = cozumler[0] if cozumler else {}
+        onceki = {s_idx: seat_idx for s_idx, seat_idx in ilk.get('onceki') or []}
+        masa_cozumu = next((c for c in cozumler if c.get('koltuklar') is not None), None)
+        baslangic = time.perf_counter()
+
+        def _sonuc(basarili: bool, cozum_yolu: Optional[str]) -> Dict[str, Any]:
+            return {
+                'basarili': basarili,
+                'cozum_yolu': cozum_yolu,
+                'sure': round(time.perf_counter() - baslangic, 4),
+                'cozucu': list(engine._cozucu_istatistikleri)
+            }
+
+        def _cp_sat(seat_data, adjacency) -> bool:
+            if self.config.cp_sat_modeli == "ogrenci":
+                atama = engine._solve_cp_sat_ogrenci(ogrenciler, seat_data, adjacency, onceki)
+            else:
+                atama = engine._solve_cp_sat_seviye(ogrenciler, seat_data, adjacency, onceki)
+            return atama is not None
+
+        try:
+            masa_ihtiyaci = engine._fizibilite_on_kontrol(
+                ogrenciler, tablo, komsuluk, self.dokum['masa_sayisi']
+            )
+        except RuntimeError:
+            return _sonuc(False, None)
+        if not masa_ihtiyaci:
+            if self.config.sezgisel_once and engine._sezgisel_seviye_koltuklari(
+                {grade: len(liste) for grade, liste in engine._seviye_gruplari(ogrenciler).items()},
+                tablo,
+                komsuluk,
+                tercihler=engine._koltuk_tercihleri(ogrenciler, onceki),
+                tercih_zorunlu=self.config.artimli_mod == "sabit"
+            ) is not None:
+                return _sonuc(True, "sezgisel")
+            if not self.config.ogretmen_masasi_once and _cp_sat(tablo, komsuluk):
+                return _sonuc(True, "cp-sat")
+        if masa_cozumu is not None and _cp_sat(*self._tablo(masa_cozumu)):
+            return _sonuc(True, "cp-sat-ogretmen-masasi")
+        return _sonuc(False, None)
+
+    def calistir(self, tekrar: int = 1, proto: bool = False) -> List[Dict[str, Any]]:
+        """Tüm denemeleri tekrar sayısı kadar çöz; her satır özgün süre/durumu da taşır"""
+        satirlar = [self.on_kontrol()]
+        for cozum in self.dokum['cozumler']:
+            for _ in range(max(1, tekrar)):
+                for sonuc in (self.coz(cozum), self.proto_coz(cozum) if proto else None):
+                    if sonuc is None:
+                        continue
+                    sonuc['ozgun_sure'] = cozum.get('sure')
+                    sonuc['ozgun_durum'] = cozum.get('durum')
+                    satirlar.append(sonuc)
+        return satirlar
+
+
+def _param_degeri(metin: str) -> Any:
+    try:
+        return json.loads(metin)
+    except ValueError:
+        return metin
+
+
+def _arguman_ayristir(argv: Optional[List[str]]) -> argparse.Namespace:
+    ayristirici = argparse.ArgumentParser(
+        description="Harmanlama model dökümünü yeniden çöz ve süreleri yazdır."
+    )
+    ayristirici.add_argument("dokum", help="model_dokumu ile yazılmış .json.gz dosyası")
+    ayristirici.add_argument("--cozum-suresi", type=float, help="CP-SAT süre bütçesi (sn)")
+    ayristirici.add_argument("--isci", type=int, help="CP-SAT arama işçisi sayısı")
+    ayristirici.add_argument("--model", choices=["seviye", "ogrenci"], help="CP-SAT model tipi")
+    ayristirici.add_argument("--tohum", type=int, help="CP-SAT arama tohumu")
+    ayristirici.add_argument("--ilk-cozumde-dur", action="store_true",
+                             help="İlk geçerli çözümde aramayı bırak")
+    ayristirici.add_argument("--param", action="append", default=[], metavar="AD=DEGER",
+                             help="Ek CP-SAT parametresi (tekrarlanabilir)")
+    ayristirici.add_argument("--tekrar", type=int, default=1, help="Her deneme kaç kez çözülsün")
+    ayristirici.add_argument("--proto", action="store_true",
+                             help="Dökümde model protosu varsa onu da olduğu gibi çöz")
+    return ayristirici.parse_args(argv)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    argumanlar = _arguman_ayristir(argv)
+    dokum = dokum_oku(argumanlar.dokum)
+    degisiklikler: Dict[str, Any] = {}
+    if argumanlar.cozum_suresi is not None:
+        degisiklikler['cozum_suresi'] = argumanlar.cozum_suresi
+    if argumanlar.isci is not None:
+        degisiklikler['isci_sayisi'] = argumanlar.isci
+    if argumanlar.model is not None:
+        degisiklikler['cp_sat_modeli'] = argumanlar.model
+    if argumanlar.tohum is not None:
+        degisiklikler['cp_sat_tohumu'] = argumanlar.tohum
+    if argumanlar.ilk_cozumde_dur:
+        degisiklikler['ilk_cozumde_dur'] = True
+    if argumanlar.param:
+        parametreler = dict(dokum['config'].get('cp_sat_parametreleri') or {})
+        for param in argumanlar.param:
+            ad, _, deger = param.partition('=')
+            parametreler[ad.strip()] = _param_degeri(deger.strip())
+        degisiklikler['cp_sat_parametreleri'] = parametreler
+
+    tekrar = DokumTekrari(dokum, degisiklikler)
+    print(f"📦 {argumanlar.dokum} ({dokum['tarih']}, çözüm yolu: {dokum.get('cozum_yolu')})")
+    print(f"   {len(dokum['ogrenci_siniflari'])} öğrenci, {len(dokum['koltuklar']['sira_nolari'])} koltuk, "
+          f"{len(dokum['komsuluk'])} komşu çifti, {len(dokum['cozumler'])} çözüm denemesi")
+    print(f"{'aşama':<32}{'süre (sn)':>12}{'özgün (sn)':>12}  durum")
+    for satir in tekrar.calistir(tekrar=argumanlar.tekrar, proto=argumanlar.proto):
+        ozgun = satir.get('ozgun_sure')
+        print(f"{satir['asama']:<32}{satir['sure']:>12.4f}"
+              f"{(f'{ozgun:.4f}' if ozgun is not None else '-'):>12}  {satir['durum']}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
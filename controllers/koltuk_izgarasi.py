@@ -0,0 +1,370 @@
+"""
+Kelebek Sınav Sistemi - Koltuk Izgarası
+Salon yerleşimlerini satır×sütun sınıf kodu dizisine çevirip yan/arka ve
+min_aralik kontrollerini tüm dizi üzerinde tek seferde yapar.
+NumPy yoksa aynı sonuçları veren saf Python yolu kullanılır.
+"""
+
+import sys
+import os
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils import TEACHER_DESK_BASE
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - numpy pandas ile birlikte gelir
+    np = None
+
+
+BOS = -1
+
+
+def _sinif_anahtari(yer: Dict) -> str:
+    return f"{yer['ogrenci_sinif']}-{yer['ogrenci_sube']}"
+
+
+class KoltukIzgarasi:
+    """
+    Aynı satır genişliğindeki salonların tek bir 2-B kod dizisinde birleşimi.
+    Her salon kendi satır bloğunu alır ve bloklar arasına bir boş satır konur;
+    böylece ön/arka karşılaştırması salon sınırını aşmaz. Boş ya da olmayan
+    koltuklar BOS (-1) değerini taşır.
+    """
+
+    def __init__(self, satir_genisligi: int, salonlar: List[Tuple[int, List[Tuple[int, int]]]]):
+        """salonlar: [(salon_id, [(sira_no, sinif_kodu), ...]), ...]"""
+        self.satir_genisligi = max(1, satir_genisligi)
+        self.salon_idleri: List[int] = []
+        self.satir_baslangiclari: List[int] = []
+        satir = 0
+        satirlar, sutunlar, kodlar = [], [], []
+        for salon_id, koltuklar in salonlar:
+            self.salon_idleri.append(salon_id)
+            self.satir_baslangiclari.append(satir)
+            en_son = 0
+            for sira_no, kod in koltuklar:
+                satirlar.append(satir + (sira_no - 1) // self.satir_genisligi)
+                sutunlar.append((sira_no - 1) % self.satir_genisligi)
+                kodlar.append(kod)
+                en_son = max(en_son, sira_no)
+            satir += (en_son + self.satir_genisligi - 1) // self.satir_genisligi + 1
+        self.satir_sayisi = max(1, satir)
+        if np is not None:
+            self.kodlar = np.full((self.satir_sayisi, self.satir_genisligi), BOS, dtype=np.int32)
+            if kodlar:
+                self.kodlar[np.asarray(satirlar), np.asarray(sutunlar)] = np.asarray(kodlar)
+        else:
+            self.kodlar = [[BOS] * self.satir_genisligi for _ in range(self.satir_sayisi)]
+            for r, c, kod in zip(satirlar, sutunlar, kodlar):
+                self.kodlar[r][c] = kod
+
+    def _konum(self, satir: int, sutun: int) -> Tuple[int, int]:
+        """Dizi konumu -> (salon_id, sira_no)"""
+        blok = 0
+        lo, hi = 0, len(self.satir_baslangiclari)
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self.satir_baslangiclari[mid] <= satir:
+                blok = mid
+                lo = mid + 1
+            else:
+                hi = mid
+        yerel_satir = satir - self.satir_baslangiclari[blok]
+        return self.salon_idleri[blok], yerel_satir * self.satir_genisligi + sutun + 1
+
+    def ayni_kodlu_komsular(self) -> List[Tuple[int, int, int, str]]:
+        """Aynı kodlu yan/arka komşu çiftleri: (salon_id, sira_no, komsu_sira_no, tur)"""
+        ciftler: List[Tuple[int, int, int, str]] = []
+        genislik = self.satir_genisligi
+        if np is not None:
+            a = self.kodlar
+            yan = (a[:, :-1] == a[:, 1:]) & (a[:, :-1] != BOS)
+            arka = (a[:-1, :] == a[1:, :]) & (a[:-1, :] != BOS)
+            for r, c in zip(*np.nonzero(yan)):
+                salon_id, sira_no = self._konum(int(r), int(c))
+                ciftler.append((salon_id, sira_no, sira_no + 1, 'yan'))
+            for r, c in zip(*np.nonzero(arka)):
+                salon_id, sira_no = self._konum(int(r), int(c))
+                ciftler.append((salon_id, sira_no, sira_no + genislik, 'arka'))
+        else:
+            a = self.kodlar
+            for r in range(self.satir_sayisi):
+                for c in range(genislik):
+                    kod = a[r][c]
+                    if kod == BOS:
+                        continue
+                    if c + 1 < genislik and a[r][c + 1] == kod:
+                        salon_id, sira_no = self._konum(r, c)
+                        ciftler.append((salon_id, sira_no, sira_no + 1, 'yan'))
+                    if r + 1 < self.satir_sayisi and a[r + 1][c] == kod:
+                        salon_id, sira_no = self._konum(r, c)
+                        ciftler.append((salon_id, sira_no, sira_no + genislik, 'arka'))
+        return ciftler
+
+
+def aralik_ihlalleri(salon_sirasi: List[int], kodlar: List[int], min_aralik: int) -> List[int]:
+    """
+    Salon içinde sıra numarasına göre dizilmiş koltuklarda, önceki min_aralik
+    koltuktan biriyle aynı koda sahip olanların dizideki indeksleri.
+    """
+    if min_aralik <= 1 or not kodlar:
+        return []
+    if np is not None:
+        kod = np.asarray(kodlar, dtype=np.int32)
+        salon = np.asarray(salon_sirasi, dtype=np.int32)
+        isaret = np.zeros(len(kod), dtype=bool)
+        for k in range(1, min(min_aralik, len(kod) - 1) + 1):
+            isaret[k:] |= (kod[k:] == kod[:-k]) & (salon[k:] == salon[:-k])
+        return np.nonzero(isaret)[0].tolist()
+    sonuc = []
+    for i in range(len(kodlar)):
+        for k in range(1, min_aralik + 1):
+            j = i - k
+            if j < 0 or salon_sirasi[j] != salon_sirasi[i]:
+                break
+            if kodlar[j] == kodlar[i]:
+                sonuc.append(i)
+                break
+    return sonuc
+
+
+def yerlesim_ihlalleri(yerlesim: Iterable[Dict], satir_genislikleri: Dict[int, int],
+                       varsayilan_genislik: int = 2, min_aralik: int = 0,
+                       anahtar: Callable[[Dict], Any] = _sinif_anahtari,
+                       adlandir: Optional[Callable[[Any], str]] = None) -> List[Dict]:
+    """
+    Yerleşimdeki kural ihlallerini yapısal kayıtlar olarak döndür.
+    anahtar satırın sınıf anahtarını (ör. SinifSozlugu kodu) verir; adlandir
+    verilirse kayıtlardaki 'sinif' alanı bu anahtardan üretilir.
+    Kayıt: {'tur': 'yan' | 'arka' | 'aralik', 'salon_id', 'salon_adi', 'sira_no',
+    'komsu_sira_no', 'sinif'}. Öğretmen masaları hesaba katılmaz. Kayıtlar
+    salonların yerleşimde ilk görünme sırasına ve sıra numarasına göre dizilir.
+    """
+    salon_sirasi: Dict[int, int] = {}
+    salon_adlari: Dict[int, str] = {}
+    kod_tablosu: Dict[str, int] = {}
+    koltuklar: Dict[int, List[Tuple[int, int]]] = {}
+    for yer in yerlesim:
+        sira_no = yer['sira_no']
+        if yer.get('ogretmen_masasi') or sira_no >= TEACHER_DESK_BASE:
+            continue
+        salon_id = yer['salon_id']
+        if salon_id not in salon_sirasi:
+            salon_sirasi[salon_id] = len(salon_sirasi)
+            salon_adlari[salon_id] = yer.get('salon_adi', '')
+            koltuklar[salon_id] = []
+        kod = kod_tablosu.setdefault(anahtar(yer), len(kod_tablosu))
+        koltuklar[salon_id].append((sira_no, kod))
+    if not koltuklar:
+        return []
+    kod_adlari = {
+        kod: (adlandir(ad) if adlandir is not None else ad) for ad, kod in kod_tablosu.items()
+    }
+
+    def _kayit(tur, salon_id, sira_no, komsu_no, kod):
+        return {
+            'tur': tur,
+            'salon_id': salon_id,
+            'salon_adi': salon_adlari[salon_id],
+            'sira_no': sira_no,
+            'komsu_sira_no': komsu_no,
+            'sinif': kod_adlari[kod]
+        }
+
+    genislik_gruplari: Dict[int, List[Tuple[int, List[Tuple[int, int]]]]] = {}
+    for salon_id, liste in koltuklar.items():
+        genislik = satir_genislikleri.get(salon_id) or varsayilan_genislik
+        genislik_gruplari.setdefault(max(1, genislik), []).append((salon_id, liste))
+
+    kayitlar: List[Dict] = []
+    for genislik, salonlar in genislik_gruplari.items():
+        izgara = KoltukIzgarasi(genislik, salonlar)
+        kod_haritasi = {(sid, no): kod for sid, liste in salonlar for no, kod in liste}
+        for salon_id, sira_no, komsu_no, tur in izgara.ayni_kodlu_komsular():
+            kayitlar.append(_kayit(tur, salon_id, sira_no, komsu_no, kod_haritasi[(salon_id, sira_no)]))
+
+    if min_aralik and min_aralik > 1:
+        sirali = sorted(
+            ((salon_sirasi[sid], no, kod, sid) for sid, liste in koltuklar.items() for no, kod in liste)
+        )
+        indeksler = aralik_ihlalleri([s[0] for s in sirali], [s[2] for s in sirali], min_aralik)
+        for i in indeksler:
+            _, sira_no, kod, salon_id = sirali[i]
+            kayitlar.append(_kayit('aralik', salon_id, sira_no, None, kod))
+
+    tur_sirasi = {'yan': 0, 'arka': 0, 'aralik': 1}
+    kayitlar.sort(key=lambda k: (salon_sirasi[k['salon_id']], tur_sirasi[k['tur']], k['sira_no']))
+    return kayitlar
+
+
+Konum = Tuple[int, int]  # (salon_id, sira_no)
+
+
+class YerlesimDenetleyici:
+    """
+    Elle yapılan takas/taşıma hamleleri için artımlı kural denetimi.
+    Salon başına sıra no -> sınıf anahtarı indeksi tutar; bir hamle yalnızca iki
+    koltuğun yan/ön/arka komşularına bakılarak (O(derece)) değerlendirilir.
+    Kayıtlar yerlesim_ihlalleri ile aynı biçimdedir ('yan' | 'arka').
+    """
+
+    def __init__(self, yerlesim: Iterable[Dict], satir_genislikleri: Dict[int, int],
+                 varsayilan_genislik: int = 2,
+                 anahtar: Callable[[Dict], Any] = _sinif_anahtari,
+                 adlandir: Optional[Callable[[Any], str]] = None):
+        self.satir_genislikleri = satir_genislikleri
+        self.varsayilan_genislik = varsayilan_genislik
+        self.anahtar = anahtar
+        self.adlandir = adlandir
+        self.salon_adlari: Dict[int, str] = {}
+        self._kodlar: Dict[int, Dict[int, Any]] = {}
+        self._satirlar: Dict[Konum, Dict] = {}
+        for yer in yerlesim:
+            salon_id, sira_no = yer['salon_id'], yer['sira_no']
+            self.salon_adlari.setdefault(salon_id, yer.get('salon_adi', ''))
+            self._satirlar[(salon_id, sira_no)] = yer
+            if not self._masa_mi(yer):
+                self._kodlar.setdefault(salon_id, {})[sira_no] = anahtar(yer)
+
+    @staticmethod
+    def _masa_mi(yer: Dict) -> bool:
+        return bool(yer.get('ogretmen_masasi')) or yer['sira_no'] >= TEACHER_DESK_BASE
+
+    def _genislik(self, salon_id: int) -> int:
+        return max(1, self.satir_genislikleri.get(salon_id) or self.varsayilan_genislik)
+
+    def komsular(self, salon_id: int, sira_no: int) -> List[Tuple[int, str]]:
+        """(komsu_sira_no, tur) — sol, sağ, ön, arka; salon sınırı ve satır sonu gözetilir"""
+        genislik = self._genislik(salon_id)
+        satir = (sira_no - 1) // genislik
+        sonuc = []
+        if sira_no - 1 >= 1 and (sira_no - 2) // genislik == satir:
+            sonuc.append((sira_no - 1, 'yan'))
+        if sira_no // genislik == satir:
+            sonuc.append((sira_no + 1, 'yan'))
+        if sira_no - genislik >= 1:
+            sonuc.append((sira_no - genislik, 'arka'))
+        sonuc.append((sira_no + genislik, 'arka'))
+        return sonuc
+
+    def dolu_siralar(self, salon_id: int) -> List[int]:
+        """Salonda öğrenci oturan (öğretmen masası dışı) sıra numaraları"""
+        return sorted(self._kodlar.get(salon_id, {}))
+
+    def yer(self, konum: Konum) -> Optional[Dict]:
+        """Konumda oturan öğrencinin satırı (boşsa None)"""
+        return self._satirlar.get(konum)
+
+    def takas_ihlalleri(self, a: Konum, b: Konum) -> List[Dict]:
+        """
+        a ile b koltuklarındaki öğrenciler yer değiştirirse bu iki koltukta oluşacak
+        ihlaller. Koltuklardan biri boşsa hamle taşımadır. Hamle uygulanmaz.
+        """
+        if a == b:
+            return []
+        return self.atama_ihlalleri({a: self._ogrenci_kodu(b), b: self._ogrenci_kodu(a)})
+
+    def atama_ihlalleri(self, yeni: Dict[Konum, Any]) -> List[Dict]:
+        """
+        Koltuklara verilen anahtarlar (None: boş) birlikte uygulanırsa bu koltuklarda
+        oluşacak ihlaller; diğer koltuklar mevcut hâliyle okunur. Hamle zincirleri
+        için genel biçim, takas_ihlalleri iki koltuklu özel hâlidir.
+        """
+        kayitlar: List[Dict] = []
+        gorulen = set()
+        for konum, kod in yeni.items():
+            if kod is None or konum[1] >= TEACHER_DESK_BASE:
+                continue
+            salon_id, sira_no = konum
+            for komsu_no, tur in self.komsular(salon_id, sira_no):
+                komsu = (salon_id, komsu_no)
+                komsu_kod = yeni[komsu] if komsu in yeni else self._kod(komsu)
+                cift = (salon_id, min(sira_no, komsu_no), max(sira_no, komsu_no))
+                if komsu_kod != kod or cift in gorulen:
+                    continue
+                gorulen.add(cift)
+                kayitlar.append({
+                    'tur': tur,
+                    'salon_id': salon_id,
+                    'salon_adi': self.salon_adlari.get(salon_id, ''),
+                    'sira_no': cift[1],
+                    'komsu_sira_no': cift[2],
+                    'sinif': self.adlandir(kod) if self.adlandir is not None else kod
+                })
+        return kayitlar
+
+    def takas_gecerli_mi(self, a: Konum, b: Konum) -> bool:
+        return not self.takas_ihlalleri(a, b)
+
+    def takas_et(self, a: Konum, b: Konum, salon_adi: Optional[str] = None) -> List[Dict]:
+        """
+        Hamleyi indekse ve satırlara uygula (kural denetimi yapmaz).
+        Konumu değişen satırları döndürür; salon_adi boş hedef salonun adıdır.
+        """
+        if a == b:
+            return []
+        yer_a, yer_b = self._satirlar.pop(a, None), self._satirlar.pop(b, None)
+        for konum in (a, b):
+            self._kodlar.get(konum[0], {}).pop(konum[1], None)
+            if salon_adi is not None:
+                self.salon_adlari.setdefault(konum[0], salon_adi)
+        degisen = []
+        for yer, hedef in ((yer_a, b), (yer_b, a)):
+            if yer is None:
+                continue
+            salon_id, sira_no = hedef
+            yer['salon_id'] = salon_id
+            yer['sira_no'] = sira_no
+            if sira_no < TEACHER_DESK_BASE:
+                yer.pop('ogretmen_masasi', None)
+                yer.pop('sira_label', None)
+            yer['salon_adi'] = self.salon_adlari.get(salon_id, yer.get('salon_adi', ''))
+            self._satirlar[hedef] = yer
+            if not self._masa_mi(yer):
+                self._kodlar.setdefault(salon_id, {})[sira_no] = self.anahtar(yer)
+            degisen.append(yer)
+        return degisen
+
+    def yerlestir(self, yer: Dict, konum: Konum, salon_adi: Optional[str] = None) -> Dict:
+        """Satırı boş koltuğa yaz ve indekse ekle (kural denetimi yapmaz)"""
+        if konum in self._satirlar:
+            raise ValueError(f"{konum} koltuğu dolu")
+        salon_id, sira_no = konum
+        if salon_adi is not None:
+            self.salon_adlari.setdefault(salon_id, salon_adi)
+        yer['salon_id'] = salon_id
+        yer['sira_no'] = sira_no
+        yer['salon_adi'] = self.salon_adlari.get(salon_id, yer.get('salon_adi', ''))
+        self._satirlar[konum] = yer
+        if not self._masa_mi(yer):
+            self._kodlar.setdefault(salon_id, {})[sira_no] = self.anahtar(yer)
+        return yer
+
+    def cikar(self, konum: Konum) -> Optional[Dict]:
+        """Koltuğu boşalt; oradaki satırı döndür"""
+        self._kodlar.get(konum[0], {}).pop(konum[1], None)
+        return self._satirlar.pop(konum, None)
+
+    def _kod(self, konum: Konum) -> Any:
+        return self._kodlar.get(konum[0], {}).get(konum[1])
+
+    def _ogrenci_kodu(self, konum: Konum) -> Any:
+        """Konumdaki öğrencinin anahtarı (öğretmen masasındaki öğrenci dahil)"""
+        yer = self._satirlar.get(konum)
+        return self.anahtar(yer) if yer is not None else None
+
+
+def ihlal_mesaji(kayit: Dict) -> str:
+    """Yapısal ihlal kaydını log/uyumsuzluk metnine çevir"""
+    if kayit['tur'] == 'aralik':
+        return (
+            f"⚠️ {kayit['salon_adi']} salonunda {kayit['sira_no']}. sıraya "
+            f"çok yakın başka bir {kayit['sinif']} öğrencisi yerleşmiş."
+        )
+    return (
+        f"⚠️ {kayit['salon_adi']} salonunda {kayit['sira_no']}. sıranın "
+        f"yanında/arkasında aynı sınıftan öğrenci bulundu ({kayit['sinif']})."
+    )
@@ -0,0 +1,326 @@
+"""
+Kelebek Sınav Sistemi - Toplu Oturum Harmanlaması
+Bir sınav haftasındaki tüm oturumları (aynı tarih/saat/ders saatindeki sınavlar)
+tek çağrıda harmanlar: oturumlar ayrı süreçlerde paralel çözülür, tüm
+yerleşimler tek veritabanı işleminde kaydedilir.
+"""
+
+import dataclasses
+import multiprocessing
+import sys
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from controllers.harmanlama_engine import HarmanlamaEngine, HarmanlamaConfig, IptalBelirteci
+
+
+OturumAnahtari = Tuple[Any, ...]
+
+
+def oturum_anahtari(sinav: Dict) -> OturumAnahtari:
+    """
+    Sınavın oturumu: (sinav_tarihi, sinav_saati, kacinci_ders).
+    Tarih/saat/ders saati bilgisi olmayan sınav kendi başına bir oturumdur.
+    """
+    anahtar = (sinav.get('sinav_tarihi'), sinav.get('sinav_saati'), sinav.get('kacinci_ders'))
+    if all(deger in (None, '') for deger in anahtar):
+        return (None, None, None, sinav['id'])
+    return anahtar
+
+
+def oturum_etiketi(anahtar: OturumAnahtari) -> str:
+    """Oturum anahtarının kullanıcıya gösterilecek metni"""
+    if anahtar[:3] == (None, None, None):
+        return f"Sınav #{anahtar[3]}"
+    tarih, saat, ders_no = anahtar[:3]
+    parcalar = [str(tarih or '-'), str(saat or '-')]
+    if ders_no:
+        parcalar.append(f"{ders_no}. ders")
+    return " ".join(parcalar)
+
+
+def oturumlari_grupla(sinavlar: List[Dict]) -> List[Dict[str, Any]]:
+    """Sınavları oturumlara ayır; oturumlar tarih/saat sırasıyla döner"""
+    gruplar: Dict[OturumAnahtari, List[Dict]] = {}
+    for sinav in sinavlar:
+        gruplar.setdefault(oturum_anahtari(sinav), []).append(sinav)
+    oturumlar = []
+    for anahtar, grup in gruplar.items():
+        salon_ids: List[int] = []
+        for sinav in grup:
+            for salon_id in sinav.get('secili_salonlar') or []:
+                if salon_id not in salon_ids:
+                    salon_ids.append(salon_id)
+        oturumlar.append({
+            'anahtar': anahtar,
+            'etiket': oturum_etiketi(anahtar),
+            'sinavlar': grup,
+            'salon_ids': salon_ids
+        })
+    oturumlar.sort(key=lambda o: tuple('' if d is None else str(d) for d in o['anahtar']))
+    return oturumlar
+
+
+# İşçi sürecinde initializer ile kalıtılan iptal olayı
+_iptal_olayi = None
+
+
+def _oturum_iscisi_baslat(iptal_olayi):
+    """ProcessPoolExecutor initializer: havuzun iptal olayını işçi sürecine aktar"""
+    global _iptal_olayi
+    _iptal_olayi = iptal_olayi
+
+
+def _oturum_coz(paket: Dict[str, Any],
+                iptal_belirteci: Optional[IptalBelirteci] = None) -> Dict[str, Any]:
+    """
+    Tek oturumu harmanla (modül düzeyinde: pickle edilebilir). Bu süreçte çağıranın
+    belirteci, işçi süreçte havuzun iptal olayı çalışan aramayı keser.
+    """
+    baslangic = time.perf_counter()
+    bitti = threading.Event()
+    if iptal_belirteci is None:
+        iptal_belirteci = IptalBelirteci()
+        if _iptal_olayi is not None:
+            def _iptali_izle():
+                # Olayda beklenmez, yoklanır: süreç beklerken sonlanırsa olayın
+                # koşul değişkeni sonraki set() çağrısını kilitleyebilir
+                while not bitti.wait(0.1):
+                    if _iptal_olayi.is_set():
+                        iptal_belirteci.iptal_et()
+                        return
+
+            if _iptal_olayi.is_set():
+                iptal_belirteci.iptal_et()
+            else:
+                threading.Thread(target=_iptali_izle, daemon=True).start()
+    try:
+        engine = HarmanlamaEngine(paket['config'], iptal_belirteci=iptal_belirteci)
+        sonuc = engine.harmanla(
+            paket['ogrenciler'],
+            paket['salonlar'],
+            sabit_ogrenciler=paket['sabit_ogrenciler'],
+            salon_sira_haritasi=paket['salon_sira_haritasi']
+        )
+    finally:
+        bitti.set()
+    sonuc['sure'] = round(time.perf_counter() - baslangic, 4)
+    return sonuc
+
+
+class TopluHarmanlamaEngine:
+    """
+    Sınav haftası planlayıcısı. harmanla() seçili (varsayılan: tüm aktif)
+    sınavları oturumlara ayırır, her oturumun öğrenci havuzunu tek sorguyla
+    kurar, oturumları süreç havuzunda çözer ve başarılı yerleşimleri tek
+    işlemde kaydeder.
+    """
+
+    def __init__(self, db=None, config: Optional[HarmanlamaConfig] = None):
+        if db is None:
+            from controllers.database_manager import get_db
+            db = get_db()
+        self.db = db
+        self.config = config or HarmanlamaConfig()
+
+    def harmanla(self, sinav_ids: Optional[List[int]] = None, kaydet: bool = True,
+                 surec_sayisi: Optional[int] = None,
+                 ilerleme_bildirimi: Optional[Callable[[Dict[str, Any]], None]] = None,
+                 iptal_belirteci: Optional[IptalBelirteci] = None) -> Dict[str, Any]:
+        """
+        Tüm oturumları harmanla ve birleşik özet döndür.
+        surec_sayisi: paralel süreç sayısı (None: çekirdek sayısı, 1: bu süreçte sırayla).
+        ilerleme_bildirimi her oturum bittiğinde {'oturum', 'tamamlanan', 'toplam',
+        'basarili', 'ogrenci_sayisi', 'sure'} sözlüğüyle çağrılır.
+        """
+        baslangic = time.perf_counter()
+        sinavlar = self.db.sinavlari_listele()
+        if sinav_ids is not None:
+            secili = set(sinav_ids)
+            sinavlar = [sinav for sinav in sinavlar if sinav['id'] in secili]
+        oturumlar = oturumlari_grupla(sinavlar)
+        paketler = self._paketleri_hazirla(oturumlar)
+
+        cozulecek = [i for i, paket in enumerate(paketler) if paket['hata'] is None]
+        surec_sayisi = min(len(cozulecek), surec_sayisi or os.cpu_count() or 1)
+        config = self.config
+        if surec_sayisi > 1 and config.isci_sayisi is None:
+            # Çekirdekler oturum süreçleri arasında paylaşılır
+            config = dataclasses.replace(
+                config, isci_sayisi=max(1, (os.cpu_count() or 1) // surec_sayisi)
+            )
+        for i in cozulecek:
+            paketler[i]['config'] = config
+
+        sonuclar: Dict[int, Dict[str, Any]] = {}
+        tamamlanan = 0
+
+        def _bitti(i: int, sonuc: Dict[str, Any]):
+            nonlocal tamamlanan
+            sonuclar[i] = sonuc
+            tamamlanan += 1
+            if ilerleme_bildirimi is not None:
+                ilerleme_bildirimi({
+                    'oturum': oturumlar[i]['etiket'],
+                    'tamamlanan': tamamlanan,
+                    'toplam': len(cozulecek),
+                    'basarili': sonuc['basarili'],
+                    'ogrenci_sayisi': len(paketler[i]['ogrenciler']),
+                    'sure': sonuc.get('sure')
+                })
+
+        iptal_edildi = False
+        if surec_sayisi > 1:
+            iptal_edildi = self._paralel_coz(paketler, cozulecek, surec_sayisi, _bitti, iptal_belirteci)
+        else:
+            iptal_edildi = self._sirayla_coz(paketler, cozulecek, _bitti, iptal_belirteci)
+
+        ozet = self._ozet_olustur(oturumlar, paketler, sonuclar)
+        ozet['iptal_edildi'] = iptal_edildi
+        ozet['kaydedilen'] = 0
+        if kaydet and not iptal_edildi:
+            sinav_yerlesimleri: Dict[int, List[Dict]] = {}
+            calismalar: List[Dict[str, Any]] = []
+            for i, sonuc in sonuclar.items():
+                if not sonuc['basarili']:
+                    continue
+                if sonuc.get('calisma') is not None:
+                    calismalar.append(dict(
+                        sonuc['calisma'],
+                        sinav_idleri=[sinav['id'] for sinav in oturumlar[i]['sinavlar']]
+                    ))
+                for sinav in oturumlar[i]['sinavlar']:
+                    sinav_yerlesimleri.setdefault(sinav['id'], [])
+                for yer in sonuc['yerlesim']:
+                    sinav_yerlesimleri.setdefault(yer.get('sinav_id'), []).append(yer)
+            sinav_yerlesimleri.pop(None, None)
+            if sinav_yerlesimleri:
+                ozet['kaydedilen'] = self.db.yerlesimleri_kaydet(sinav_yerlesimleri, calismalar)
+        ozet['toplam_sure'] = round(time.perf_counter() - baslangic, 4)
+        return ozet
+
+    def _paketleri_hazirla(self, oturumlar: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Her oturum için öğrenci havuzu, salonlar ve sıra haritasını hazırla"""
+        salon_map = {salon['id']: salon for salon in self.db.salonlari_listele()}
+        tum_salon_ids = sorted({sid for oturum in oturumlar for sid in oturum['salon_ids']
+                                if sid in salon_map})
+        sira_haritasi = self.db.salon_sira_haritasi(tum_salon_ids)
+        paketler = []
+        for oturum in oturumlar:
+            havuz = self.db.oturum_ogrenci_havuzu(oturum['sinavlar'])
+            salonlar = [salon_map[sid] for sid in oturum['salon_ids'] if sid in salon_map]
+            hata = None
+            if not havuz['tum']:
+                hata = "❌ Oturumdaki sınavlarda öğrenci bulunamadı."
+            elif not salonlar:
+                hata = "❌ Oturum için aktif salon seçilmemiş."
+            paketler.append({
+                'ogrenciler': havuz['tum'],
+                'sabit_ogrenciler': havuz['sabit'],
+                'salonlar': salonlar,
+                'salon_sira_haritasi': {
+                    salon['id']: sira_haritasi.get(salon['id'], []) for salon in salonlar
+                },
+                'cakisan': havuz['cakisan'],
+                'hata': hata
+            })
+        return paketler
+
+    def _sirayla_coz(self, paketler: List[Dict[str, Any]], cozulecek: List[int],
+                     bitti: Callable[[int, Dict[str, Any]], None],
+                     iptal_belirteci: Optional[IptalBelirteci]) -> bool:
+        """
+        Oturumları bu süreçte sırayla çöz; belirteç çalışan aramayı da keser.
+        İptal edildiyse True döndürür; yarıda kalan oturum sonuçlara yazılmaz.
+        """
+        for i in cozulecek:
+            if iptal_belirteci is not None and iptal_belirteci.iptal_edildi:
+                return True
+            sonuc = _oturum_coz(paketler[i], iptal_belirteci)
+            if iptal_belirteci is not None and iptal_belirteci.iptal_edildi:
+                return True
+            bitti(i, sonuc)
+        return False
+
+    def _paralel_coz(self, paketler: List[Dict[str, Any]], cozulecek: List[int],
+                     surec_sayisi: int, bitti: Callable[[int, Dict[str, Any]], None],
+                     iptal_belirteci: Optional[IptalBelirteci]) -> bool:
+        """
+        Oturumları süreç havuzunda çöz; iptal edildiyse True döndür. İptal bekleyen
+        oturumları düşürür ve çalışanları işçilerin izlediği olayla durdurur.
+        """
+        baglam = multiprocessing.get_context("spawn")
+        try:
+            iptal_olayi = baglam.Event()
+            executor = ProcessPoolExecutor(
+                max_workers=surec_sayisi,
+                mp_context=baglam,
+                initializer=_oturum_iscisi_baslat,
+                initargs=(iptal_olayi,)
+            )
+        except OSError:
+            # Süreç açılamıyorsa (kısıtlı ortam) oturumları bu süreçte sırayla çöz
+            return self._sirayla_coz(paketler, cozulecek, bitti, iptal_belirteci)
+        if iptal_belirteci is not None:
+            iptal_belirteci.kaydet(iptal_olayi.set)
+        try:
+            bekleyen = {executor.submit(_oturum_coz, paketler[i]): i for i in cozulecek}
+            while bekleyen:
+                if iptal_belirteci is not None and iptal_belirteci.iptal_edildi:
+                    return True
+                biten, _ = wait(bekleyen, timeout=0.1, return_when=FIRST_COMPLETED)
+                for gelecek in biten:
+                    i = bekleyen.pop(gelecek)
+                    try:
+                        sonuc = gelecek.result()
+                    except BrokenProcessPool as exc:
+                        raise RuntimeError("Harmanlama süreci beklenmedik şekilde sonlandı.") from exc
+                    bitti(i, sonuc)
+            return False
+        finally:
+            if iptal_belirteci is not None:
+                iptal_belirteci.kaldir(iptal_olayi.set)
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    def _ozet_olustur(self, oturumlar: List[Dict[str, Any]], paketler: List[Dict[str, Any]],
+                      sonuclar: Dict[int, Dict[str, Any]]) -> Dict[str, Any]:
+        """Oturum sonuçlarından birleşik özet"""
+        satirlar = []
+        for i, (oturum, paket) in enumerate(zip(oturumlar, paketler)):
+            sonuc = sonuclar.get(i)
+            if paket['hata'] is not None:
+                hatalar = [paket['hata']]
+            elif sonuc is None:
+                hatalar = ["⏹️ Oturum çözülmeden iptal edildi."]
+            else:
+                hatalar = list(sonuc['hatalar'])
+            satirlar.append({
+                'oturum': oturum['etiket'],
+                'anahtar': oturum['anahtar'],
+                'sinav_ids': [sinav['id'] for sinav in oturum['sinavlar']],
+                'sinav_adlari': [sinav['sinav_adi'] for sinav in oturum['sinavlar']],
+                'ogrenci_sayisi': len(paket['ogrenciler']),
+                'salon_sayisi': len(paket['salonlar']),
+                'cakisan': paket['cakisan'],
+                'basarili': bool(sonuc and sonuc['basarili']),
+                'yerlestirilen': len(sonuc['yerlesim']) if sonuc else 0,
+                'uyumsuzluk_sayisi': len(sonuc['uyumsuzluklar']) if sonuc else 0,
+                'cozum_yolu': (sonuc.get('istatistikler') or {}).get('cozum_yolu') if sonuc else None,
+                'sure': sonuc.get('sure') if sonuc else None,
+                'hatalar': hatalar
+            })
+        return {
+            'basarili': bool(satirlar) and all(satir['basarili'] for satir in satirlar),
+            'oturumlar': satirlar,
+            'oturum_sayisi': len(satirlar),
+            'basarisiz_oturum': sum(1 for satir in satirlar if not satir['basarili']),
+            'toplam_ogrenci': sum(satir['ogrenci_sayisi'] for satir in satirlar),
+            'yerlestirilen': sum(satir['yerlestirilen'] for satir in satirlar),
+            'uyumsuzluk_sayisi': sum(satir['uyumsuzluk_sayisi'] for satir in satirlar),
+        }
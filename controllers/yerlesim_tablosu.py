@@ -0,0 +1,211 @@
+"""
+Kelebek Sınav Sistemi - Sütunlu Yerleşim Sonucu
+harmanla() sonucundaki yerleşimi satır sözlükleri yerine paralel dizilerde
+tutar. Eski liste gibi dolaşılır ve indekslenir (satırlar istendikçe sözlüğe
+çevrilir); dataframe() sütunları satır satır dolaşmadan pandas'a verir.
+"""
+
+from array import array
+from collections.abc import Sequence
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+
+# Sütunlarda tutulan anahtarlar; diğerleri (sabit_konum, sira_label...) seyrek eklerde durur
+_SUTUN_ANAHTARLARI = frozenset({
+    'ogrenci_id', 'salon_id', 'sira_no', 'ogrenci_sinif', 'ogrenci_sube',
+    'salon_adi', 'sabit_mi', 'sinav_id', 'sinav_adi'
+})
+
+
+class YerlesimTablosu(Sequence):
+    """
+    Yerleşimin sütunlu biçimi.
+    ogrenci_idleri/salon_idleri/sira_nolari satır başına değerlerdir; sinif_kodlari
+    siniflar[(sinif, sube)], sinav_kodlari sinavlar[(sinav_id, sinav_adi)] tablosuna
+    işaret eder; sabit ve ogretmen bayraklardır. Salon adları salon_id başına bir kez
+    saklanır.
+    """
+
+    __slots__ = ('ogrenci_idleri', 'salon_idleri', 'sira_nolari', 'sinif_kodlari',
+                 'sinav_kodlari', 'sabit', 'ogretmen', 'siniflar', 'sinavlar',
+                 'salon_adlari', 'ekler', '_sinif_indeksi', '_sinav_indeksi')
+
+    def __init__(self, satirlar: Optional[Iterable[Dict]] = None):
+        self.ogrenci_idleri = array('q')
+        self.salon_idleri = array('i')
+        self.sira_nolari = array('i')
+        self.sinif_kodlari = array('i')
+        self.sinav_kodlari = array('i')
+        self.sabit = array('b')
+        self.ogretmen = array('b')
+        self.siniflar: List[Tuple[Any, Any]] = []
+        self.sinavlar: List[Tuple[Any, Any]] = []
+        self.salon_adlari: Dict[int, str] = {}
+        self.ekler: Dict[int, Dict[str, Any]] = {}  # satır indeksi -> sütun dışı alanlar
+        self._sinif_indeksi: Dict[Tuple[Any, Any], int] = {}
+        self._sinav_indeksi: Dict[Tuple[Any, Any], int] = {}
+        if satirlar is not None:
+            self.extend(satirlar)
+
+    # ------------------------------------------------------------ liste davranışı
+    def __len__(self) -> int:
+        return len(self.ogrenci_idleri)
+
+    def __getitem__(self, idx):
+        if isinstance(idx, slice):
+            return [self._satir(i) for i in range(*idx.indices(len(self)))]
+        if idx < 0:
+            idx += len(self)
+        if not 0 <= idx < len(self):
+            raise IndexError("yerleşim indeksi aralık dışında")
+        return self._satir(idx)
+
+    def __iter__(self):
+        for idx in range(len(self)):
+            yield self._satir(idx)
+
+    def __eq__(self, other) -> bool:
+        if isinstance(other, (YerlesimTablosu, list, tuple)):
+            return len(self) == len(other) and list(self) == list(other)
+        return NotImplemented
+
+    def __repr__(self) -> str:
+        return f"YerlesimTablosu({len(self)} satır, {len(self.salon_adlari)} salon)"
+
+    def append(self, yer: Dict):
+        idx = len(self)
+        salon_id = yer['salon_id']
+        self.ogrenci_idleri.append(yer['ogrenci_id'])
+        self.salon_idleri.append(salon_id)
+        self.sira_nolari.append(yer['sira_no'])
+        self.sinif_kodlari.append(self._kodla(
+            self._sinif_indeksi, self.siniflar, (yer['ogrenci_sinif'], yer['ogrenci_sube'])
+        ))
+        self.sinav_kodlari.append(self._kodla(
+            self._sinav_indeksi, self.sinavlar, (yer.get('sinav_id'), yer.get('sinav_adi'))
+        ))
+        self.sabit.append(1 if yer.get('sabit_mi') else 0)
+        self.salon_adlari.setdefault(salon_id, yer.get('salon_adi', ''))
+        ogretmen = yer.get('ogretmen_masasi') is True
+        self.ogretmen.append(1 if ogretmen else 0)
+        ek = {
+            anahtar: deger for anahtar, deger in yer.items()
+            if anahtar not in _SUTUN_ANAHTARLARI and not (anahtar == 'ogretmen_masasi' and ogretmen)
+        }
+        if ek:
+            self.ekler[idx] = ek
+
+    def extend(self, satirlar: Iterable[Dict]):
+        for yer in satirlar:
+            self.append(yer)
+
+    def sort(self, key: Optional[Callable[[Dict], Any]] = None, reverse: bool = False):
+        """list.sort ile uyumlu; anahtar satır sözlüğü üzerinden hesaplanır"""
+        if key is None:
+            raise TypeError("YerlesimTablosu.sort bir key fonksiyonu gerektirir")
+        sira = sorted(range(len(self)), key=lambda i: key(self._satir(i)), reverse=reverse)
+        self._yeniden_diz(sira)
+
+    def salon_sirasina_gore_sirala(self):
+        """sort(key=(salon_adi, sira_no)) ile aynı sıra; satır sözlüğü kurmadan"""
+        salon_sirasi = {
+            salon_id: sira for sira, salon_id in
+            enumerate(sorted(self.salon_adlari, key=lambda s: (self.salon_adlari[s], s)))
+        }
+        salonlar, siralar = self.salon_idleri, self.sira_nolari
+        self._yeniden_diz(sorted(range(len(self)), key=lambda i: (salon_sirasi[salonlar[i]], siralar[i])))
+
+    # --------------------------------------------------------------- dönüşümler
+    def dataframe(self):
+        """
+        Sütunları pandas DataFrame'e çevir. Sayısal sütunlar dizilerin üzerine
+        kopyasız numpy görünümleridir; sınıf, şube, salon adı ve sınav adı kod
+        tablolarından kategorik sütun olarak kurulur (satır başına Python işi yok).
+        """
+        import numpy as np
+        import pandas as pd
+
+        def _gorunum(sutun: array, dtype):
+            return np.frombuffer(sutun, dtype=dtype) if len(sutun) else np.zeros(0, dtype=dtype)
+
+        def _kategorik(kodlar, degerler: List[Any]):
+            # None değerler pandas'ta eksik (-1) kodla temsil edilir
+            kategoriler: Dict[Any, int] = {}
+            eslem = np.array([
+                -1 if d is None else kategoriler.setdefault(d, len(kategoriler)) for d in degerler
+            ], dtype=np.int32)
+            return pd.Categorical.from_codes(eslem[kodlar] if len(eslem) else kodlar,
+                                             list(kategoriler))
+
+        sinif_kodlari = _gorunum(self.sinif_kodlari, np.int32)
+        sinav_kodlari = _gorunum(self.sinav_kodlari, np.int32)
+        salon_idleri = _gorunum(self.salon_idleri, np.int32)
+        salon_id_listesi = sorted(self.salon_adlari)
+        salon_kodlari = np.searchsorted(np.array(salon_id_listesi, dtype=np.int32), salon_idleri)
+        sinav_idleri = np.array([sinav_id for sinav_id, _ in self.sinavlar], dtype=object)
+
+        return pd.DataFrame({
+            'ogrenci_id': _gorunum(self.ogrenci_idleri, np.int64),
+            'salon_id': salon_idleri,
+            'sira_no': _gorunum(self.sira_nolari, np.int32),
+            'ogrenci_sinif': _kategorik(sinif_kodlari, [sinif for sinif, _ in self.siniflar]),
+            'ogrenci_sube': _kategorik(sinif_kodlari, [sube for _, sube in self.siniflar]),
+            'salon_adi': _kategorik(salon_kodlari, [self.salon_adlari[s] for s in salon_id_listesi]),
+            'sabit_mi': _gorunum(self.sabit, np.int8).view(np.bool_),
+            'ogretmen_masasi': _gorunum(self.ogretmen, np.int8).view(np.bool_),
+            'sinav_id': sinav_idleri[sinav_kodlari] if len(sinav_idleri) else sinav_idleri,
+            'sinav_adi': _kategorik(sinav_kodlari, [sinav_adi for _, sinav_adi in self.sinavlar]),
+        }, copy=False)
+
+    def __getstate__(self):
+        return (self.ogrenci_idleri, self.salon_idleri, self.sira_nolari, self.sinif_kodlari,
+                self.sinav_kodlari, self.sabit, self.ogretmen, self.siniflar, self.sinavlar,
+                self.salon_adlari, self.ekler)
+
+    def __setstate__(self, state):
+        (self.ogrenci_idleri, self.salon_idleri, self.sira_nolari, self.sinif_kodlari,
+         self.sinav_kodlari, self.sabit, self.ogretmen, self.siniflar, self.sinavlar,
+         self.salon_adlari, self.ekler) = state
+        self._sinif_indeksi = {kayit: kod for kod, kayit in enumerate(self.siniflar)}
+        self._sinav_indeksi = {kayit: kod for kod, kayit in enumerate(self.sinavlar)}
+
+    # ------------------------------------------------------------------- iç
+    @staticmethod
+    def _kodla(indeks: Dict[Tuple[Any, Any], int], tablo: List[Tuple[Any, Any]],
+               kayit: Tuple[Any, Any]) -> int:
+        kod = indeks.get(kayit)
+        if kod is None:
+            kod = indeks[kayit] = len(tablo)
+            tablo.append(kayit)
+        return kod
+
+    def _satir(self, idx: int) -> Dict:
+        salon_id = self.salon_idleri[idx]
+        sinif, sube = self.siniflar[self.sinif_kodlari[idx]]
+        sinav_id, sinav_adi = self.sinavlar[self.sinav_kodlari[idx]]
+        yer = {
+            'ogrenci_id': self.ogrenci_idleri[idx],
+            'salon_id': salon_id,
+            'sira_no': self.sira_nolari[idx],
+            'ogrenci_sinif': sinif,
+            'ogrenci_sube': sube,
+            'salon_adi': self.salon_adlari[salon_id],
+            'sabit_mi': bool(self.sabit[idx]),
+            'sinav_id': sinav_id,
+            'sinav_adi': sinav_adi
+        }
+        if self.ogretmen[idx]:
+            yer['ogretmen_masasi'] = True
+        ek = self.ekler.get(idx)
+        if ek:
+            yer.update(ek)
+        return yer
+
+    def _yeniden_diz(self, sira: List[int]):
+        for ad in ('ogrenci_idleri', 'salon_idleri', 'sira_nolari', 'sinif_kodlari',
+                   'sinav_kodlari', 'sabit', 'ogretmen'):
+            sutun = getattr(self, ad)
+            setattr(self, ad, array(sutun.typecode, [sutun[i] for i in sira]))
+        if self.ekler:
+            yeni_indeks = {eski: yeni for yeni, eski in enumerate(sira)}
+            self.ekler = {yeni_indeks[eski]: ek for eski, ek in self.ekler.items()}
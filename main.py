@@ -9,6 +9,7 @@ import tkinter as tk
 from tkinter import messagebox
 import sys
 import os
+import multiprocessing
 
 # Path ayarı
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
@@ -226,6 +227,8 @@ Lütfen loglara bakın veya geliştiriciye bildirin.
 
 
 if __name__ == "__main__":
+    # PyInstaller ile paketlenmiş exe'de harmanlama alt süreçleri için gerekli
+    multiprocessing.freeze_support()
     try:
         main()
     except KeyboardInterrupt:
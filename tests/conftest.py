@@ -0,0 +1,11 @@
+"""
+Kelebek Sınav Sistemi - Ortak test fixture'ları
+"""
+
+import pytest
+
+
+@pytest.fixture
+def ortools_gerekli():
+    """OR-Tools yüklü değilse CP-SAT gerektiren testi atla"""
+    pytest.importorskip("ortools")
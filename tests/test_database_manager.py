@@ -0,0 +1,61 @@
+"""
+Kelebek Sınav Sistemi - Veritabanı Yerleşim Kaydı Testleri
+pytest ile çalıştırılır: python -m pytest tests/ -v
+"""
+
+import pytest
+import sys
+import os
+
+# Path ayarı
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from controllers.database_manager import DatabaseManager
+
+
+@pytest.fixture
+def yerlesimli_sinav(tmp_path):
+    """Tek salonlu bir sınav ve ilk 12 sıraya kaydedilmiş yerleşimi"""
+    db = DatabaseManager(str(tmp_path / "yerlesim.db"))
+    salon_id = db.salon_ekle("A-101", 20)
+    ogrenci_ids = [
+        db.ogrenci_ekle(f"Ad{no}", "TEST", "9", sube)
+        for sube in ("A", "B") for no in range(6)
+    ]
+    ders = db.ders_ekle("Matematik", [9])
+    sinav_id = db.sinav_ekle("Mat 9", ders, ["9"], [salon_id])
+    db.yerlesim_kaydet(sinav_id, [
+        {'ogrenci_id': ogrenci_id, 'salon_id': salon_id, 'sira_no': sira_no}
+        for sira_no, ogrenci_id in enumerate(ogrenci_ids, start=1)
+    ])
+    return db, sinav_id
+
+
+class TestYerlesimDegisiklikleri:
+    """yerlesim_degisikliklerini_kaydet ile yalnızca değişen satırların yazılması"""
+
+    def test_elle_degisiklikler_kaydedilir(self, yerlesimli_sinav):
+        """Takas edilen iki öğrencinin satırları UNIQUE çakışması olmadan güncellenir"""
+        db, sinav_id = yerlesimli_sinav
+        yerlesim = db.yerlesim_getir(sinav_id)
+        a, b = dict(yerlesim[0]), dict(yerlesim[1])
+        a['sira_no'], b['sira_no'] = b['sira_no'], a['sira_no']
+        a['salon_id'], b['salon_id'] = b['salon_id'], a['salon_id']
+        assert db.yerlesim_degisikliklerini_kaydet([a, b]) == 2
+        yeni = {y['ogrenci_id']: (y['salon_id'], y['sira_no']) for y in db.yerlesim_getir(sinav_id)}
+        assert yeni[a['ogrenci_id']] == (a['salon_id'], a['sira_no'])
+        assert yeni[b['ogrenci_id']] == (b['salon_id'], b['sira_no'])
+        assert len(yeni) == 12
+
+    def test_onarim_satirlari_kaydedilir(self, yerlesimli_sinav):
+        """Yerel onarımda çıkarılan silinir, eklenen yazılır, diğer satırlara dokunulmaz"""
+        db, sinav_id = yerlesimli_sinav
+        yerlesim = db.yerlesim_getir(sinav_id)
+        cikan, kalan = yerlesim[0], yerlesim[1:]
+        yeni_id = db.ogrenci_ekle("Yeni", "Öğrenci", "9", "A")
+        yeni = dict(cikan, ogrenci_id=yeni_id)
+        assert db.yerlesim_degisikliklerini_kaydet([yeni], sinav_id, cikarilanlar=[cikan]) == 2
+        sonra = {y['ogrenci_id']: (y['salon_id'], y['sira_no']) for y in db.yerlesim_getir(sinav_id)}
+        assert cikan['ogrenci_id'] not in sonra
+        assert sonra[yeni_id] == (cikan['salon_id'], cikan['sira_no'])
+        assert all(sonra[y['ogrenci_id']] == (y['salon_id'], y['sira_no']) for y in kalan)
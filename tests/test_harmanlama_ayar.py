@@ -0,0 +1,100 @@
+"""
+Kelebek Sınav Sistemi - Çözücü Ayar Profili Testleri
+pytest ile çalıştırılır: python -m pytest tests/ -v
+"""
+
+import json
+import pytest
+import sys
+import os
+
+# Path ayarı
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from controllers.harmanlama_engine import HarmanlamaEngine, HarmanlamaConfig
+from controllers.harmanlama_ayar import (COZUM_SURESI_ORNEK_SAYISI, CozucuAyarlayici, PROFIL_SURUMU,
+                                         profil_uygula, profil_yaz, sentetik_ornekler)
+from tests.test_harmanlama_engine import ogrenci_listesi
+
+
+def profil_dosyasi(tmp_path, bantlar):
+    yol = str(tmp_path / 'profil.json')
+    with open(yol, 'w', encoding='utf-8') as dosya:
+        json.dump({'surum': PROFIL_SURUMU, 'bantlar': bantlar}, dosya)
+    return yol
+
+
+class TestAyarProfili:
+    """Profilin boyut bandına göre motora uygulanması ve ayarlayıcı"""
+
+    def test_bant_secimi_ve_acik_ayarlar(self, tmp_path):
+        """Bant öğrenci sayısına göre seçilir; varsayılandan farklı verilmiş alanlar korunur"""
+        yol = profil_dosyasi(tmp_path, [
+            {'ad': 'kucuk', 'alt': 0, 'ust': 100, 'ayarlar': {'isci_sayisi': 1, 'cozum_suresi': 3.0}},
+            {'ad': 'buyuk', 'alt': 100, 'ust': None,
+             'ayarlar': {'cp_sat_modeli': 'ogrenci', 'seed': 99}},
+        ])
+        config, bant = profil_uygula(HarmanlamaConfig(ayar_profili=yol, cozum_suresi=30.0), 50)
+        assert bant == 'kucuk'
+        assert config.isci_sayisi == 1
+        assert config.cozum_suresi == 30.0
+
+        config, bant = profil_uygula(HarmanlamaConfig(ayar_profili=yol), 5000)
+        assert bant == 'buyuk'
+        assert config.cp_sat_modeli == 'ogrenci'
+        # Profil yalnızca ayarlanabilir alanları değiştirebilir
+        assert config.seed is None
+
+        temel = HarmanlamaConfig(ayar_profili=str(tmp_path / 'yok.json'))
+        assert profil_uygula(temel, 50) == (temel, None)
+
+    def test_motor_profili_kullanir(self, tmp_path):
+        """harmanla() bandın stratejisiyle çözer ve performans raporunda bandı bildirir"""
+        pytest.importorskip("ortools")
+        yol = profil_dosyasi(tmp_path, [
+            {'ad': 'kucuk', 'alt': 0, 'ust': None, 'ayarlar': {'sezgisel_once': False}},
+        ])
+        ogrenciler = ogrenci_listesi({('9', 'A'): 8, ('10', 'B'): 8})
+        salonlar = [{'id': 1, 'salon_adi': 'A-101', 'kapasite': 20}]
+        engine = HarmanlamaEngine(HarmanlamaConfig(seed=1, ayar_profili=yol))
+        sonuc = engine.harmanla(ogrenciler, salonlar)
+        assert sonuc['basarili'], sonuc['hatalar']
+        assert sonuc['istatistikler']['cozum_yolu'] == 'cp-sat'
+        assert sonuc['performans']['ayar_profili'] == 'kucuk'
+        assert engine._temel_config.sezgisel_once is True
+
+    def test_ayarlayici_profil_yazar(self, tmp_path):
+        """Ayarlayıcı örneği olan bantlar için okunabilir bir profil üretir"""
+        ornekler = sentetik_ornekler([120])
+        ayarlayici = CozucuAyarlayici(
+            ornekler,
+            temel=HarmanlamaConfig(cozum_suresi=5.0),
+            deneme_sayisi=2,
+            arama_uzayi={'ilk_cozumde_dur': [False, True]}
+        )
+        assert ayarlayici.adaylar() == [{}, {'ilk_cozumde_dur': True}]
+
+        profil = ayarlayici.ayarla()
+        assert [bant['ad'] for bant in profil['bantlar']] == ['kucuk']
+        bant = profil['bantlar'][0]
+        assert bant['ornekler'] == ['sentetik-120-0']
+        assert bant['basarisiz'] == 0 and bant['temel_basarisiz'] == 0
+        # Tek örnekle süre bütçesi kısaltılmaz
+        assert 'cozum_suresi' not in bant['ayarlar']
+
+        yol = profil_yaz(profil, str(tmp_path / 'alt' / 'profil.json'))
+        _, bant_adi = profil_uygula(HarmanlamaConfig(ayar_profili=yol), 120)
+        assert bant_adi == 'kucuk'
+
+    def test_sure_butcesi_yeterli_ornekle_kisalir(self):
+        """cozum_suresi yalnızca bant yeterli örnekle ölçüldüyse ve temelin altında kalacak şekilde yazılır"""
+        pytest.importorskip("ortools")
+        ornekler = sentetik_ornekler([120], tohumlar=tuple(range(COZUM_SURESI_ORNEK_SAYISI)))
+        temel = HarmanlamaConfig(cozum_suresi=5.0, sezgisel_once=False)
+        ayarlayici = CozucuAyarlayici(ornekler, temel=temel, deneme_sayisi=1)
+        bant = ayarlayici.ayarla()['bantlar'][0]
+        assert bant['basarisiz'] == 0
+        assert 0 < bant['ayarlar']['cozum_suresi'] <= temel.cozum_suresi
+
+        ayarlayici = CozucuAyarlayici(ornekler[:1], temel=temel, deneme_sayisi=1)
+        assert 'cozum_suresi' not in ayarlayici.ayarla()['bantlar'][0]['ayarlar']
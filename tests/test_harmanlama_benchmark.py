@@ -0,0 +1,52 @@
+"""
+Kelebek Sınav Sistemi - Harmanlama Benchmark Testleri
+pytest ile çalıştırılır: python -m pytest tests/ -v
+"""
+
+import pytest
+import sys
+import os
+
+# Path ayarı
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from controllers.harmanlama_benchmark import sentetik_okul, olcum_yap, karsilastir
+from utils import SINIF_SEVIYELERI
+
+
+class TestSentetikOkul:
+    """Sentetik okul üreticisi testleri"""
+
+    def test_boyut_ve_sabitler(self):
+        okul = sentetik_okul(600, seed=1)
+        assert len(okul['ogrenciler']) == 600
+        assert len({o['id'] for o in okul['ogrenciler']}) == 600
+        assert {o['sinif'] for o in okul['ogrenciler']} <= set(SINIF_SEVIYELERI)
+        kapasite = sum(s['kapasite'] for s in okul['salonlar'])
+        assert kapasite >= 600
+        sabit_siralar = [(o['sabit_salon_id'], o['sabit_salon_sira_id']) for o in okul['sabit_ogrenciler']]
+        assert okul['sabit_ogrenciler'] and len(set(sabit_siralar)) == len(sabit_siralar)
+
+    def test_ayni_seed_ayni_okul(self):
+        assert sentetik_okul(300, seed=5) == sentetik_okul(300, seed=5)
+
+
+class TestOlcum:
+    """Ölçüm ve temel karşılaştırma testleri"""
+
+    def test_asamalar_olculur(self):
+        olcum = olcum_yap(300, seed=2, seviyeler=['5', '6', '7', '8', '9', '10'])
+        assert olcum['basarili'] is True
+        assert olcum['toplam_sure'] > 0
+        assert {'sira_haritasi', 'koltuk_verisi', 'istatistik'} <= set(olcum['asamalar'])
+        assert olcum['tepe_bellek_mb'] > 0
+
+    def test_gerileme_yakalanir(self):
+        temel = {'olcumler': [{'ogrenci_sayisi': 300, 'basarili': True,
+                               'toplam_sure': 1.0, 'tepe_bellek_mb': 10.0}]}
+        ayni = {'olcumler': [{'ogrenci_sayisi': 300, 'basarili': True,
+                              'toplam_sure': 1.1, 'tepe_bellek_mb': 10.5}]}
+        yavas = {'olcumler': [{'ogrenci_sayisi': 300, 'basarili': False,
+                               'toplam_sure': 2.0, 'tepe_bellek_mb': 20.0}]}
+        assert karsilastir(ayni, temel) == []
+        assert len(karsilastir(yavas, temel)) == 3
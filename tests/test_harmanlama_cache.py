@@ -0,0 +1,117 @@
+"""
+Kelebek Sınav Sistemi - Salon Düzeni Önbelleği Testleri
+pytest ile çalıştırılır: python -m pytest tests/ -v
+"""
+
+import pickle
+import pytest
+import sys
+import os
+
+# Path ayarı
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from controllers.harmanlama_cache import (SalonDuzeni, SalonDuzeniOnbellegi, get_duzen_onbellegi,
+                                          HarmanlamaSonucOnbellegi)
+from controllers.harmanlama_engine import HarmanlamaEngine
+
+
+class TestSalonDuzeni:
+    """CSR komşuluk yapısı testleri"""
+
+    @pytest.mark.parametrize("genislik", [1, 2, 3])
+    def test_komsular_motorla_ayni(self, genislik):
+        """Komşu numaraları HarmanlamaEngine._seat_neighbors ile aynıdır"""
+        siralar = {1, 2, 3, 5, 6, 7, 8, 10, 11, 12}
+        duzen = SalonDuzeni(1, siralar, genislik)
+        engine = HarmanlamaEngine()
+        for idx, sira_no in enumerate(duzen.sira_nolar):
+            assert duzen.komsu_numaralari(idx) == engine._seat_neighbors(sira_no, genislik, siralar)
+
+    def test_pickle_ile_korunur(self):
+        """Düzen diske yazılıp okunabilir"""
+        duzen = pickle.loads(pickle.dumps(SalonDuzeni(3, range(1, 9), 2)))
+        assert list(duzen.sira_nolar) == list(range(1, 9))
+        assert duzen.indeks[5] == 4
+        assert duzen.komsu_numaralari(0) == [2, 3]
+
+
+class TestSalonDuzeniOnbellegi:
+    """Önbellek isabet ve geçersiz kılma testleri"""
+
+    def test_ayni_duzen_tekrar_kurulmaz(self):
+        onbellek = SalonDuzeniOnbellegi()
+        ilk = onbellek.getir(1, [1, 2, 3, 4], 2)
+        assert onbellek.getir(1, [4, 3, 2, 1], 2) is ilk
+        assert onbellek.getir(1, [1, 2, 3], 2) is not ilk
+        assert (onbellek.isabet, onbellek.iska) == (1, 2)
+
+    def test_kalici_dosya(self, tmp_path):
+        yol = str(tmp_path / "duzen.pkl")
+        SalonDuzeniOnbellegi(yol).getir(7, range(1, 5), 2)
+        yeni = SalonDuzeniOnbellegi(yol)
+        yeni.getir(7, range(1, 5), 2)
+        assert yeni.isabet == 1
+        yeni.gecersiz_kil(7)
+        assert len(SalonDuzeniOnbellegi(yol)) == 0
+
+    def test_salon_guncelle_gecersiz_kilar(self, tmp_path):
+        """Veritabanında salon değişince o salonun kayıtları atılır"""
+        from controllers.database_manager import DatabaseManager
+        db = DatabaseManager(str(tmp_path / "test.db"))
+        salon_id = db.salon_ekle("A-101", 4)
+        diger_id = db.salon_ekle("A-102", 4)
+        onbellek = get_duzen_onbellegi()
+        onbellek.getir(salon_id, range(1, 5), 2)
+        onbellek.getir(diger_id, range(1, 5), 2)
+        db.salon_guncelle(salon_id, kapasite=6)
+        anahtarlar = {k[0] for k in onbellek._kayitlar}
+        assert salon_id not in anahtarlar
+        assert diger_id in anahtarlar
+        sira_id = db.salon_sira_haritasi([diger_id])[diger_id][0]['id']
+        db.salon_sira_guncelle(sira_id, aktif_mi=0)
+        assert diger_id not in {k[0] for k in onbellek._kayitlar}
+
+
+class TestHarmanlamaSonucOnbellegi:
+    """İçerik adresli sonuç önbelleği testleri"""
+
+    def _girdi(self):
+        ogrenciler = [
+            {'id': i, 'ad': f'Ö{i}', 'soyad': 'T', 'sinif': '9' if i % 2 else '10', 'sube': 'A'}
+            for i in range(1, 13)
+        ]
+        return ogrenciler, [{'id': 1, 'salon_adi': 'A-101', 'kapasite': 16}]
+
+    def test_anahtar_sira_bagimsiz(self):
+        ogrenciler, salonlar = self._girdi()
+        from controllers.harmanlama_engine import HarmanlamaConfig
+        a = HarmanlamaSonucOnbellegi.anahtar(ogrenciler, salonlar, HarmanlamaConfig(seed=1))
+        b = HarmanlamaSonucOnbellegi.anahtar(list(reversed(ogrenciler)), salonlar, HarmanlamaConfig(seed=1))
+        c = HarmanlamaSonucOnbellegi.anahtar(ogrenciler, salonlar, HarmanlamaConfig(seed=2))
+        assert a == b
+        assert a != c
+
+    def test_tekrar_calistirma_onbellekten(self, tmp_path):
+        """Aynı girdiler ikinci kez çözülmeden döner"""
+        from controllers.harmanlama_engine import HarmanlamaConfig
+        ogrenciler, salonlar = self._girdi()
+        config = HarmanlamaConfig(seed=4, sonuc_onbellegi=True, sonuc_onbellegi_dizini=str(tmp_path))
+        ilk = HarmanlamaEngine(config).harmanla(ogrenciler, salonlar)
+        ikinci = HarmanlamaEngine(config).harmanla(ogrenciler, salonlar)
+        assert ilk['basarili'] and 'onbellekten' not in ilk
+        assert ikinci['onbellekten'] is True
+        assert ikinci['yerlesim'] == ilk['yerlesim']
+        ogrenciler[0]['sube'] = 'B'
+        ucuncu = HarmanlamaEngine(config).harmanla(ogrenciler, salonlar)
+        assert 'onbellekten' not in ucuncu
+
+    def test_lru_budama(self, tmp_path):
+        onbellek = HarmanlamaSonucOnbellegi(str(tmp_path), en_fazla=2)
+        for no in range(3):
+            onbellek.kaydet(f"k{no}", {'no': no})
+            os.utime(tmp_path / f"k{no}.pkl", (no, no))
+        onbellek.getir("k1")
+        onbellek.kaydet("k3", {'no': 3})
+        kalan = sorted(p.name for p in tmp_path.iterdir())
+        assert kalan == ["k1.pkl", "k3.pkl"]
@@ -0,0 +1,635 @@
+"""
+Kelebek Sınav Sistemi - Harmanlama Engine Unit Testleri
+pytest ile çalıştırılır: python -m pytest tests/ -v
+"""
+
+import pytest
+import sys
+import os
+
+# Path ayarı
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from controllers.harmanlama_engine import HarmanlamaEngine, HarmanlamaConfig, IptalBelirteci
+
+
+def ogrenci_listesi(dagilim, baslangic_id=1):
+    """{('9', 'A'): 5, ...} dağılımından öğrenci sözlükleri üret"""
+    ogrenciler = []
+    next_id = baslangic_id
+    for (sinif, sube), adet in dagilim.items():
+        for _ in range(adet):
+            ogrenciler.append({
+                'id': next_id,
+                'ad': f'Öğrenci{next_id}',
+                'soyad': 'TEST',
+                'sinif': sinif,
+                'sube': sube
+            })
+            next_id += 1
+    return ogrenciler
+
+
+def komsu_ihlalleri(engine, yerlesim, satir_genisligi=2):
+    """Yan/arka komşu olup aynı sınıf seviyesinde oturan koltuk çiftlerini say"""
+    koltuklar = {
+        (yer['salon_id'], yer['sira_no']): str(yer['ogrenci_sinif'])
+        for yer in yerlesim if not yer.get('ogretmen_masasi')
+    }
+    ihlal = 0
+    for (salon_id, sira_no), seviye in koltuklar.items():
+        salon_siralari = {no for (sid, no) in koltuklar if sid == salon_id}
+        for komsu in engine._seat_neighbors(sira_no, satir_genisligi, salon_siralari):
+            if komsu > sira_no and koltuklar.get((salon_id, komsu)) == seviye:
+                ihlal += 1
+    return ihlal
+
+
+@pytest.mark.usefixtures("ortools_gerekli")
+class TestCpSatSeviyeModeli:
+    """Seviye bazlı (koltuk×seviye) CP-SAT modeli testleri"""
+
+    def test_tum_ogrenciler_yerlesir(self):
+        """Her öğrenci tek bir koltuğa, her koltuğa en fazla bir öğrenci"""
+        ogrenciler = ogrenci_listesi({('9', 'A'): 10, ('10', 'A'): 10, ('11', 'B'): 8})
+        salonlar = [{'id': 1, 'salon_adi': 'A-101', 'kapasite': 30}]
+        engine = HarmanlamaEngine(HarmanlamaConfig(seed=1, sezgisel_once=False))
+        sonuc = engine.harmanla(ogrenciler, salonlar)
+        assert sonuc['basarili'] is True
+        yerlesim = sonuc['yerlesim']
+        assert sorted(y['ogrenci_id'] for y in yerlesim) == [o['id'] for o in ogrenciler]
+        assert len({(y['salon_id'], y['sira_no']) for y in yerlesim}) == len(yerlesim)
+        assert komsu_ihlalleri(engine, yerlesim) == 0
+
+    def test_seviye_ve_ogrenci_modelleri_uyumlu(self):
+        """Eski öğrenci×koltuk modeli de aynı kuralları sağlar"""
+        ogrenciler = ogrenci_listesi({('9', 'A'): 6, ('10', 'B'): 6})
+        salonlar = [{'id': 1, 'salon_adi': 'A-101', 'kapasite': 12}]
+        engine = HarmanlamaEngine(HarmanlamaConfig(seed=3, cp_sat_modeli="ogrenci", sezgisel_once=False))
+        sonuc = engine.harmanla(ogrenciler, salonlar)
+        assert sonuc['basarili'] is True
+        assert komsu_ihlalleri(engine, sonuc['yerlesim']) == 0
+
+    def test_ogretmen_masasi_yedegi(self):
+        """Kural sağlanamıyorsa öğretmen masası kullanılır"""
+        # 2 genişliğinde 4 koltuk: en fazla 2 öğrenci aynı seviyeden oturabilir
+        ogrenciler = ogrenci_listesi({('9', 'A'): 3, ('10', 'A'): 1})
+        salonlar = [{'id': 1, 'salon_adi': 'A-101', 'kapasite': 4}]
+        engine = HarmanlamaEngine(HarmanlamaConfig(seed=5))
+        sonuc = engine.harmanla(ogrenciler, salonlar)
+        assert sonuc['basarili'] is True
+        masa = [y for y in sonuc['yerlesim'] if y.get('ogretmen_masasi')]
+        assert len(masa) == 1
+        assert sonuc['uyumsuzluk_var'] is True
+        assert komsu_ihlalleri(engine, sonuc['yerlesim']) == 0
+        assert sonuc['istatistikler']['cozum_yolu'] == "cp-sat-ogretmen-masasi"
+
+
+@pytest.mark.usefixtures("ortools_gerekli")
+class TestSalonAyristirma:
+    """İki aşamalı (salon bazlı) çözüm testleri"""
+
+    def test_salon_kotalari_kapasiteyi_asmaz(self):
+        """Seviye kotaları her salonun boş koltuk sayısına sığar"""
+        engine = HarmanlamaEngine(HarmanlamaConfig(seed=2))
+        salonlar = [
+            {'id': 1, 'salon_adi': 'A-101', 'kapasite': 20},
+            {'id': 2, 'salon_adi': 'A-102', 'kapasite': 12}
+        ]
+        salon_sira_map = engine._hazirla_salon_sira_map(salonlar, None)
+        seat_data, adjacency = engine._prepare_seat_data(salonlar, salon_sira_map, {})
+        salon_koltuklari = seat_data.salon_koltuklari()
+        assert sorted(salon_koltuklari) == [1, 2]
+        kotalar = engine._salon_kotalari({9: 12, 10: 10, 11: 8}, seat_data, salon_koltuklari, adjacency)
+        assert kotalar is not None
+        assert sum(kotalar[1].values()) <= 20
+        assert sum(kotalar[2].values()) <= 12
+        for grade, adet in {9: 12, 10: 10, 11: 8}.items():
+            assert sum(k.get(grade, 0) for k in kotalar.values()) == adet
+
+    def test_salon_bazli_sonuc_ayni_yapida(self):
+        """Salon bazlı mod harmanla() ile aynı yerleşim yapısını döndürür"""
+        ogrenciler = ogrenci_listesi({('9', 'A'): 15, ('10', 'B'): 15, ('11', 'C'): 14, ('12', 'A'): 10})
+        salonlar = [
+            {'id': 1, 'salon_adi': 'A-101', 'kapasite': 20},
+            {'id': 2, 'salon_adi': 'A-102', 'kapasite': 20},
+            {'id': 3, 'salon_adi': 'A-103', 'kapasite': 20}
+        ]
+        engine = HarmanlamaEngine(HarmanlamaConfig(seed=4, salon_ayristirma=True, sezgisel_once=False))
+        sonuc = engine.harmanla(ogrenciler, salonlar)
+        assert sonuc['basarili'] is True
+        yerlesim = sonuc['yerlesim']
+        assert sorted(y['ogrenci_id'] for y in yerlesim) == [o['id'] for o in ogrenciler]
+        assert len({(y['salon_id'], y['sira_no']) for y in yerlesim}) == len(yerlesim)
+        assert set(yerlesim[0].keys()) >= {'ogrenci_id', 'salon_id', 'sira_no', 'salon_adi', 'sabit_mi'}
+        assert komsu_ihlalleri(engine, yerlesim) == 0
+
+    def test_tek_isci_havuz_kurmaz(self):
+        """isci_sayisi=1 iken salon alt problemleri süreç havuzu kurulmadan sırayla çözülür"""
+        from controllers import harmanlama_engine
+        ogrenciler = ogrenci_listesi({('9', 'A'): 15, ('10', 'B'): 15, ('11', 'C'): 14})
+        salonlar = [
+            {'id': 1, 'salon_adi': 'A-101', 'kapasite': 24},
+            {'id': 2, 'salon_adi': 'A-102', 'kapasite': 24}
+        ]
+        harmanlama_engine._salon_havuzunu_birak()
+        engine = HarmanlamaEngine(HarmanlamaConfig(
+            seed=4, salon_ayristirma=True, sezgisel_once=False, isci_sayisi=1
+        ))
+        sonuc = engine.harmanla(ogrenciler, salonlar)
+        assert sonuc['basarili'] is True
+        assert engine.cozum_yolu == "cp-sat-salon"
+        assert harmanlama_engine._salon_havuzu is None
+        assert komsu_ihlalleri(engine, sonuc['yerlesim']) == 0
+
+
+class TestSezgiselYerlesim:
+    """DSATUR tabanlı hızlı yol testleri (OR-Tools gerektirmez)"""
+
+    def test_kolay_oturum_sezgisel_cozulur(self):
+        """Karışık seviyeler CP-SAT'e gitmeden yerleşir"""
+        ogrenciler = ogrenci_listesi({('9', 'A'): 20, ('10', 'A'): 18, ('11', 'B'): 16, ('12', 'C'): 6})
+        salonlar = [
+            {'id': 1, 'salon_adi': 'A-101', 'kapasite': 32},
+            {'id': 2, 'salon_adi': 'A-102', 'kapasite': 32}
+        ]
+        engine = HarmanlamaEngine(HarmanlamaConfig(seed=7))
+        sonuc = engine.harmanla(ogrenciler, salonlar)
+        assert sonuc['basarili'] is True
+        assert sonuc['istatistikler']['cozum_yolu'] == "sezgisel"
+        assert len(sonuc['yerlesim']) == len(ogrenciler)
+        assert komsu_ihlalleri(engine, sonuc['yerlesim']) == 0
+
+    def test_sezgisel_yol_imkansizsa_none(self):
+        """Tek seviye bağımsız küme sınırını aşarsa sezgisel yol vazgeçer"""
+        engine = HarmanlamaEngine(HarmanlamaConfig(seed=7))
+        salonlar = [{'id': 1, 'salon_adi': 'A-101', 'kapasite': 4}]
+        salon_sira_map = engine._hazirla_salon_sira_map(salonlar, None)
+        seat_data, adjacency = engine._prepare_seat_data(salonlar, salon_sira_map, {})
+        assert engine._sezgisel_seviye_koltuklari({9: 3, 10: 1}, seat_data, adjacency) is None
+        secim = engine._sezgisel_seviye_koltuklari({9: 2, 10: 2}, seat_data, adjacency)
+        assert sorted(len(v) for v in secim.values()) == [2, 2]
+
+
+class TestArtimliHarmanlama:
+    """Önceki yerleşimden yeniden harmanlama testleri"""
+
+    def _ilk_ve_degisen(self):
+        ogrenciler = ogrenci_listesi({('9', 'A'): 12, ('10', 'B'): 12, ('11', 'C'): 10})
+        salonlar = [
+            {'id': 1, 'salon_adi': 'A-101', 'kapasite': 20},
+            {'id': 2, 'salon_adi': 'A-102', 'kapasite': 20}
+        ]
+        ilk = HarmanlamaEngine(HarmanlamaConfig(seed=11)).harmanla(ogrenciler, salonlar)
+        assert ilk['basarili'] is True
+        cikan = {ogrenciler[0]['id'], ogrenciler[15]['id']}
+        yeni_liste = [o for o in ogrenciler if o['id'] not in cikan]
+        yeni_liste += ogrenci_listesi({('12', 'A'): 3}, baslangic_id=100)
+        return ilk['yerlesim'], yeni_liste, salonlar, cikan
+
+    @pytest.mark.parametrize("cozum", ["sezgisel", "cp-sat"])
+    @pytest.mark.parametrize("mod", ["ipucu", "sabit"])
+    def test_kalan_ogrenciler_yerinde(self, mod, cozum):
+        """Değişmeyen öğrenciler eski koltuklarında kalır, fark raporlanır"""
+        if cozum == "cp-sat":
+            pytest.importorskip("ortools")
+        onceki, yeni_liste, salonlar, cikan = self._ilk_ve_degisen()
+        engine = HarmanlamaEngine(HarmanlamaConfig(
+            seed=12, artimli_mod=mod, sezgisel_once=cozum == "sezgisel"
+        ))
+        sonuc = engine.harmanla(yeni_liste, salonlar, onceki_yerlesim=onceki)
+        assert sonuc['basarili'] is True
+        fark = sonuc['degisiklikler']
+        assert sorted(fark['eklenen']) == [100, 101, 102]
+        assert set(fark['cikarilan']) == cikan
+        assert fark['tasinan'] == []
+        assert fark['yerinde_kalan'] == len(yeni_liste) - 3
+        assert komsu_ihlalleri(engine, sonuc['yerlesim']) == 0
+
+    def test_aralik_optimizasyonu_kalanlari_oynatmaz(self):
+        """Aralık optimizasyonu açıkken de eski koltuğundaki öğrenciler kilitli kalır"""
+        onceki, yeni_liste, salonlar, _ = self._ilk_ve_degisen()
+        engine = HarmanlamaEngine(HarmanlamaConfig(
+            seed=12, aralik_optimizasyonu=True, optimizasyon_suresi=1.0
+        ))
+        sonuc = engine.harmanla(yeni_liste, salonlar, onceki_yerlesim=onceki)
+        assert sonuc['basarili'] is True
+        assert sonuc['degisiklikler']['tasinan'] == []
+        assert sonuc['istatistikler']['aralik']['kilitli'] == len(yeni_liste) - 3
+        assert komsu_ihlalleri(engine, sonuc['yerlesim']) == 0
+
+
+class TestFizibiliteOnKontrol:
+    """Çözücü öncesi bağımsız küme sınırı testleri"""
+
+    def _koltuklar(self, engine, salonlar):
+        salon_sira_map = engine._hazirla_salon_sira_map(salonlar, None)
+        return engine._prepare_seat_data(salonlar, salon_sira_map, {}, include_teacher_desks=False)
+
+    def test_bagimsiz_kume_izgara(self):
+        """2 genişlikli 3x2 ızgarada en fazla 3 öğrenci aynı seviyeden oturabilir"""
+        engine = HarmanlamaEngine(HarmanlamaConfig())
+        seat_data, adjacency = self._koltuklar(engine, [{'id': 1, 'salon_adi': 'A', 'kapasite': 6}])
+        komsular = {}
+        for a, b in adjacency:
+            komsular.setdefault(a, []).append(b)
+            komsular.setdefault(b, []).append(a)
+        assert engine._bagimsiz_kume_boyutu(list(range(len(seat_data))), komsular) == 3
+
+    def test_masa_ihtiyaci_hesaplanir(self):
+        """Kapasiteyi aşan seviye kadar öğretmen masası gerekir"""
+        engine = HarmanlamaEngine(HarmanlamaConfig())
+        seat_data, adjacency = self._koltuklar(engine, [{'id': 1, 'salon_adi': 'A', 'kapasite': 4}])
+        ogrenciler = ogrenci_listesi({('9', 'A'): 3, ('10', 'A'): 1})
+        assert engine._fizibilite_on_kontrol(ogrenciler, seat_data, adjacency, masa_sayisi=1) == 1
+
+    def test_imkansiz_durum_hemen_reddedilir(self):
+        """Masalar da yetmiyorsa çözücü çalışmadan gerekçeli hata döner"""
+        ogrenciler = ogrenci_listesi({('9', 'A'): 8})
+        salonlar = [{'id': 1, 'salon_adi': 'A-101', 'kapasite': 8}]
+        engine = HarmanlamaEngine(HarmanlamaConfig(sezgisel_once=False))
+        sonuc = engine.harmanla(ogrenciler, salonlar)
+        assert sonuc['basarili'] is False
+        assert any("9. sınıf seviyesinden 8 öğrenci" in h for h in sonuc['hatalar'])
+        assert engine.cozum_yolu is None
+
+
+@pytest.mark.usefixtures("ortools_gerekli")
+class TestCozucuAyarlari:
+    """Süre bütçesi, işçi sayısı, ilerleme bildirimi ve iptal testleri"""
+
+    def _veri(self):
+        ogrenciler = ogrenci_listesi({('9', 'A'): 10, ('10', 'A'): 10, ('11', 'B'): 8})
+        salonlar = [{'id': 1, 'salon_adi': 'A-101', 'kapasite': 30}]
+        return ogrenciler, salonlar
+
+    def test_ayarlar_cozucuye_gecer(self):
+        """Süre ve işçi sayısı config'den okunur"""
+        from ortools.sat.python import cp_model
+        engine = HarmanlamaEngine(HarmanlamaConfig(cozum_suresi=2.5, isci_sayisi=3))
+        solver = engine._cp_sat_solver(cp_model)
+        assert solver.parameters.max_time_in_seconds == 2.5
+        assert solver.parameters.num_workers == 3
+        assert HarmanlamaEngine(HarmanlamaConfig())._isci_sayisi() == (os.cpu_count() or 1)
+
+    def test_tohum_ve_ek_parametreler(self):
+        """cp_sat_tohumu ve cp_sat_parametreleri çözücü parametrelerine yazılır"""
+        from ortools.sat.python import cp_model
+        engine = HarmanlamaEngine(HarmanlamaConfig(
+            cp_sat_tohumu=7, cp_sat_parametreleri={'randomize_search': True}
+        ))
+        solver = engine._cp_sat_solver(cp_model)
+        assert solver.parameters.random_seed == 7
+        assert solver.parameters.randomize_search is True
+
+    def test_ogretmen_masasi_once(self):
+        """Gevşetilmiş mod masasız modeli atlayıp doğrudan masalı modeli çözer"""
+        ogrenciler, salonlar = self._veri()
+        engine = HarmanlamaEngine(HarmanlamaConfig(seed=1, sezgisel_once=False,
+                                                   ogretmen_masasi_once=True))
+        sonuc = engine.harmanla(ogrenciler, salonlar)
+        assert sonuc['basarili']
+        assert engine.cozum_yolu == "cp-sat-ogretmen-masasi"
+        assert [c['ogretmen_masasi'] for c in sonuc['performans']['cp_sat']] == [True]
+
+    def test_ilerleme_bildirilir_ve_ilk_cozumde_durur(self):
+        """Ara çözümler bildirilir; ilk_cozumde_dur tek çözümde bırakır"""
+        ogrenciler, salonlar = self._veri()
+        bildirimler = []
+        engine = HarmanlamaEngine(
+            HarmanlamaConfig(seed=1, sezgisel_once=False, ilk_cozumde_dur=True, isci_sayisi=1),
+            ilerleme_bildirimi=bildirimler.append
+        )
+        sonuc = engine.harmanla(ogrenciler, salonlar)
+        assert sonuc['basarili'] is True
+        assert [b['cozum_sayisi'] for b in bildirimler] == [1]
+        assert bildirimler[0]['gecen_sure'] >= 0
+
+    def test_iptal_edilen_harmanlama_basarisiz_doner(self):
+        """Tetiklenmiş belirteçle çözüm başlamadan iptal mesajı döner"""
+        ogrenciler, salonlar = self._veri()
+        iptal = IptalBelirteci()
+        iptal.iptal_et()
+        engine = HarmanlamaEngine(HarmanlamaConfig(sezgisel_once=False), iptal_belirteci=iptal)
+        sonuc = engine.harmanla(ogrenciler, salonlar)
+        assert sonuc['basarili'] is False
+        assert any("iptal" in h for h in sonuc['hatalar'])
+
+
+class TestPerformansRaporu:
+    """harmanla() sonucundaki performans bloğu testleri"""
+
+    def test_asamalar_ve_toplam(self):
+        """Aşama süreleri dışlayıcıdır; toplamı aşmaz"""
+        ogrenciler = ogrenci_listesi({('9', 'A'): 10, ('10', 'B'): 10})
+        salonlar = [{'id': 1, 'salon_adi': 'A-101', 'kapasite': 24}]
+        sonuc = HarmanlamaEngine(HarmanlamaConfig(seed=1)).harmanla(ogrenciler, salonlar)
+        performans = sonuc['performans']
+        assert {'sira_haritasi', 'koltuk_verisi', 'sezgisel', 'istatistik'} <= set(performans['asamalar'])
+        asama_toplami = sum(s['duvar'] for s in performans['asamalar'].values())
+        assert asama_toplami <= performans['toplam']['duvar'] + 0.001
+
+    def test_cp_sat_istatistikleri(self):
+        pytest.importorskip("ortools")
+        ogrenciler = ogrenci_listesi({('9', 'A'): 3, ('10', 'A'): 1})
+        salonlar = [{'id': 1, 'salon_adi': 'A-101', 'kapasite': 4}]
+        sonuc = HarmanlamaEngine(HarmanlamaConfig(seed=1, sezgisel_once=False)).harmanla(ogrenciler, salonlar)
+        cozumler = sonuc['performans']['cp_sat']
+        assert len(cozumler) == 1
+        assert cozumler[0]['ogretmen_masasi'] is True
+        assert cozumler[0]['durum'] in ("OPTIMAL", "FEASIBLE")
+        assert cozumler[0]['degisken'] > 0 and cozumler[0]['kisit'] > 0
+        calisma = sonuc['calisma']
+        assert calisma['cozucu_durumu'] == cozumler[0]['durum']
+        assert calisma['ogretmen_masasi'] == sum(1 for y in sonuc['yerlesim'] if y.get('ogretmen_masasi'))
+        assert (calisma['ogrenci_sayisi'], calisma['koltuk_sayisi'], calisma['ihlal_sayisi']) == (4, 4, 0)
+        assert calisma['config']['sezgisel_once'] is False
+
+    def test_basarisiz_sonucta_da_var(self):
+        sonuc = HarmanlamaEngine().harmanla([], [])
+        assert 'performans' in sonuc
+
+
+class TestRoundRobinDagitim:
+    """Çözücüsüz round-robin dağıtım modu testleri"""
+
+    def test_karistirma_dogrusal_ve_aralikli(self):
+        """Tüm öğrenciler bir kez çıkar, dengeli gruplarda aynı sınıf art arda gelmez"""
+        engine = HarmanlamaEngine(HarmanlamaConfig(seed=1, min_aralik=2))
+        ogrenciler = ogrenci_listesi({('9', 'A'): 20, ('9', 'B'): 18, ('10', 'A'): 20, ('11', 'C'): 15})
+        karma = engine._round_robin_harmanlama(engine._sinif_gruplarina_ayir(ogrenciler))
+        assert sorted(o['id'] for o in karma) == sorted(o['id'] for o in ogrenciler)
+        anahtarlar = [f"{o['sinif']}-{o['sube']}" for o in karma]
+        assert all(a != b for a, b in zip(anahtarlar, anahtarlar[1:]))
+
+    def test_secilen_modla_yerlesim(self):
+        """dagitim_modu='round-robin' çözücüye gitmeden kuralı bozmayan yerleşim üretir"""
+        ogrenciler = ogrenci_listesi({('9', 'A'): 12, ('9', 'B'): 12, ('10', 'A'): 12, ('11', 'B'): 10})
+        salonlar = [
+            {'id': 1, 'salon_adi': 'A-101', 'kapasite': 30},
+            {'id': 2, 'salon_adi': 'A-102', 'kapasite': 30}
+        ]
+        engine = HarmanlamaEngine(HarmanlamaConfig(seed=3, dagitim_modu="round-robin"))
+        sonuc = engine.harmanla(ogrenciler, salonlar)
+        assert sonuc['basarili']
+        assert engine.cozum_yolu == "round-robin"
+        assert sonuc['istatistikler']['dagitim_modu'] == "round-robin"
+        assert sonuc['performans']['cp_sat'] == []
+        assert len({(y['salon_id'], y['sira_no']) for y in sonuc['yerlesim']}) == len(ogrenciler)
+        assert engine.yerlesim_ihlalleri(sonuc['yerlesim']) == []
+        # Akış denetimi raporlanan seviye kuralını uygular: 9-A ile 9-B de yan yana gelmez
+        assert komsu_ihlalleri(engine, sonuc['yerlesim']) == 0
+        assert not sonuc['uyumsuzluk_var']
+
+    def test_kalan_ihlaller_seviye_anahtariyla_raporlanir(self):
+        """Kural sağlanamazsa gevşetilen koltuklar seviye anahtarıyla uyumsuzluk olarak raporlanır"""
+        ogrenciler = ogrenci_listesi({('9', 'A'): 10, ('9', 'B'): 10})
+        salonlar = [{'id': 1, 'salon_adi': 'A-101', 'kapasite': 20}]
+        engine = HarmanlamaEngine(HarmanlamaConfig(seed=3, dagitim_modu="round-robin"))
+        sonuc = engine.harmanla(ogrenciler, salonlar)
+        assert sonuc['basarili']
+        assert komsu_ihlalleri(engine, sonuc['yerlesim']) > 0
+        assert sonuc['uyumsuzluk_var']
+        assert len(sonuc['uyumsuzluklar']) == len(engine._kural_ihlalleri(sonuc['yerlesim']))
+        assert all(mesaj.endswith("(9).") for mesaj in sonuc['uyumsuzluklar'])
+
+    def test_sabit_ogrenci_komsulugu_gozetilir(self):
+        """Sabit öğrencinin yanına/arkasına aynı şubeden öğrenci oturtulmaz"""
+        ogrenciler = ogrenci_listesi({('9', 'A'): 8, ('10', 'B'): 8, ('11', 'C'): 8})
+        sabit = dict(ogrenciler[0], sabit_salon_id=1, sabit_salon_sira_id=3)
+        harita = {1: [
+            {'id': no, 'salon_id': 1, 'salon_adi': 'A-101', 'sira_no': no}
+            for no in range(1, 31)
+        ]}
+        salonlar = [{'id': 1, 'salon_adi': 'A-101', 'kapasite': 30}]
+        engine = HarmanlamaEngine(HarmanlamaConfig(seed=5, dagitim_modu="round-robin"))
+        sonuc = engine.harmanla(ogrenciler, salonlar, sabit_ogrenciler=[sabit],
+                                salon_sira_haritasi=harita)
+        assert sonuc['basarili']
+        assert engine.yerlesim_ihlalleri(sonuc['yerlesim']) == []
+
+    def test_ortools_yoksa_round_robine_duser(self, monkeypatch):
+        """OR-Tools yüklenemezse CP-SAT yerine round-robin kullanılır"""
+        from controllers import harmanlama_engine
+        monkeypatch.setattr(harmanlama_engine, '_ortools_yuklu', lambda: False)
+        ogrenciler = ogrenci_listesi({('9', 'A'): 10, ('10', 'A'): 10})
+        salonlar = [{'id': 1, 'salon_adi': 'A-101', 'kapasite': 30}]
+        engine = HarmanlamaEngine(HarmanlamaConfig(seed=1, sezgisel_once=False))
+        sonuc = engine.harmanla(ogrenciler, salonlar)
+        assert sonuc['basarili']
+        assert engine.cozum_yolu == "round-robin"
+        assert any("OR-Tools bulunamadı" in log for log in engine.hata_loglari)
+
+
+class TestAralikOptimizasyonu:
+    """Aynı şubeleri uzaklaştıran zamana yayılan yerel arama testleri"""
+
+    def _harmanla(self, belirtec=None, bildirim=None, **ayarlar):
+        ogrenciler = ogrenci_listesi({
+            ('9', 'A'): 14, ('9', 'B'): 14, ('10', 'A'): 14, ('10', 'B'): 14,
+            ('11', 'A'): 6, ('12', 'A'): 6
+        })
+        salonlar = [
+            {'id': 1, 'salon_adi': 'A-101', 'kapasite': 36},
+            {'id': 2, 'salon_adi': 'A-102', 'kapasite': 36}
+        ]
+        engine = HarmanlamaEngine(HarmanlamaConfig(seed=4, **ayarlar),
+                                  iptal_belirteci=belirtec, ilerleme_bildirimi=bildirim)
+        return engine, engine.harmanla(ogrenciler, salonlar)
+
+    def test_puan_duser_ve_kural_korunur(self):
+        """Takaslar yakın aynı şube çiftlerini azaltır, seviye deseni ve öğrenciler korunur"""
+        _, once = self._harmanla()
+        bildirimler = []
+        engine, sonuc = self._harmanla(bildirim=bildirimler.append, aralik_optimizasyonu=True)
+        assert sonuc['basarili']
+        aralik = sonuc['istatistikler']['aralik']
+        assert aralik['puan'] <= aralik['baslangic_puani']
+        assert aralik['takas'] > 0
+        assert komsu_ihlalleri(engine, sonuc['yerlesim']) == 0
+        assert engine.yerlesim_ihlalleri(sonuc['yerlesim']) == []
+        assert (sorted(y['ogrenci_id'] for y in sonuc['yerlesim'])
+                == sorted(y['ogrenci_id'] for y in once['yerlesim']))
+        # Akış: her iyileşen tur daha düşük (ya da eşit) puanla bildirilir
+        puanlar = [b['amac'] for b in bildirimler if b.get('asama') == 'aralik']
+        assert puanlar and puanlar == sorted(puanlar, reverse=True)
+        assert puanlar[-1] == aralik['puan']
+
+    def test_kabul_edilince_durur(self):
+        """kabul_et() optimizasyonu durdurur ama harmanlamayı iptal etmez"""
+        belirtec = IptalBelirteci()
+        belirtec.kabul_et()
+        _, sonuc = self._harmanla(belirtec=belirtec, aralik_optimizasyonu=True)
+        assert sonuc['basarili']
+        aralik = sonuc['istatistikler']['aralik']
+        assert aralik['durma_nedeni'] == "kabul"
+        assert aralik['takas'] == 0
+
+
+class TestSinifSozlugu:
+    """Sınıf/seviye kodlama ve sayısal olmayan sınıf adları testleri"""
+
+    def test_kodlar_tekil_ve_aileler(self):
+        """Aynı çift aynı kodu alır; branşlar ve hazırlık sınıfları seviye ailesine katılır"""
+        from controllers.harmanlama_engine import SinifSozlugu
+        sozluk = SinifSozlugu()
+        a = sozluk.sinif_kodu("11sayisal", "A")
+        assert sozluk.sinif_kodu("11sayisal", "A") == a
+        assert sozluk.sinif_kodu("11sozel", "A") != a
+        assert sozluk.seviye_kodu("11sayisal") == sozluk.seviye_kodu("11sozel")
+        assert sozluk.seviye_kodu("lisehazirlikingilizce") == sozluk.seviye_kodu("9")
+        assert sozluk.seviye_kodu(10) == sozluk.seviye_kodu("10")
+        assert sozluk.seviye_kodu("bilinmeyen") != sozluk.seviye_kodu("baska")
+        assert sozluk.sinif_adi(a) == "11sayisal-A"
+        assert sozluk.sinif_seviyeleri[a] == sozluk.seviye_kodu("11")
+
+    @pytest.mark.parametrize("sezgisel", [True, False])
+    def test_metin_siniflarla_harmanlama(self, sezgisel):
+        """'11sayisal' gibi sınıflar çözücüye kadar hatasız gider, aynı aile yan yana oturmaz"""
+        if not sezgisel:
+            pytest.importorskip("ortools")
+        from utils import sinif_seviyesinden_sayi
+        ogrenciler = ogrenci_listesi({
+            ('11sayisal', 'A'): 8, ('11sozel', 'A'): 7, ('lisehazirlikingilizce', 'B'): 6,
+            ('10', 'A'): 14, ('12esitağirlik', 'C'): 10
+        })
+        salonlar = [{'id': 1, 'salon_adi': 'A-101', 'kapasite': 50}]
+        engine = HarmanlamaEngine(HarmanlamaConfig(seed=2, sezgisel_once=sezgisel))
+        sonuc = engine.harmanla(ogrenciler, salonlar)
+        assert sonuc['basarili'], sonuc['hatalar']
+        aileler = [dict(y, ogrenci_sinif=sinif_seviyesinden_sayi(y['ogrenci_sinif']))
+                   for y in sonuc['yerlesim']]
+        assert komsu_ihlalleri(engine, aileler) == 0
+        assert sonuc['istatistikler']['sinif_dagilim']['11sayisal/A'] == 8
+
+
+class TestKoltukTablosu:
+    """Sütun tabanlı koltuk/öğrenci tabloları testleri"""
+
+    def test_sutunlar_ve_alt_tablo(self):
+        """Koltuklar dizilerde tutulur; alt tablo süreçlere gönderilebilir"""
+        import pickle
+        engine = HarmanlamaEngine(HarmanlamaConfig())
+        salonlar = [
+            {'id': 1, 'salon_adi': 'A-101', 'kapasite': 6},
+            {'id': 2, 'salon_adi': 'A-102', 'kapasite': 4}
+        ]
+        salon_sira_map = engine._hazirla_salon_sira_map(salonlar, None)
+        tablo, _ = engine._prepare_seat_data(salonlar, salon_sira_map, {1: {2}},
+                                             include_teacher_desks=True)
+        assert len(tablo) == 5 + 1 + 4 + 1
+        assert 2 not in [no for sid, no in zip(tablo.salon_idleri, tablo.sira_nolari) if sid == 1]
+        assert len(tablo.ogretmen_koltuklari()) == 2
+        alt = pickle.loads(pickle.dumps(tablo.alt_tablo(tablo.salon_koltuklari()[2])))
+        assert list(alt.sira_nolari)[:4] == [1, 2, 3, 4]
+        assert alt.salon_adlari == {2: 'A-102'}
+
+    def test_ogrenci_tablosu(self):
+        """Öğrenci tablosu seviye ailelerini gruplar"""
+        from controllers.harmanlama_engine import OgrenciTablosu, SinifSozlugu
+        ogrenciler = ogrenci_listesi({('11sayisal', 'A'): 2, ('11sozel', 'B'): 1, ('9', 'A'): 2})
+        tablo = OgrenciTablosu(ogrenciler, SinifSozlugu())
+        assert list(tablo.idler) == [1, 2, 3, 4, 5]
+        assert sorted(len(g) for g in tablo.seviye_gruplari().values()) == [2, 3]
+
+
+class TestSabitKomsuMaskeleri:
+    """Sabit öğrencilerin komşu koltuklarına seviye yasağı (alan budama) testleri"""
+
+    def _okul(self):
+        ogrenciler = ogrenci_listesi({('10', 'A'): 8, ('9', 'B'): 8, ('11', 'C'): 6})
+        harita = {1: [
+            {'id': no, 'salon_id': 1, 'salon_adi': 'A-101', 'sira_no': no}
+            for no in range(1, 25)
+        ]}
+        sabitler = [
+            dict(ogrenciler[i], sabit_salon_id=1, sabit_salon_sira_id=no)
+            for i, no in ((0, 3), (1, 10), (2, 17))
+        ]
+        salonlar = [{'id': 1, 'salon_adi': 'A-101', 'kapasite': 24}]
+        return ogrenciler, sabitler, salonlar, harita
+
+    def test_komsu_koltuklara_maske(self):
+        """Sabit 10. sınıfın yan ve ön/arka koltukları 10. seviyeyi yasaklar"""
+        ogrenciler, sabitler, salonlar, harita = self._okul()
+        engine = HarmanlamaEngine(HarmanlamaConfig())
+        salon_sira_map = engine._hazirla_salon_sira_map(salonlar, harita)
+        _, occupied_map, occupied_classes = engine._sabit_ogrenci_yerlestir(
+            sabitler, salonlar, salon_sira_map
+        )
+        tablo, _ = engine._prepare_seat_data(salonlar, salon_sira_map, occupied_map,
+                                             occupied_classes=occupied_classes)
+        onuncu = engine.sozluk.seviye_kodu('10')
+        yasakli = sorted(tablo.sira_nolari[idx] for idx in tablo.yasak_maskeleri
+                         if tablo.yasakli_mi(idx, onuncu))
+        assert yasakli == [1, 4, 5, 8, 9, 12, 15, 18, 19]
+        alt = tablo.alt_tablo(list(tablo.yasak_maskeleri))
+        assert all(alt.yasakli_mi(idx, onuncu) for idx in range(len(alt)))
+
+    @pytest.mark.parametrize("sezgisel,model", [(True, "seviye"), (False, "seviye"), (False, "ogrenci")])
+    def test_sabit_komsusu_ihlal_yok(self, sezgisel, model):
+        """Sabit öğrencilerle birlikte tüm yerleşimde aynı seviye yan yana/arka arkaya gelmez"""
+        if not sezgisel:
+            pytest.importorskip("ortools")
+        ogrenciler, sabitler, salonlar, harita = self._okul()
+        engine = HarmanlamaEngine(HarmanlamaConfig(seed=3, sezgisel_once=sezgisel, cp_sat_modeli=model))
+        sonuc = engine.harmanla(ogrenciler, salonlar, sabit_ogrenciler=sabitler,
+                                salon_sira_haritasi=harita)
+        assert sonuc['basarili'], sonuc['hatalar']
+        assert not any(y.get('ogretmen_masasi') for y in sonuc['yerlesim'])
+        assert komsu_ihlalleri(engine, sonuc['yerlesim']) == 0
+
+
+class TestYerelOnarim:
+    """Son dakika ekleme/çıkarma için küresel çözümsüz yerel onarım testleri"""
+
+    def test_ekleme_ve_cikarma(self):
+        """Yeni öğrenciler kurala uygun yerleşir; yalnızca eklenen/taşınan satırlar değişir"""
+        ogrenciler = ogrenci_listesi({('9', 'A'): 12, ('10', 'B'): 12, ('11', 'C'): 10})
+        salonlar = [{'id': 1, 'salon_adi': 'A-101', 'kapasite': 20},
+                    {'id': 2, 'salon_adi': 'A-102', 'kapasite': 20}]
+        engine = HarmanlamaEngine(HarmanlamaConfig(seed=2))
+        sonuc = engine.harmanla(ogrenciler, salonlar)
+        assert sonuc['basarili'], sonuc['hatalar']
+        onceki = [dict(yer) for yer in sonuc['yerlesim']]
+        yeniler = ogrenci_listesi({('12', 'D'): 3, ('9', 'B'): 1}, baslangic_id=100)
+
+        onarim = engine.yerel_onarim(sonuc['yerlesim'], salonlar, yeni_ogrenciler=yeniler,
+                                     cikarilan_idler=[1, 13])
+        assert onarim['basarili'], onarim['hatalar']
+        assert sonuc['yerlesim'] == onceki
+        assert sorted(onarim['degisiklikler']['eklenen']) == [100, 101, 102, 103]
+        assert sorted(onarim['degisiklikler']['cikarilan']) == [1, 13]
+        assert [yer['ogrenci_id'] for yer in onarim['cikarilan']] == [1, 13]
+        assert len(onarim['yerlesim']) == len(onceki) + 2
+        assert komsu_ihlalleri(engine, onarim['yerlesim']) == 0
+        degisen = {yer['ogrenci_id'] for yer in onarim['degisen']}
+        eski = {yer['ogrenci_id']: (yer['salon_id'], yer['sira_no']) for yer in onceki}
+        for yer in onarim['yerlesim']:
+            if yer['ogrenci_id'] not in degisen:
+                assert eski[yer['ogrenci_id']] == (yer['salon_id'], yer['sira_no'])
+
+    @pytest.mark.parametrize("uzunluk,basarili", [(1, False), (2, True)])
+    def test_kaydirma_zinciri(self, uzunluk, basarili):
+        """Boş koltuk uygun değilse bir öğrenci oraya kaydırılıp yeni öğrenciye yer açılır"""
+        #  9 | 10
+        # 10 | 11
+        # 11 | --
+        yerlesim = [
+            {'ogrenci_id': no, 'salon_id': 1, 'salon_adi': 'A-101', 'sira_no': no,
+             'ogrenci_sinif': sinif, 'ogrenci_sube': 'A', 'sabit_mi': False}
+            for no, sinif in [(1, '9'), (2, '10'), (3, '10'), (4, '11'), (5, '11')]
+        ]
+        salonlar = [{'id': 1, 'salon_adi': 'A-101', 'kapasite': 6}]
+        engine = HarmanlamaEngine(HarmanlamaConfig(onarim_zincir_uzunlugu=uzunluk))
+        yeni = ogrenci_listesi({('11', 'B'): 1}, baslangic_id=50)
+        onarim = engine.yerel_onarim(yerlesim, salonlar, yeni_ogrenciler=yeni)
+        assert onarim['basarili'] is basarili
+        if not basarili:
+            assert onarim['yerlestirilemeyen'] == [50]
+            assert onarim['degisen'] == []
+            return
+        konumlar = {yer['ogrenci_id']: yer['sira_no'] for yer in onarim['degisen']}
+        assert konumlar == {50: 1, 1: 6}
+        assert onarim['degisiklikler']['tasinan'][0]['eski_sira_no'] == 1
+        assert komsu_ihlalleri(engine, onarim['yerlesim']) == 0
@@ -0,0 +1,75 @@
+"""
+Kelebek Sınav Sistemi - Harmanlama İşçi Süreci Testleri
+pytest ile çalıştırılır: python -m pytest tests/ -v
+"""
+
+import pytest
+import sys
+import os
+
+# Path ayarı
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from controllers.harmanlama_engine import HarmanlamaConfig, IptalBelirteci
+from controllers.harmanlama_isci import HarmanlamaIsciSureci
+
+
+def _ogrenciler(adet_9, adet_10):
+    ogrenciler = []
+    for idx in range(adet_9 + adet_10):
+        ogrenciler.append({
+            'id': idx + 1,
+            'ad': f'Öğrenci{idx + 1}',
+            'soyad': 'TEST',
+            'sinif': '9' if idx < adet_9 else '10',
+            'sube': 'A'
+        })
+    return ogrenciler
+
+
+@pytest.fixture(scope="module")
+def isci():
+    pytest.importorskip("ortools")
+    surec = HarmanlamaIsciSureci()
+    yield surec
+    surec.kapat()
+
+
+class TestHarmanlamaIsciSureci:
+    """Ayrı süreçte harmanlama testleri"""
+
+    def test_sonuc_ve_ilerleme_surecten_gelir(self, isci):
+        """Sonuç sözlüğü ve CP-SAT ilerlemesi süreç sınırından geçer"""
+        bildirimler = []
+        sonuc = isci.harmanla(
+            _ogrenciler(8, 8),
+            [{'id': 1, 'salon_adi': 'A-101', 'kapasite': 16}],
+            config=HarmanlamaConfig(seed=1, sezgisel_once=False, isci_sayisi=1),
+            ilerleme_bildirimi=bildirimler.append
+        )
+        assert sonuc['basarili'] is True
+        assert len(sonuc['yerlesim']) == 16
+        assert bildirimler and bildirimler[0]['cozum_sayisi'] == 1
+
+    def test_surec_tekrar_kullanilir(self, isci):
+        """İkinci harmanlama aynı işçi havuzunu kullanır"""
+        onceki = isci._executor
+        sonuc = isci.harmanla(
+            _ogrenciler(4, 4),
+            [{'id': 1, 'salon_adi': 'A-101', 'kapasite': 8}]
+        )
+        assert sonuc['basarili'] is True
+        assert isci._executor is onceki
+
+    def test_iptal_surece_iletilir(self, isci):
+        """Önceden tetiklenmiş belirteç işçideki motoru durdurur"""
+        iptal = IptalBelirteci()
+        iptal.iptal_et()
+        sonuc = isci.harmanla(
+            _ogrenciler(8, 8),
+            [{'id': 1, 'salon_adi': 'A-101', 'kapasite': 16}],
+            config=HarmanlamaConfig(sezgisel_once=False),
+            iptal_belirteci=iptal
+        )
+        assert sonuc['basarili'] is False
+        assert any("iptal" in h for h in sonuc['hatalar'])
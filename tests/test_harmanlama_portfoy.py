@@ -0,0 +1,59 @@
+"""
+Kelebek Sınav Sistemi - Portföy Harmanlama Testleri
+pytest ile çalıştırılır: python -m pytest tests/ -v
+"""
+
+import pytest
+import sys
+import os
+
+# Path ayarı
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from controllers.harmanlama_engine import HarmanlamaConfig, IptalBelirteci
+from controllers.harmanlama_portfoy import PortfoyHarmanlama
+from tests.test_harmanlama_engine import ogrenci_listesi
+
+
+pytestmark = pytest.mark.usefixtures("ortools_gerekli")
+
+
+class TestPortfoyHarmanlama:
+    """Strateji yarışı testleri"""
+
+    def test_ilk_gecerli_yerlesim_kazanir(self, tmp_path):
+        """Kazanan strateji sonuçta ve sayaç dosyasında görünür"""
+        kayit = str(tmp_path / "kazananlar.json")
+        portfoy = PortfoyHarmanlama(HarmanlamaConfig(seed=1), kayit_dosyasi=kayit)
+        ogrenciler = ogrenci_listesi({('9', 'A'): 10, ('10', 'A'): 10, ('11', 'B'): 8})
+        salonlar = [{'id': 1, 'salon_adi': 'A-101', 'kapasite': 30}]
+        sonuc = portfoy.harmanla(ogrenciler, salonlar)
+        assert sonuc['basarili']
+        kazanan = sonuc['portfoy']['kazanan']
+        assert kazanan in sonuc['portfoy']['stratejiler']
+        assert sonuc['istatistikler']['portfoy_kazanani'] == kazanan
+        assert len(sonuc['yerlesim']) == len(ogrenciler)
+        portfoy.harmanla(ogrenciler, salonlar)
+        assert sum(k['kazanma'] for k in portfoy.kazanan_istatistikleri().values()) == 2
+
+    def test_tum_stratejiler_basarisiz(self, tmp_path):
+        """Hiçbir strateji yerleştiremezse her birinin hatası raporlanır"""
+        portfoy = PortfoyHarmanlama(HarmanlamaConfig(seed=1),
+                                    kayit_dosyasi=str(tmp_path / "k.json"))
+        ogrenciler = ogrenci_listesi({('9', 'A'): 6})
+        salonlar = [{'id': 1, 'salon_adi': 'A-101', 'kapasite': 6}]
+        sonuc = portfoy.harmanla(ogrenciler, salonlar)
+        assert not sonuc['basarili']
+        assert sonuc['portfoy']['kazanan'] is None
+        assert len(sonuc['hatalar']) == len(portfoy.stratejiler)
+        assert portfoy.kazanan_istatistikleri() == {}
+
+    def test_dis_iptal_tum_stratejileri_durdurur(self, tmp_path):
+        """Önceden iptal edilmiş belirteçle hiçbir strateji sonuç üretmez"""
+        iptal = IptalBelirteci()
+        iptal.iptal_et()
+        portfoy = PortfoyHarmanlama(HarmanlamaConfig(seed=1), kayit_dosyasi=str(tmp_path / "k.json"),
+                                    iptal_belirteci=iptal)
+        ogrenciler = ogrenci_listesi({('9', 'A'): 5, ('10', 'A'): 5})
+        sonuc = portfoy.harmanla(ogrenciler, [{'id': 1, 'salon_adi': 'A-101', 'kapasite': 12}])
+        assert not sonuc['basarili']
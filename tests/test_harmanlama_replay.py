@@ -0,0 +1,81 @@
+"""
+Kelebek Sınav Sistemi - Model Dökümü ve Tekrar Testleri
+pytest ile çalıştırılır: python -m pytest tests/ -v
+"""
+
+import pytest
+import sys
+import os
+
+# Path ayarı
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from controllers.harmanlama_engine import HarmanlamaEngine, HarmanlamaConfig
+from controllers.harmanlama_replay import DokumTekrari, dokum_oku, main
+from tests.test_harmanlama_engine import ogrenci_listesi
+
+
+def dokum_yaz(tmp_path, **ayarlar):
+    ogrenciler = ogrenci_listesi({('9', 'A'): 10, ('10', 'B'): 10, ('11', 'C'): 8})
+    salonlar = [{'id': 1, 'salon_adi': 'A-101', 'kapasite': 30}]
+    sonuc = HarmanlamaEngine(HarmanlamaConfig(seed=1, model_dokumu=str(tmp_path), **ayarlar)).harmanla(
+        ogrenciler, salonlar
+    )
+    assert sonuc['basarili'], sonuc['hatalar']
+    return sonuc
+
+
+class TestModelDokumu:
+    """model_dokumu açıkken yazılan döküm ve çevrimdışı tekrar"""
+
+    def test_dokum_kapaliyken_dosya_yazilmaz(self):
+        """Varsayılan ayarlarda döküm yazılmaz, performans raporunda yol yoktur"""
+        ogrenciler = ogrenci_listesi({('9', 'A'): 4, ('10', 'B'): 4})
+        sonuc = HarmanlamaEngine(HarmanlamaConfig(seed=1)).harmanla(
+            ogrenciler, [{'id': 1, 'salon_adi': 'A-101', 'kapasite': 10}]
+        )
+        assert 'model_dokumu' not in sonuc['performans']
+
+    def test_sezgisel_dokumu_tekrarlanir(self, tmp_path):
+        """Sezgisel yol dökülür; tekrar aynı koltuk tablosunda yine çözüm bulur"""
+        sonuc = dokum_yaz(tmp_path)
+        yol = sonuc['performans']['model_dokumu']
+        assert os.path.dirname(yol) == str(tmp_path)
+
+        dokum = dokum_oku(yol)
+        assert len(dokum['ogrenci_siniflari']) == 28
+        assert len(dokum['koltuklar']['sira_nolari']) == 30
+        assert dokum['cozumler'][0]['asama'] == 'sezgisel'
+        assert dokum['cozumler'][0]['durum'] == 'BULUNDU'
+
+        satirlar = DokumTekrari(dokum).calistir()
+        assert satirlar[0]['asama'] == 'on_kontrol'
+        assert [(s['asama'], s['durum']) for s in satirlar[1:]] == [('sezgisel', 'BULUNDU')]
+
+    def test_cp_sat_dokumu_ve_proto_tekrari(self, tmp_path, capsys):
+        """CP-SAT denemesi durumu ve model protosuyla birlikte dökülür ve aynen yeniden çözülür"""
+        pytest.importorskip("ortools")
+        sonuc = dokum_yaz(tmp_path, sezgisel_once=False, model_dokumu_proto=True)
+        dokum = dokum_oku(sonuc['performans']['model_dokumu'])
+        cozum = dokum['cozumler'][-1]
+        assert cozum['asama'] == 'cp-sat'
+        assert cozum['model_proto']
+
+        tekrar = DokumTekrari(dokum, {'cp_sat_modeli': 'ogrenci'})
+        assert tekrar.coz(cozum)['durum'] == cozum['durum']
+        assert tekrar.proto_coz(cozum)['durum'] == cozum['durum']
+
+        assert main([sonuc['performans']['model_dokumu'], '--proto', '--tekrar', '2',
+                     '--param', 'randomize_search=true']) == 0
+        cikti = capsys.readouterr().out
+        assert cikti.count('cp-sat (proto)') == 2
+
+    def test_akis_ayarlara_gore_yol_secer(self, tmp_path):
+        """akis() dökülen tabloda harmanla akışını tekrarlar; sezgisel kapalıysa CP-SAT'e geçer"""
+        pytest.importorskip("ortools")
+        sonuc = dokum_yaz(tmp_path)
+        dokum = dokum_oku(sonuc['performans']['model_dokumu'])
+        assert DokumTekrari(dokum).akis()['cozum_yolu'] == 'sezgisel'
+        akis = DokumTekrari(dokum, {'sezgisel_once': False}).akis()
+        assert akis['basarili'] and akis['cozum_yolu'] == 'cp-sat'
+        assert akis['cozucu'][0]['durum'] in ('OPTIMAL', 'FEASIBLE')
@@ -0,0 +1,154 @@
+"""
+Kelebek Sınav Sistemi - Koltuk Izgarası Testleri
+pytest ile çalıştırılır: python -m pytest tests/ -v
+"""
+
+import random
+import pytest
+import sys
+import os
+
+# Path ayarı
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from controllers import koltuk_izgarasi
+from controllers.koltuk_izgarasi import yerlesim_ihlalleri
+from controllers.harmanlama_engine import HarmanlamaEngine
+
+
+def rastgele_yerlesim(salon_sayisi, kapasite, seed=3):
+    rng = random.Random(seed)
+    yerlesim = []
+    for salon_id in range(1, salon_sayisi + 1):
+        for sira_no in range(1, kapasite + 1):
+            if rng.random() < 0.15:
+                continue
+            yerlesim.append({
+                'salon_id': salon_id,
+                'salon_adi': f'S{salon_id}',
+                'sira_no': sira_no,
+                'ogrenci_sinif': rng.choice(['9', '10', '11']),
+                'ogrenci_sube': rng.choice(['A', 'B'])
+            })
+    return yerlesim
+
+
+def referans_ciftler(yerlesim, genislik):
+    """_seat_neighbors ile koltuk koltuk hesaplanan aynı sınıflı komşu çiftleri"""
+    engine = HarmanlamaEngine()
+    harita = {(y['salon_id'], y['sira_no']): f"{y['ogrenci_sinif']}-{y['ogrenci_sube']}" for y in yerlesim}
+    ciftler = set()
+    for (salon_id, sira_no), anahtar in harita.items():
+        dolu = {no for sid, no in harita if sid == salon_id}
+        for komsu in engine._seat_neighbors(sira_no, genislik, dolu):
+            if harita[(salon_id, komsu)] == anahtar:
+                ciftler.add((salon_id, min(sira_no, komsu), max(sira_no, komsu)))
+    return ciftler
+
+
+class TestYerlesimIhlalleri:
+    """Dizi tabanlı ihlal tespiti testleri"""
+
+    @pytest.mark.parametrize("numpy_var", [True, False])
+    @pytest.mark.parametrize("genislik", [2, 3])
+    def test_referansla_ayni(self, monkeypatch, numpy_var, genislik):
+        """Izgara sonuçları koltuk koltuk kontrolle birebir aynıdır"""
+        if not numpy_var:
+            monkeypatch.setattr(koltuk_izgarasi, "np", None)
+        yerlesim = rastgele_yerlesim(4, 30)
+        kayitlar = yerlesim_ihlalleri(yerlesim, {}, varsayilan_genislik=genislik)
+        bulunan = {(k['salon_id'], k['sira_no'], k['komsu_sira_no']) for k in kayitlar}
+        assert bulunan == referans_ciftler(yerlesim, genislik)
+        assert all(k['tur'] in ('yan', 'arka') for k in kayitlar)
+
+    @pytest.mark.parametrize("numpy_var", [True, False])
+    def test_min_aralik(self, monkeypatch, numpy_var):
+        """Sıra numarası düzeninde yakın aynı sınıf 'aralik' kaydı üretir"""
+        if not numpy_var:
+            monkeypatch.setattr(koltuk_izgarasi, "np", None)
+        yerlesim = [
+            {'salon_id': 1, 'salon_adi': 'S1', 'sira_no': no, 'ogrenci_sinif': sinif, 'ogrenci_sube': 'A'}
+            for no, sinif in [(1, '9'), (2, '10'), (3, '9'), (4, '11'), (5, '12'), (6, '9')]
+        ]
+        kayitlar = yerlesim_ihlalleri(yerlesim, {1: 10}, min_aralik=2)
+        assert [(k['tur'], k['sira_no']) for k in kayitlar] == [('aralik', 3)]
+
+    def test_ogretmen_masasi_haric(self):
+        yerlesim = [
+            {'salon_id': 1, 'salon_adi': 'S1', 'sira_no': 1, 'ogrenci_sinif': '9', 'ogrenci_sube': 'A'},
+            {'salon_id': 1, 'salon_adi': 'S1', 'sira_no': 900100, 'ogrenci_sinif': '9',
+             'ogrenci_sube': 'A', 'ogretmen_masasi': True}
+        ]
+        assert yerlesim_ihlalleri(yerlesim, {}) == []
+
+    def test_validate_yerlesim_mesajlari(self):
+        """Motorun doğrulaması kayıtlardan mesaj üretir"""
+        engine = HarmanlamaEngine()
+        yerlesim = [
+            {'salon_id': 1, 'salon_adi': 'S1', 'sira_no': 1, 'ogrenci_sinif': '9', 'ogrenci_sube': 'A'},
+            {'salon_id': 1, 'salon_adi': 'S1', 'sira_no': 2, 'ogrenci_sinif': '9', 'ogrenci_sube': 'A'}
+        ]
+        uyumsuzluklar = []
+        assert engine._validate_yerlesim(yerlesim, 0, uyumsuzluklar=uyumsuzluklar, strict=False) is False
+        assert uyumsuzluklar == [
+            "⚠️ S1 salonunda 1. sıranın yanında/arkasında aynı sınıftan öğrenci bulundu (9-A)."
+        ]
+
+
+class TestYerlesimDenetleyici:
+    """Elle takas/taşıma için artımlı denetim testleri"""
+
+    def yerlesim(self):
+        # Genişlik 2: 1-2 | 3-4 | 5-6
+        return [
+            {'ogrenci_id': no, 'salon_id': 1, 'salon_adi': 'S1', 'sira_no': no,
+             'ogrenci_sinif': sinif, 'ogrenci_sube': 'A'}
+            for no, sinif in [(1, '9'), (2, '10'), (3, '10'), (4, '9'), (5, '9')]
+        ]
+
+    def test_takas_denetimi(self):
+        """Takas ve boş sıraya taşıma yalnızca iki koltuğun komşularıyla denetlenir"""
+        denetleyici = HarmanlamaEngine().yerlesim_denetleyici(self.yerlesim())
+        ihlaller = denetleyici.takas_ihlalleri((1, 1), (1, 2))
+        assert {(k['tur'], k['sira_no'], k['komsu_sira_no']) for k in ihlaller} == {
+            ('arka', 1, 3), ('arka', 2, 4)
+        }
+        assert {k['sinif'] for k in ihlaller} == {'9', '10'}
+        # Boş 6. sıra: 10-A oraya geçebilir, 9-A yandaki 5. ve arkadaki 4. sırayla çakışır
+        assert denetleyici.takas_gecerli_mi((1, 2), (1, 6))
+        assert [k['tur'] for k in denetleyici.takas_ihlalleri((1, 1), (1, 6))] == ['yan', 'arka']
+        assert denetleyici.takas_ihlalleri((1, 1), (1, 1)) == []
+
+    def test_ayni_seviye_farkli_sube_takasi_reddedilir(self):
+        """Denetleyici şubeyi değil çözücünün seviye kuralını uygular"""
+        yerlesim = [
+            {'ogrenci_id': no, 'salon_id': 1, 'salon_adi': 'S1', 'sira_no': no,
+             'ogrenci_sinif': sinif, 'ogrenci_sube': sube}
+            for no, sinif, sube in [(1, '9', 'A'), (2, '10', 'A'), (4, '9', 'B')]
+        ]
+        engine = HarmanlamaEngine()
+        denetleyici = engine.yerlesim_denetleyici(yerlesim)
+        ihlaller = denetleyici.takas_ihlalleri((1, 2), (1, 4))
+        assert [(k['tur'], k['sira_no'], k['komsu_sira_no'], k['sinif']) for k in ihlaller] == [
+            ('yan', 1, 2, '9')
+        ]
+        assert not denetleyici.takas_gecerli_mi((1, 2), (1, 4))
+        denetleyici.takas_et((1, 2), (1, 4))
+        assert len(engine._kural_ihlalleri(yerlesim)) == 1
+
+    def test_takas_et(self):
+        """Hamle satırları ve indeksi günceller; tahmin edilen ihlaller tam denetimle aynıdır"""
+        yerlesim = self.yerlesim()
+        denetleyici = HarmanlamaEngine().yerlesim_denetleyici(yerlesim)
+        degisen = denetleyici.takas_et((1, 2), (1, 6))
+        assert [(y['ogrenci_id'], y['sira_no']) for y in degisen] == [(2, 6)]
+        assert denetleyici.yer((1, 2)) is None
+        assert yerlesim_ihlalleri(yerlesim, {}) == []
+
+        tahmin = denetleyici.takas_ihlalleri((1, 1), (1, 3))
+        degisen = denetleyici.takas_et((1, 1), (1, 3))
+        assert sorted((y['ogrenci_id'], y['sira_no']) for y in degisen) == [(1, 3), (3, 1)]
+        gercek = yerlesim_ihlalleri(yerlesim, {})
+        assert {(k['sira_no'], k['komsu_sira_no']) for k in gercek} == {
+            (k['sira_no'], k['komsu_sira_no']) for k in tahmin
+        } != set()
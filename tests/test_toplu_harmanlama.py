@@ -0,0 +1,132 @@
+"""
+Kelebek Sınav Sistemi - Toplu Oturum Harmanlaması Testleri
+pytest ile çalıştırılır: python -m pytest tests/ -v
+"""
+
+import pytest
+import sys
+import os
+
+# Path ayarı
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from controllers.database_manager import DatabaseManager
+from controllers.harmanlama_engine import HarmanlamaEngine, HarmanlamaConfig, IptalBelirteci
+from controllers.toplu_harmanlama import TopluHarmanlamaEngine, oturumlari_grupla
+
+
+@pytest.fixture
+def hafta(tmp_path):
+    """İki oturumlu küçük sınav haftası: pazartesi 1. ders (iki sınav), salı 2. ders"""
+    db = DatabaseManager(str(tmp_path / "hafta.db"))
+    salonlar = [db.salon_ekle("A-101", 20), db.salon_ekle("A-102", 20)]
+    for sinif in ("9", "10", "11"):
+        for sube in ("A", "B"):
+            for no in range(6):
+                db.ogrenci_ekle(f"Ad{no}", f"{sinif}{sube}", sinif, sube)
+    ders = db.ders_ekle("Matematik", [9, 10, 11])
+    sinavlar = [
+        db.sinav_ekle("Mat 9", ders, ["9"], salonlar, sinav_tarihi="2026-06-01",
+                      sinav_saati="09:00", kacinci_ders=1),
+        db.sinav_ekle("Mat 10", ders, ["10", "9-A"], salonlar, sinav_tarihi="2026-06-01",
+                      sinav_saati="09:00", kacinci_ders=1),
+        db.sinav_ekle("Mat 11", ders, ["11-A"], salonlar[:1], sinav_tarihi="2026-06-02",
+                      sinav_saati="10:00", kacinci_ders=2),
+    ]
+    return db, sinavlar
+
+
+class TestTopluHarmanlama:
+    """Oturum gruplama, tek sorgulu havuz ve tek işlemde kayıt testleri"""
+
+    def test_oturumlar_gruplanir(self, hafta):
+        """Aynı tarih/saat/ders saatindeki sınavlar tek oturumdur"""
+        db, sinavlar = hafta
+        oturumlar = oturumlari_grupla(db.sinavlari_listele())
+        assert [[s['id'] for s in o['sinavlar']] for o in oturumlar] == [sinavlar[:2], sinavlar[2:]]
+        assert len(oturumlar[0]['salon_ids']) == 2
+
+    def test_havuz_cakisanlari_ayiklar(self, hafta):
+        """Aynı oturumda iki sınavı olan öğrenci bir kez, ilk sınavıyla gelir"""
+        db, sinavlar = hafta
+        oturum = oturumlari_grupla(db.sinavlari_listele())[0]
+        havuz = db.oturum_ogrenci_havuzu(oturum['sinavlar'])
+        assert len(havuz['tum']) == 24
+        assert havuz['cakisan'] == 6
+        assert {o['sinav_id'] for o in havuz['tum'] if o['sinif'] == '9'} == {sinavlar[0]}
+
+    def test_tum_hafta_kaydedilir(self, hafta):
+        """Tüm oturumlar çözülür, ilerleme bildirilir ve yerleşimler kaydedilir"""
+        db, sinavlar = hafta
+        bildirimler = []
+        engine = TopluHarmanlamaEngine(db, HarmanlamaConfig(seed=1, dagitim_modu="round-robin"))
+        ozet = engine.harmanla(surec_sayisi=1, ilerleme_bildirimi=bildirimler.append)
+        assert ozet['basarili']
+        assert ozet['oturum_sayisi'] == 2
+        assert ozet['yerlestirilen'] == ozet['kaydedilen'] == 30
+        assert [b['tamamlanan'] for b in bildirimler] == [1, 2]
+        assert len(db.yerlesim_getir(sinavlar[0])) == 12
+        assert len(db.yerlesim_getir(sinavlar[1])) == 12
+        assert {y['salon_id'] for y in db.yerlesim_getir(sinavlar[2])} == {
+            db.sinav_getir(sinavlar[2])['secili_salonlar'][0]
+        }
+
+    def test_paralel_sonuc_ayni(self, hafta):
+        """Süreç havuzunda çözüm sıralı çözümle aynı özeti verir"""
+        pytest.importorskip("ortools")
+        db, _ = hafta
+        engine = TopluHarmanlamaEngine(db, HarmanlamaConfig(seed=1))
+        ozet = engine.harmanla(surec_sayisi=2, kaydet=False)
+        assert ozet['basarili']
+        assert ozet['kaydedilen'] == 0
+        assert [o['yerlestirilen'] for o in ozet['oturumlar']] == [24, 6]
+
+    def test_iptal_calisan_oturumu_keser(self, hafta, monkeypatch):
+        """Belirteç bu süreçteki motora geçer; oturum ortasında iptal hiçbir şey kaydetmez"""
+        from controllers import toplu_harmanlama
+
+        class IptalEdenEngine(HarmanlamaEngine):
+            def harmanla(self, *args, **kwargs):
+                self.iptal_belirteci.iptal_et()
+                return super().harmanla(*args, **kwargs)
+
+        monkeypatch.setattr(toplu_harmanlama, 'HarmanlamaEngine', IptalEdenEngine)
+        db, sinavlar = hafta
+        engine = TopluHarmanlamaEngine(db, HarmanlamaConfig(seed=1, dagitim_modu="round-robin"))
+        ozet = engine.harmanla(surec_sayisi=1, iptal_belirteci=IptalBelirteci())
+        assert ozet['iptal_edildi']
+        assert ozet['kaydedilen'] == 0
+        assert [o['hatalar'] for o in ozet['oturumlar']] == [["⏹️ Oturum çözülmeden iptal edildi."]] * 2
+        assert db.yerlesim_getir(sinavlar[0]) == []
+
+    def test_calisma_gecmisi(self, hafta, tmp_path):
+        """Her kaydedilen oturum geçmişe yazılır; sorgu, özet ve dışa aktarma çalışır"""
+        db, sinavlar = hafta
+        engine = TopluHarmanlamaEngine(db, HarmanlamaConfig(seed=1, dagitim_modu="round-robin"))
+        assert engine.harmanla(surec_sayisi=1)['basarili']
+        kayitlar = db.harmanlama_gecmisi_listele()
+        assert sorted(k['sinav_idleri'] for k in kayitlar) == [sinavlar[:2], sinavlar[2:]]
+        kayit = db.harmanlama_gecmisi_listele(sinav_id=sinavlar[2])[0]
+        assert kayit['ogrenci_sayisi'] == 6 and kayit['yerlestirilen'] == 6
+        assert kayit['cozum_yolu'] == "round-robin"
+        assert kayit['config']['seed'] == 1
+        assert kayit['toplam_sure'] is not None and 'siralama' in kayit['asamalar']
+        assert db.harmanlama_gecmisi_listele(cozum_yolu="cp-sat") == []
+
+        ozet = db.harmanlama_gecmisi_ozeti()
+        assert [(o['cozum_yolu'], o['calisma_sayisi']) for o in ozet] == [("round-robin", 2)]
+
+        from controllers.excel_handler import ExcelHandler
+        dosya = tmp_path / "gecmis.xlsx"
+        assert ExcelHandler.harmanlama_gecmisi_yazdir(str(dosya), kayitlar)
+        assert dosya.exists()
+
+    def test_gecmis_yerlesimle_ayni_islemde(self, hafta):
+        """Geçmiş kaydı yazılamazsa yerleşim de yazılmaz"""
+        db, sinavlar = hafta
+        yerlesim = [{'ogrenci_id': 1, 'salon_id': db.sinav_getir(sinavlar[0])['secili_salonlar'][0],
+                     'sira_no': 1}]
+        with pytest.raises(Exception):
+            db.yerlesim_kaydet(sinavlar[0], yerlesim, calisma={'salon_sayisi': 1})
+        assert db.yerlesim_getir(sinavlar[0]) == []
+        assert db.harmanlama_gecmisi_listele() == []
@@ -0,0 +1,73 @@
+"""
+Kelebek Sınav Sistemi - Sütunlu Yerleşim Sonucu Testleri
+pytest ile çalıştırılır: python -m pytest tests/ -v
+"""
+
+import pickle
+import pytest
+import sys
+import os
+
+# Path ayarı
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from controllers.harmanlama_engine import HarmanlamaEngine, HarmanlamaConfig
+from controllers.yerlesim_tablosu import YerlesimTablosu
+from tests.test_harmanlama_engine import ogrenci_listesi
+
+
+def ornek_satirlar():
+    return [
+        {'ogrenci_id': 5, 'salon_id': 2, 'sira_no': 3, 'ogrenci_sinif': '9', 'ogrenci_sube': 'A',
+         'salon_adi': 'B-201', 'sabit_mi': False, 'sinav_id': 1, 'sinav_adi': 'Matematik'},
+        {'ogrenci_id': 6, 'salon_id': 1, 'sira_no': 1, 'ogrenci_sinif': '10', 'ogrenci_sube': 'B',
+         'salon_adi': 'A-101', 'sabit_mi': True, 'sabit_konum': 'A-101 / 001',
+         'sinav_id': 1, 'sinav_adi': 'Matematik'},
+        {'ogrenci_id': 7, 'salon_id': 2, 'sira_no': 1, 'ogrenci_sinif': '9', 'ogrenci_sube': 'A',
+         'salon_adi': 'B-201', 'sabit_mi': False, 'ogretmen_masasi': True,
+         'sira_label': 'Öğretmen Masası', 'sinav_id': None, 'sinav_adi': None},
+    ]
+
+
+class TestYerlesimTablosu:
+    """Sütunlu yerleşim sonucunun liste uyumluluğu ve DataFrame dönüşümü"""
+
+    def test_liste_gibi_davranir(self):
+        """Satırlar aynen geri gelir; sıralama ve pickle sütunları birlikte taşır"""
+        satirlar = ornek_satirlar()
+        tablo = YerlesimTablosu(satirlar)
+        assert len(tablo) == 3
+        assert tablo == satirlar
+        assert tablo[-1] == satirlar[-1]
+        assert tablo[1:] == satirlar[1:]
+
+        tablo.salon_sirasina_gore_sirala()
+        beklenen = sorted(satirlar, key=lambda x: (x['salon_adi'], x['sira_no']))
+        assert tablo == beklenen
+        assert pickle.loads(pickle.dumps(tablo)) == beklenen
+
+    def test_dataframe_sutunlari(self):
+        """Sınıf/salon kategorik, bayraklar bool, eksik sınav adı NaN olur"""
+        pd = pytest.importorskip("pandas")
+        tablo = YerlesimTablosu(ornek_satirlar())
+        df = tablo.dataframe()
+        assert list(df['ogrenci_id']) == [5, 6, 7]
+        assert isinstance(df['ogrenci_sinif'].dtype, pd.CategoricalDtype)
+        assert list(df['salon_adi'].astype(str)) == ['B-201', 'A-101', 'B-201']
+        assert list(df['sabit_mi']) == [False, True, False]
+        assert list(df['ogretmen_masasi']) == [False, False, True]
+        assert pd.isna(df['sinav_adi'].iloc[2])
+        assert len(YerlesimTablosu().dataframe()) == 0
+
+    def test_harmanla_sutunlu_sonuc(self):
+        """sutunlu_sonuc açıkken sonuç aynı satırları taşıyan bir YerlesimTablosu'dur"""
+        ogrenciler = ogrenci_listesi({('9', 'A'): 8, ('10', 'B'): 8, ('11', 'C'): 6})
+        salonlar = [{'id': 1, 'salon_adi': 'A-101', 'kapasite': 12},
+                    {'id': 2, 'salon_adi': 'A-102', 'kapasite': 12}]
+        liste = HarmanlamaEngine(HarmanlamaConfig(seed=4)).harmanla(ogrenciler, salonlar)
+        sutunlu = HarmanlamaEngine(HarmanlamaConfig(seed=4, sutunlu_sonuc=True)).harmanla(
+            ogrenciler, salonlar
+        )
+        assert sutunlu['basarili'], sutunlu['hatalar']
+        assert isinstance(sutunlu['yerlesim'], YerlesimTablosu)
+        assert sutunlu['yerlesim'] == liste['yerlesim']
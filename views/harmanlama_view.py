@@ -19,8 +19,12 @@ from assets.styles import (KelebekTheme, configure_standard_button,
                            ScrollableFrame)
 from assets.layout import setup_responsive_window
 from controllers.database_manager import get_db
-from controllers.harmanlama_engine import HarmanlamaEngine, HarmanlamaConfig, GozetmenAtamaEngine
+from controllers.harmanlama_engine import (HarmanlamaEngine, HarmanlamaConfig, GozetmenAtamaEngine,
+                                           IptalBelirteci)
+from controllers.harmanlama_isci import get_harmanlama_isci
+from controllers.harmanlama_ayar import varsayilan_profil_dosyasi
 from controllers.excel_handler import ExcelHandler
+from controllers.yerlesim_tablosu import YerlesimTablosu
 from utils import format_sira_label
 from views.visual_seating import VisualSeatingPlanWindow
 
@@ -28,11 +32,12 @@ from views.visual_seating import VisualSeatingPlanWindow
 class LoadingDialog(tk.Toplevel):
     """Yükleme animasyonu gösteren dialog"""
     
-    def __init__(self, parent, message="Lütfen bekleyin..."):
+    def __init__(self, parent, message="Lütfen bekleyin...", iptal_komutu=None, kabul_komutu=None):
         super().__init__(parent)
         self.title("İşlem Devam Ediyor")
         self.configure(bg=KelebekTheme.BG_DARK)
-        self.geometry("300x120")
+        yukseklik = 120 + 50 * sum(1 for komut in (iptal_komutu, kabul_komutu) if komut)
+        self.geometry(f"300x{yukseklik}")
         self.resizable(False, False)
         self.transient(parent)
         self.grab_set()
@@ -40,7 +45,7 @@ class LoadingDialog(tk.Toplevel):
         # Ortala
         self.update_idletasks()
         x = parent.winfo_x() + (parent.winfo_width() - 300) // 2
-        y = parent.winfo_y() + (parent.winfo_height() - 120) // 2
+        y = parent.winfo_y() + (parent.winfo_height() - yukseklik) // 2
         self.geometry(f"+{x}+{y}")
         
         # Mesaj
@@ -65,6 +70,18 @@ class LoadingDialog(tk.Toplevel):
         )
         self.spinner_label.pack()
         
+        self.iptal_btn = None
+        if iptal_komutu:
+            self.iptal_btn = tk.Button(self, command=iptal_komutu)
+            configure_standard_button(self.iptal_btn, "danger", "⏹️ İptal")
+            self.iptal_btn.pack(pady=(8, 0))
+        
+        self.kabul_btn = None
+        if kabul_komutu:
+            self.kabul_btn = tk.Button(self, command=kabul_komutu)
+            configure_standard_button(self.kabul_btn, "success", "✅ Yeterli, bu yerleşimi al")
+            self.kabul_btn.pack(pady=(8, 0))
+        
         self.running = True
         self._animate()
         
@@ -85,6 +102,11 @@ class LoadingDialog(tk.Toplevel):
 class GelismisHarmanlamaView:
     """Geliştirilmiş Harmanlama ve Yerleştirme ekranı"""
     
+    # Bu sayıda ve üzeri salon seçildiğinde salonlar ayrı süreçlerde çözülür
+    SALON_AYRISTIRMA_ESIGI = 10
+    # "Aynı şubeleri uzaklaştır" seçiliyken yerel aramaya tanınan süre (saniye)
+    ARALIK_OPTIMIZASYON_SURESI = 10.0
+    
     def __init__(self, window, parent):
         self.window = window
         self.parent = parent
@@ -119,10 +141,13 @@ class GelismisHarmanlamaView:
         self._worker_queue: queue.Queue = queue.Queue()
         self._worker_thread: threading.Thread | None = None
         self._loading_dialog: LoadingDialog | None = None
+        self._iptal_belirteci: IptalBelirteci | None = None
         
         self.setup_ui()
         self.load_sinavlar()
         self._poll_worker_queue()
+        # Harmanlama süreci ve OR-Tools ilk kullanımdan önce hazırlansın
+        get_harmanlama_isci().isit()
     
     def setup_ui(self):
         """UI oluştur"""
@@ -297,6 +322,9 @@ class GelismisHarmanlamaView:
         tk.Button(btn_frame, text="📜 Detaylı Log", 
                  font=(KelebekTheme.FONT_FAMILY, 8),
                  command=self.show_log_window).pack(side="right")
+        tk.Button(btn_frame, text="📈 Geçmiş",
+                 font=(KelebekTheme.FONT_FAMILY, 8),
+                 command=self.gecmis_export).pack(side="right", padx=(0, 5))
 
     def _build_salon_panel(self, container):
         tk.Label(
@@ -353,6 +381,28 @@ class GelismisHarmanlamaView:
             self._style_action_button(btn, variant, text)
             btn.pack(pady=6, fill="x", padx=20)
 
+        self.artimli_var = tk.BooleanVar(value=False)
+        tk.Checkbutton(
+            container,
+            text="♻️ Kayıtlı yerleşimi koru (sadece değişenleri taşı)",
+            variable=self.artimli_var,
+            font=(KelebekTheme.FONT_FAMILY, 9),
+            bg=KelebekTheme.BG_WHITE,
+            fg=KelebekTheme.TEXT_DARK,
+            activebackground=KelebekTheme.BG_WHITE
+        ).pack(anchor="w", padx=20, pady=(4, 0))
+
+        self.aralik_var = tk.BooleanVar(value=False)
+        tk.Checkbutton(
+            container,
+            text=f"📏 Aynı şubeleri uzaklaştır (en fazla {self.ARALIK_OPTIMIZASYON_SURESI:g} sn)",
+            variable=self.aralik_var,
+            font=(KelebekTheme.FONT_FAMILY, 9),
+            bg=KelebekTheme.BG_WHITE,
+            fg=KelebekTheme.TEXT_DARK,
+            activebackground=KelebekTheme.BG_WHITE
+        ).pack(anchor="w", padx=20)
+
     def _build_gozetmen_panel(self, container):
         tk.Label(
             container,
@@ -1002,13 +1052,29 @@ class GelismisHarmanlamaView:
             return
         
         # Loading dialog göster
-        self._loading_dialog = LoadingDialog(self.window, "🔄 Harmanlama yapılıyor...")
+        self._iptal_belirteci = IptalBelirteci()
+        self._loading_dialog = LoadingDialog(
+            self.window,
+            "🔄 Harmanlama yapılıyor...",
+            iptal_komutu=self._harmanlamayi_iptal_et,
+            kabul_komutu=self._aralik_kabul_et if self.aralik_var.get() else None
+        )
+        
+        onceki_yerlesim = None
+        if self.artimli_var.get():
+            onceki_yerlesim = []
+            for sinav_id in self.secili_sinav_ids:
+                onceki_yerlesim.extend(self.db.yerlesim_getir(sinav_id))
+            self.log(f"♻️ Artımlı mod: {len(onceki_yerlesim)} kayıtlı koltuk korunacak")
         
         # Arka plan thread'i için veri hazırla
         worker_data = {
             'tum_ogrenciler': tum_ogrenciler,
             'secili_salonlar': secili_salonlar,
             'sabit_ogrenciler': sabit_ogrenciler,
+            'onceki_yerlesim': onceki_yerlesim,
+            'iptal_belirteci': self._iptal_belirteci,
+            'aralik_optimizasyonu': self.aralik_var.get(),
             'havuz': havuz,
             'secili_sinav_snapshot': dict(self.secili_sinav_snapshot)
         }
@@ -1024,11 +1090,46 @@ class GelismisHarmanlamaView:
         )
         self._worker_thread.start()
     
+    def _harmanlamayi_iptal_et(self):
+        """LoadingDialog'daki İptal butonu: çalışan çözümü durdur."""
+        if self._iptal_belirteci is None or self._iptal_belirteci.iptal_edildi:
+            return
+        self._iptal_belirteci.iptal_et()
+        if self._loading_dialog:
+            self._loading_dialog.message_label.config(text="⏹️ İptal ediliyor...")
+            if self._loading_dialog.iptal_btn:
+                self._loading_dialog.iptal_btn.config(state="disabled")
+    
+    def _aralik_kabul_et(self):
+        """LoadingDialog'daki Yeterli butonu: aralık optimizasyonunu bitir, en iyi yerleşimi al."""
+        if self._iptal_belirteci is None or self._iptal_belirteci.iptal_edildi:
+            return
+        self._iptal_belirteci.kabul_et()
+        if self._loading_dialog and self._loading_dialog.kabul_btn:
+            self._loading_dialog.kabul_btn.config(state="disabled")
+    
+    def _cozum_ilerlemesi(self, bilgi: dict):
+        """CP-SAT ara çözümlerini LoadingDialog'a aktar (çözücü thread'inden)."""
+        if bilgi.get('asama') == 'aralik':
+            self._worker_queue.put(("progress", f"📏 {bilgi['cozum_sayisi']}. tur | "
+                                                f"{bilgi['gecen_sure']:.1f} sn | yakınlık {bilgi['amac']}"))
+            return
+        metin = f"🔄 {bilgi['cozum_sayisi']}. çözüm | {bilgi['gecen_sure']:.1f} sn"
+        if bilgi.get('amac') is not None:
+            metin += f" | amaç {bilgi['amac']:g}"
+        self._worker_queue.put(("progress", metin))
+    
     def _worker_harmanla(self, data: dict):
         """Arka planda çalışan harmanlama işlemi."""
         try:
-            config = HarmanlamaConfig()
-            engine = HarmanlamaEngine(config)
+            config = HarmanlamaConfig(
+                salon_ayristirma=len(data['secili_salonlar']) >= self.SALON_AYRISTIRMA_ESIGI,
+                sonuc_onbellegi=True,
+                aralik_optimizasyonu=data.get('aralik_optimizasyonu', False),
+                optimizasyon_suresi=self.ARALIK_OPTIMIZASYON_SURESI,
+                sutunlu_sonuc=True,
+                ayar_profili=varsayilan_profil_dosyasi()
+            )
             
             self._worker_queue.put(("progress", "🔄 Salon sıra haritası hazırlanıyor..."))
             
@@ -1038,16 +1139,23 @@ class GelismisHarmanlamaView:
             
             self._worker_queue.put(("progress", "🔄 Öğrenciler yerleştiriliyor..."))
             
-            sonuc = engine.harmanla(
+            # Motor ayrı süreçte çalışır; bu thread yalnızca sonucu bekler
+            sonuc = get_harmanlama_isci().harmanla(
                 data['tum_ogrenciler'],
                 data['secili_salonlar'],
                 sabit_ogrenciler=data['sabit_ogrenciler'],
-                salon_sira_haritasi=salon_sira_map
+                salon_sira_haritasi=salon_sira_map,
+                onceki_yerlesim=data.get('onceki_yerlesim'),
+                config=config,
+                iptal_belirteci=data.get('iptal_belirteci'),
+                ilerleme_bildirimi=self._cozum_ilerlemesi
             )
             
             # Sonucu ana thread'e gönder
+            iptal = data.get('iptal_belirteci')
             self._worker_queue.put(("done", {
                 'sonuc': sonuc,
+                'iptal_edildi': bool(iptal and iptal.iptal_edildi),
                 'havuz': data['havuz'],
                 'secili_sinav_snapshot': data['secili_sinav_snapshot']
             }))
@@ -1069,11 +1177,18 @@ class GelismisHarmanlamaView:
         sonuc = payload['sonuc']
         havuz = payload['havuz']
         secili_sinav_snapshot = payload['secili_sinav_snapshot']
+        self._iptal_belirteci = None
+        
+        if payload.get('iptal_edildi'):
+            self.log("⏹️ Harmanlama iptal edildi; önceki yerleşim değiştirilmedi.")
+            show_message(self.window, "Harmanlama iptal edildi.", "info")
+            return
         
         if not sonuc['basarili']:
             self.log("❌ HARMANLAMA BAŞARISIZ!")
             for hata in sonuc['hatalar']:
                 self.log(f"   {hata}")
+            self._log_performans(sonuc.get('performans'))
             show_message(self.window, "Harmanlama başarısız! Loglara bakın.", "error")
             return
         
@@ -1085,7 +1200,7 @@ class GelismisHarmanlamaView:
         self.son_harman_secili_sinavlar = list(secili_sinav_snapshot.values())
         
         try:
-            self._persist_yerlesim(sonuc['yerlesim'])
+            self._persist_yerlesim(sonuc['yerlesim'], sonuc.get('calisma'))
             self.log("💾 Yerleşim veritabanına kaydedildi")
         except Exception as e:
             self.log(f"❌ Yerleşim kaydedilemedi: {e}")
@@ -1101,6 +1216,13 @@ class GelismisHarmanlamaView:
             for detay in uyumsuzluklar:
                 self.log(f"   {detay}")
         
+        degisiklikler = sonuc.get('degisiklikler')
+        if degisiklikler:
+            self.log(f"♻️ Yerinde kalan: {degisiklikler['yerinde_kalan']} | "
+                     f"Eklenen: {len(degisiklikler['eklenen'])} | "
+                     f"Çıkarılan: {len(degisiklikler['cikarilan'])} | "
+                     f"Taşınan: {len(degisiklikler['tasinan'])}")
+        
         koltuk_listesi = sonuc.get('koltuk_listesi') or []
         if koltuk_listesi:
             self.log("🪑 Koltuk Sıralaması:")
@@ -1117,11 +1239,22 @@ class GelismisHarmanlamaView:
         self.log(f"📊 İstatistikler:")
         self.log(f"   • Yerleştirilen öğrenci: {istatistikler['yerlestirilen']}")
         self.log(f"   • Kullanılan salon: {istatistikler['kullanilan_salon']}/{istatistikler['toplam_salon']}")
+        if istatistikler.get('cozum_yolu'):
+            self.log(f"   • Çözüm yolu: {istatistikler['cozum_yolu']}")
+        aralik = istatistikler.get('aralik')
+        if aralik:
+            self.log(f"   • Aynı şube yakınlığı: {aralik['baslangic_puani']} → {aralik['puan']} "
+                     f"({aralik['yakin_cift']} yakın çift, {aralik['takas']} takas, "
+                     f"{aralik['durma_nedeni']})")
+        if sonuc.get('onbellekten'):
+            self.log("   • ⚡ Aynı girdilerle önceki sonuç önbellekten kullanıldı")
         
         for salon_stat in istatistikler['salon_istatistikleri']:
             self.log(f"   • {salon_stat['salon_adi']}: {salon_stat['doluluk']}/"
                      f"{salon_stat['kapasite']} (%{salon_stat['oran']})")
         
+        self._log_performans(sonuc.get('performans'))
+        
         stat_text = (f"✅ {istatistikler['yerlestirilen']} öğrenci yerleştirildi | "
                      f"{istatistikler['kullanilan_salon']} salon kullanıldı")
         if uyumsuzluklar:
@@ -1137,12 +1270,30 @@ class GelismisHarmanlamaView:
         else:
             show_message(self.window, "✅ Harmanlama başarılı!", "success")
     
+    def _log_performans(self, performans: dict | None):
+        """Aşama süreleri ve CP-SAT istatistiklerini logla (sahadaki yavaş oturumlar için)"""
+        if not performans:
+            return
+        toplam = performans.get('toplam') or {}
+        self.log(f"⏱️ Performans: toplam {toplam.get('duvar', 0) * 1000:.0f} ms "
+                 f"(CPU {toplam.get('cpu', 0) * 1000:.0f} ms)")
+        asamalar = sorted(performans.get('asamalar', {}).items(),
+                          key=lambda item: item[1]['duvar'], reverse=True)
+        for asama, sure in asamalar:
+            self.log(f"   • {asama}: {sure['duvar'] * 1000:.0f} ms (CPU {sure['cpu'] * 1000:.0f} ms)")
+        for cozum in performans.get('cp_sat', []):
+            masa = " [öğretmen masalı]" if cozum.get('ogretmen_masasi') else ""
+            self.log(f"   • CP-SAT{masa}: {cozum['durum']}, {cozum['degisken']} değişken, "
+                     f"{cozum['kisit']} kısıt, {cozum['catisma']} çatışma, "
+                     f"{cozum['dal']} dal, {cozum['sure']:.2f} sn")
+    
     def _on_harmanla_error(self, payload: dict):
         """Harmanlama hatası olduğunda çağrılır (ana thread)."""
         # Loading dialog kapat
         if self._loading_dialog:
             self._loading_dialog.stop()
             self._loading_dialog = None
+        self._iptal_belirteci = None
         
         error_msg = f"Beklenmeyen hata: {payload['message']}"
         self.log(f"❌ {error_msg}")
@@ -1205,19 +1356,19 @@ class GelismisHarmanlamaView:
             'istatistikler': istatistikler
         }
     
-    def _persist_yerlesim(self, yerlesim_listesi):
-        """Yerleşim sonuçlarını tekil veya çoklu sınavlar için kaydet"""
+    def _persist_yerlesim(self, yerlesim_listesi, calisma=None):
+        """Yerleşim sonuçlarını tekil veya çoklu sınavlar için kaydet (çalışma geçmişiyle birlikte)"""
         if not yerlesim_listesi:
             return
         
         try:
             if hasattr(self.db, 'yerlesim_toplu_kaydet') and len(self.secili_sinav_ids) > 1:
-                self.db.yerlesim_toplu_kaydet(yerlesim_listesi)
+                self.db.yerlesim_toplu_kaydet(yerlesim_listesi, calisma)
             elif self.secili_sinav_ids:
                 hedef_id = self.secili_sinav_ids[0]
                 filtreli = [y for y in yerlesim_listesi
                             if y.get('sinav_id', hedef_id) == hedef_id]
-                self.db.yerlesim_kaydet(hedef_id, filtreli)
+                self.db.yerlesim_kaydet(hedef_id, filtreli, calisma)
         except AttributeError:
             self.log("⚠️ Yerleşim kaydı için gerekli yöntem bulunamadı")
     
@@ -1328,13 +1479,20 @@ class GelismisHarmanlamaView:
     def display_results(self, sonuc):
         """Sonuç bilgilerini kaydet"""
         yerlesim = sonuc['yerlesim']
-        salonlar = sorted(set(y['salon_adi'] for y in yerlesim))
+        salonlar = self._salon_adlari(yerlesim)
         summary_text = (f"Kullanılan salon: {len(salonlar)} | "
                         f"Yerleştirilen öğrenci: {len(yerlesim)}")
         self.last_summary = summary_text
         self.log(f"📊 {summary_text}")
         self.log("ℹ️ Detaylar için 'Yerleşimi Göster' butonunu kullanın.")
     
+    @staticmethod
+    def _salon_adlari(yerlesim) -> list:
+        """Yerleşimdeki salon adları (sıralı); sütunlu sonuçta satırlar dolaşılmaz"""
+        if isinstance(yerlesim, YerlesimTablosu):
+            return sorted(set(yerlesim.salon_adlari.values()))
+        return sorted(set(y['salon_adi'] for y in yerlesim))
+    
     def auto_assign_gozetmenler(self):
         """Her salon için otomatik gözetmen ataması yap"""
         if not self.yerlesim_sonuc:
@@ -1382,6 +1540,26 @@ class GelismisHarmanlamaView:
         
         self.update_gozetmen_map()
 
+    def gecmis_export(self):
+        """Harmanlama çalışma geçmişini Excel'e aktar"""
+        kayitlar = self.db.harmanlama_gecmisi_listele(limit=None)
+        if not kayitlar:
+            show_message(self.window, "Henüz kayıtlı harmanlama çalışması yok.", "warning")
+            return
+        file_path = filedialog.asksaveasfilename(
+            title="Harmanlama Geçmişini Kaydet",
+            defaultextension=".xlsx",
+            filetypes=[("Excel Files", "*.xlsx")],
+            initialfile=f"harmanlama_gecmisi_{datetime.now().strftime('%Y%m%d_%H%M')}.xlsx"
+        )
+        if not file_path:
+            return
+        if self.excel_handler.harmanlama_gecmisi_yazdir(file_path, kayitlar):
+            self.log(f"📈 {len(kayitlar)} harmanlama kaydı dışa aktarıldı: {file_path}")
+            show_message(self.window, f"{len(kayitlar)} çalışma kaydı dışa aktarıldı.", "success")
+        else:
+            show_message(self.window, "Harmanlama geçmişi dışa aktarılamadı.", "error")
+
     def excel_export(self):
         """Excel'e aktar (arka planda çalışır)"""
         if self._worker_thread and self._worker_thread.is_alive():
@@ -1470,19 +1648,22 @@ class GelismisHarmanlamaView:
             salon_gozetmenleri = data['salon_gozetmen_map']
             
             db = get_db()
-            for yer in data['yerlesim']:
-                ogrenci = db.ogrenci_getir(yer['ogrenci_id'])
-                if ogrenci:
-                    yerlesim_data.append({
-                        'salon_adi': yer['salon_adi'],
-                        'sira_no': yer['sira_no'],
-                        'ad': ogrenci['ad'],
-                        'soyad': ogrenci['soyad'],
-                        'sinif': ogrenci['sinif'],
-                        'sube': ogrenci['sube'],
-                        'gozetmenler': salon_gozetmenleri.get(yer['salon_id'], ""),
-                        'sinav_adi': sinav_map.get(yer.get('sinav_id'), {}).get('sinav_adi', yer.get('sinav_adi', ""))
-                    })
+            if isinstance(data['yerlesim'], YerlesimTablosu):
+                yerlesim_data = self._excel_tablosu(db, data['yerlesim'], sinav_map, salon_gozetmenleri)
+            else:
+                for yer in data['yerlesim']:
+                    ogrenci = db.ogrenci_getir(yer['ogrenci_id'])
+                    if ogrenci:
+                        yerlesim_data.append({
+                            'salon_adi': yer['salon_adi'],
+                            'sira_no': yer['sira_no'],
+                            'ad': ogrenci['ad'],
+                            'soyad': ogrenci['soyad'],
+                            'sinif': ogrenci['sinif'],
+                            'sube': ogrenci['sube'],
+                            'gozetmenler': salon_gozetmenleri.get(yer['salon_id'], ""),
+                            'sinav_adi': sinav_map.get(yer.get('sinav_id'), {}).get('sinav_adi', yer.get('sinav_adi', ""))
+                        })
             
             self._worker_queue.put(("progress", "📊 Excel dosyası yazılıyor..."))
             
@@ -1503,6 +1684,27 @@ class GelismisHarmanlamaView:
                 'traceback': traceback.format_exc()
             }))
     
+    @staticmethod
+    def _excel_tablosu(db, yerlesim: YerlesimTablosu, sinav_map: dict, salon_gozetmenleri: dict):
+        """
+        Sütunlu yerleşimi tek öğrenci sorgusuyla zenginleştirip Excel DataFrame'i kur
+        (öğrenci başına ogrenci_getir çağrısı yerine birleştirme).
+        """
+        import pandas as pd
+        tablo = yerlesim.dataframe()
+        ogrenciler = pd.DataFrame(db.ogrencileri_listele(),
+                                  columns=['id', 'ad', 'soyad', 'sinif', 'sube'])
+        tablo = tablo.drop(columns=['ogrenci_sinif', 'ogrenci_sube']).merge(
+            ogrenciler, left_on='ogrenci_id', right_on='id', how='inner'
+        )
+        tablo['gozetmenler'] = tablo['salon_id'].map(salon_gozetmenleri).fillna("")
+        sinav_adlari = {sinav_id: sinav.get('sinav_adi') for sinav_id, sinav in sinav_map.items()}
+        tablo['sinav_adi'] = tablo['sinav_id'].map(sinav_adlari).fillna(
+            tablo['sinav_adi'].astype(object)
+        ).fillna("")
+        return tablo[['salon_adi', 'sira_no', 'ad', 'soyad', 'sinif', 'sube',
+                      'gozetmenler', 'sinav_adi']]
+    
     def _on_excel_done(self, payload: dict):
         """Excel export tamamlandığında çağrılır (ana thread)."""
         if self._loading_dialog:
@@ -1585,7 +1787,19 @@ class GelismisHarmanlamaView:
         if not sinav_adlari and self.yerlesim_sonuc.get('yerlesim'):
              # fallback
              sinav_adlari = self.yerlesim_sonuc['yerlesim'][0].get('sinav_adi', 'Sınav')
-        VisualSeatingPlanWindow(self.window, self.yerlesim_sonuc['yerlesim'], sinav_adlari)
+        yerlesim = self.yerlesim_sonuc['yerlesim']
+        salon_sira_map = self.db.salon_sira_haritasi(sorted({yer['salon_id'] for yer in yerlesim}))
+        VisualSeatingPlanWindow(self.window, yerlesim, sinav_adlari,
+                                degisiklik_kaydet=self._elle_degisiklikleri_kaydet,
+                                salon_sira_haritasi=salon_sira_map)
+
+    def _elle_degisiklikleri_kaydet(self, degisenler, yerlesim):
+        """Görsel plandaki takas/taşımaları kaydet; yalnızca yeri değişen satırlar yazılır"""
+        hedef_id = self.secili_sinav_ids[0] if len(self.secili_sinav_ids) == 1 else None
+        sayi = self.db.yerlesim_degisikliklerini_kaydet(degisenler, sinav_id=hedef_id)
+        self.yerlesim_sonuc['yerlesim'] = yerlesim
+        self.log(f"✋ Elle düzenleme: {len(degisenler)} öğrencinin yeri değişti, {sayi} kayıt güncellendi")
+        return sayi
 
     def show_result_window(self):
         """Yerleşim sonuçlarını ayrı pencerede göster"""
@@ -11,6 +11,9 @@ from openpyxl.utils import get_column_letter
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from assets.styles import KelebekTheme, configure_standard_button, show_message
+from controllers.harmanlama_engine import HarmanlamaEngine
+from controllers.koltuk_izgarasi import ihlal_mesaji
+from utils import TEACHER_DESK_BASE
 
 class VisualSeatingPlanWindow(tk.Toplevel):
     """Görsel Renkli Sınıf Oturma Düzeni Penceresi (Gelişmiş)"""
@@ -32,11 +35,38 @@ class VisualSeatingPlanWindow(tk.Toplevel):
     EXCEL_COLORS = {k: v.replace("#", "") for k, v in CLASS_COLORS.items()}
     EXCEL_COLORS["Diğer"] = "BDC3C7" # Gri
     
-    def __init__(self, parent, yerlesim_data, sinav_adi=""):
+    def __init__(self, parent, yerlesim_data, sinav_adi="", degisiklik_kaydet=None,
+                 salon_sira_haritasi=None):
+        """
+        degisiklik_kaydet(degisenler, yerlesim) verilirse öğrenciler sürükle-bırak ile
+        takas edilebilir/taşınabilir ve yalnızca yeri değişen satırlar kaydedilir.
+        salon_sira_haritasi (DatabaseManager.salon_sira_haritasi) aktif sıraları verir;
+        boş sıraya taşıma yalnızca aktif sıralara yapılabilir.
+        Pencere satırların kopyasıyla çalışır; kaydedilmemiş hamleler çağırana sızmaz.
+        """
         super().__init__(parent)
         self.title(f"🎨 Görsel Sınıf Oturma Düzeni - {sinav_adi}")
-        self.yerlesim_data = yerlesim_data
+        self.yerlesim_data = self._satirlari_hazirla(yerlesim_data)
         self.sinav_adi = sinav_adi
+        self.degisiklik_kaydet = degisiklik_kaydet
+        self.aktif_siralar = None if salon_sira_haritasi is None else {
+            salon_id: {int(sira['sira_no']) for sira in siralar}
+            for salon_id, siralar in salon_sira_haritasi.items()
+        }
+        
+        # Elle düzenleme: artımlı kural denetimi ve sürükleme durumu
+        engine = HarmanlamaEngine()
+        salonlar = {yer['salon_id']: yer.get('salon_adi', '') for yer in self.yerlesim_data}
+        salon_sira_map = engine._hazirla_salon_sira_map(
+            [{'id': salon_id, 'salon_adi': ad, 'kapasite': 0} for salon_id, ad in salonlar.items()],
+            salon_sira_haritasi
+        ) if salon_sira_haritasi is not None else None
+        self.denetleyici = engine.yerlesim_denetleyici(self.yerlesim_data, salon_sira_map)
+        self._degisenler = {}  # ogrenci_id -> güncel satır
+        self._kutular = {}  # (salon_id, sira_no) -> kutu
+        self._kutu_konumlari = {}  # kutu/etiket -> (salon_id, sira_no)
+        self._surukle_kaynak = None
+        self._surukle_hedef = None
         
         # State
         self.filtered_class = tk.StringVar(value="Tümü")
@@ -97,6 +127,29 @@ class VisualSeatingPlanWindow(tk.Toplevel):
             # Renk göstergesi
             tk.Label(frame, bg=color, width=2).pack(side="right", padx=10)
             
+        # Elle Düzenleme
+        if self.degisiklik_kaydet is not None:
+            edit_card = tk.LabelFrame(left_panel, text="Elle Düzenleme", bg=KelebekTheme.BG_WHITE, fg=KelebekTheme.TEXT_DARK)
+            edit_card.pack(fill="x", padx=10, pady=10)
+            tk.Label(
+                edit_card,
+                text="Öğrenciyi sürükleyip başka bir sıraya bırakın: dolu sırada takas, boş sırada taşıma yapılır.",
+                font=("Arial", 8),
+                fg=KelebekTheme.TEXT_MUTED,
+                bg=KelebekTheme.BG_WHITE,
+                wraplength=220,
+                justify="left"
+            ).pack(padx=5, pady=2)
+            self.durum_label = tk.Label(
+                edit_card, text="", font=("Arial", 8, "bold"),
+                bg=KelebekTheme.BG_WHITE, wraplength=220, justify="left"
+            )
+            self.durum_label.pack(padx=5, pady=2)
+            self.btn_kaydet = tk.Button(edit_card, command=self._degisiklikleri_kaydet)
+            configure_standard_button(self.btn_kaydet, "success", "💾 Değişiklikleri Kaydet")
+            self.btn_kaydet.config(state="disabled")
+            self.btn_kaydet.pack(fill="x", padx=5, pady=5)
+        
         # Kaydet Butonları
         tk.Label(left_panel, text="Dışa Aktar", font=("Arial", 10, "bold"), bg=KelebekTheme.BG_WHITE).pack(pady=(20, 5))
         
@@ -151,6 +204,8 @@ class VisualSeatingPlanWindow(tk.Toplevel):
         # Temizle ve yeniden çiz
         for widget in self.scrollable_frame.winfo_children():
             widget.destroy()
+        self._kutular = {}
+        self._kutu_konumlari = {}
         self._draw_salons(self.scrollable_frame)
         
     def _draw_salons(self, parent):
@@ -240,7 +295,8 @@ class VisualSeatingPlanWindow(tk.Toplevel):
                     fg_color = "white"
                 
                 # Öğrenci Kutusu
-                box = tk.Frame(seating_frame, bg=bg_color, width=70, height=55, bd=1, relief="raised")
+                box = tk.Frame(seating_frame, bg=bg_color, width=70, height=55, bd=1, relief="raised",
+                               highlightthickness=0)
                 box.grid(row=r, column=real_col, padx=2, pady=2)
                 box.pack_propagate(False)
                 
@@ -270,13 +326,129 @@ class VisualSeatingPlanWindow(tk.Toplevel):
                         fg=fg_color
                     ).pack(side="bottom", pady=1)
                 
+                self._surukle_bagla(box, (ogrenci['salon_id'], sira_no))
             except ValueError:
                 continue
+        
+        # Boş aktif sıralar taşıma hedefi olarak çizilir
+        if self.degisiklik_kaydet is not None and self.aktif_siralar is not None and ogrenciler:
+            salon_id = ogrenciler[0]['salon_id']
+            dolu = {int(x['sira_no']) for x in ogrenciler if str(x['sira_no']).isdigit()}
+            for sira_no in sorted(self.aktif_siralar.get(salon_id, set()) - dolu):
+                if sira_no >= TEACHER_DESK_BASE:
+                    continue
+                max_sira = max(max_sira, sira_no)
+                box = tk.Frame(seating_frame, bg="white", width=70, height=55, bd=1, relief="groove",
+                               highlightthickness=0)
+                box.grid(row=(sira_no - 1) // 2, column=0 if (sira_no - 1) % 2 == 0 else 2, padx=2, pady=2)
+                box.pack_propagate(False)
+                tk.Label(box, text=str(sira_no), font=("Arial", 7), bg="white", fg="#bdc3c7").pack(anchor="nw", padx=1)
+                self._surukle_bagla(box, (salon_id, sira_no))
 
         # Koridor
         total_rows = (max_sira + 1) // 2
         tk.Label(seating_frame, text="K\nO\nR\nİ\nD\nO\nR", fg="#eee", font=("Arial", 8)).grid(row=0, column=1, rowspan=max(1, total_rows+1), padx=8)
 
+    @staticmethod
+    def _satirlari_hazirla(yerlesim_data):
+        """Motor (ogrenci_sinif) ve veritabanı (sinif) satırları aynı alanlarla çizilsin"""
+        satirlar = [dict(yer) for yer in yerlesim_data]
+        for yer in satirlar:
+            yer.setdefault('sinif', yer.get('ogrenci_sinif', ''))
+            yer.setdefault('sube', yer.get('ogrenci_sube', ''))
+            yer.setdefault('ogrenci_sinif', yer['sinif'])
+            yer.setdefault('ogrenci_sube', yer['sube'])
+        return satirlar
+    
+    # ==================== SÜRÜKLE-BIRAK ====================
+    
+    def _surukle_bagla(self, box, konum):
+        """Kutuyu ve içindeki etiketleri sürükle-bırak olaylarına bağla"""
+        if self.degisiklik_kaydet is None:
+            return
+        self._kutular[konum] = box
+        for widget in [box] + box.winfo_children():
+            self._kutu_konumlari[widget] = konum
+            widget.bind("<ButtonPress-1>", lambda e, k=konum: self._surukle_basla(k))
+            widget.bind("<B1-Motion>", self._surukle)
+            widget.bind("<ButtonRelease-1>", self._birak)
+    
+    def _hedef_gecerli_mi(self, konum):
+        """Dolu koltuklar takas, boş koltuklar yalnızca aktif sıra ise taşıma hedefidir"""
+        if self.denetleyici.yer(konum) is not None:
+            return True
+        return self.aktif_siralar is not None and konum[1] in self.aktif_siralar.get(konum[0], ())
+    
+    def _surukle_basla(self, konum):
+        self._surukle_kaynak = konum if self.denetleyici.yer(konum) is not None else None
+        self._surukle_hedef = None
+    
+    def _surukle(self, event):
+        """İmlecin altındaki sıra için hamleyi anında denetle ve kutuyu renklendir"""
+        if self._surukle_kaynak is None:
+            return
+        hedef = self._kutu_konumlari.get(self.winfo_containing(event.x_root, event.y_root))
+        if hedef == self._surukle_hedef:
+            return
+        self._vurguyu_kaldir()
+        self._surukle_hedef = hedef
+        if hedef is None or hedef == self._surukle_kaynak:
+            return
+        if not self._hedef_gecerli_mi(hedef):
+            self._kutular[hedef].config(highlightthickness=3, highlightbackground=KelebekTheme.DANGER,
+                                        highlightcolor=KelebekTheme.DANGER)
+            self._durum_yaz("⛔ Aktif olmayan sıra", KelebekTheme.DANGER)
+            return
+        ihlaller = self.denetleyici.takas_ihlalleri(self._surukle_kaynak, hedef)
+        renk = KelebekTheme.DANGER if ihlaller else KelebekTheme.SUCCESS
+        self._kutular[hedef].config(highlightthickness=3, highlightbackground=renk, highlightcolor=renk)
+        self._durum_yaz(ihlal_mesaji(ihlaller[0]) if ihlaller else "✅ Kurala uygun", renk)
+    
+    def _birak(self, event):
+        kaynak, hedef = self._surukle_kaynak, self._surukle_hedef
+        self._vurguyu_kaldir()
+        self._surukle_kaynak = self._surukle_hedef = None
+        if kaynak is None or hedef is None or hedef == kaynak:
+            return
+        if not self._hedef_gecerli_mi(hedef):
+            self._durum_yaz("⛔ Aktif olmayan sıraya taşınamaz", KelebekTheme.DANGER)
+            return
+        ihlaller = self.denetleyici.takas_ihlalleri(kaynak, hedef)
+        if ihlaller and not messagebox.askyesno(
+                "Kural İhlali",
+                "\n".join(ihlal_mesaji(kayit) for kayit in ihlaller) + "\n\nYine de uygulansın mı?",
+                parent=self):
+            self._durum_yaz("↩️ Hamle geri alındı", KelebekTheme.TEXT_MUTED)
+            return
+        for yer in self.denetleyici.takas_et(kaynak, hedef):
+            self._degisenler[yer['ogrenci_id']] = yer
+        self.btn_kaydet.config(state="normal")
+        self._durum_yaz(f"✋ Kaydedilmemiş değişiklik: {len(self._degisenler)} öğrenci", KelebekTheme.WARNING)
+        self._refresh_canvas()
+    
+    def _vurguyu_kaldir(self):
+        kutu = self._kutular.get(self._surukle_hedef)
+        if kutu is not None and kutu.winfo_exists():
+            kutu.config(highlightthickness=0)
+    
+    def _durum_yaz(self, metin, renk):
+        self.durum_label.config(text=metin, fg=renk)
+    
+    def _degisiklikleri_kaydet(self):
+        """Yalnızca yeri değişen öğrencilerin satırlarını kaydet"""
+        if not self._degisenler:
+            return
+        try:
+            # Çağıran kopyaları alır; sonraki kaydedilmemiş hamleler onun listesini değiştirmez
+            sayi = self.degisiklik_kaydet([dict(yer) for yer in self._degisenler.values()],
+                                          [dict(yer) for yer in self.yerlesim_data])
+        except Exception as e:
+            show_message(self, f"Değişiklikler kaydedilemedi:\n{e}", "error")
+            return
+        self._degisenler.clear()
+        self.btn_kaydet.config(state="disabled")
+        self._durum_yaz(f"💾 {sayi} yerleşim kaydı güncellendi", KelebekTheme.SUCCESS)
+    
     def _get_class_key(self, sinif_str):
         sinif_seviyesi = "".join(filter(str.isdigit, str(sinif_str)))
         if not sinif_seviyesi: